@@ -2,13 +2,46 @@
 Mini-Orchestrator - Routing logic pro různé typy requestů
 """
 
+import importlib.util
 import logging
-import re
+import sys
+from pathlib import Path
 from typing import Any, Dict
 
 logger = logging.getLogger(__name__)
 
 
+def _load_pattern_engine():
+    """
+    Načte sdílený PatternEngine z MyCoder (src/mycoder/router/pattern_engine.py)
+
+    V Docker image je soubor zkopírovaný vedle router.py, v checkoutu repa
+    se načte přímo ze zdrojů bez importu celého balíčku mycoder.
+    """
+    try:
+        from pattern_engine import PatternEngine
+
+        return PatternEngine
+    except ImportError:
+        pass
+
+    path = (
+        Path(__file__).resolve().parents[2]
+        / "src"
+        / "mycoder"
+        / "router"
+        / "pattern_engine.py"
+    )
+    spec = importlib.util.spec_from_file_location("pattern_engine", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["pattern_engine"] = module
+    spec.loader.exec_module(module)
+    return module.PatternEngine
+
+
+PatternEngine = _load_pattern_engine()
+
+
 class MiniOrchestrator:
     """Routing logika pro různé typy requests"""
 
@@ -50,9 +83,24 @@ class MiniOrchestrator:
         ],
     }
 
+    # Intent pro code úkoly (podřetězce, pořadí = priorita)
+    CODE_MODES = {
+        "debug": [r"(debug|fix|error|bug|problém)"],
+        "refactor": [r"(refactor|improve|vylepši|optimalizuj)"],
+        "review": [r"(review|check|zkontroluj|posouď)"],
+        "test": [r"(test|testuj|unittest)"],
+    }
+
     def __init__(self):
         self.total_requests = 0
         self.routing_stats = {}
+        # Všechny patterny v jednom průchodu textem
+        self.engine = PatternEngine(
+            {
+                **self.PATTERNS,
+                **{f"mode:{mode}": p for mode, p in self.CODE_MODES.items()},
+            }
+        )
 
     def route_request(self, user_message: str) -> Dict[str, Any]:
         """
@@ -63,14 +111,15 @@ class MiniOrchestrator:
                 'target': 'has' | 'llm_server',
                 'service': 'filesystem-mcp' | 'transcriber-mcp' | ...,
                 'mode': 'chat' | 'analyze' | 'debug' | ...,
-                'model': 'claude' | 'gpt4' | 'local' | 'auto'
+                'model': 'claude' | 'gpt4' | 'local' | 'auto',
+                'categories': všechny matchnuté kategorie (např. ['code', 'research'])
             }
         """
         self.total_requests += 1
-        msg_lower = user_message.lower()
+        matched = self.engine.match(user_message)
 
         # 1. HEAVY TASKS → LLM Server
-        if self._match_patterns(msg_lower, self.PATTERNS["transcribe"]):
+        if "transcribe" in matched:
             logger.info("Detected: TRANSCRIPTION task")
             return self._track_routing(
                 {
@@ -78,10 +127,11 @@ class MiniOrchestrator:
                     "service": "transcriber-mcp",
                     "mode": "transcribe",
                     "model": "whisper-large",
-                }
+                },
+                matched,
             )
 
-        if self._match_patterns(msg_lower, self.PATTERNS["translate"]):
+        if "translate" in matched:
             logger.info("Detected: TRANSLATION task")
             return self._track_routing(
                 {
@@ -89,33 +139,19 @@ class MiniOrchestrator:
                     "service": "translation",
                     "mode": "translate",
                     "model": "local",  # nebo 'gpt4' pro lepší kvalitu
-                }
+                },
+                matched,
             )
 
         # 2. CODE TASKS → HAS s Claude/GPT-4
-        if self._match_patterns(msg_lower, self.PATTERNS["code"]):
+        if "code" in matched:
             logger.info("Detected: CODE task")
 
             # Rozpoznat intent: debug vs refactor vs review vs generate
-            if any(
-                word in msg_lower
-                for word in ["debug", "fix", "error", "bug", "problém"]
-            ):
-                mode = "debug"
-            elif any(
-                word in msg_lower
-                for word in ["refactor", "improve", "vylepši", "optimalizuj"]
-            ):
-                mode = "refactor"
-            elif any(
-                word in msg_lower
-                for word in ["review", "check", "zkontroluj", "posouď"]
-            ):
-                mode = "review"
-            elif any(word in msg_lower for word in ["test", "testuj", "unittest"]):
-                mode = "test"
-            else:
-                mode = "chat"  # default pro code
+            mode = next(
+                (mode for mode in self.CODE_MODES if f"mode:{mode}" in matched),
+                "chat",  # default pro code
+            )
 
             return self._track_routing(
                 {
@@ -123,11 +159,12 @@ class MiniOrchestrator:
                     "service": "filesystem-mcp",
                     "mode": mode,
                     "model": "claude",  # Claude je best pro code
-                }
+                },
+                matched,
             )
 
         # 3. RESEARCH → HAS research-mcp
-        if self._match_patterns(msg_lower, self.PATTERNS["research"]):
+        if "research" in matched:
             logger.info("Detected: RESEARCH task")
             return self._track_routing(
                 {
@@ -135,11 +172,12 @@ class MiniOrchestrator:
                     "service": "research-mcp",
                     "mode": "chat",
                     "model": "gpt4",  # GPT-4 dobrý pro research
-                }
+                },
+                matched,
             )
 
         # 4. MEMORY SEARCH → HAS cldmemory-mcp
-        if self._match_patterns(msg_lower, self.PATTERNS["memory"]):
+        if "memory" in matched:
             logger.info("Detected: MEMORY SEARCH task")
             return self._track_routing(
                 {
@@ -147,11 +185,12 @@ class MiniOrchestrator:
                     "service": "cldmemory-mcp",
                     "mode": "search",
                     "model": None,  # memory search nepotřebuje LLM přímo
-                }
+                },
+                matched,
             )
 
         # 5. HOME AUTOMATION → Home Assistant
-        if self._match_patterns(msg_lower, self.PATTERNS["home"]):
+        if "home" in matched:
             logger.info("Detected: HOME AUTOMATION task")
             return self._track_routing(
                 {
@@ -159,11 +198,12 @@ class MiniOrchestrator:
                     "service": "home-assistant",
                     "mode": "command",
                     "model": None,
-                }
+                },
+                matched,
             )
 
         # 6. IMAGE GENERATION → LLM Server
-        if self._match_patterns(msg_lower, self.PATTERNS["image"]):
+        if "image" in matched:
             logger.info("Detected: IMAGE GENERATION task")
             return self._track_routing(
                 {
@@ -171,7 +211,8 @@ class MiniOrchestrator:
                     "service": "image-generation",
                     "mode": "generate",
                     "model": "stable-diffusion",
-                }
+                },
+                matched,
             )
 
         # DEFAULT: Obecný chat → HAS Zen Coordinator s auto model selection
@@ -182,31 +223,24 @@ class MiniOrchestrator:
                 "service": "zen-coordinator",
                 "mode": "chat",
                 "model": "auto",  # Zen vybere sám nejlepší model
-            }
+            },
+            matched,
         )
 
-    def _match_patterns(self, text: str, patterns: list) -> bool:
-        """Zkontroluje jestli text matchuje nějaký pattern"""
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
-
-    def _track_routing(self, routing: dict) -> dict:
-        """Track routing statistics"""
+    def _track_routing(self, routing: dict, matched=None) -> dict:
+        """Track routing statistics a přidá všechny matchnuté kategorie"""
+        if matched is not None:
+            routing["categories"] = [
+                c for c in matched.categories if c in self.PATTERNS
+            ]
         service = routing["service"]
         self.routing_stats[service] = self.routing_stats.get(service, 0) + 1
         return routing
 
     def _debug_get_matched_patterns(self, text: str) -> dict:
         """Debug metoda - vrátí které patterns matchly"""
-        msg_lower = text.lower()
-        matched = {}
-
-        for category, patterns in self.PATTERNS.items():
-            matches = []
-            for pattern in patterns:
-                if re.search(pattern, msg_lower, re.IGNORECASE):
-                    matches.append(pattern)
-
-            if matches:
-                matched[category] = matches
-
-        return matched
+        return {
+            category: patterns
+            for category, patterns in self.engine.matched_patterns(text).items()
+            if category in self.PATTERNS
+        }
@@ -59,31 +59,76 @@ Example:
     ```
 """
 
-# Core components
-from .adaptive_modes import AdaptiveModeManager, OperationalMode
-from .api_providers import (
-    APIProviderConfig,
-    APIProviderRouter,
-    APIProviderStatus,
-    APIProviderType,
-    APIResponse,
-    ClaudeAnthropicProvider,
-    ClaudeOAuthProvider,
-    GeminiProvider,
-    OllamaProvider,
-)
-from .context_manager import ContextManager
-from .enhanced_mycoder import EnhancedMyCoder
-from .enhanced_mycoder_v2 import EnhancedMyCoderV2
-from .mycoder import MyCoder
-from .security import FileSecurityManager, SecurityError
-from .storage import StorageManager
-from .tool_registry import (
-    ToolExecutionContext,
-    ToolRegistry,
-    ToolResult,
-    get_tool_registry,
-)
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .adaptive_modes import AdaptiveModeManager, OperationalMode
+    from .api_providers import (
+        APIProviderConfig,
+        APIProviderRouter,
+        APIProviderStatus,
+        APIProviderType,
+        APIResponse,
+        ClaudeAnthropicProvider,
+        ClaudeOAuthProvider,
+        GeminiProvider,
+        OllamaProvider,
+    )
+    from .context_manager import ContextManager
+    from .enhanced_mycoder import EnhancedMyCoder
+    from .enhanced_mycoder_v2 import EnhancedMyCoderV2
+    from .mycoder import MyCoder
+    from .security import FileSecurityManager, SecurityError
+    from .storage import StorageManager
+    from .tool_registry import (
+        ToolExecutionContext,
+        ToolRegistry,
+        ToolResult,
+        get_tool_registry,
+    )
+
+# Core components are imported on first attribute access (PEP 562), so
+# ``import mycoder`` and entry points that need only part of the package do
+# not load aiohttp, aiosqlite and every provider up front.
+_LAZY_IMPORTS = {
+    "AdaptiveModeManager": ".adaptive_modes",
+    "OperationalMode": ".adaptive_modes",
+    "APIProviderConfig": ".api_providers",
+    "APIProviderRouter": ".api_providers",
+    "APIProviderStatus": ".api_providers",
+    "APIProviderType": ".api_providers",
+    "APIResponse": ".api_providers",
+    "ClaudeAnthropicProvider": ".api_providers",
+    "ClaudeOAuthProvider": ".api_providers",
+    "GeminiProvider": ".api_providers",
+    "OllamaProvider": ".api_providers",
+    "ContextManager": ".context_manager",
+    "EnhancedMyCoder": ".enhanced_mycoder",
+    "EnhancedMyCoderV2": ".enhanced_mycoder_v2",
+    "MyCoder": ".mycoder",
+    "FileSecurityManager": ".security",
+    "SecurityError": ".security",
+    "StorageManager": ".storage",
+    "ToolExecutionContext": ".tool_registry",
+    "ToolRegistry": ".tool_registry",
+    "ToolResult": ".tool_registry",
+    "get_tool_registry": ".tool_registry",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 # Version info
 __version__ = "2.2.0"
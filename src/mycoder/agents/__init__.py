@@ -4,8 +4,9 @@ from .base import AgentResult, AgentType, BaseAgent
 from .bash import BashAgent
 from .explore import ExploreAgent
 from .general import GeneralPurposeAgent
-from .orchestrator import AgentOrchestrator
+from .orchestrator import AgentOrchestrator, SubTask
 from .plan import PlanAgent
+from .workspace_cache import WorkspaceCache
 
 __all__ = [
     "BaseAgent",
@@ -16,4 +17,6 @@ __all__ = [
     "BashAgent",
     "GeneralPurposeAgent",
     "AgentOrchestrator",
+    "SubTask",
+    "WorkspaceCache",
 ]
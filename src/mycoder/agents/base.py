@@ -6,7 +6,10 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .workspace_cache import WorkspaceCache
 
 
 class AgentType(Enum):
@@ -32,6 +35,8 @@ class BaseAgent(ABC):
         self.coder = coder
         self.working_dir = working_directory
         self.context: List[Dict[str, Any]] = []
+        # Set by the orchestrator when sub-agents share workspace reads
+        self.workspace_cache: Optional[WorkspaceCache] = None
 
     @property
     @abstractmethod
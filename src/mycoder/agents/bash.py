@@ -4,15 +4,17 @@ from __future__ import annotations
 
 import os
 import shlex
-import subprocess
 from typing import Any, Dict
 
+from ..utils.process_runner import get_process_runner
 from .base import AgentResult, AgentType, BaseAgent
 
 
 class BashAgent(BaseAgent):
     """Agent for running bash commands."""
 
+    DEFAULT_TIMEOUT = 60
+
     @property
     def agent_type(self) -> AgentType:
         return AgentType.BASH
@@ -40,12 +42,13 @@ class BashAgent(BaseAgent):
                     agent_type=self.agent_type,
                     error="Command is empty",
                 )
-            result = subprocess.run(
+            context = context or {}
+            result = await get_process_runner().run(
                 args,
                 cwd=self.working_dir,
-                capture_output=True,
-                text=True,
-                timeout=60,
+                timeout=context.get("timeout", self.DEFAULT_TIMEOUT),
+                on_stdout=context.get("on_output"),
+                on_stderr=context.get("on_output"),
             )
         except Exception as exc:
             return AgentResult(
@@ -58,11 +61,23 @@ class BashAgent(BaseAgent):
         output = result.stdout.strip()
         if not output and result.stderr:
             output = result.stderr.strip()
+        if result.timed_out:
+            return AgentResult(
+                success=False,
+                content=output,
+                agent_type=self.agent_type,
+                metadata={"returncode": result.returncode, "timed_out": True},
+                error=f"Command timed out after {result.duration_ms / 1000:.0f}s",
+            )
 
         return AgentResult(
             success=result.returncode == 0,
             content=output or "",
             agent_type=self.agent_type,
-            metadata={"returncode": result.returncode},
+            metadata={
+                "returncode": result.returncode,
+                "duration_ms": result.duration_ms,
+                "truncated": result.stdout_truncated + result.stderr_truncated,
+            },
             error=None if result.returncode == 0 else output or "Command failed",
         )
@@ -5,12 +5,17 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List
 
+from ..utils.process_runner import get_process_runner
 from .base import AgentResult, AgentType, BaseAgent
+from .workspace_cache import WorkspaceCache
 
 
 class ExploreAgent(BaseAgent):
     """Agent for quick codebase exploration."""
 
+    # rg results are cut to this many characters, counted from the first match
+    MAX_SEARCH_CHARS = 5000
+
     @property
     def agent_type(self) -> AgentType:
         return AgentType.EXPLORE
@@ -23,13 +28,14 @@ class ExploreAgent(BaseAgent):
 
     async def execute(self, task: str, context: Dict[str, Any] = None) -> AgentResult:
         thoroughness = context.get("thoroughness", "medium") if context else "medium"
+        cache = self.workspace_cache or WorkspaceCache(self.working_dir)
 
         if self._is_file_search(task):
-            result = await self._search_files(task, thoroughness)
+            result = await self._search_files(task, thoroughness, cache)
         elif self._is_code_search(task):
-            result = await self._search_code(task, thoroughness)
+            result = await self._search_code(task, thoroughness, cache)
         else:
-            result = await self._explore_structure(task, thoroughness)
+            result = await self._explore_structure(task, thoroughness, cache)
 
         return AgentResult(
             success=True,
@@ -46,28 +52,29 @@ class ExploreAgent(BaseAgent):
         keywords = ["search for", "find code", "grep", "where is function", "class"]
         return any(keyword in task.lower() for keyword in keywords)
 
-    async def _search_files(self, task: str, thoroughness: str) -> str:
+    async def _search_files(
+        self, task: str, thoroughness: str, cache: WorkspaceCache
+    ) -> str:
         patterns = self._extract_patterns(task)
         results: List[Path] = []
 
         for pattern in patterns:
-            matches = list(self.working_dir.rglob(pattern))
-            results.extend(matches[:50])
+            results.extend(await cache.glob(pattern, limit=50))
 
         if not results:
             return "No files found matching the pattern."
 
         return "\n".join(str(path.relative_to(self.working_dir)) for path in results)
 
-    async def _search_code(self, task: str, thoroughness: str) -> str:
-        import subprocess
-
+    async def _search_code(
+        self, task: str, thoroughness: str, cache: WorkspaceCache
+    ) -> str:
         search_term = self._extract_search_term(task)
         if not search_term:
             return "Could not determine search term."
 
-        try:
-            result = subprocess.run(
+        async def run_search() -> str:
+            result = await get_process_runner().run(
                 [
                     "rg",
                     "-n",
@@ -78,18 +85,25 @@ class ExploreAgent(BaseAgent):
                     search_term,
                     str(self.working_dir),
                 ],
-                capture_output=True,
-                text=True,
                 timeout=30,
+                # Keep the start of the output (4 bytes covers any UTF-8
+                # character); only a small tail is buffered past it
+                head_output_bytes=4 * self.MAX_SEARCH_CHARS,
+                max_output_bytes=1024,
             )
-            output = result.stdout.strip()
-            return output[:5000] if output else "No matches found."
+            return result.stdout.strip()[: self.MAX_SEARCH_CHARS]
+
+        try:
+            output = await cache.get_or_compute(("rg", search_term), run_search)
+            return output or "No matches found."
         except Exception as exc:
             return f"Search error: {exc}"
 
-    async def _explore_structure(self, task: str, thoroughness: str) -> str:
+    async def _explore_structure(
+        self, task: str, thoroughness: str, cache: WorkspaceCache
+    ) -> str:
         structure = []
-        for item in sorted(self.working_dir.iterdir()):
+        for item in await cache.listdir():
             if item.name.startswith("."):
                 continue
             prefix = "DIR" if item.is_dir() else "FILE"
@@ -19,7 +19,7 @@ class GeneralPurposeAgent(BaseAgent):
         return "General-purpose agent for analysis, coding, and guidance"
 
     async def execute(self, task: str, context: Dict[str, Any] = None) -> AgentResult:
-        response = await self.coder.process_request(task)
+        response = await self.coder.process_request(task, priority="agent")
         content = (
             response.get("content") if isinstance(response, dict) else str(response)
         )
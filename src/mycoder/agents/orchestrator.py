@@ -2,22 +2,64 @@
 
 from __future__ import annotations
 
+import asyncio
+import re
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from .base import AgentResult, AgentType, BaseAgent
 from .bash import BashAgent
 from .explore import ExploreAgent
 from .general import GeneralPurposeAgent
 from .plan import PlanAgent
+from .workspace_cache import WorkspaceCache
+
+# Numbered ("1." / "1)") or bulleted plan lines
+_PLAN_ITEM = re.compile(r"^\s*(?:\d+[.)]|[-*])\s+(?P<text>\S.*)$")
+# Markdown headings and whole-line bold titles ("**2. Steps**")
+_HEADING = re.compile(
+    r"^\s*(?:#+\s+(?P<title>.+)|(?:\d+[.)]\s+)?\*\*(?P<bold>[^*]+)\*\*:?)\s*$"
+)
+
+
+@dataclass
+class SubTask:
+    """One independent unit of a decomposed task."""
+
+    index: int
+    agent_type: AgentType
+    task: str
+    timeout: Optional[float] = None
+
+
+@dataclass
+class SubTaskResult:
+    subtask: SubTask
+    result: AgentResult
+    duration_ms: float = 0.0
 
 
 class AgentOrchestrator:
     """Orchestrator for selecting and executing agents."""
 
-    def __init__(self, coder, working_directory: Path) -> None:
+    # Plan sections whose items become subtasks
+    STEP_SECTION_KEYWORDS = ("step", "implementation", "subtask")
+
+    def __init__(
+        self,
+        coder,
+        working_directory: Path,
+        max_workers: int = 4,
+        subtask_timeout: float = 120.0,
+        max_subtasks: int = 8,
+    ) -> None:
         self.coder = coder
         self.working_dir = working_directory
+        self.max_workers = max(1, max_workers)
+        self.subtask_timeout = subtask_timeout
+        self.max_subtasks = max_subtasks
         self.agents: Dict[AgentType, BaseAgent] = {
             AgentType.EXPLORE: ExploreAgent(coder, working_directory),
             AgentType.PLAN: PlanAgent(coder, working_directory),
@@ -52,5 +94,166 @@ class AgentOrchestrator:
     async def execute(
         self, task: str, context: Optional[Dict[str, Any]] = None
     ) -> AgentResult:
+        if context and context.get("parallel"):
+            return await self.execute_parallel(task, context=context)
         agent = self.select_agent(task, context=context)
         return await agent.execute(task, context=context or {})
+
+    async def decompose(
+        self, task: str, context: Optional[Dict[str, Any]] = None
+    ) -> List[SubTask]:
+        """Split a task into independent subtasks using the plan agent."""
+        plan = await self.agents[AgentType.PLAN].execute(task, context=context or {})
+        steps = self.parse_plan_steps(plan.content) if plan.success else []
+        if not steps:
+            steps = [task]
+
+        subtasks = []
+        for index, step in enumerate(steps[: self.max_subtasks]):
+            agent_type = self.select_agent(step).agent_type
+            if agent_type in (AgentType.PLAN, AgentType.BASH):
+                # Planning is already done. Plan text is model output, so it
+                # never becomes a shell command without the user approving it.
+                agent_type = AgentType.GENERAL
+            subtasks.append(SubTask(index=index, agent_type=agent_type, task=step))
+        return subtasks
+
+    def parse_plan_steps(self, plan: str) -> List[str]:
+        """
+        Extract step lines from plan markdown.
+
+        Top-level items under a heading mentioning steps are preferred;
+        otherwise every top-level numbered or bulleted item is used.
+        """
+        in_steps = False
+        section_items: List[str] = []
+        all_items: List[str] = []
+        for line in plan.splitlines():
+            heading = _HEADING.match(line)
+            if heading:
+                title = (heading.group("title") or heading.group("bold")).lower()
+                in_steps = any(k in title for k in self.STEP_SECTION_KEYWORDS)
+                continue
+            item = _PLAN_ITEM.match(line)
+            if not item or line.startswith(("  ", "\t")):
+                continue
+            text = item.group("text").replace("**", "").strip()
+            if text:
+                all_items.append(text)
+                if in_steps:
+                    section_items.append(text)
+        return section_items or all_items
+
+    async def execute_parallel(
+        self,
+        task: str,
+        context: Optional[Dict[str, Any]] = None,
+        subtasks: Optional[List[SubTask]] = None,
+    ) -> AgentResult:
+        """
+        Run independent subtasks concurrently and merge their results.
+
+        At most ``max_workers`` sub-agents run at once, each bounded by its
+        own timeout. Sub-agents are fresh instances sharing a read-only
+        ``WorkspaceCache``. Results are merged in subtask order regardless of
+        completion order, so the output is deterministic.
+        """
+        context = dict(context or {})
+        context.pop("parallel", None)
+        if subtasks is None:
+            subtasks = await self.decompose(task, context)
+
+        cache = WorkspaceCache(self.working_dir)
+        semaphore = asyncio.Semaphore(self.max_workers)
+        started = time.perf_counter()
+
+        async def run(subtask: SubTask) -> SubTaskResult:
+            async with semaphore:
+                return await self._run_subtask(subtask, context, cache)
+
+        results = await asyncio.gather(*(run(subtask) for subtask in subtasks))
+        return self._merge(task, results, cache, (time.perf_counter() - started))
+
+    async def _run_subtask(
+        self, subtask: SubTask, context: Dict[str, Any], cache: WorkspaceCache
+    ) -> SubTaskResult:
+        agent = type(self.agents[subtask.agent_type])(self.coder, self.working_dir)
+        agent.workspace_cache = cache
+        timeout = subtask.timeout or self.subtask_timeout
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                agent.execute(subtask.task, context=dict(context)), timeout
+            )
+        except asyncio.TimeoutError:
+            result = AgentResult(
+                success=False,
+                content="",
+                agent_type=subtask.agent_type,
+                error=f"Subtask timed out after {timeout:.0f}s",
+            )
+        except asyncio.CancelledError:
+            # Only this subtask was cancelled; cancelling the batch still propagates
+            current = asyncio.current_task()
+            if current is not None and getattr(current, "cancelling", lambda: 0)():
+                raise
+            result = AgentResult(
+                success=False,
+                content="",
+                agent_type=subtask.agent_type,
+                error="Subtask was cancelled",
+            )
+        except Exception as exc:
+            result = AgentResult(
+                success=False,
+                content="",
+                agent_type=subtask.agent_type,
+                error=str(exc),
+            )
+        return SubTaskResult(
+            subtask=subtask,
+            result=result,
+            duration_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    def _merge(
+        self,
+        task: str,
+        results: List[SubTaskResult],
+        cache: WorkspaceCache,
+        elapsed: float,
+    ) -> AgentResult:
+        results = sorted(results, key=lambda r: r.subtask.index)
+        sections = []
+        for item in results:
+            subtask, result = item.subtask, item.result
+            header = (
+                f"## {subtask.index + 1}. [{subtask.agent_type.value}] {subtask.task}"
+            )
+            body = result.content if result.success else f"Failed: {result.error}"
+            sections.append(f"{header}\n\n{body}".rstrip())
+
+        failed = [r.subtask.index + 1 for r in results if not r.result.success]
+        return AgentResult(
+            success=not failed,
+            content="\n\n".join(sections),
+            agent_type=AgentType.GENERAL,
+            metadata={
+                "task": task,
+                "parallel": True,
+                "elapsed_ms": elapsed * 1000,
+                "workspace_cache": cache.stats(),
+                "subtasks": [
+                    {
+                        "index": r.subtask.index,
+                        "agent": r.subtask.agent_type.value,
+                        "task": r.subtask.task,
+                        "success": r.result.success,
+                        "duration_ms": r.duration_ms,
+                        "error": r.result.error,
+                    }
+                    for r in results
+                ],
+            },
+            error=f"Subtasks failed: {failed}" if failed else None,
+        )
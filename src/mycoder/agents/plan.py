@@ -41,7 +41,9 @@ class PlanAgent(BaseAgent):
     async def execute(self, task: str, context: Dict[str, Any] = None) -> AgentResult:
         plan_prompt = self._build_plan_prompt(task, context)
 
-        response = await self.coder.process_request(plan_prompt, use_tools=False)
+        response = await self.coder.process_request(
+            plan_prompt, use_tools=False, priority="agent"
+        )
         content = (
             response.get("content") if isinstance(response, dict) else str(response)
         )
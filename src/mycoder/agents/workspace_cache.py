@@ -0,0 +1,81 @@
+"""Read-only workspace cache shared by concurrently running agents."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class WorkspaceCache:
+    """
+    Memoizes workspace reads for the duration of one orchestrated task.
+
+    Sub-agents running in parallel usually list the same directories, glob
+    the same patterns and grep for overlapping terms. Each lookup runs once;
+    concurrent callers asking for the same key wait for the same lookup
+    instead of repeating the work. A lookup runs in its own task, so a
+    caller that is cancelled (e.g. by its subtask timeout) does not cancel
+    it for the others. File contents are keyed on mtime so a
+    file changed by a bash subtask is read again.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self._entries: Dict[Tuple[Any, ...], "asyncio.Future[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_compute(
+        self, key: Tuple[Any, ...], compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached value for key, computing it once."""
+        task = self._entries.get(key)
+        if task is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(compute())
+            self._entries[key] = task
+            task.add_done_callback(lambda done: self._forget_failed(key, done))
+        return await asyncio.shield(task)
+
+    def _forget_failed(self, key: Tuple[Any, ...], task: "asyncio.Future[Any]") -> None:
+        # Failures are not cached; the next caller retries
+        if task.cancelled() or task.exception() is not None:
+            if self._entries.get(key) is task:
+                del self._entries[key]
+
+    async def glob(self, pattern: str, limit: int = 50) -> List[Path]:
+        """Paths under the root matching a recursive glob pattern."""
+
+        async def compute() -> List[Path]:
+            return await asyncio.to_thread(
+                lambda: list(self.root.rglob(pattern))[:limit]
+            )
+
+        return await self.get_or_compute(("glob", pattern, limit), compute)
+
+    async def listdir(self, path: Optional[Path] = None) -> List[Path]:
+        """Sorted entries of a directory (default: the root)."""
+        directory = Path(path) if path else self.root
+
+        async def compute() -> List[Path]:
+            return await asyncio.to_thread(lambda: sorted(directory.iterdir()))
+
+        return await self.get_or_compute(("listdir", str(directory)), compute)
+
+    async def read_text(self, path: Path) -> str:
+        """File contents, re-read when the file's mtime changes."""
+        path = Path(path)
+        mtime = path.stat().st_mtime_ns
+
+        async def compute() -> str:
+            return await asyncio.to_thread(
+                path.read_text, encoding="utf-8", errors="replace"
+            )
+
+        return await self.get_or_compute(("read", str(path), mtime), compute)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
@@ -5,8 +5,11 @@ This module is now a compatibility facade for the new modular provider system.
 See `src/mycoder/providers/` for implementation details.
 """
 
+from typing import TYPE_CHECKING, Any, List
+
 import aiohttp
 
+from .providers import llm as _llm
 from .providers.base import (
     APIProviderConfig,
     APIProviderStatus,
@@ -14,22 +17,44 @@ from .providers.base import (
     APIResponse,
     BaseAPIProvider,
     CircuitBreaker,
+    CircuitEvent,
     CircuitState,
 )
-from .providers.llm import (
-    BedrockProvider,
-    ClaudeAnthropicProvider,
-    ClaudeOAuthProvider,
-    GeminiProvider,
-    HuggingFaceProvider,
-    MercuryProvider,
-    MistralProvider,
-    OllamaProvider,
-    OpenAIProvider,
-    TermuxOllamaProvider,
-    XAIProvider,
-)
+from .providers.batch import BatchResult
 from .providers.router import APIProviderRouter
+from .providers.scheduler import (
+    ProviderBusyError,
+    RequestPriority,
+    RequestScheduler,
+)
+from .providers.usage_ledger import BudgetPolicy, UsageLedger, UsageRecord
+
+if TYPE_CHECKING:
+    from .providers.llm import (
+        BedrockProvider,
+        ClaudeAnthropicProvider,
+        ClaudeOAuthProvider,
+        GeminiProvider,
+        HuggingFaceProvider,
+        MercuryProvider,
+        MistralProvider,
+        OllamaProvider,
+        OpenAIProvider,
+        TermuxOllamaProvider,
+        XAIProvider,
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # Provider classes load on first use, like in providers.llm
+    if name in _llm.__all__:
+        return getattr(_llm, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_llm.__all__))
+
 
 # Export legacy names or any other utilities if needed
 # The router is the main component used by the rest of the app
@@ -46,10 +71,18 @@ __all__ = [
     "APIProviderStatus",
     "CircuitState",
     "CircuitBreaker",
+    "CircuitEvent",
     "APIResponse",
     "APIProviderConfig",
     "BaseAPIProvider",
     "APIProviderRouter",
+    "BatchResult",
+    "ProviderBusyError",
+    "RequestPriority",
+    "RequestScheduler",
+    "BudgetPolicy",
+    "UsageLedger",
+    "UsageRecord",
     "ClaudeAnthropicProvider",
     "ClaudeOAuthProvider",
     "GeminiProvider",
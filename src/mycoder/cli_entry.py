@@ -0,0 +1,37 @@
+"""
+Entry point of the ``mycoder`` script.
+
+Parses the command line with the standard library only. The interactive CLI
+(rich, prompt_toolkit, psutil and the provider stack) is imported once it is
+about to run, so ``mycoder --help`` and ``mycoder --version`` return at once.
+"""
+
+import argparse
+from typing import List, Optional
+
+from . import __version__
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser of the ``mycoder`` script."""
+    parser = argparse.ArgumentParser(
+        prog="mycoder",
+        description="MyCoder interactive AI development assistant.",
+        epilog="Inside the CLI, type /help to list commands.",
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {__version__}"
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    build_parser().parse_args(argv)
+
+    from .cli_interactive import main as run_interactive
+
+    run_interactive()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Left: Chat History (Auto-scrolling Markdown). Right: Activity Panel (Live Activi
 
 import asyncio
 import functools
+import itertools
 import json
 import logging
 import os
@@ -19,8 +20,6 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
-import psutil
-
 logger = logging.getLogger(__name__)
 
 # Rich library is now required via poetry
@@ -75,6 +74,7 @@ try:
     from .todo_tracker import TodoTracker
     from .tool_registry import ToolExecutionContext
     from .ui_activity_panel import Activity, ActivityPanel, ActivityType
+    from .ui_chat_transcript import ChatTranscript
     from .web_tools import WebFetcher, WebSearcher
 except ImportError:
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -94,13 +94,9 @@ except ImportError:
     from mycoder.todo_tracker import TodoTracker
     from mycoder.tool_registry import ToolExecutionContext
     from mycoder.ui_activity_panel import Activity, ActivityPanel, ActivityType
+    from mycoder.ui_chat_transcript import ChatTranscript
     from mycoder.web_tools import WebFetcher, WebSearcher
 
-try:
-    from .tts_engine import TTSEngine
-except ImportError:
-    TTSEngine = None
-
 # CYBERPUNK PALETTE
 COLOR_SYSTEM = "bold cyan"
 COLOR_USER = "bold green"
@@ -136,6 +132,7 @@ class MyCoderCompleter(Completer):
             "/realtime",
             "/tools",
             "/providers",
+            "/usage",
             "/setup",
             "/init",
             "/history",
@@ -380,6 +377,9 @@ class ExecutionMonitor:
         if current_time - self._last_metrics_time < 2.0:
             return self._cached_metrics
 
+        # psutil is only needed once the UI is drawn, not at startup
+        import psutil
+
         metrics = {"cpu": 0.0, "ram": 0.0, "thermal": "N/A"}
         try:
             metrics["cpu"] = psutil.cpu_percent(interval=None)
@@ -575,6 +575,12 @@ class InteractiveCLI:
         self.active_provider = self.config.preferred_provider or "ollama_local"
         self.preferred_provider = self._map_provider(self.active_provider)
         self.chat_history: List[Dict[str, str]] = []
+        # Session-local ids: the transcript caches rendered messages by id
+        self._message_ids = itertools.count(1)
+        self.chat_transcript = ChatTranscript(self.console, self._render_message_body)
+        # Reply being streamed, shown as the live tail of the transcript
+        self.streaming_reply: Optional[str] = None
+        self.streaming_timestamp = ""
         self.show_thinking = False  # Toggle for displaying <thinking> blocks
         self.activity_panel = ActivityPanel()
         self.auto_executor = AutoExecutor(
@@ -601,12 +607,18 @@ class InteractiveCLI:
         # TTS engine (v2.2.0)
         self.tts_engine = None
         tts_config = getattr(self.config, "text_to_speech", {}) or {}
-        if TTSEngine and tts_config.get("enabled", False):
-            self.tts_engine = TTSEngine(
-                provider=tts_config.get("provider", "pyttsx3"),
-                voice=tts_config.get("voice", "cs"),
-                rate=tts_config.get("rate", 150),
-            )
+        if tts_config.get("enabled", False):
+            # Imported only when enabled: the TTS backends pull in audio SDKs
+            try:
+                from .tts_engine import TTSEngine
+            except ImportError:
+                TTSEngine = None
+            if TTSEngine:
+                self.tts_engine = TTSEngine(
+                    provider=tts_config.get("provider", "pyttsx3"),
+                    voice=tts_config.get("voice", "cs"),
+                    rate=tts_config.get("rate", 150),
+                )
 
         self.self_evolve_manager = SelfEvolveManager(self.coder, self.working_directory)
         self.todo_tracker = TodoTracker(
@@ -846,6 +858,67 @@ class InteractiveCLI:
             table.add_row(option["key"], option["label"], api_required)
         self.console.print(table)
 
+    def _show_usage(self, args: List[str]) -> None:
+        """Display usage ledger totals for today, this session, or per day."""
+        router = getattr(self.coder, "provider_router", None)
+        if not router or not getattr(router, "usage_ledger", None):
+            self.console.print(f"[{COLOR_INFO}]Usage tracking is not enabled.[/]")
+            return
+
+        scope = args[0].lower() if args else "today"
+        if scope == "today":
+            title = "Usage today"
+            group_by = ("provider", "model")
+            rows = router.get_usage_summary(
+                group_by=group_by, day=datetime.now().date().isoformat()
+            )
+        elif scope == "session":
+            title = f"Usage this session ({router.session_id})"
+            group_by = ("provider", "model")
+            rows = router.get_usage_summary(
+                group_by=group_by, session_id=router.session_id
+            )
+        elif scope == "days":
+            title = "Usage per day"
+            group_by = ("day",)
+            rows = sorted(
+                router.get_usage_summary(group_by=group_by),
+                key=lambda row: row["day"],
+                reverse=True,
+            )
+        else:
+            self.console.print("[bold red]Usage: /usage [today|session|days][/]")
+            return
+
+        table = Table(title=title, box=box.ROUNDED, border_style=COLOR_BORDER)
+        for column in group_by:
+            table.add_column(column.replace("_", " ").title(), style="cyan")
+        table.add_column("Requests", justify="right")
+        table.add_column("Failed", justify="right", style="red")
+        table.add_column("Tokens", justify="right")
+        table.add_column("Cost (USD)", justify="right", style="yellow")
+        for row in rows:
+            table.add_row(
+                *[str(row[column]) for column in group_by],
+                str(row["requests"]),
+                str(row["failures"] or 0),
+                str(row["tokens"] or 0),
+                f"{row['cost'] or 0:.4f}",
+            )
+        self.console.print(table)
+
+        ledger = router.usage_ledger
+        policy = router.budget_policy
+        lines = [
+            f"Session: ${ledger.session_cost(router.session_id):.4f}",
+            f"Today: ${ledger.day_cost():.4f}",
+        ]
+        if policy and policy.session_limit_usd is not None:
+            lines[0] += f" / ${policy.session_limit_usd:.2f}"
+        if policy and policy.daily_limit_usd is not None:
+            lines[1] += f" / ${policy.daily_limit_usd:.2f}"
+        self.console.print(f"[{COLOR_INFO}]{' | '.join(lines)}[/]")
+
     def _map_provider(self, provider_key: str) -> Optional[APIProviderType]:
         """Map a provider key to the corresponding APIProviderType enum."""
         mapping = {
@@ -872,6 +945,7 @@ class InteractiveCLI:
         """Append a chat entry and persist history."""
         self.chat_history.append(
             {
+                "id": next(self._message_ids),
                 "role": role,
                 "content": content,
                 "timestamp": self._current_timestamp(),
@@ -888,6 +962,8 @@ class InteractiveCLI:
             data = json.loads(self.history_path.read_text(encoding="utf-8"))
             if isinstance(data, list):
                 self.chat_history = data[-500:]
+                for entry in self.chat_history:
+                    entry["id"] = next(self._message_ids)
         except Exception as exc:
             self.console.print(f"[bold yellow]History load failed: {exc}[/]")
 
@@ -1186,6 +1262,8 @@ class InteractiveCLI:
             self.list_tools()
         elif cmd == "/providers":
             self._show_providers()
+        elif cmd == "/usage":
+            self._show_usage(args)
         elif cmd == "/setup":
             await self._configure_provider()
         elif cmd == "/history":
@@ -1256,7 +1334,7 @@ class InteractiveCLI:
         elif cmd == "/self-evolve":
             if not args:
                 self.console.print(
-                    "[bold red]Usage: /self-evolve propose|issue <desc>|apply <id>|dry-run <id>|status|show <id>[/]"
+                    "[bold red]Usage: /self-evolve propose|issue <desc>|apply <id>|dry-run <id>|evaluate [ids]|status|show <id>[/]"
                 )
                 return
             action = args[0].lower()
@@ -1354,6 +1432,38 @@ class InteractiveCLI:
                     self.console.print(
                         f"[{COLOR_INFO}]Affected files:[/] {', '.join(affected)}"
                     )
+            elif action == "evaluate":
+                proposal_ids = args[1:] or None
+                self.console.print(
+                    f"[{COLOR_INFO}]Evaluating proposals in parallel worktrees...[/]"
+                )
+                self._log_activity("SELF_EVOLVE", "evaluate")
+                try:
+                    results = await self.self_evolve_manager.evaluate_proposals(
+                        proposal_ids
+                    )
+                except (ValueError, RuntimeError) as exc:
+                    self.console.print(f"[bold red]{exc}[/]")
+                    return
+                if not results:
+                    self.console.print("No proposals to evaluate.")
+                    return
+                table = Table(title="Proposal Evaluation")
+                table.add_column("Proposal")
+                table.add_column("Risk", justify="right")
+                table.add_column("Result")
+                for result in results:
+                    outcome = (
+                        "[green]pass[/]"
+                        if result.get("success")
+                        else f"[red]{result.get('error') or 'tests failed'}[/]"
+                    )
+                    table.add_row(
+                        result["proposal_id"],
+                        f"{result['risk_score'] * 100:.0f}%",
+                        outcome,
+                    )
+                self.console.print(table)
             elif action == "issue":
                 if len(args) < 2:
                     self.console.print(
@@ -1424,7 +1534,7 @@ class InteractiveCLI:
                 self.console.print(Markdown(f"```diff\n{diff}\n```"))
             else:
                 self.console.print(
-                    "[bold red]Usage: /self-evolve propose|issue <desc>|apply <id>|dry-run <id>|status|show <id>[/]"
+                    "[bold red]Usage: /self-evolve propose|issue <desc>|apply <id>|dry-run <id>|evaluate [ids]|status|show <id>[/]"
                 )
                 return
         elif cmd == "/plan":
@@ -1505,7 +1615,7 @@ class InteractiveCLI:
         elif cmd == "/agent":
             if not args:
                 self.console.print(
-                    "[bold red]Usage: /agent explore <task> | /agent plan <task> | /agent bash <command> | /agent general <task>[/]"
+                    "[bold red]Usage: /agent explore <task> | /agent plan <task> | /agent bash <command> | /agent general <task> | /agent parallel <task>[/]"
                 )
                 return
             agent_key = args[0].lower()
@@ -1514,6 +1624,14 @@ class InteractiveCLI:
                 self.console.print("[bold red]Task/command is required.[/]")
                 return
             context = {"agent": agent_key}
+            if agent_key == "parallel":
+                self._log_activity("AGENT", agent_key)
+                result = await self.agent_orchestrator.execute_parallel(task)
+                self.console.print(Markdown(result.content))
+                self._append_chat_entry("ai", result.content)
+                if not result.success:
+                    self.console.print(f"[bold red]{result.error}[/]")
+                return
             if agent_key == "explore":
                 agent_type = AgentType.EXPLORE
             elif agent_key == "plan":
@@ -1756,6 +1874,7 @@ class InteractiveCLI:
         table.add_row("/realtime", "Toggle Realtime")
         table.add_row("/tools", "List tools")
         table.add_row("/providers", "List AI providers")
+        table.add_row("/usage [today|session|days]", "Show API spend and tokens")
         table.add_row("/setup", "Configure provider & API key")
         table.add_row("/init ...", "Initialize project guide file")
         table.add_row("/history ...", "Save/export/scroll chat history")
@@ -1767,7 +1886,9 @@ class InteractiveCLI:
         table.add_row("/plan ...", "Plan mode (create/approve/show/execute)")
         table.add_row("/todo ...", "Todo list tracking")
         table.add_row("/edit ...", "Edit file with unique match validation")
-        table.add_row("/agent ...", "Run specialized agent (explore/plan/bash/general)")
+        table.add_row(
+            "/agent ...", "Run specialized agent (explore/plan/bash/general/parallel)"
+        )
         table.add_row("/web ...", "Web fetch/search tools")
         table.add_row("/mcp ...", "MCP connect/tools/call")
         table.add_row("/voice start|stop|status", "Voice dictation control")
@@ -1841,11 +1962,14 @@ class InteractiveCLI:
             context_files.extend(attached_files)
 
         last_refresh_time = 0.0
+        self.streaming_reply = ""
+        self.streaming_timestamp = self._current_timestamp()
 
         def _stream_handler(chunk: str) -> None:
             nonlocal stream_text, last_refresh_time
             if not chunk:
                 return
+            self.streaming_reply = (self.streaming_reply or "") + chunk
             stream_text += chunk
             if len(stream_text) > 1000:
                 stream_text = stream_text[-1000:]
@@ -1875,6 +1999,8 @@ class InteractiveCLI:
                     if isinstance(response, dict)
                     else str(response)
                 )
+                # The finished reply replaces the streamed tail
+                self.streaming_reply = None
                 self._append_chat_entry("ai", content)
                 self._log_activity("RESPONSE_OK", f"{len(content)} chars")
                 if self.tts_engine and getattr(self.config, "text_to_speech", {}).get(
@@ -1959,6 +2085,7 @@ class InteractiveCLI:
                 )
                 return None
             finally:
+                self.streaming_reply = None
                 self.activity_panel.clear_operation()
                 self.activity_panel.clear_thinking()
                 progress_task.cancel()
@@ -2008,168 +2135,66 @@ class InteractiveCLI:
         layout["monitor"].update(self.activity_panel.render(self.console))
         return layout
 
-    def _estimate_message_height(
-        self, entry: Dict[str, str], content_width: int
-    ) -> int:
-        """
-        Conservatively estimate how many terminal lines this message will consume.
-
-        Uses defensive calculation that counts newlines and applies safety buffers
-        to prevent overflow during rendering.
-
-        Args:
-            entry: Chat message entry with 'role' and 'content'
-            content_width: Available width for content rendering
-
-        Returns:
-            Estimated line count (always rounds up for safety)
-        """
-        return _calculate_message_height(
-            entry.get("content", ""), entry.get("role", "user"), content_width
-        )
+    def _render_message_body(self, entry: Dict[str, str], show_thinking: bool):
+        """Body renderable of one chat message (Markdown for AI replies)."""
+        role = entry.get("role")
+        content = entry.get("content", "")
+        if role == "user":
+            return Text(content, style="white")
+        if role == "ai":
+            return _cached_render_ai_content(content, show_thinking)
+        return Text(content, style="italic yellow")
 
     def _render_chat_panel(self) -> Panel:
         """
-        Render chat history with conservative height calculation.
+        Render the visible part of the chat history.
 
-        Uses defensive sizing with newline counting and generous safety buffers
-        to prevent overflow even with complex Markdown content.
+        Messages are pre-rendered to lines by ``chat_transcript`` and cached
+        per width, so a refresh (up to ~20x/s while streaming) only slices
+        cached lines; the streaming reply is the one message rendered anew.
 
         Returns:
             Panel containing formatted chat history with separators
         """
-        # Get terminal dimensions
-        term_height = self.console.size.height
-        term_width = self.console.size.width
-
-        # Calculate available height for chat content - CONSERVATIVE APPROACH
-        # Panel decorations breakdown:
-        #   - Top border: 1
-        #   - Title line: 1
-        #   - Top padding: 1
-        #   - Bottom padding: 1
-        #   - Bottom border: 1
-        #   - Safety buffer for overflow indicator: 2
-        #   - Extra safety margin: 2
-        PANEL_OVERHEAD = 9  # Increased from 5 to be more defensive
-        available_lines = max(5, term_height - PANEL_OVERHEAD)
-
-        # Apply safety factor: only use 85% of calculated available space
-        # This accounts for Rich's internal rendering overhead
-        safe_available_lines = int(available_lines * 0.85)
-
-        # Content width inside panel (accounting for borders + padding + margins)
-        content_width = max(30, term_width - 10)  # Increased from 8 to 10
+        term_width, term_height = self.console.size
+        panel_title = "[bold green]💬 CHAT SESSION[/bold green]"
 
-        # Separator configuration
-        def separator_line() -> Text:
-            """Return a horizontal separator line for chat messages."""
-            return Text("─" * min(60, content_width), style="dim white")
-
-        # Handle empty history
-        if not self.chat_history:
+        if not self.chat_history and self.streaming_reply is None:
             return Panel(
                 Text("Waiting for input...", style=COLOR_INFO),
-                title="[bold green]💬 CHAT SESSION[/bold green]",
+                title=panel_title,
                 border_style="green",
                 box=box.ROUNDED,
                 padding=(1, 2),
                 expand=True,
             )
 
-        # Build visible history from newest to oldest until we run out of space
-        visible_history = []
-        consumed_lines = 0
-
-        # Reserve space for overflow indicator (if needed)
-        OVERFLOW_INDICATOR_LINES = 3
-        working_space = safe_available_lines - OVERFLOW_INDICATOR_LINES
-        total_messages = len(self.chat_history)
-        max_offset = max(0, total_messages - 1)
-        self.history_offset = min(max(self.history_offset, 0), max_offset)
-        visible_source = self.chat_history[: total_messages - self.history_offset]
-
-        # Iterate backwards through history
-        for entry in reversed(visible_source):
-            estimated_lines = self._estimate_message_height(entry, content_width)
-
-            # Strict check: stop BEFORE we exceed limit (defensive)
-            if consumed_lines + estimated_lines >= working_space:
-                break
-
-            visible_history.insert(0, entry)  # Insert at front to maintain order
-            consumed_lines += estimated_lines
-
-            # Hard limit: never show more than 15 messages regardless of space
-            # This prevents performance issues with rapid re-rendering
-            if len(visible_history) >= 15:
-                break
-
-        # Ensure we show at least the most recent message (emergency fallback)
-        if not visible_history and visible_source:
-            visible_history = [visible_source[-1]]
-
-        # Calculate overflow indicator
-        overflow = len(visible_source) - len(visible_history)
-
-        # Build renderable content
-        renderables: List = []
-
-        if self.history_offset > 0:
-            renderables.append(
-                Text(
-                    f"[... {self.history_offset} newer messages hidden ...]",
-                    style="dim italic",
-                    justify="center",
-                )
-            )
-            renderables.append(separator_line())
-
-        # Add overflow indicator if needed
-        if overflow > 0:
-            renderables.append(
-                Text(
-                    f"[... {overflow} starších zpráv skryto ...]",
-                    style="dim italic",
-                    justify="center",
-                )
-            )
-            renderables.append(separator_line())
-
-        # Render each visible message
-        for index, entry in enumerate(visible_history):
-            role = entry["role"]
-            content = entry["content"]
-            ts = entry["timestamp"]
-
-            # Determine styling based on role
-            if role == "user":
-                header_style = "bold green"
-                header_label = "You"
-                body_renderable = Text(content, style="white")
-            elif role == "ai":
-                header_style = "bold cyan"
-                header_label = "MyCoder AI"
-                body_renderable = _cached_render_ai_content(content, self.show_thinking)
-
-            else:  # system
-                header_style = "bold yellow"
-                header_label = "System"
-                body_renderable = Text(content, style="italic yellow")
-
-            # Add message header
-            renderables.append(Text(f"[{ts}] {header_label}:", style=header_style))
-
-            # Add message body
-            renderables.append(body_renderable)
-
-            # Add separator (except after last message)
-            if index != len(visible_history) - 1:
-                renderables.append(separator_line())
+        # Narrow terminals stack chat above the activity panel (_create_layout),
+        # wide ones give it 60% of the width and the full height
+        if term_width < 80:
+            panel_width, panel_height = term_width, term_height // 2
+        else:
+            panel_width, panel_height = term_width * 60 // 100, term_height
+        # Borders (2) and padding (1, 2)
+        content_width = max(20, panel_width - 6)
+        viewport = max(3, panel_height - 4)
+
+        streaming = None
+        if self.streaming_reply is not None:
+            streaming = (self.streaming_reply, self.streaming_timestamp)
+        view = self.chat_transcript.view(
+            self.chat_history,
+            content_width,
+            viewport,
+            show_thinking=self.show_thinking,
+            offset=self.history_offset,
+            streaming=streaming,
+        )
+        self.history_offset = view.hidden_newer
 
         return Panel(
-            Group(*renderables),
-            title="[bold green]💬 CHAT SESSION[/bold green]",
+            view.renderable(),
+            title=panel_title,
             border_style="green",
             box=box.ROUNDED,
             padding=(1, 2),
@@ -2332,6 +2357,7 @@ class InteractiveCLI:
             )
         finally:
             self._live = None
+            await self.self_evolve_manager.close()
 
 
 def main():
@@ -257,9 +257,13 @@ class EnhancedMyCoder(MyCoder):
             return None
 
         try:
-            # Search for relevant memories
+            # Search for relevant memories; semantic matching also recalls
+            # memories worded differently from the prompt
             result = await self.mcp_connector.search_memories(
-                query=prompt[:200], limit=5, mode=mode  # Limit query length
+                query=prompt[:200],  # Limit query length
+                limit=5,
+                mode=mode,
+                strategy="hybrid",
             )
 
             if result.get("success"):
@@ -35,6 +35,9 @@ try:
         APIProviderRouter,
         APIProviderType,
         APIResponse,
+        BudgetPolicy,
+        RequestScheduler,
+        UsageLedger,
     )
     from .context_manager import ContextManager
     from .mcp_bridge import MCPBridge
@@ -56,6 +59,9 @@ except ImportError:
         APIProviderRouter,
         APIProviderType,
         APIResponse,
+        BudgetPolicy,
+        RequestScheduler,
+        UsageLedger,
     )
     from mycoder.tool_registry import (  # type: ignore
         ToolExecutionContext,
@@ -202,6 +208,7 @@ class EnhancedMyCoderV2:
 
         # Initialize API provider router
         self.provider_router = None
+        self._warm_up_task: Optional[asyncio.Task] = None
 
         # Initialize tool registry
         self.tool_registry = get_tool_registry()
@@ -269,6 +276,7 @@ class EnhancedMyCoderV2:
 
         # Initialize API providers
         await self._initialize_api_providers()
+        await self._warm_up_providers()
 
         # NEW (v2.2.0): Initialize MCP bridge and tool orchestrator
         await self._initialize_tool_system()
@@ -515,6 +523,7 @@ class EnhancedMyCoderV2:
                 config={
                     "base_url": ollama_local_url,
                     "model": ollama_local_model,
+                    "keep_alive": ollama_local_config.get("keep_alive"),
                 },
             )
             provider_configs.append(local_ollama_config)
@@ -555,11 +564,46 @@ class EnhancedMyCoderV2:
             )
             provider_configs.append(remote_config)
 
+        # Usage ledger and spend budgets
+        usage_config = self._get_section("usage")
+        usage_ledger = None
+        budget_policy = None
+        if usage_config.get("enabled", True):
+            db_path = usage_config.get("db_path")
+            usage_ledger = UsageLedger(Path(db_path).expanduser() if db_path else None)
+            budget_policy = BudgetPolicy.from_config(usage_config)
+
+        # Priority scheduling and admission control in front of providers
+        scheduler_config = self._get_section("scheduler")
+        scheduler = RequestScheduler(
+            max_queue=scheduler_config.get("max_queue", 32),
+            queue_timeout=scheduler_config.get("queue_timeout_seconds", 30.0),
+        )
+
         # Initialize router with all providers
-        self.provider_router = APIProviderRouter(provider_configs)
+        self.provider_router = APIProviderRouter(
+            provider_configs,
+            usage_ledger=usage_ledger,
+            budget_policy=budget_policy,
+            scheduler=scheduler,
+        )
 
         logger.info(f"Initialized {len(provider_configs)} API providers")
 
+    async def _warm_up_providers(self):
+        """Optionally pre-load provider models so the first request is not cold."""
+        warm_up_config = self._get_section("warm_up")
+        if not warm_up_config.get("enabled", False):
+            return
+
+        warm_up = self.provider_router.warm_up_all(
+            timeout=warm_up_config.get("timeout_seconds", 30)
+        )
+        if warm_up_config.get("wait", False):
+            await warm_up
+        else:
+            self._warm_up_task = asyncio.create_task(warm_up)
+
     async def _initialize_tool_system(self):
         """Initialize MCP bridge and tool orchestrator for action-performing CLI (v2.2.0)"""
         try:
@@ -741,11 +785,19 @@ class EnhancedMyCoderV2:
             if self.thermal_monitor and self.thermal_monitor["enabled"]:
                 context["thermal_status"] = await self._get_thermal_status()
 
-            full_prompt = prompt
+            request_prompt = prompt
+            if context.get("memory_context"):
+                request_prompt = (
+                    f"Previous context:\n{context['memory_context']}\n\n"
+                    f"Current request: {prompt}"
+                )
+
+            full_prompt = request_prompt
             if use_tools:
                 # Inject AGENTS.md context
                 full_prompt = (
-                    f"{SYSTEM_PROMPT}\n{self.system_prompt_context}\n\nUser: {prompt}"
+                    f"{SYSTEM_PROMPT}\n{self.system_prompt_context}\n\n"
+                    f"User: {request_prompt}"
                 )
 
             # Execute request with multi-API system
@@ -866,6 +918,14 @@ class EnhancedMyCoderV2:
             context["session_id"] = kwargs["session_id"]
             context["continue_session"] = kwargs.get("continue_session", False)
 
+            # Recall earlier messages of a continued session related to the prompt
+            if context["continue_session"]:
+                memory_context = await self._get_history_context(
+                    kwargs.get("prompt", ""), kwargs["session_id"]
+                )
+                if memory_context:
+                    context["memory_context"] = memory_context
+
         # Add network status
         context["network_status"] = self._check_network_status()
 
@@ -885,6 +945,30 @@ class EnhancedMyCoderV2:
 
         return context
 
+    async def _get_history_context(self, prompt: str, session_id: str) -> Optional[str]:
+        """Get earlier messages of the session closest to the prompt (opt-in)."""
+        recall = self.config.get("history_recall", {})
+        if not recall.get("enabled", False):
+            return None
+
+        try:
+            messages = await self.storage_manager.search_history(
+                prompt[:200],  # Limit query length
+                limit=recall.get("limit", 3),
+                session_id=session_id,
+            )
+        except Exception as e:
+            logger.debug(f"History recall failed: {e}")
+            return None
+
+        return (
+            "\n".join(
+                f"[{message['role']}] {message['content'][:500]}"
+                for message in messages
+            )
+            or None
+        )
+
     async def _get_thermal_status(self) -> Dict[str, Any]:
         """Get current thermal status for Q9550 system"""
         try:
@@ -1409,6 +1493,10 @@ class EnhancedMyCoderV2:
         """Gracefully shutdown Enhanced MyCoder system"""
         logger.info("Shutting down Enhanced MyCoder v2.2.0...")
 
+        if self._warm_up_task and not self._warm_up_task.done():
+            self._warm_up_task.cancel()
+        self._warm_up_task = None
+
         # Stop adaptive mode monitoring
         if hasattr(self.mode_manager, "stop_monitoring"):
             await self.mode_manager.stop_monitoring()
@@ -17,9 +17,6 @@ from pathlib import Path
 # Ensure src is in path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from mycoder.context_manager import ContextManager
-from mycoder.enhanced_mycoder_v2 import EnhancedMyCoderV2
-
 
 class JsonlHandler(logging.Handler):
     """Logs events as JSONL lines for machine parsing."""
@@ -75,6 +72,10 @@ async def main():
     logging.info(f"Initializing Headless Agent. Auto-approve: {args.auto_approve}")
 
     try:
+        # Imported after argument parsing so --help and usage errors are fast
+        from mycoder.context_manager import ContextManager
+        from mycoder.enhanced_mycoder_v2 import EnhancedMyCoderV2
+
         working_dir = Path(args.working_dir).resolve()
 
         # Load Context
@@ -93,8 +94,9 @@ async def main():
         use_tools = args.auto_approve
 
         logging.info("Processing request...")
+        # Headless jobs yield to interactive sessions sharing the providers
         response = await coder.process_request(
-            prompt, use_tools=use_tools, continue_session=False
+            prompt, use_tools=use_tools, continue_session=False, priority="batch"
         )
 
         # Output result
@@ -4,65 +4,427 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import inspect
 import json
 import logging
 import os
+import re
 import shutil
+import sqlite3
+import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 from aiohttp import web
 
+try:
+    from .utils.process_runner import ProcessRunner
+    from .vector_index import VectorIndex, create_embedder
+except ImportError:
+    from utils.process_runner import ProcessRunner  # type: ignore
+    from vector_index import VectorIndex, create_embedder  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+# Receives (stream name, line) for commands whose output is streamed
+ToolOutputCallback = Callable[[str, str], Union[None, Awaitable[None]]]
+
 
 class LocalMemoryStore:
-    """Simple JSONL memory store for local MCP usage."""
+    """
+    SQLite memory store for local MCP usage.
+
+    Memories live in ``mcp_memory.db`` with an FTS5 index over their content,
+    so a search only touches matching rows. Hits are ranked by BM25 relevance
+    weighted by importance and recency. Every ``compact_every`` writes the
+    store drops duplicate memories, evicts the least important ones beyond
+    ``max_entries`` and merges index segments. An existing
+    ``mcp_memory.jsonl`` is imported once and renamed. SQLite builds without
+    FTS5 fall back to a substring scan.
+
+    With ``semantic`` enabled every memory is also embedded into a local
+    VectorIndex, so memories phrased differently from the query can be
+    recalled by ``semantic_search`` and ``hybrid_search``.
+    """
+
+    RECENCY_HALF_LIFE = 30 * 24 * 3600.0
+    MIN_SIMILARITY = 0.1
+    RRF_K = 60
+    _TOKEN = re.compile(r"\w+", re.UNICODE)
+    _COLUMNS = ("content", "type", "importance", "timestamp")
 
-    def __init__(self, data_dir: Path):
+    def __init__(
+        self,
+        data_dir: Path,
+        max_entries: int = 200_000,
+        compact_every: int = 1000,
+        semantic: bool = True,
+        embedder: Any = None,
+    ):
         self.data_dir = data_dir
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.memory_path = self.data_dir / "mcp_memory.jsonl"
+        self.db_path = self.data_dir / "mcp_memory.db"
+        self.legacy_path = self.data_dir / "mcp_memory.jsonl"
+        self.max_entries = max_entries
+        self.compact_every = compact_every
+        self.fts_enabled = False
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self.vectors: Optional[VectorIndex] = None
+        if semantic:
+            self.vectors = VectorIndex(
+                self.data_dir / "mcp_memory_vectors", embedder or create_embedder()
+            )
+        # Rows written before the index existed are embedded on first use
+        self._vectors_synced = False
+        self._migrate_jsonl()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open connection (lock held); created on first use."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn = conn
+            self._init_schema(conn)
+        return self._conn
+
+    def _init_schema(self, conn: sqlite3.Connection) -> None:
+        with conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS memories (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    content TEXT NOT NULL,
+                    type TEXT NOT NULL DEFAULT 'interaction',
+                    importance REAL NOT NULL DEFAULT 0.5,
+                    timestamp REAL NOT NULL,
+                    extra TEXT
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_memories_rank
+                    ON memories(importance, timestamp);
+                """)
+        has_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'memories_fts'"
+        ).fetchone()
+        try:
+            with conn:
+                conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+                        content,
+                        content='memories',
+                        content_rowid='id',
+                        tokenize='unicode61 remove_diacritics 2'
+                    );
+
+                    CREATE TRIGGER IF NOT EXISTS memories_ai
+                    AFTER INSERT ON memories BEGIN
+                        INSERT INTO memories_fts(rowid, content)
+                        VALUES (new.id, new.content);
+                    END;
+
+                    CREATE TRIGGER IF NOT EXISTS memories_ad
+                    AFTER DELETE ON memories BEGIN
+                        INSERT INTO memories_fts(memories_fts, rowid, content)
+                        VALUES ('delete', old.id, old.content);
+                    END;
+                    """)
+                if not has_index:
+                    # Rows written before the index existed
+                    conn.execute(
+                        "INSERT INTO memories_fts(memories_fts) VALUES ('rebuild')"
+                    )
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning("SQLite FTS5 unavailable, using substring search: %s", e)
+            self.fts_enabled = False
+
+    def _migrate_jsonl(self) -> None:
+        """Import the legacy append-only JSONL file once."""
+        if not self.legacy_path.exists():
+            return
+        entries = []
+        with self.legacy_path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict) and entry.get("content"):
+                    entries.append(entry)
+        self.extend(entries)
+        self.legacy_path.rename(
+            self.legacy_path.with_name(self.legacy_path.name + ".migrated")
+        )
+        logger.info("Migrated %s memories from %s", len(entries), self.legacy_path)
 
     def append(self, entry: Dict[str, Any]) -> None:
-        with self.memory_path.open("a", encoding="utf-8") as handle:
-            json.dump(entry, handle, ensure_ascii=True)
-            handle.write("\n")
+        self.extend([entry])
+
+    def extend(self, entries: List[Dict[str, Any]]) -> None:
+        """Store several memories in one transaction."""
+        if not entries:
+            return
+        rows = []
+        for entry in entries:
+            extra = {k: v for k, v in entry.items() if k not in self._COLUMNS}
+            rows.append(
+                (
+                    str(entry.get("content", "")),
+                    str(entry.get("type", "interaction")),
+                    float(entry.get("importance", 0.5)),
+                    float(entry.get("timestamp") or time.time()),
+                    json.dumps(extra, ensure_ascii=True) if extra else None,
+                )
+            )
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO memories (content, type, importance, timestamp, extra) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                # Ids are never reused, so they also key the vector index
+                last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            if self.vectors is not None and self._vectors_synced:
+                self.vectors.add(
+                    range(last_id - len(rows) + 1, last_id + 1),
+                    [row[0] for row in rows],
+                )
+            self._writes += len(rows)
+            due = self.compact_every and self._writes >= self.compact_every
+        if due:
+            self.compact()
 
     def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
-        if not self.memory_path.exists() or not query:
+        """
+        Best matching memories for a query.
+
+        With FTS5 every word of the query must appear in the memory, either
+        whole or as the start of a word. Without FTS5 the query is matched as
+        a case-insensitive substring.
+        """
+        if not query or limit <= 0:
             return []
 
-        results = []
-        query_lower = query.lower()
-        with self.memory_path.open("r", encoding="utf-8") as handle:
-            for line in handle:
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                content = str(entry.get("content", ""))
-                if query_lower in content.lower():
-                    results.append(entry)
+        with self._lock:
+            rows = self._keyword_rows(self._connection(), query, limit)
+        return [self._to_entry(row) for row in rows]
 
-        results.sort(key=lambda item: item.get("importance", 0), reverse=True)
-        return results[:limit]
+    def semantic_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Memories closest in meaning to the query, with a ``score``.
+
+        Falls back to keyword search when the store has no vector index.
+        """
+        if self.vectors is None:
+            return self.search(query, limit)
+        if not query or limit <= 0:
+            return []
+        with self._lock:
+            hits = self._semantic_rows(self._connection(), query, limit)
+        return [dict(self._to_entry(row), score=round(score, 4)) for row, score in hits]
+
+    def hybrid_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Keyword and semantic results merged by reciprocal rank fusion."""
+        if not query or limit <= 0:
+            return []
+        with self._lock:
+            conn = self._connection()
+            rankings = [self._keyword_rows(conn, query, limit * 2)]
+            if self.vectors is not None:
+                rankings.append(
+                    [row for row, _ in self._semantic_rows(conn, query, limit * 2)]
+                )
+
+        scores: Dict[int, float] = {}
+        by_id: Dict[int, sqlite3.Row] = {}
+        for ranking in rankings:
+            for rank, row in enumerate(ranking):
+                scores[row["id"]] = scores.get(row["id"], 0.0) + 1.0 / (
+                    self.RRF_K + rank
+                )
+                by_id[row["id"]] = row
+        best = sorted(scores, key=scores.get, reverse=True)[:limit]
+        return [self._to_entry(by_id[memory_id]) for memory_id in best]
+
+    def _keyword_rows(
+        self, conn: sqlite3.Connection, query: str, limit: int
+    ) -> List[sqlite3.Row]:
+        terms = self._TOKEN.findall(query.lower())
+        if self.fts_enabled and terms:
+            # bm25() is negative (lower is better); importance and
+            # recency scale it so ascending order puts the best first
+            return conn.execute(
+                """
+                SELECT m.* FROM memories_fts
+                JOIN memories m ON m.id = memories_fts.rowid
+                WHERE memories_fts MATCH ?
+                ORDER BY bm25(memories_fts) * (0.5 + m.importance)
+                    / (1.0 + MAX(0.0, ? - m.timestamp) / ?)
+                LIMIT ?
+                """,
+                (
+                    " ".join(f'"{term}"*' for term in terms),
+                    time.time(),
+                    self.RECENCY_HALF_LIFE,
+                    limit,
+                ),
+            ).fetchall()
+        return conn.execute(
+            """
+            SELECT * FROM memories WHERE instr(lower(content), ?) > 0
+            ORDER BY importance DESC, timestamp DESC
+            LIMIT ?
+            """,
+            (query.lower(), limit),
+        ).fetchall()
+
+    def _semantic_rows(
+        self, conn: sqlite3.Connection, query: str, limit: int
+    ) -> List[Tuple[sqlite3.Row, float]]:
+        self._sync_vectors(conn)
+        # Over-fetch: compaction leaves vectors of deleted memories behind
+        hits = self.vectors.search(query, limit * 3, self.MIN_SIMILARITY)
+        if not hits:
+            return []
+        placeholders = ",".join("?" for _ in hits)
+        rows = {
+            row["id"]: row
+            for row in conn.execute(
+                f"SELECT * FROM memories WHERE id IN ({placeholders})",
+                [memory_id for memory_id, _ in hits],
+            )
+        }
+        return [
+            (rows[memory_id], score) for memory_id, score in hits if memory_id in rows
+        ][:limit]
+
+    def _sync_vectors(self, conn: sqlite3.Connection) -> None:
+        """Embed memories the vector index has not seen (lock held)."""
+        if self._vectors_synced:
+            return
+        total = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+        if len(self.vectors) > 2 * total + 1000:
+            # Mostly vectors of compacted-away memories
+            self.vectors.clear()
+        last_id = self.vectors.max_id
+        while True:
+            batch = conn.execute(
+                "SELECT id, content FROM memories WHERE id > ? ORDER BY id LIMIT 2000",
+                (last_id,),
+            ).fetchall()
+            if not batch:
+                break
+            self.vectors.add(
+                [row["id"] for row in batch], [row["content"] for row in batch]
+            )
+            last_id = batch[-1]["id"]
+        self._vectors_synced = True
+
+    def _to_entry(self, row: sqlite3.Row) -> Dict[str, Any]:
+        entry = json.loads(row["extra"]) if row["extra"] else {}
+        entry.update({column: row[column] for column in self._COLUMNS})
+        return entry
+
+    def count(self) -> int:
+        with self._lock:
+            return (
+                self._connection()
+                .execute("SELECT COUNT(*) FROM memories")
+                .fetchone()[0]
+            )
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Drop duplicates and evict memories beyond ``max_entries``.
+
+        Of identical memories the newest is kept with the highest importance
+        any copy had. Eviction removes the least important, then oldest.
+        """
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("""
+                    UPDATE memories SET importance = (
+                        SELECT MAX(importance) FROM memories AS d
+                        WHERE d.content = memories.content
+                    )
+                    WHERE id IN (
+                        SELECT MAX(id) FROM memories
+                        GROUP BY content HAVING COUNT(*) > 1
+                    )
+                    """)
+                duplicates = conn.execute("""
+                    DELETE FROM memories WHERE id NOT IN (
+                        SELECT MAX(id) FROM memories GROUP BY content
+                    )
+                    """).rowcount
+                remaining = conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+                evicted = 0
+                if self.max_entries and remaining > self.max_entries:
+                    evicted = conn.execute(
+                        """
+                        DELETE FROM memories WHERE id IN (
+                            SELECT id FROM memories
+                            ORDER BY importance ASC, timestamp ASC
+                            LIMIT ?
+                        )
+                        """,
+                        (remaining - self.max_entries,),
+                    ).rowcount
+                    remaining -= evicted
+                if self.fts_enabled:
+                    conn.execute(
+                        "INSERT INTO memories_fts(memories_fts, rank) VALUES ('merge', 500)"
+                    )
+            self._writes = 0
+            if duplicates or evicted:
+                # Re-checked on the next semantic search
+                self._vectors_synced = False
+        if duplicates or evicted:
+            logger.info(
+                "Compacted memories: %s duplicates, %s evicted, %s remaining",
+                duplicates,
+                evicted,
+                remaining,
+            )
+        return {"duplicates": duplicates, "evicted": evicted, "remaining": remaining}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
 
 
 class LocalMCPServer:
     """Minimal MCP-compatible server with filesystem, git, terminal, and memory."""
 
+    MAX_BATCH_CALLS = 64
+    STREAMING_TOOLS = {"terminal_exec", "shell_command", "git_diff", "git_log"}
+
     def __init__(
         self,
         host: str = "127.0.0.1",
         port: int = 8020,
         data_dir: Optional[Path] = None,
+        output_head_bytes: int = 16 * 1024,
+        output_tail_bytes: int = 256 * 1024,
     ):
         self.host = host
         self.port = port
         self.data_dir = data_dir or Path.home() / ".mycoder"
         self.memory_store = LocalMemoryStore(self.data_dir)
+        # Command output kept per stream: the first head bytes and the last
+        # tail bytes, with a marker in place of what was dropped in between
+        self.output_head_bytes = output_head_bytes
+        self.output_tail_bytes = output_tail_bytes
+        self.process_runner = ProcessRunner(max_concurrency=self.MAX_BATCH_CALLS)
         self.app = web.Application()
         self.runner: Optional[web.AppRunner] = None
         self.site: Optional[web.TCPSite] = None
@@ -72,6 +434,8 @@ class LocalMCPServer:
         self.app.router.add_get("/health", self._handle_health)
         self.app.router.add_get("/services", self._handle_services)
         self.app.router.add_post("/mcp", self._handle_mcp)
+        self.app.router.add_post("/mcp/batch", self._handle_mcp_batch)
+        self.app.router.add_post("/mcp/stream", self._handle_mcp_stream)
 
     async def start(self) -> None:
         if self.runner:
@@ -87,11 +451,13 @@ class LocalMCPServer:
             await self.runner.cleanup()
             self.runner = None
             self.site = None
+        self.memory_store.close()
 
     async def _handle_health(self, request: web.Request) -> web.Response:
         return web.json_response({"status": "ok"})
 
-    async def _handle_services(self, request: web.Request) -> web.Response:
+    def service_catalog(self) -> Dict[str, Any]:
+        """Services and their tools, as reported by /services."""
         services = {
             "filesystem": {
                 "status": "running",
@@ -126,8 +492,10 @@ class LocalMCPServer:
                 ],
             },
         }
-        payload = {"zen_coordinator": {"services": services}}
-        return web.json_response(payload)
+        return {"zen_coordinator": {"services": services}}
+
+    async def _handle_services(self, request: web.Request) -> web.Response:
+        return web.json_response(self.service_catalog())
 
     async def _handle_mcp(self, request: web.Request) -> web.Response:
         try:
@@ -135,9 +503,106 @@ class LocalMCPServer:
         except json.JSONDecodeError:
             return web.json_response({"error": "Invalid JSON payload"}, status=400)
 
-        tool = data.get("tool")
-        args = data.get("arguments") or {}
+        status, result = await self.call_tool(
+            data.get("tool"), data.get("arguments") or {}
+        )
+        return web.json_response(result, status=status)
+
+    async def _handle_mcp_batch(self, request: web.Request) -> web.Response:
+        """
+        Run several tool calls in one request.
+
+        The payload is ``{"calls": [{"tool": ..., "arguments": {...}}, ...]}``.
+        Calls are independent and run concurrently, so a batch must not rely
+        on ordering between them (e.g. a write followed by a read). Each
+        entry of ``results`` carries the HTTP status the call would have had
+        on ``/mcp`` and either ``result`` or ``error``.
+        """
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"error": "Invalid JSON payload"}, status=400)
+
+        calls = data.get("calls") if isinstance(data, dict) else data
+        if not isinstance(calls, list):
+            return web.json_response({"error": "Expected a list of calls"}, status=400)
+        if len(calls) > self.MAX_BATCH_CALLS:
+            return web.json_response(
+                {"error": f"Batch exceeds {self.MAX_BATCH_CALLS} calls"}, status=400
+            )
+
+        async def run(call: Any) -> Dict[str, Any]:
+            if not isinstance(call, dict):
+                return {"status": 400, "error": "Invalid call"}
+            status, result = await self.call_tool(
+                call.get("tool"), call.get("arguments") or {}
+            )
+            if status != 200:
+                return {"status": status, "error": result.get("error")}
+            return {"status": status, "result": result}
+
+        results = await asyncio.gather(*(run(call) for call in calls))
+        return web.json_response({"results": list(results)})
+
+    async def _handle_mcp_stream(self, request: web.Request) -> web.StreamResponse:
+        """
+        Run one tool call and stream its output as NDJSON.
+
+        The payload is the same as for ``/mcp``. For the tools in
+        ``STREAMING_TOOLS`` every output line is sent as soon as the command
+        prints it, as ``{"type": "stdout" | "stderr", "data": line}``. The
+        last line is always ``{"type": "result", "status": ...}`` with
+        ``result`` (without the already streamed stdout/stderr) or ``error``.
+        A client that disconnects stops the command.
+        """
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"error": "Invalid JSON payload"}, status=400)
+
+        response = web.StreamResponse(
+            headers={"Content-Type": "application/x-ndjson; charset=utf-8"}
+        )
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+
+        async def emit(event: Dict[str, Any]) -> None:
+            await response.write((json.dumps(event) + "\n").encode("utf-8"))
+
+        async def on_output(stream: str, line: str) -> None:
+            await emit({"type": stream, "data": line})
 
+        status, result = await self.call_tool(
+            data.get("tool"), data.get("arguments") or {}, on_output=on_output
+        )
+        final: Dict[str, Any] = {"type": "result", "status": status}
+        if status == 200:
+            final["result"] = result
+        else:
+            final["error"] = result.get("error")
+        try:
+            await emit(final)
+            await response.write_eof()
+        except ConnectionError:
+            logger.debug("Stream client went away before the result")
+        return response
+
+    async def call_tool(
+        self,
+        tool: Any,
+        args: Dict[str, Any],
+        on_output: Optional[ToolOutputCallback] = None,
+    ) -> Tuple[int, Dict[str, Any]]:
+        """
+        Run one tool call; returns (HTTP status, payload).
+
+        This is what /mcp does after decoding the request. Clients running in
+        the same process call it directly and skip the HTTP round trip.
+
+        With ``on_output``, tools in ``STREAMING_TOOLS`` pass each output line
+        to it as ``(stream, line)`` while the command runs and leave stdout
+        and stderr out of the payload. Other tools ignore it.
+        """
         handler = {
             "file_read": self._tool_file_read,
             "file_write": self._tool_file_write,
@@ -154,53 +619,66 @@ class LocalMCPServer:
         }.get(tool)
 
         if not handler:
-            return web.json_response({"error": f"Unknown tool: {tool}"}, status=400)
+            return 400, {"error": f"Unknown tool: {tool}"}
 
         try:
-            result = await handler(args)
+            if on_output is not None and tool in self.STREAMING_TOOLS:
+                return 200, await handler(args, on_output=on_output)
+            return 200, await handler(args)
         except (FileNotFoundError, ValueError) as exc:
-            return web.json_response({"error": str(exc)}, status=400)
+            return 400, {"error": str(exc)}
         except Exception as exc:
             safe_tool = str(tool).replace("\r", " ").replace("\n", " ")
             logger.exception("Local MCP tool failure: %s", safe_tool)
-            return web.json_response({"error": str(exc)}, status=500)
-
-        return web.json_response(result)
+            return 500, {"error": str(exc)}
 
     async def _tool_file_read(self, args: Dict[str, Any]) -> Dict[str, Any]:
         path = self._resolve_path(args.get("path"))
-        if not path or not path.exists():
+        if not path:
             raise FileNotFoundError("File not found")
-        content = path.read_text(encoding="utf-8", errors="replace")
-        return {"path": str(path), "content": content}
+        return await asyncio.to_thread(self._read_file, path)
 
     async def _tool_file_write(self, args: Dict[str, Any]) -> Dict[str, Any]:
         path = self._resolve_path(args.get("path"))
         content = args.get("content", "")
         if not path:
             raise FileNotFoundError("Path not provided")
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(str(content), encoding="utf-8")
-        return {"path": str(path), "written": True}
+        return await asyncio.to_thread(self._write_file, path, str(content))
 
     async def _tool_file_list(self, args: Dict[str, Any]) -> Dict[str, Any]:
         path = self._resolve_path(args.get("path", "."))
         recursive = bool(args.get("recursive", False))
         max_entries = int(args.get("max_entries", 500))
-        if not path or not path.exists():
+        if not path:
+            raise FileNotFoundError("Path not found")
+        return await asyncio.to_thread(self._list_dir, path, recursive, max_entries)
+
+    # Filesystem work runs in a worker thread: the server may share its event
+    # loop with the CLI (in-process mode).
+
+    @staticmethod
+    def _read_file(path: Path) -> Dict[str, Any]:
+        if not path.exists():
+            raise FileNotFoundError("File not found")
+        content = path.read_text(encoding="utf-8", errors="replace")
+        return {"path": str(path), "content": content}
+
+    @staticmethod
+    def _write_file(path: Path, content: str) -> Dict[str, Any]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+        return {"path": str(path), "written": True}
+
+    @staticmethod
+    def _list_dir(path: Path, recursive: bool, max_entries: int) -> Dict[str, Any]:
+        if not path.exists():
             raise FileNotFoundError("Path not found")
 
         entries = []
-        if recursive:
-            for entry in path.rglob("*"):
-                entries.append(str(entry))
-                if len(entries) >= max_entries:
-                    break
-        else:
-            for entry in path.iterdir():
-                entries.append(str(entry))
-                if len(entries) >= max_entries:
-                    break
+        for entry in path.rglob("*") if recursive else path.iterdir():
+            entries.append(str(entry))
+            if len(entries) >= max_entries:
+                break
 
         return {"path": str(path), "entries": entries}
 
@@ -210,21 +688,24 @@ class LocalMCPServer:
         max_results = int(args.get("max_results", 50))
         if not query:
             raise ValueError("Query is required")
-        if not path or not path.exists():
+        if not path or not await asyncio.to_thread(path.exists):
             raise FileNotFoundError("Path not found")
 
         if shutil.which("rg"):
             return await self._rg_search(query, path, max_results)
-        return self._python_search(query, path, max_results)
+        return await asyncio.to_thread(self._python_search, query, path, max_results)
 
-    async def _tool_terminal_exec(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def _tool_terminal_exec(
+        self,
+        args: Dict[str, Any],
+        on_output: Optional[ToolOutputCallback] = None,
+    ) -> Dict[str, Any]:
         command = args.get("command") or args.get("cmd")
         if not command:
             raise ValueError("Command is required")
         working_dir = args.get("working_dir") or args.get("cwd")
         timeout = int(args.get("timeout", 30))
-        result = await self._run_command(str(command), working_dir, timeout)
-        return result
+        return await self._run_command(str(command), working_dir, timeout, on_output)
 
     async def _tool_system_info(self, args: Dict[str, Any]) -> Dict[str, Any]:
         return {
@@ -241,21 +722,31 @@ class LocalMCPServer:
             int(args.get("timeout", 30)),
         )
 
-    async def _tool_git_diff(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def _tool_git_diff(
+        self,
+        args: Dict[str, Any],
+        on_output: Optional[ToolOutputCallback] = None,
+    ) -> Dict[str, Any]:
         repo_path = self._resolve_path(args.get("repo_path", "."))
         return await self._run_command(
             f"git -C {self._shell_quote(repo_path)} diff",
             None,
             int(args.get("timeout", 30)),
+            on_output,
         )
 
-    async def _tool_git_log(self, args: Dict[str, Any]) -> Dict[str, Any]:
+    async def _tool_git_log(
+        self,
+        args: Dict[str, Any],
+        on_output: Optional[ToolOutputCallback] = None,
+    ) -> Dict[str, Any]:
         repo_path = self._resolve_path(args.get("repo_path", "."))
         limit = int(args.get("limit", 10))
         return await self._run_command(
             f"git -C {self._shell_quote(repo_path)} log -n {limit} --oneline",
             None,
             int(args.get("timeout", 30)),
+            on_output,
         )
 
     async def _tool_store_memory(self, args: Dict[str, Any]) -> Dict[str, Any]:
@@ -268,13 +759,21 @@ class LocalMCPServer:
             "importance": float(args.get("importance", 0.5)),
             "timestamp": time.time(),
         }
-        self.memory_store.append(entry)
+        await asyncio.to_thread(self.memory_store.append, entry)
         return {"stored": True}
 
     async def _tool_search_memories(self, args: Dict[str, Any]) -> Dict[str, Any]:
         query = str(args.get("query", "")).strip()
         limit = int(args.get("limit", 5))
-        memories = self.memory_store.search(query, limit)
+        strategy = str(args.get("strategy", "hybrid"))
+        search = {
+            "keyword": self.memory_store.search,
+            "semantic": self.memory_store.semantic_search,
+            "hybrid": self.memory_store.hybrid_search,
+        }.get(strategy)
+        if not search:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+        memories = await asyncio.to_thread(search, query, limit)
         return {"memories": memories}
 
     async def _rg_search(
@@ -317,25 +816,78 @@ class LocalMCPServer:
         return {"matches": matches}
 
     async def _run_command(
-        self, command: str, working_dir: Optional[str], timeout: int
+        self,
+        command: str,
+        working_dir: Optional[str],
+        timeout: int,
+        on_output: Optional[ToolOutputCallback] = None,
     ) -> Dict[str, Any]:
-        process = await asyncio.create_subprocess_shell(
-            command,
+        """
+        Run a shell command with capped output.
+
+        The command runs in its own process group, so on timeout the shell
+        and everything it started is killed. Output read until then is kept.
+        Each stream keeps ``output_head_bytes`` from its start and
+        ``output_tail_bytes`` from its end; ``stdout_truncated`` and
+        ``stderr_truncated`` report the bytes dropped in between.
+
+        With ``on_output`` the lines are streamed instead and the result has
+        no stdout/stderr. If the callback fails (the client went away), the
+        command is stopped.
+        """
+        stop = asyncio.Event()
+
+        def forward(stream: str):
+            if on_output is None:
+                return None
+
+            async def callback(line: str) -> None:
+                if stop.is_set():
+                    return
+                try:
+                    outcome = on_output(stream, line)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+                except Exception as exc:
+                    logger.info("Stopping command, output consumer failed: %s", exc)
+                    stop.set()
+
+            return callback
+
+        result = await self.process_runner.run(
+            self._shell_args(command),
             cwd=working_dir,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+            timeout=timeout,
+            on_stdout=forward("stdout"),
+            on_stderr=forward("stderr"),
+            max_output_bytes=self.output_tail_bytes,
+            head_output_bytes=self.output_head_bytes,
+            stop=stop,
         )
-        try:
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
-        except asyncio.TimeoutError:
-            process.kill()
-            return {"stdout": "", "stderr": "Command timed out", "returncode": 124}
 
-        return {
-            "stdout": stdout.decode("utf-8", errors="replace"),
-            "stderr": stderr.decode("utf-8", errors="replace"),
-            "returncode": process.returncode,
-        }
+        payload: Dict[str, Any] = {"returncode": result.returncode}
+        stderr = result.stderr
+        if result.timed_out:
+            payload["returncode"] = 124
+            payload["timed_out"] = True
+            stderr += ("\n" if stderr and not stderr.endswith("\n") else "") + (
+                "Command timed out"
+            )
+        if result.stopped:
+            payload["stopped"] = True
+        if on_output is None:
+            payload["stdout"] = result.stdout
+            payload["stderr"] = stderr
+            if result.stdout_truncated:
+                payload["stdout_truncated"] = result.stdout_truncated
+            if result.stderr_truncated:
+                payload["stderr_truncated"] = result.stderr_truncated
+        return payload
+
+    def _shell_args(self, command: str) -> List[str]:
+        if os.name == "nt":
+            return [os.environ.get("COMSPEC", "cmd.exe"), "/c", command]
+        return ["/bin/sh", "-c", command]
 
     def _resolve_path(self, raw_path: Optional[str]) -> Optional[Path]:
         if not raw_path:
@@ -355,11 +907,29 @@ def main() -> None:
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8020)
     parser.add_argument("--data-dir", default=None)
+    parser.add_argument(
+        "--output-head-bytes",
+        type=int,
+        default=16 * 1024,
+        help="Command output kept from the start of each stream",
+    )
+    parser.add_argument(
+        "--output-tail-bytes",
+        type=int,
+        default=256 * 1024,
+        help="Command output kept from the end of each stream",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
     data_dir = Path(args.data_dir).expanduser() if args.data_dir else None
-    server = LocalMCPServer(host=args.host, port=args.port, data_dir=data_dir)
+    server = LocalMCPServer(
+        host=args.host,
+        port=args.port,
+        data_dir=data_dir,
+        output_head_bytes=args.output_head_bytes,
+        output_tail_bytes=args.output_tail_bytes,
+    )
 
     async def _run() -> None:
         await server.start()
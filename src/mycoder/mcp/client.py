@@ -3,51 +3,151 @@
 from __future__ import annotations
 
 import asyncio
+import inspect
+import itertools
 import json
-from dataclasses import dataclass
-from typing import Any, Dict, List
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
 
 from .protocol import MCPTool
 
+logger = logging.getLogger(__name__)
+
+NotificationHandler = Callable[[str, str, Dict[str, Any]], Any]
+
 
 @dataclass
 class MCPServerConnection:
     name: str
-    process: asyncio.subprocess.Process
+    process: Optional[asyncio.subprocess.Process] = None
+    command: List[str] = field(default_factory=list)
+    pending: Dict[int, "asyncio.Future[Dict[str, Any]]"] = field(default_factory=dict)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    write_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    stderr_tail: Deque[str] = field(default_factory=lambda: deque(maxlen=50))
+    tasks: List["asyncio.Task[Any]"] = field(default_factory=list)
+    restart_task: Optional["asyncio.Task[None]"] = None
+    restarts: int = 0
+    # Restart attempts since the server last stayed up; bounds and backs off
+    attempts: int = 0
+    started_at: float = 0.0
+    closing: bool = False
 
 
 class MCPClient:
-    """Client for communicating with MCP servers."""
+    """
+    Client for communicating with MCP servers.
+
+    Each server runs as a subprocess speaking newline-delimited JSON-RPC over
+    stdio. A background reader per server matches responses to requests by
+    id, so any number of calls can be in flight at once, and hands server
+    notifications to registered handlers, which run in their own tasks. stderr
+    is drained continuously so a chatty server never blocks on a full pipe.
+    When a server exits unexpectedly, pending calls fail and the server is
+    restarted (up to ``max_restarts`` attempts in a row) with its tool list
+    refreshed; a server that then stays up for ``restart_reset_after``
+    seconds gets its attempts back.
+    """
+
+    # Stream buffer limit; tool results can be much larger than asyncio's 64 KiB
+    MAX_MESSAGE_BYTES = 16 * 1024 * 1024
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        request_timeout: float = 30.0,
+        max_restarts: int = 3,
+        restart_backoff: float = 0.5,
+        restart_reset_after: float = 60.0,
+    ) -> None:
         self.servers: Dict[str, MCPServerConnection] = {}
         self.available_tools: Dict[str, MCPTool] = {}
+        self.request_timeout = request_timeout
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.restart_reset_after = restart_reset_after
+        self.notification_handlers: List[NotificationHandler] = []
+        self._ids = itertools.count(1)
+        self._background: Set["asyncio.Task[Any]"] = set()
 
     async def connect(self, server_name: str, command: List[str]) -> bool:
+        conn = MCPServerConnection(name=server_name, command=list(command))
+        self.servers[server_name] = conn
         try:
-            process = await asyncio.create_subprocess_exec(
-                *command,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            self.servers[server_name] = MCPServerConnection(
-                name=server_name, process=process
-            )
-            tools = await self._initialize_server(server_name)
-            for tool in tools:
-                self.available_tools[f"{server_name}:{tool.name}"] = tool
+            await self._start(conn)
             return True
-        except Exception:
+        except Exception as e:
+            logger.warning(f"Failed to connect MCP server {server_name}: {e}")
+            await self.disconnect(server_name)
             return False
 
+    async def disconnect(self, server_name: str) -> None:
+        """Stop a server without restarting it."""
+        conn = self.servers.pop(server_name, None)
+        if not conn:
+            return
+        conn.closing = True
+        conn.ready.clear()
+        if conn.restart_task:
+            conn.restart_task.cancel()
+        await self._stop_process(conn)
+        self._fail_pending(conn, f"Server {server_name} disconnected")
+        self._drop_tools(server_name)
+
+    async def close(self) -> None:
+        """Disconnect every server and cancel background handler tasks."""
+        for server_name in list(self.servers):
+            await self.disconnect(server_name)
+        tasks = [t for t in self._background if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        """Run a coroutine in a task that is referenced until it finishes."""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def add_notification_handler(self, handler: NotificationHandler) -> None:
+        """Call handler(server_name, method, params) for server notifications."""
+        self.notification_handlers.append(handler)
+
+    async def _start(self, conn: MCPServerConnection) -> None:
+        process = await asyncio.create_subprocess_exec(
+            *conn.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=self.MAX_MESSAGE_BYTES,
+        )
+        conn.process = process
+        conn.tasks = [
+            asyncio.create_task(self._read_loop(conn, process)),
+            asyncio.create_task(self._drain_stderr(conn, process)),
+        ]
+        tools = await self._initialize_server(conn.name)
+        self._register_tools(conn.name, tools)
+        conn.started_at = time.monotonic()
+        conn.ready.set()
+
     async def _initialize_server(self, server_name: str) -> List[MCPTool]:
         conn = self.servers.get(server_name)
         if not conn:
             return []
 
-        await self._send_request(server_name, "initialize", {"capabilities": {}})
-        tools_response = await self._send_request(server_name, "tools/list", {})
+        response = await self._request(conn, "initialize", {"capabilities": {}})
+        if "error" in response:
+            raise ConnectionError(f"initialize failed: {response['error']}")
+        await self._notify(conn, "notifications/initialized", {})
+        return await self._list_tools(conn)
+
+    async def _list_tools(self, conn: MCPServerConnection) -> List[MCPTool]:
+        tools_response = await self._request(conn, "tools/list", {})
+        if "error" in tools_response:
+            raise ConnectionError(f"tools/list failed: {tools_response['error']}")
         tools = []
         for tool_data in tools_response.get("tools", []):
             tools.append(
@@ -59,8 +159,30 @@ class MCPClient:
             )
         return tools
 
+    async def refresh_tools(self, server_name: str) -> List[MCPTool]:
+        """Reload a server's tool list."""
+        conn = self.servers.get(server_name)
+        if not conn or not conn.ready.is_set():
+            return []
+        tools = await self._list_tools(conn)
+        self._register_tools(server_name, tools)
+        return tools
+
+    def _register_tools(self, server_name: str, tools: List[MCPTool]) -> None:
+        self._drop_tools(server_name)
+        for tool in tools:
+            self.available_tools[f"{server_name}:{tool.name}"] = tool
+
+    def _drop_tools(self, server_name: str) -> None:
+        prefix = f"{server_name}:"
+        for full_name in [n for n in self.available_tools if n.startswith(prefix)]:
+            del self.available_tools[full_name]
+
     async def call_tool(
-        self, tool_name: str, arguments: Dict[str, Any]
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         if ":" in tool_name:
             server_name, tool = tool_name.split(":", 1)
@@ -73,35 +195,241 @@ class MCPClient:
                 return {"error": f"Tool not found: {tool_name}"}
 
         return await self._send_request(
-            server_name, "tools/call", {"name": tool, "arguments": arguments}
+            server_name,
+            "tools/call",
+            {"name": tool, "arguments": arguments},
+            timeout=timeout,
         )
 
     async def _send_request(
-        self, server_name: str, method: str, params: Dict[str, Any]
+        self,
+        server_name: str,
+        method: str,
+        params: Dict[str, Any],
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         conn = self.servers.get(server_name)
-        if not conn or not conn.process.stdin:
+        if not conn:
             return {"error": "Server not connected"}
+        timeout = timeout or self.request_timeout
 
-        import uuid
+        if not conn.ready.is_set():
+            restarting = conn.restart_task and not conn.restart_task.done()
+            if not restarting:
+                return {"error": "Server not connected"}
+            try:
+                await asyncio.wait_for(conn.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return {"error": f"Server {server_name} is restarting"}
 
-        request_id = str(uuid.uuid4())
+        return await self._request(conn, method, params, timeout)
+
+    async def _request(
+        self,
+        conn: MCPServerConnection,
+        method: str,
+        params: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        process = conn.process
+        if not process or not process.stdin or process.returncode is not None:
+            return {"error": "Server not connected"}
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        conn.pending[request_id] = future
         message = {
             "jsonrpc": "2.0",
             "id": request_id,
             "method": method,
             "params": params,
         }
+        timeout = timeout or self.request_timeout
+
+        try:
+            await self._write(conn, message)
+            response = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return {"error": f"Request {method} timed out after {timeout:g}s"}
+        except (ConnectionError, OSError) as e:
+            return {"error": str(e) or "Server connection lost"}
+        finally:
+            conn.pending.pop(request_id, None)
+
+        if response.get("error") is not None:
+            error = response["error"]
+            if isinstance(error, dict):
+                return {"error": error.get("message", "Unknown error"), **error}
+            return {"error": str(error)}
+        result = response.get("result", {})
+        return result if isinstance(result, dict) else {"result": result}
+
+    async def _notify(
+        self, conn: MCPServerConnection, method: str, params: Dict[str, Any]
+    ) -> None:
+        await self._write(conn, {"jsonrpc": "2.0", "method": method, "params": params})
+
+    async def _write(self, conn: MCPServerConnection, message: Dict[str, Any]) -> None:
+        process = conn.process
+        if not process or not process.stdin:
+            raise ConnectionError("Server not connected")
+        async with conn.write_lock:
+            process.stdin.write((json.dumps(message) + "\n").encode())
+            await process.stdin.drain()
+
+    async def _read_loop(
+        self, conn: MCPServerConnection, process: asyncio.subprocess.Process
+    ) -> None:
+        try:
+            while True:
+                try:
+                    line = await process.stdout.readline()
+                except ValueError:
+                    logger.warning(f"MCP server {conn.name} sent an oversized message")
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug(f"Ignoring non-JSON output from {conn.name}")
+                    continue
+                if isinstance(message, dict):
+                    await self._dispatch(conn, message)
+        except asyncio.CancelledError:
+            return
+        if conn.process is process:
+            self._on_exit(conn)
+
+    async def _dispatch(
+        self, conn: MCPServerConnection, message: Dict[str, Any]
+    ) -> None:
+        method = message.get("method")
+        message_id = message.get("id")
+
+        if method is None:
+            future = conn.pending.get(message_id)
+            if future and not future.done():
+                future.set_result(message)
+            return
 
-        conn.process.stdin.write((json.dumps(message) + "\n").encode())
-        await conn.process.stdin.drain()
+        if message_id is not None:
+            # Request from the server; only ping is supported
+            reply: Dict[str, Any] = {"jsonrpc": "2.0", "id": message_id}
+            if method == "ping":
+                reply["result"] = {}
+            else:
+                reply["error"] = {"code": -32601, "message": "Method not found"}
+            try:
+                await self._write(conn, reply)
+            except (ConnectionError, OSError):
+                pass
+            return
+
+        params = message.get("params") or {}
+        if method == "notifications/tools/list_changed":
+            self._spawn(self._refresh_quietly(conn.name))
+        if self.notification_handlers:
+            # Off the reader, so a slow handler or one calling a tool does not
+            # hold up responses
+            self._spawn(self._run_handlers(conn.name, method, params))
+
+    async def _run_handlers(
+        self, server_name: str, method: str, params: Dict[str, Any]
+    ) -> None:
+        for handler in list(self.notification_handlers):
+            try:
+                outcome = handler(server_name, method, params)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception as e:
+                logger.warning(f"MCP notification handler failed: {e}")
+
+    async def _refresh_quietly(self, server_name: str) -> None:
+        try:
+            await self.refresh_tools(server_name)
+        except Exception as e:
+            logger.warning(f"Failed to refresh tools of {server_name}: {e}")
 
-        if conn.process.stdout:
-            line = await conn.process.stdout.readline()
-            response = json.loads(line.decode())
-            return response.get("result", {})
+    async def _drain_stderr(
+        self, conn: MCPServerConnection, process: asyncio.subprocess.Process
+    ) -> None:
+        try:
+            while True:
+                try:
+                    line = await process.stderr.readline()
+                except ValueError:
+                    await process.stderr.read(self.MAX_MESSAGE_BYTES)
+                    continue
+                if not line:
+                    return
+                text = line.decode("utf-8", errors="replace").rstrip()
+                conn.stderr_tail.append(text)
+                logger.debug(f"[{conn.name}] {text}")
+        except asyncio.CancelledError:
+            return
+
+    def _on_exit(self, conn: MCPServerConnection) -> None:
+        was_ready = conn.ready.is_set()
+        conn.ready.clear()
+        self._fail_pending(conn, f"Server {conn.name} exited")
+        if conn.closing or not was_ready:
+            return
+        logger.warning(f"MCP server {conn.name} exited unexpectedly")
+        if time.monotonic() - conn.started_at >= self.restart_reset_after:
+            conn.attempts = 0
+        if conn.attempts < self.max_restarts:
+            conn.restart_task = asyncio.create_task(self._restart(conn))
+
+    async def _restart(self, conn: MCPServerConnection) -> None:
+        while not conn.closing and conn.attempts < self.max_restarts:
+            conn.attempts += 1
+            conn.restarts += 1
+            await asyncio.sleep(self.restart_backoff * 2 ** (conn.attempts - 1))
+            await self._stop_process(conn)
+            try:
+                await self._start(conn)
+                logger.info(f"Restarted MCP server {conn.name}")
+                return
+            except Exception as e:
+                logger.warning(f"Restart of MCP server {conn.name} failed: {e}")
+                # Do not leave a half-started server running
+                await self._stop_process(conn)
+        self._drop_tools(conn.name)
 
-        return {}
+    async def _stop_process(self, conn: MCPServerConnection) -> None:
+        process = conn.process
+        for task in conn.tasks:
+            task.cancel()
+        conn.tasks = []
+        if process and process.returncode is None:
+            try:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), 2.0)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+            except ProcessLookupError:
+                pass
+
+    def _fail_pending(self, conn: MCPServerConnection, reason: str) -> None:
+        for future in conn.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError(reason))
+        conn.pending.clear()
 
     def get_available_tools(self) -> List[MCPTool]:
         return list(self.available_tools.values())
+
+    def get_server_status(self) -> Dict[str, Dict[str, Any]]:
+        """Connection state, in-flight calls and recent stderr per server."""
+        return {
+            name: {
+                "running": conn.ready.is_set(),
+                "pending": len(conn.pending),
+                "restarts": conn.restarts,
+                "stderr_tail": list(conn.stderr_tail)[-5:],
+            }
+            for name, conn in self.servers.items()
+        }
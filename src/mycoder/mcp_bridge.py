@@ -6,12 +6,13 @@ Umožňuje spouštět MCP tools jako BaseTool implementace.
 """
 
 import asyncio
+import json
 import logging
 import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import aiohttp
 
@@ -51,6 +52,8 @@ class MCPBridge:
     - Automatické spuštění local MCP serveru pokud neběží
     - Registraci MCP tools jako BaseTool objektů
     - Volání MCP endpoints přes unified interface
+    - Slučování souběžných volání do jednoho požadavku na /mcp/batch
+    - Přímé volání handlerů local serveru běžícího ve stejném procesu
     """
 
     def __init__(
@@ -59,6 +62,10 @@ class MCPBridge:
         auto_start: bool = True,
         local_host: str = "127.0.0.1",
         local_port: int = 8020,
+        batch_window_ms: float = 5.0,
+        max_batch_size: int = 32,
+        in_process: bool = True,
+        data_dir: Optional[Path] = None,
     ):
         """
         Args:
@@ -66,11 +73,20 @@ class MCPBridge:
             auto_start: Automaticky spustit local server pokud neběží
             local_host: Host pro local server
             local_port: Port pro local server
+            batch_window_ms: Jak dlouho čekat na další volání, která se
+                odešlou společně, když předchozí batch ještě běží (0 = každé
+                volání zvlášť)
+            max_batch_size: Maximální počet volání v jednom batchi
+            in_process: Spustit local server ve stejném procesu a volat jeho
+                handlery přímo (False = subprocess a HTTP)
+            data_dir: Adresář s daty local serveru (výchozí ~/.mycoder)
         """
         self.mcp_url = mcp_url
         self.auto_start = auto_start
         self.local_host = local_host
         self.local_port = local_port
+        self.in_process = in_process
+        self.data_dir = data_dir
 
         self.mcp_connector: Optional[MCPConnector] = None
         self.local_server: Optional[LocalMCPServer] = None
@@ -81,6 +97,14 @@ class MCPBridge:
         self.mcp_tools: Dict[str, Dict[str, Any]] = {}
         self.is_initialized = False
 
+        # Slučování volání (coalescing)
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self._batch_queue: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._batch_supported = True
+
     async def initialize(self) -> bool:
         """
         Inicializuje MCP bridge.
@@ -141,6 +165,22 @@ class MCPBridge:
 
             logger.info("Starting local MCP server...")
 
+            if self.in_process:
+                # HTTP zůstává pro ostatní klienty, bridge volá handlery přímo
+                server = LocalMCPServer(
+                    host=self.local_host,
+                    port=self.local_port,
+                    data_dir=self.data_dir,
+                )
+                await server.start()
+                self.local_server = server
+                logger.info(
+                    "Local MCP server running in-process on %s:%s",
+                    self.local_host,
+                    self.local_port,
+                )
+                return True
+
             # Spustit server v subprocess
             # Najít cestu k local_mcp_server.py
             module_dir = Path(__file__).parent
@@ -159,7 +199,8 @@ class MCPBridge:
                     self.local_host,
                     "--port",
                     str(self.local_port),
-                ],
+                ]
+                + (["--data-dir", str(self.data_dir)] if self.data_dir else []),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
             )
@@ -210,43 +251,54 @@ class MCPBridge:
 
     async def _load_available_tools(self) -> None:
         """Načte seznam dostupných MCP tools"""
+        if self.local_server:
+            self._register_services(self.local_server.service_catalog())
+            return
+
         if not self.session:
             return
 
         try:
             async with self.session.get(f"{self.mcp_url}/services") as response:
                 if response.status == 200:
-                    data = await response.json()
-
-                    services = data
-                    if "zen_coordinator" in data:
-                        services = data.get("zen_coordinator", {}).get("services", {})
-
-                    # Extrahovat tools z různých služeb
-                    for service_name, service_info in services.items():
-                        if isinstance(service_info, dict):
-                            tools = service_info.get("tools", [])
-                            for tool_name in tools:
-                                self.mcp_tools[tool_name] = {
-                                    "service": service_name,
-                                    "name": tool_name,
-                                }
-
-                    logger.info(
-                        "Loaded %s MCP tools from %s services",
-                        len(self.mcp_tools),
-                        len(services),
-                    )
+                    self._register_services(await response.json())
 
         except Exception as e:
             logger.error(f"Error loading MCP tools: {e}")
 
+    def _register_services(self, data: Dict[str, Any]) -> None:
+        services = data
+        if "zen_coordinator" in data:
+            services = data.get("zen_coordinator", {}).get("services", {})
+
+        # Extrahovat tools z různých služeb
+        for service_name, service_info in services.items():
+            if isinstance(service_info, dict):
+                tools = service_info.get("tools", [])
+                for tool_name in tools:
+                    self.mcp_tools[tool_name] = {
+                        "service": service_name,
+                        "name": tool_name,
+                    }
+
+        logger.info(
+            "Loaded %s MCP tools from %s services",
+            len(self.mcp_tools),
+            len(services),
+        )
+
     async def call_mcp_tool(
         self, tool_name: str, args: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
         Zavolá MCP tool přes MCP endpoint.
 
+        Běží-li local server ve stejném procesu, zavolá se jeho handler
+        přímo bez HTTP a serializace. Jinak se volání odešlou společně jedním
+        požadavkem na /mcp/batch a server je vykoná souběžně: nic-li neběží,
+        hned po aktuálním kroku smyčky (sloučí se jen volání spuštěná
+        zároveň), jinak se sbírají po dobu ``batch_window``.
+
         Args:
             tool_name: Název nástroje (např. "file_read")
             args: Argumenty pro nástroj
@@ -254,6 +306,229 @@ class MCPBridge:
         Returns:
             Výsledek z MCP serveru
         """
+        if self.local_server:
+            return await self._call_local_tool(tool_name, args)
+
+        if not self.session:
+            return {"success": False, "error": "MCP bridge not initialized"}
+
+        if self.batch_window <= 0:
+            return await self._post_tool_call(tool_name, args)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch_queue.append((tool_name, args, future))
+        if len(self._batch_queue) >= self.max_batch_size:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            # Osamocené volání na okno nečeká
+            delay = self.batch_window if self._batch_tasks else 0
+            self._batch_timer = loop.call_later(delay, self._flush_batch)
+        return await future
+
+    async def call_mcp_tools(
+        self, calls: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Zavolá několik MCP tools jedním požadavkem na /mcp/batch.
+
+        Volání jsou nezávislá a server je spouští souběžně. Pokud server
+        /mcp/batch nepodporuje, volání se pošlou jednotlivě.
+
+        Args:
+            calls: Dvojice (název nástroje, argumenty)
+
+        Returns:
+            Výsledky ve stejném pořadí jako ``calls``
+        """
+        if self.local_server:
+            return list(
+                await asyncio.gather(
+                    *(self._call_local_tool(tool, args) for tool, args in calls)
+                )
+            )
+
+        if not self.session:
+            return [
+                {"success": False, "error": "MCP bridge not initialized"} for _ in calls
+            ]
+        if len(calls) == 1 or not self._batch_supported:
+            return list(
+                await asyncio.gather(
+                    *(self._post_tool_call(tool, args) for tool, args in calls)
+                )
+            )
+
+        payload = {"calls": [{"tool": tool, "arguments": args} for tool, args in calls]}
+        try:
+            async with self.session.post(
+                f"{self.mcp_url}/mcp/batch", json=payload
+            ) as response:
+                if response.status in (404, 405):
+                    # Starší nebo vzdálený server bez batch endpointu
+                    self._batch_supported = False
+                    return await self.call_mcp_tools(calls)
+                data = await response.json()
+        except Exception as e:
+            logger.error(f"Error calling MCP batch of {len(calls)} tools: {e}")
+            return [{"success": False, "error": str(e)} for _ in calls]
+
+        entries = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(entries, list) or len(entries) != len(calls):
+            error = (data or {}).get("error") or "Invalid batch response"
+            return [{"success": False, "error": error} for _ in calls]
+        return [
+            (
+                {"success": False, "error": entry.get("error")}
+                if "error" in entry
+                else self._normalize_result(entry.get("result") or {})
+            )
+            for entry in entries
+        ]
+
+    async def stream_mcp_tool(
+        self, tool_name: str, args: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Zavolá MCP tool a průběžně vrací jeho výstup.
+
+        Pro ``terminal_exec``, ``git_log`` a ``git_diff`` přicházejí řádky
+        výstupu hned, jak je příkaz vypíše, jako ``{"type": "stdout" |
+        "stderr", "data": řádek}``. Poslední událost je vždy ``{"type":
+        "result", ...}`` s normalizovaným výsledkem (bez stdout/stderr, které
+        už byly odeslány). Ukončení iterace předčasně příkaz zastaví.
+
+        Args:
+            tool_name: Název nástroje
+            args: Argumenty pro nástroj
+
+        Yields:
+            Události výstupu a nakonec výsledek
+        """
+        if self.local_server:
+            events = self._stream_local_tool(tool_name, args)
+            try:
+                async for event in events:
+                    yield event
+            finally:
+                # Uzavřít hned, ne až při úklidu generátoru
+                await events.aclose()
+            return
+
+        if not self.session:
+            yield {
+                "type": "result",
+                "success": False,
+                "error": "MCP bridge not initialized",
+            }
+            return
+
+        payload = {"tool": tool_name, "arguments": args}
+        try:
+            async with self.session.post(
+                f"{self.mcp_url}/mcp/stream", json=payload
+            ) as response:
+                if response.status in (404, 405):
+                    # Server bez streamování: celý výsledek najednou
+                    result = await self._post_tool_call(tool_name, args)
+                    yield {"type": "result", **result}
+                    return
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if event.get("type") == "result":
+                        event = self._stream_result(event)
+                    yield event
+        except Exception as e:
+            logger.error(f"Error streaming MCP tool {tool_name}: {e}")
+            yield {"type": "result", "success": False, "error": str(e)}
+
+    async def _stream_local_tool(
+        self, tool_name: str, args: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streamování z local serveru ve stejném procesu přes frontu."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+
+        async def on_output(stream: str, line: str) -> None:
+            await queue.put({"type": stream, "data": line})
+
+        async def run() -> None:
+            try:
+                status, result = await self.local_server.call_tool(
+                    tool_name, args, on_output=on_output
+                )
+                event = {"type": "result", "status": status}
+                if status == 200:
+                    event["result"] = result
+                else:
+                    event["error"] = result.get("error")
+            except Exception as e:
+                logger.error(f"Error streaming MCP tool {tool_name}: {e}")
+                event = {"type": "result", "status": 500, "error": str(e)}
+            await queue.put(event)
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await queue.get()
+                if event["type"] == "result":
+                    yield self._stream_result(event)
+                    return
+                yield event
+        finally:
+            # Konzument skončil dřív: zrušení úlohy zabije proces
+            if not task.done():
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _stream_result(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        if "error" in event:
+            return {"type": "result", "success": False, "error": event.get("error")}
+        return {"type": "result", **self._normalize_result(event.get("result") or {})}
+
+    def _flush_batch(self) -> None:
+        """Odešle nashromážděná volání na pozadí."""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        queued, self._batch_queue = self._batch_queue, []
+        if not queued:
+            return
+        task = asyncio.create_task(self._dispatch_batch(queued))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _dispatch_batch(
+        self, queued: List[Tuple[str, Dict[str, Any], asyncio.Future]]
+    ) -> None:
+        try:
+            results = await self.call_mcp_tools(
+                [(tool, args) for tool, args, _ in queued]
+            )
+        except Exception as e:
+            results = [{"success": False, "error": str(e)} for _ in queued]
+        for (_, _, future), result in zip(queued, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _call_local_tool(
+        self, tool_name: str, args: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Volání handleru local serveru ve stejném procesu."""
+        try:
+            status, result = await self.local_server.call_tool(tool_name, args)
+        except Exception as e:
+            logger.error(f"Error calling MCP tool {tool_name}: {e}")
+            return {"success": False, "error": str(e)}
+        if status != 200:
+            return {"success": False, "error": result.get("error")}
+        return self._normalize_result(result)
+
+    async def _post_tool_call(
+        self, tool_name: str, args: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Jedno volání přes /mcp."""
         if not self.session:
             return {"success": False, "error": "MCP bridge not initialized"}
 
@@ -263,17 +538,19 @@ class MCPBridge:
             async with self.session.post(
                 f"{self.mcp_url}/mcp", json=payload
             ) as response:
-                result = await response.json()
-                if "success" in result:
-                    return result
-                if "error" in result:
-                    return {"success": False, "error": result.get("error")}
-                return {"success": True, "data": result}
+                return self._normalize_result(await response.json())
 
         except Exception as e:
             logger.error(f"Error calling MCP tool {tool_name}: {e}")
             return {"success": False, "error": str(e)}
 
+    def _normalize_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if "success" in result:
+            return result
+        if "error" in result:
+            return {"success": False, "error": result.get("error")}
+        return {"success": True, "data": result}
+
     async def register_mcp_tools_in_registry(self, tool_registry) -> None:
         """
         Zaregistruje MCP tools jako BaseTool objekty v tool_registry.
@@ -334,6 +611,14 @@ class MCPBridge:
 
     async def close(self) -> None:
         """Zavře MCP bridge a ukončí resources"""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        for _, _, future in self._batch_queue:
+            if not future.done():
+                future.set_result({"success": False, "error": "MCP bridge closed"})
+        self._batch_queue = []
+
         if self.session:
             await self.session.close()
             self.session = None
@@ -44,6 +44,9 @@ class MCPConnector:
         self.service_status: Dict[str, Any] = {}
         self.last_health_check: float = 0
         self.health_check_interval = 60  # Check every 60 seconds
+        # Per-mode tool lists, dropped only when /services reports a change
+        self._mode_tools: Dict[OperationalMode, List[str]] = {}
+        self._connection_checked_at: Optional[float] = None
         self.auto_start_local = (
             auto_start_local
             if auto_start_local is not None
@@ -83,7 +86,12 @@ class MCPConnector:
                 f"{self.orchestrator_url}/services"
             ) as response:
                 if response.status == 200:
-                    self.service_status = await response.json()
+                    service_status = await response.json()
+                    self.last_health_check = asyncio.get_event_loop().time()
+                    if service_status == self.service_status:
+                        return self.service_status
+                    self.service_status = service_status
+                    self._mode_tools.clear()
 
                     # Extract available tools from all services
                     self.available_tools = []
@@ -99,7 +107,6 @@ class MCPConnector:
                             tools = service_info.get("tools", [])
                             self.available_tools.extend(tools)
 
-                    self.last_health_check = asyncio.get_event_loop().time()
                     logger.info(
                         f"MCP health check: {len(self.available_tools)} tools available from "
                         f"{len(zen_services)} services"
@@ -118,7 +125,17 @@ class MCPConnector:
         if not self.session:
             return
 
+        # A connection verified within the health check interval is trusted;
+        # tool calls would otherwise pay an extra /health round trip each
+        now = asyncio.get_event_loop().time()
+        if (
+            self._connection_checked_at is not None
+            and now - self._connection_checked_at < self.health_check_interval
+        ):
+            return
+
         if await self.test_connection():
+            self._connection_checked_at = now
             return
 
         if not self.auto_start_local:
@@ -128,6 +145,7 @@ class MCPConnector:
             await self._start_local_server()
             self.orchestrator_url = self._local_server_url
             if await self.test_connection():
+                self._connection_checked_at = asyncio.get_event_loop().time()
                 logger.info("Using local MCP server at %s", self._local_server_url)
             else:
                 logger.warning(
@@ -175,10 +193,16 @@ class MCPConnector:
         if current_time - self.last_health_check > self.health_check_interval:
             await self.check_services_health()
 
+        cached = self._mode_tools.get(mode)
+        if cached is None:
+            cached = self._mode_tools[mode] = self._filter_tools_for_mode(mode)
+        return list(cached)
+
+    def _filter_tools_for_mode(self, mode: OperationalMode) -> List[str]:
         # Filter tools based on mode
         if mode == OperationalMode.FULL:
             # All available tools
-            return self.available_tools
+            return list(self.available_tools)
 
         elif mode == OperationalMode.DEGRADED:
             # Essential tools only
@@ -262,6 +286,9 @@ class MCPConnector:
             "client": "mycoder_adaptive",
         }
 
+        if self.local_server and self.orchestrator_url == self._local_server_url:
+            return await self._call_local_tool(tool_name, arguments, mode, timeout)
+
         try:
             # Make request with appropriate timeout
             request_timeout = aiohttp.ClientTimeout(total=timeout)
@@ -335,6 +362,8 @@ class MCPConnector:
 
         except Exception as e:
             logger.error(f"MCP tool call error: {e}")
+            # Re-verify (and possibly fall back to the local server) next call
+            self._connection_checked_at = None
             return {
                 "success": False,
                 "error": f"MCP connection error: {str(e)}",
@@ -346,6 +375,47 @@ class MCPConnector:
                 ),
             }
 
+    async def _call_local_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        mode: OperationalMode,
+        timeout: int,
+    ) -> Dict[str, Any]:
+        """Dispatch straight to the in-process local server, skipping HTTP."""
+        try:
+            status, result = await asyncio.wait_for(
+                self.local_server.call_tool(tool_name, arguments), timeout
+            )
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "error": f"MCP tool call timeout after {timeout}s",
+                "tool": tool_name,
+                "fallback_suggestion": (
+                    "retry_with_longer_timeout" if timeout < 60 else "degrade_mode"
+                ),
+            }
+
+        if status == 200:
+            return {
+                "success": True,
+                "result": result,
+                "tool": tool_name,
+                "mode": mode.value,
+            }
+        error = result.get("error")
+        return {
+            "success": False,
+            "error": (
+                f"Bad request: {error}" if status == 400 else f"HTTP {status}: {error}"
+            ),
+            "status_code": status,
+            "fallback_suggestion": (
+                "use_local_fallback" if status == 400 else "retry_or_degrade"
+            ),
+        }
+
     async def store_memory(
         self,
         content: str,
@@ -361,11 +431,21 @@ class MCPConnector:
         )
 
     async def search_memories(
-        self, query: str, limit: int = 5, mode: OperationalMode = OperationalMode.FULL
+        self,
+        query: str,
+        limit: int = 5,
+        mode: OperationalMode = OperationalMode.FULL,
+        strategy: str = "hybrid",
     ) -> Dict[str, Any]:
-        """Search memories through MCP memory service."""
+        """
+        Search memories through MCP memory service.
+
+        ``strategy`` is "keyword", "semantic" or "hybrid" (both, fused).
+        """
         return await self.call_mcp_tool(
-            "search_memories", {"query": query, "limit": limit}, mode
+            "search_memories",
+            {"query": query, "limit": limit, "strategy": strategy},
+            mode,
         )
 
     async def read_file(self, file_path: str, mode: OperationalMode) -> Dict[str, Any]:
@@ -4,16 +4,21 @@ Defines the standard interface for all AI providers in MyCoder.
 """
 
 import logging
+import math
+import random
 import time
 from abc import ABC, abstractmethod
 import asyncio
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 import aiofiles
 
+from ..utils.context_packer import ContextPacker
+from ..utils.token_counter import TokenCounter, get_token_counter
 from .rate_limiter import PersistentRateLimiter
 
 logger = logging.getLogger(__name__)
@@ -57,47 +62,183 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"
 
 
+@dataclass
+class CircuitEvent:
+    """A circuit breaker state transition."""
+
+    name: str
+    from_state: CircuitState
+    to_state: CircuitState
+    reason: str
+    open_for: float = 0.0
+    timestamp: float = field(default_factory=time.time)
+
+
 @dataclass
 class CircuitBreaker:
+    """
+    Rolling-window circuit breaker.
+
+    The circuit opens on ``failure_threshold`` consecutive failures, on a
+    failure rate above ``failure_rate_threshold`` or on a p95 latency above
+    ``latency_slo_ms`` within the last ``window_size`` calls (once
+    ``min_calls`` have been seen). Each consecutive trip doubles the OPEN
+    period from ``recovery_timeout`` up to ``max_recovery_timeout``, with
+    +/- ``jitter`` randomisation so providers do not all retry at once.
+
+    In HALF_OPEN at most ``half_open_max_probes`` requests run at a time and
+    ``half_open_max_calls`` successful probes close the circuit again.
+    Listeners receive a ``CircuitEvent`` for every state transition.
+    """
+
     failure_threshold: int = 5
-    recovery_timeout: int = 60
+    recovery_timeout: float = 60
     half_open_max_calls: int = 3
+    half_open_max_probes: int = 1
+    window_size: int = 20
+    min_calls: int = 10
+    failure_rate_threshold: float = 0.5
+    latency_slo_ms: Optional[float] = None
+    max_recovery_timeout: float = 600
+    jitter: float = 0.2
+    # Probes never reported back (e.g. the caller gave up) are reclaimed
+    probe_timeout: float = 120
+    name: str = ""
 
     state: CircuitState = CircuitState.CLOSED
     failure_count: int = 0
     last_failure_time: float = 0.0
     half_open_calls: int = 0
+    opened_at: float = 0.0
+    open_for: float = 0.0
+    consecutive_trips: int = 0
+    listeners: List[Callable[[CircuitEvent], None]] = field(
+        default_factory=list, repr=False
+    )
+    _window: Deque[Tuple[bool, Optional[float]]] = field(
+        default_factory=deque, repr=False
+    )
+    _probes: List[float] = field(default_factory=list, repr=False)
 
     def can_execute(self) -> bool:
+        """Check whether a request may run; reserves a probe in HALF_OPEN."""
         if self.state == CircuitState.CLOSED:
             return True
 
+        now = time.time()
         if self.state == CircuitState.OPEN:
-            if time.time() - self.last_failure_time > self.recovery_timeout:
-                self.state = CircuitState.HALF_OPEN
-                self.half_open_calls = 0
-                return True
+            if now - self.opened_at < self.open_for:
+                return False
+            self._transition(CircuitState.HALF_OPEN, "recovery timeout elapsed")
+
+        self._probes = [t for t in self._probes if now - t < self.probe_timeout]
+        if len(self._probes) >= self.half_open_max_probes:
             return False
+        self._probes.append(now)
+        return True
 
-        return self.half_open_calls < self.half_open_max_calls
+    def record_success(self, duration_ms: Optional[float] = None) -> None:
+        """Record a successful call and its latency."""
+        self.release_probe()
+        self._window.append((True, duration_ms))
+        self._trim_window()
+        self.failure_count = 0
 
-    def record_success(self) -> None:
         if self.state == CircuitState.HALF_OPEN:
+            if self._violates_slo(duration_ms):
+                self._trip(f"probe latency {duration_ms:.0f} ms over SLO")
+                return
             self.half_open_calls += 1
             if self.half_open_calls >= self.half_open_max_calls:
-                self.state = CircuitState.CLOSED
-                self.failure_count = 0
-        else:
-            self.failure_count = 0
-
-    def record_failure(self) -> None:
+                self.consecutive_trips = 0
+                self._window.clear()
+                self._transition(CircuitState.CLOSED, "probes succeeded")
+        elif self.state == CircuitState.CLOSED:
+            p95 = self.p95_latency_ms()
+            if p95 is not None and self._violates_slo(p95):
+                self._trip(f"p95 latency {p95:.0f} ms over SLO")
+
+    def record_failure(self, duration_ms: Optional[float] = None) -> None:
+        """Record a failed call (errors and timeouts alike)."""
+        self.release_probe()
+        self._window.append((False, duration_ms))
+        self._trim_window()
         self.failure_count += 1
         self.last_failure_time = time.time()
 
         if self.state == CircuitState.HALF_OPEN:
-            self.state = CircuitState.OPEN
-        elif self.failure_count >= self.failure_threshold:
-            self.state = CircuitState.OPEN
+            self._trip("probe failed")
+        elif self.state == CircuitState.CLOSED:
+            if self.failure_count >= self.failure_threshold:
+                self._trip(f"{self.failure_count} consecutive failures")
+            elif len(self._window) >= self.min_calls:
+                rate = self.failure_rate()
+                if rate > self.failure_rate_threshold:
+                    self._trip(f"failure rate {rate:.0%} in last {len(self._window)}")
+
+    def failure_rate(self) -> float:
+        """Share of failed calls in the rolling window."""
+        if not self._window:
+            return 0.0
+        return sum(1 for ok, _ in self._window if not ok) / len(self._window)
+
+    def p95_latency_ms(self) -> Optional[float]:
+        """p95 latency of the rolling window, None until min_calls are seen."""
+        latencies = sorted(ms for _, ms in self._window if ms is not None)
+        if len(latencies) < self.min_calls:
+            return None
+        return latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)]
+
+    def add_listener(self, listener: Callable[[CircuitEvent], None]) -> None:
+        """Subscribe to state transitions."""
+        self.listeners.append(listener)
+
+    def _violates_slo(self, duration_ms: Optional[float]) -> bool:
+        return (
+            self.latency_slo_ms is not None
+            and duration_ms is not None
+            and duration_ms > self.latency_slo_ms
+        )
+
+    def _trim_window(self) -> None:
+        while len(self._window) > self.window_size:
+            self._window.popleft()
+
+    def release_probe(self) -> None:
+        """Return a HALF_OPEN probe slot that was reserved but not used."""
+        if self._probes:
+            self._probes.pop(0)
+
+    def _trip(self, reason: str) -> None:
+        backoff = self.recovery_timeout * (2**self.consecutive_trips)
+        backoff = min(backoff, self.max_recovery_timeout)
+        if self.jitter:
+            backoff *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self.consecutive_trips += 1
+        self.opened_at = time.time()
+        self.open_for = backoff
+        self._probes.clear()
+        self._transition(CircuitState.OPEN, reason)
+
+    def _transition(self, state: CircuitState, reason: str) -> None:
+        event = CircuitEvent(
+            name=self.name,
+            from_state=self.state,
+            to_state=state,
+            reason=reason,
+            open_for=self.open_for if state == CircuitState.OPEN else 0.0,
+        )
+        self.state = state
+        if state == CircuitState.HALF_OPEN:
+            self.half_open_calls = 0
+        elif state == CircuitState.CLOSED:
+            self.failure_count = 0
+
+        for listener in list(self.listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Circuit breaker listener failed: {e}")
 
 
 @dataclass
@@ -138,8 +279,24 @@ class APIProviderConfig:
 class BaseAPIProvider(ABC):
     """Base class for all API providers with FEI-inspired patterns."""
 
+    # Context window used when the config does not set max_context_tokens
+    DEFAULT_MAX_CONTEXT_TOKENS = 8192
+    # Parallel requests used by batch queries unless max_concurrency is set
+    DEFAULT_MAX_CONCURRENCY = 4
+    # Characters read per context file unless max_file_context_chars is set
+    DEFAULT_MAX_FILE_CONTEXT_CHARS = 512 * 1024
+
     def __init__(self, config: APIProviderConfig):
         self.config = config
+        self.max_context_tokens = config.config.get(
+            "max_context_tokens", self.DEFAULT_MAX_CONTEXT_TOKENS
+        )
+        self.max_concurrency = config.config.get(
+            "max_concurrency", self.DEFAULT_MAX_CONCURRENCY
+        )
+        self.max_file_context_chars = config.config.get(
+            "max_file_context_chars", self.DEFAULT_MAX_FILE_CONTEXT_CHARS
+        )
         self.status = APIProviderStatus.UNKNOWN
         self.last_health_check = 0
         self.error_count = 0
@@ -151,6 +308,13 @@ class BaseAPIProvider(ABC):
             half_open_max_calls=config.config.get(
                 "circuit_breaker_half_open_max_calls", 3
             ),
+            half_open_max_probes=config.config.get(
+                "circuit_breaker_half_open_max_probes", 1
+            ),
+            window_size=config.config.get("circuit_breaker_window", 20),
+            latency_slo_ms=config.config.get("latency_slo_ms"),
+            max_recovery_timeout=config.config.get("circuit_breaker_max_timeout", 600),
+            name=config.provider_type.value,
         )
 
         # Initialize persistent rate limiter
@@ -176,8 +340,25 @@ class BaseAPIProvider(ABC):
         """Check provider health and availability."""
         pass
 
+    async def warm_up(self) -> bool:
+        """
+        Prepare the provider for its first request.
+
+        The default runs a health check and caches the status so the first
+        query does not pay for a probe. Providers override this to pre-load
+        models or open connections.
+        """
+        self.status = await self.health_check()
+        self.last_health_check = time.time()
+        return self.status in [APIProviderStatus.HEALTHY, APIProviderStatus.DEGRADED]
+
     async def can_handle_request(self, context: Dict[str, Any] = None) -> bool:
-        """Check if provider can handle the request."""
+        """
+        Check if provider can handle the request.
+
+        In HALF_OPEN a True answer reserves a probe slot; the caller must
+        record the outcome on the circuit breaker or call ``release_probe``.
+        """
         if not self.config.enabled:
             return False
         if not self.circuit_breaker.can_execute():
@@ -190,10 +371,17 @@ class BaseAPIProvider(ABC):
             self.last_health_check
             and (now - self.last_health_check) > self.config.health_check_interval
         ):
-            self.status = await self.health_check()
+            try:
+                self.status = await self.health_check()
+            except BaseException:
+                self.circuit_breaker.release_probe()
+                raise
             self.last_health_check = now
 
-        return self.status in [APIProviderStatus.HEALTHY, APIProviderStatus.DEGRADED]
+        if self.status in [APIProviderStatus.HEALTHY, APIProviderStatus.DEGRADED]:
+            return True
+        self.circuit_breaker.release_probe()
+        return False
 
     def get_metrics(self) -> Dict[str, Any]:
         """Get provider performance metrics."""
@@ -211,17 +399,42 @@ class BaseAPIProvider(ABC):
             "last_health_check": self.last_health_check,
         }
 
+    @property
+    def token_counter(self) -> TokenCounter:
+        """Token counter matching this provider's model family."""
+        return get_token_counter(getattr(self, "model", None))
+
     async def _process_file_context(
-        self, files: List[Path], max_files: int = 5, max_chars: int = 8000
+        self,
+        files: List[Path],
+        prompt: str = "",
+        reserve_tokens: int = 4096,
     ) -> str:
-        """Process file context for APIs concurrently without blocking the event loop."""
+        """
+        Pack file context into the provider's context window.
+
+        Files are read concurrently without blocking the event loop, then
+        packed into ``max_context_tokens`` minus the prompt and the tokens
+        reserved for the response. Files mentioned in the prompt win, and
+        files that do not fit whole are trimmed to their most relevant blocks.
+        """
+        counter = self.token_counter
+        budget = self.max_context_tokens - counter.count(prompt) - reserve_tokens
+        if budget <= 0:
+            logger.warning(
+                f"No context budget left for files on {self.config.provider_type.value}"
+            )
+            return ""
+
+        # No tokenizer packs more than ~8 chars per token, so longer reads are
+        # waste; large context windows are capped so one file stays bounded
+        max_chars = min(budget * 8, self.max_file_context_chars)
 
         async def _read_single_file(file_path: Path) -> Optional[str]:
             try:
                 # Fully async: rely on OS to throw IsADirectoryError or FileNotFoundError
                 async with aiofiles.open(file_path, mode="r", encoding="utf-8") as f:
-                    content = await f.read(max_chars)
-                return f"File: {file_path.name}\n```\n{content}\n```"
+                    return await f.read(max_chars)
             except (IsADirectoryError, FileNotFoundError):
                 # Ignore missing files or directories silently, similar to previous behavior
                 pass
@@ -229,8 +442,23 @@ class BaseAPIProvider(ABC):
                 logger.warning(f"Error reading file {file_path}: {e}")
             return None
 
-        tasks = [_read_single_file(f) for f in files[:max_files]]
-        results = await asyncio.gather(*tasks)
-
-        file_contents = [r for r in results if r]
-        return "\n\n".join(file_contents) if file_contents else ""
+        results = await asyncio.gather(*[_read_single_file(Path(f)) for f in files])
+        readable = [
+            (Path(path), content)
+            for path, content in zip(files, results)
+            if content is not None
+        ]
+        if not readable:
+            return ""
+
+        # Tokenizing and ranking blocks is CPU-bound, so keep it off the loop
+        packed = await asyncio.to_thread(
+            ContextPacker(counter).pack, readable, budget, prompt
+        )
+        if packed.truncated or packed.dropped:
+            logger.debug(
+                f"Context packing for {self.config.provider_type.value}: "
+                f"{packed.tokens}/{budget} tokens, truncated={packed.truncated}, "
+                f"dropped={packed.dropped}"
+            )
+        return packed.text
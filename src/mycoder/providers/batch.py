@@ -0,0 +1,297 @@
+"""
+Batch Query Scheduling for API Providers.
+Spreads many prompts over all usable providers, respecting rate limits and
+per-provider concurrency, and retries failed prompts on other providers or,
+after a backoff, on the same one.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+)
+
+from .base import APIProviderType, APIResponse, BaseAPIProvider, CircuitState
+from .scheduler import RequestPriority
+
+if TYPE_CHECKING:
+    from .router import APIProviderRouter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one prompt of a batch."""
+
+    index: int
+    prompt: str
+    response: APIResponse
+
+    @property
+    def success(self) -> bool:
+        return self.response.success
+
+
+@dataclass
+class _BatchItem:
+    index: int
+    prompt: str
+    tried: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    retries: int = 0
+
+
+class BatchScheduler:
+    """
+    Runs a batch of prompts across several providers.
+
+    Every provider gets ``max_concurrency`` workers that pull prompts from a
+    shared queue, so faster providers naturally take more of the batch. A
+    failed prompt is handed to the least busy provider that has not tried it
+    yet. A provider whose circuit opens or whose budget or rate limit runs
+    out is dropped and its queued prompts move to the remaining providers.
+    Once every provider has failed a prompt with a transient error, it is
+    queued again after an exponential backoff, up to ``max_retries`` times.
+    """
+
+    def __init__(
+        self,
+        router: "APIProviderRouter",
+        providers: Sequence[BaseAPIProvider],
+        context: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        **kwargs,
+    ):
+        self.router = router
+        self.providers = list(providers)
+        self.context = context
+        self.session_id = session_id or router.session_id
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.kwargs = kwargs
+
+        self._shared: Deque[_BatchItem] = deque()
+        self._assigned: Dict[APIProviderType, Deque[_BatchItem]] = {
+            p.config.provider_type: deque() for p in self.providers
+        }
+        self._alive: Set[APIProviderType] = set(self._assigned)
+        self._remaining = 0
+        self._cond = asyncio.Condition()
+        self._results: "asyncio.Queue[BatchResult]" = asyncio.Queue()
+        self._retry_tasks: Set[asyncio.Task] = set()
+
+    def _concurrency(self, provider: BaseAPIProvider) -> int:
+        limit = max(1, provider.max_concurrency)
+        if self.max_concurrency:
+            limit = min(limit, self.max_concurrency)
+        return limit
+
+    async def run(self, prompts: Sequence[str]) -> AsyncIterator[BatchResult]:
+        """Yield a result for every prompt, in completion order."""
+        self._shared.extend(_BatchItem(i, p) for i, p in enumerate(prompts))
+        self._remaining = len(self._shared)
+        if not self._remaining:
+            return
+
+        if not self.providers:
+            while self._shared:
+                self._fail(self._shared.popleft())
+
+        workers = [
+            asyncio.create_task(self._worker(provider))
+            for provider in self.providers
+            for _ in range(self._concurrency(provider))
+        ]
+        try:
+            for _ in range(len(prompts)):
+                yield await self._results.get()
+        finally:
+            tasks = workers + list(self._retry_tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _worker(self, provider: BaseAPIProvider) -> None:
+        provider_type = provider.config.provider_type
+        while True:
+            item = await self._next_item(provider)
+            if item is None:
+                return
+            try:
+                await self._process(provider, item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Batch worker for {provider_type.value} failed: {e}")
+                await self._retire(provider, [item], str(e))
+
+    async def _next_item(self, provider: BaseAPIProvider) -> Optional[_BatchItem]:
+        provider_type = provider.config.provider_type
+        async with self._cond:
+            while True:
+                if not self._remaining or provider_type not in self._alive:
+                    return None
+                assigned = self._assigned[provider_type]
+                if assigned:
+                    return assigned.popleft()
+                if self._shared:
+                    return self._shared.popleft()
+                await self._cond.wait()
+
+    async def _process(self, provider: BaseAPIProvider, item: _BatchItem) -> None:
+        provider_type = provider.config.provider_type
+
+        if provider.circuit_breaker.state != CircuitState.CLOSED:
+            await self._retire(provider, [item], "circuit breaker open")
+            return
+        budget_error = await self.router._check_budget(provider_type, self.session_id)
+        if budget_error:
+            await self._retire(provider, [item], budget_error)
+            return
+
+        # Batch workers bound their own concurrency, so they only queue behind
+        # interactive and agent requests and are never refused admission
+        queue = self.router.scheduler.queue_for(provider)
+        async with queue.slot(RequestPriority.BATCH, self.session_id, admit=False):
+            await self._query(provider, item)
+
+    async def _query(self, provider: BaseAPIProvider, item: _BatchItem) -> None:
+        provider_type = provider.config.provider_type
+        if getattr(provider, "rate_limiter", None):
+            try:
+                await provider.rate_limiter.acquire()
+            except Exception as e:
+                await self._retire(provider, [item], str(e))
+                return
+
+        started = time.perf_counter()
+        try:
+            response = await provider.query(item.prompt, self.context, **self.kwargs)
+        except Exception as e:
+            response = APIResponse(
+                success=False, content="", provider=provider_type, error=str(e)
+            )
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        self.router._record_usage(provider, response, self.session_id)
+        if provider_type.value not in item.tried:
+            item.tried.append(provider_type.value)
+        if response.success:
+            provider.circuit_breaker.record_success(response.duration_ms or duration_ms)
+            await self._complete(item, response)
+        else:
+            provider.circuit_breaker.record_failure(response.duration_ms or duration_ms)
+            item.errors[provider_type.value] = response.error or "unknown"
+            async with self._cond:
+                self._reroute(item)
+
+    async def _retire(
+        self, provider: BaseAPIProvider, items: List[_BatchItem], reason: str
+    ) -> None:
+        """Drop a provider from the batch and move its prompts elsewhere."""
+        provider_type = provider.config.provider_type
+        async with self._cond:
+            if provider_type in self._alive:
+                logger.warning(f"Dropping {provider_type.value} from batch: {reason}")
+                self._alive.discard(provider_type)
+            assigned = self._assigned[provider_type]
+            pending = list(items) + list(assigned)
+            assigned.clear()
+            for item in pending:
+                item.errors.setdefault(provider_type.value, reason)
+                if provider_type.value not in item.tried:
+                    item.tried.append(provider_type.value)
+                self._reroute(item)
+
+            if not self._alive:
+                while self._shared:
+                    self._fail(self._shared.popleft())
+            self._cond.notify_all()
+
+    def _reroute(self, item: _BatchItem) -> None:
+        """Give a failed prompt to the least busy untried provider (lock held)."""
+        candidates = [
+            provider_type
+            for provider_type in self._assigned
+            if provider_type in self._alive and provider_type.value not in item.tried
+        ]
+        if candidates:
+            target = min(candidates, key=lambda p: len(self._assigned[p]))
+            self._assigned[target].append(item)
+        elif self._should_retry(item):
+            item.retries += 1
+            delay = self.retry_backoff * 2 ** (item.retries - 1)
+            task = asyncio.create_task(self._retry_later(item, delay))
+            self._retry_tasks.add(task)
+            task.add_done_callback(self._retry_tasks.discard)
+        else:
+            self._fail(item)
+        self._cond.notify_all()
+
+    def _should_retry(self, item: _BatchItem) -> bool:
+        """Whether a prompt every provider has failed gets another round."""
+        last_error = next(reversed(item.errors.values()), None)
+        return (
+            item.retries < self.max_retries
+            and bool(self._alive)
+            and self.router._is_retryable_error(last_error)
+        )
+
+    async def _retry_later(self, item: _BatchItem, delay: float) -> None:
+        """Queue a prompt again on the least busy provider after ``delay``."""
+        await asyncio.sleep(delay)
+        async with self._cond:
+            alive = [p for p in self._assigned if p in self._alive]
+            if alive:
+                target = min(alive, key=lambda p: len(self._assigned[p]))
+                self._assigned[target].append(item)
+            else:
+                self._fail(item)
+            self._cond.notify_all()
+
+    async def _complete(self, item: _BatchItem, response: APIResponse) -> None:
+        response.metadata.setdefault("attempted_providers", list(item.tried))
+        response.metadata.setdefault("attempted_errors", dict(item.errors))
+        response.metadata.setdefault("fallback_used", len(item.tried) > 1)
+        response.metadata["batch_index"] = item.index
+        async with self._cond:
+            self._finish(item, response)
+            self._cond.notify_all()
+
+    def _fail(self, item: _BatchItem) -> None:
+        last_error = next(reversed(item.errors.values()), "no provider available")
+        self._finish(
+            item,
+            APIResponse(
+                success=False,
+                content="",
+                provider=APIProviderType.RECOVERY,
+                error=f"All providers failed. Last error: {last_error}",
+                metadata={
+                    "attempted_providers": list(item.tried),
+                    "attempted_errors": dict(item.errors),
+                    "fallback_used": len(item.tried) > 1,
+                    "batch_index": item.index,
+                },
+            ),
+        )
+
+    def _finish(self, item: _BatchItem, response: APIResponse) -> None:
+        self._remaining -= 1
+        self._results.put_nowait(BatchResult(item.index, item.prompt, response))
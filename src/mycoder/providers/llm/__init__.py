@@ -1,15 +1,50 @@
 """
 LLM Providers Module.
+
+Provider classes are imported on first access, so code that uses only one
+provider does not load the modules (and SDKs such as boto3) of the others.
 """
 
-from .anthropic import ClaudeAnthropicProvider, ClaudeOAuthProvider
-from .aws import BedrockProvider
-from .google import GeminiProvider
-from .huggingface import HuggingFaceProvider
-from .mercury import MercuryProvider
-from .mistral import MistralProvider
-from .ollama import OllamaProvider, TermuxOllamaProvider
-from .openai_compat import OpenAIProvider, XAIProvider
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .anthropic import ClaudeAnthropicProvider, ClaudeOAuthProvider
+    from .aws import BedrockProvider
+    from .google import GeminiProvider
+    from .huggingface import HuggingFaceProvider
+    from .mercury import MercuryProvider
+    from .mistral import MistralProvider
+    from .ollama import OllamaProvider, TermuxOllamaProvider
+    from .openai_compat import OpenAIProvider, XAIProvider
+
+_LAZY_IMPORTS = {
+    "ClaudeAnthropicProvider": ".anthropic",
+    "ClaudeOAuthProvider": ".anthropic",
+    "BedrockProvider": ".aws",
+    "GeminiProvider": ".google",
+    "HuggingFaceProvider": ".huggingface",
+    "MercuryProvider": ".mercury",
+    "MistralProvider": ".mistral",
+    "OllamaProvider": ".ollama",
+    "TermuxOllamaProvider": ".ollama",
+    "OpenAIProvider": ".openai_compat",
+    "XAIProvider": ".openai_compat",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     "ClaudeAnthropicProvider",
@@ -29,6 +29,8 @@ except Exception:
 class ClaudeAnthropicProvider(BaseAPIProvider):
     """Claude API provider using direct Anthropic API."""
 
+    DEFAULT_MAX_CONTEXT_TOKENS = 200_000
+
     def __init__(self, config: APIProviderConfig):
         super().__init__(config)
         self.api_key = config.config.get("api_key") or os.getenv("ANTHROPIC_API_KEY")
@@ -66,7 +68,11 @@ class ClaudeAnthropicProvider(BaseAPIProvider):
 
             # Add file context if provided
             if context and context.get("files"):
-                file_content = await self._process_file_context(context["files"])
+                file_content = await self._process_file_context(
+                    context["files"],
+                    prompt=prompt,
+                    reserve_tokens=kwargs.get("max_tokens", 4096),
+                )
                 if file_content:
                     messages[0]["content"] = f"{file_content}\n\n{prompt}"
 
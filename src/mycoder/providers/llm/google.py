@@ -23,6 +23,8 @@ logger = logging.getLogger(__name__)
 class GeminiProvider(BaseAPIProvider):
     """Google Gemini API provider."""
 
+    DEFAULT_MAX_CONTEXT_TOKENS = 1_000_000
+
     def __init__(self, config: APIProviderConfig):
         # Enforce strict rate limits for free tier if not overridden
         if "rate_limit_rpm" not in config.config:
@@ -50,7 +52,11 @@ class GeminiProvider(BaseAPIProvider):
 
             full_prompt = prompt
             if context and context.get("files"):
-                file_content = await self._process_file_context(context["files"])
+                file_content = await self._process_file_context(
+                    context["files"],
+                    prompt=prompt,
+                    reserve_tokens=kwargs.get("max_tokens", 4096),
+                )
                 if file_content:
                     full_prompt = f"{file_content}\n\n{prompt}"
 
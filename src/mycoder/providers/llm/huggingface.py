@@ -63,7 +63,11 @@ class HuggingFaceProvider(BaseAPIProvider):
 
         full_prompt = prompt
         if context and context.get("files"):
-            file_content = await self._process_file_context(context["files"])
+            file_content = await self._process_file_context(
+                context["files"],
+                prompt=prompt,
+                reserve_tokens=kwargs.get("max_tokens", 512),
+            )
             if file_content:
                 full_prompt = f"{file_content}\n\n{prompt}"
 
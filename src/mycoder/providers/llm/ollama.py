@@ -24,12 +24,19 @@ logger = logging.getLogger(__name__)
 class OllamaProvider(BaseAPIProvider):
     """Ollama provider for local and remote instances."""
 
+    # Ollama's default num_ctx; raise via config for larger local models
+    DEFAULT_MAX_CONTEXT_TOKENS = 4096
+    # One local model serves requests one at a time by default
+    DEFAULT_MAX_CONCURRENCY = 1
+
     def __init__(self, config: APIProviderConfig):
         super().__init__(config)
         self.base_url = config.config.get("base_url", "http://localhost:11434")
         self.model = config.config.get("model", "tinyllama")
         self.is_local = "localhost" in self.base_url or "127.0.0.1" in self.base_url
         self.is_termux = config.provider_type == APIProviderType.TERMUX_OLLAMA
+        # How long Ollama keeps the model loaded after a request (e.g. "30m")
+        self.keep_alive = config.config.get("keep_alive")
 
     async def query(
         self, prompt: str, context: Dict[str, Any] = None, **kwargs
@@ -42,7 +49,9 @@ class OllamaProvider(BaseAPIProvider):
             full_prompt = prompt
             if context and context.get("files"):
                 file_content = await self._process_file_context(
-                    context["files"], max_files=3, max_chars=2000
+                    context["files"],
+                    prompt=prompt,
+                    reserve_tokens=kwargs.get("max_tokens", 2048),
                 )
                 if file_content:
                     full_prompt = f"Context:\n{file_content}\n\nQuery: {prompt}"
@@ -56,6 +65,8 @@ class OllamaProvider(BaseAPIProvider):
                     "num_predict": kwargs.get("max_tokens", 2048),
                 },
             }
+            if self.keep_alive is not None:
+                payload["keep_alive"] = self.keep_alive
 
             if self.is_local and context and context.get("thermal_monitoring"):
                 temp_check = await self._check_thermal_status()
@@ -131,6 +142,35 @@ class OllamaProvider(BaseAPIProvider):
             logger.warning(f"Ollama health check failed ({self.base_url}): {e}")
             return APIProviderStatus.UNAVAILABLE
 
+    async def warm_up(self) -> bool:
+        """Load the model into memory with an empty generate request."""
+        if not await super().warm_up():
+            return False
+
+        # A generate request without a prompt only loads the model
+        payload = {"model": self.model, "keep_alive": self.keep_alive or "5m"}
+        try:
+            async with aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout_seconds)
+            ) as session:
+                async with session.post(
+                    f"{self.base_url}/api/generate", json=payload
+                ) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logger.warning(
+                            f"Ollama warm-up of {self.model} failed "
+                            f"({response.status}): {error_text}"
+                        )
+                        return False
+                    await response.read()
+        except Exception as e:
+            logger.warning(f"Ollama warm-up failed ({self.base_url}): {e}")
+            return False
+
+        logger.info(f"Ollama model {self.model} loaded at {self.base_url}")
+        return True
+
     async def _check_thermal_status(self) -> Dict[str, Any]:
         """Check thermal status for local instances."""
         try:
@@ -23,6 +23,8 @@ logger = logging.getLogger(__name__)
 class OpenAIProvider(BaseAPIProvider):
     """Standard OpenAI API Provider."""
 
+    DEFAULT_MAX_CONTEXT_TOKENS = 128_000
+
     def __init__(self, config: APIProviderConfig):
         super().__init__(config)
         self.api_key = config.config.get("api_key") or os.getenv("OPENAI_API_KEY")
@@ -58,7 +60,11 @@ class OpenAIProvider(BaseAPIProvider):
 
         # Add file context if provided
         if context and context.get("files"):
-            file_content = await self._process_file_context(context["files"])
+            file_content = await self._process_file_context(
+                context["files"],
+                prompt=prompt,
+                reserve_tokens=kwargs.get("max_tokens", 4096),
+            )
             if file_content:
                 messages[0]["content"] = f"{file_content}\n\n{prompt}"
 
@@ -3,62 +3,107 @@ API Provider Router.
 Manages selection and fallback for multiple AI providers.
 """
 
+import asyncio
+import dataclasses
+import hashlib
+import json
 import logging
-from typing import Any, Callable, Dict, List, Optional
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Sequence
 
+from . import llm
 from .base import (
     APIProviderConfig,
     APIProviderStatus,
     APIProviderType,
     APIResponse,
     BaseAPIProvider,
+    CircuitEvent,
+    CircuitState,
 )
-from .llm import (
-    BedrockProvider,
-    ClaudeAnthropicProvider,
-    ClaudeOAuthProvider,
-    GeminiProvider,
-    HuggingFaceProvider,
-    MercuryProvider,
-    MistralProvider,
-    OllamaProvider,
-    OpenAIProvider,
-    TermuxOllamaProvider,
-    XAIProvider,
-)
+from .batch import BatchResult, BatchScheduler
+from .scheduler import ProviderBusyError, RequestPriority, RequestScheduler
+from .usage_ledger import BudgetPolicy, UsageLedger, UsageRecord
 
 logger = logging.getLogger(__name__)
 
+# Provider class per type, by name: only the modules of configured
+# providers are imported (see providers.llm)
+_PROVIDER_CLASSES = {
+    APIProviderType.CLAUDE_ANTHROPIC: "ClaudeAnthropicProvider",
+    APIProviderType.CLAUDE_OAUTH: "ClaudeOAuthProvider",
+    APIProviderType.GEMINI: "GeminiProvider",
+    APIProviderType.OLLAMA_LOCAL: "OllamaProvider",
+    APIProviderType.OLLAMA_REMOTE: "OllamaProvider",
+    APIProviderType.TERMUX_OLLAMA: "TermuxOllamaProvider",
+    APIProviderType.MERCURY: "MercuryProvider",
+    APIProviderType.AWS_BEDROCK: "BedrockProvider",
+    APIProviderType.OPENAI: "OpenAIProvider",
+    APIProviderType.X_AI: "XAIProvider",
+    APIProviderType.MISTRAL: "MistralProvider",
+    APIProviderType.HUGGINGFACE: "HuggingFaceProvider",
+}
+
+# Context keys that change on every request but do not change the answer.
+# session_id stays in the fingerprint so usage is billed to the right budget.
+_VOLATILE_CONTEXT_KEYS = frozenset({"timestamp", "network_status", "thermal_status"})
+
+
+@dataclasses.dataclass
+class _InFlightQuery:
+    """Upstream call shared by concurrent identical queries."""
+
+    task: "asyncio.Task[APIResponse]"
+    streaming: bool
+    callbacks: List[Callable[[str], None]] = dataclasses.field(default_factory=list)
+    chunks: List[str] = dataclasses.field(default_factory=list)
+    waiters: int = 0
+
+    def fan_out(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        for callback in list(self.callbacks):
+            try:
+                callback(chunk)
+            except Exception as e:
+                logger.warning(f"Stream callback failed: {e}")
+
 
 class APIProviderRouter:
     """Router for managing multiple API providers with fallback logic."""
 
-    def __init__(self, configs: List[APIProviderConfig]):
+    def __init__(
+        self,
+        configs: List[APIProviderConfig],
+        usage_ledger: Optional[UsageLedger] = None,
+        budget_policy: Optional[BudgetPolicy] = None,
+        coalesce_requests: bool = True,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
         self.providers: List[BaseAPIProvider] = []
         self.fallback_chain: List[APIProviderType] = []
+        self.usage_ledger = usage_ledger
+        self.budget_policy = budget_policy
+        self.coalesce_requests = coalesce_requests
+        self.scheduler = scheduler or RequestScheduler()
+        self._in_flight: Dict[str, _InFlightQuery] = {}
+        self.coalescing_metrics = {"upstream_queries": 0, "coalesced_queries": 0}
+        self.circuit_events: Deque[CircuitEvent] = deque(maxlen=100)
+        self.circuit_listeners: List[Callable[[CircuitEvent], None]] = []
+        # Budget session for requests whose context carries no session_id
+        self.session_id = f"run-{uuid.uuid4().hex[:12]}"
         self._initialize_providers(configs)
 
     def _initialize_providers(self, configs: List[APIProviderConfig]):
         """Initialize all configured providers."""
-        provider_classes = {
-            APIProviderType.CLAUDE_ANTHROPIC: ClaudeAnthropicProvider,
-            APIProviderType.CLAUDE_OAUTH: ClaudeOAuthProvider,
-            APIProviderType.GEMINI: GeminiProvider,
-            APIProviderType.OLLAMA_LOCAL: OllamaProvider,
-            APIProviderType.OLLAMA_REMOTE: OllamaProvider,
-            APIProviderType.TERMUX_OLLAMA: TermuxOllamaProvider,
-            APIProviderType.MERCURY: MercuryProvider,
-            APIProviderType.AWS_BEDROCK: BedrockProvider,
-            APIProviderType.OPENAI: OpenAIProvider,
-            APIProviderType.X_AI: XAIProvider,
-            APIProviderType.MISTRAL: MistralProvider,
-            APIProviderType.HUGGINGFACE: HuggingFaceProvider,
-        }
-
         for config in configs:
-            if config.provider_type in provider_classes:
+            class_name = _PROVIDER_CLASSES.get(config.provider_type)
+            if class_name:
                 try:
-                    provider = provider_classes[config.provider_type](config)
+                    provider = getattr(llm, class_name)(config)
+                    provider.circuit_breaker.add_listener(self._on_circuit_event)
                     self.providers.append(provider)
                     self.fallback_chain.append(config.provider_type)
                     logger.info(f"Initialized provider: {config.provider_type.value}")
@@ -79,7 +124,151 @@ class APIProviderRouter:
         stream_callback: Optional[Callable[[str], None]] = None,
         **kwargs,
     ) -> APIResponse:
-        """Execute query with intelligent provider selection and fallbacks."""
+        """
+        Execute query with intelligent provider selection and fallbacks.
+
+        Concurrent calls with the same fingerprint (prompt, provider options,
+        kwargs and stable context) share one upstream call; every caller gets
+        its own copy of the response and all stream callbacks receive the
+        chunks. Pass ``coalesce=False`` to force a separate call.
+
+        ``priority`` ("interactive", "agent" or "batch"; default interactive)
+        decides the order in which requests waiting for a busy provider are
+        served. A provider whose queue is full is skipped with a "busy" error.
+        """
+        coalesce = kwargs.pop("coalesce", self.coalesce_requests)
+        priority = RequestPriority.parse(kwargs.pop("priority", None))
+        if not coalesce:
+            return await self._execute_query(
+                prompt,
+                context,
+                preferred_provider,
+                fallback_enabled,
+                stream_callback,
+                priority=priority,
+                **kwargs,
+            )
+
+        key = self._fingerprint(
+            prompt, context, preferred_provider, fallback_enabled, kwargs
+        )
+        flight = self._in_flight.get(key)
+        coalesced = flight is not None
+
+        if flight is None:
+            flight = _InFlightQuery(task=None, streaming=stream_callback is not None)
+            flight.task = asyncio.ensure_future(
+                self._execute_query(
+                    prompt,
+                    context,
+                    preferred_provider,
+                    fallback_enabled,
+                    flight.fan_out if flight.streaming else None,
+                    priority=priority,
+                    **kwargs,
+                )
+            )
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(
+                lambda _task, key=key: self._in_flight.pop(key, None)
+            )
+            self.coalescing_metrics["upstream_queries"] += 1
+        else:
+            self.coalescing_metrics["coalesced_queries"] += 1
+            logger.info("Coalescing identical in-flight query")
+
+        if stream_callback is not None and flight.streaming:
+            # Replay what the shared call already streamed, then follow it
+            for chunk in list(flight.chunks):
+                stream_callback(chunk)
+            flight.callbacks.append(stream_callback)
+
+        flight.waiters += 1
+        try:
+            response = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+            if stream_callback in flight.callbacks:
+                flight.callbacks.remove(stream_callback)
+
+        if stream_callback is not None and not flight.streaming and response.content:
+            # Joined a non-streaming call: deliver the answer as one chunk
+            stream_callback(response.content)
+
+        return self._copy_response(response, coalesced)
+
+    @staticmethod
+    def _copy_response(response: APIResponse, coalesced: bool) -> APIResponse:
+        """Give each caller its own response object and metadata."""
+        metadata = dict(response.metadata or {})
+        metadata["coalesced"] = coalesced
+        return dataclasses.replace(response, metadata=metadata)
+
+    @staticmethod
+    def _fingerprint(
+        prompt: str,
+        context: Optional[Dict[str, Any]],
+        preferred_provider: Optional[APIProviderType],
+        fallback_enabled: bool,
+        kwargs: Dict[str, Any],
+    ) -> str:
+        """Stable hash of everything that determines the upstream request."""
+
+        def _default(value: Any) -> str:
+            if isinstance(value, Path):
+                return str(value)
+            if hasattr(value, "value") and isinstance(value.value, str):
+                return value.value
+            # Live objects (tool registries, clients) compare by identity
+            return f"{type(value).__name__}@{id(value)}"
+
+        stable_context = {
+            key: value
+            for key, value in (context or {}).items()
+            if key not in _VOLATILE_CONTEXT_KEYS
+        }
+        payload = json.dumps(
+            {
+                "prompt": prompt,
+                "context": stable_context,
+                "preferred_provider": (
+                    preferred_provider.value if preferred_provider else None
+                ),
+                "fallback_enabled": fallback_enabled,
+                "kwargs": kwargs,
+            },
+            sort_keys=True,
+            default=_default,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_coalescing_metrics(self) -> Dict[str, Any]:
+        """Counts of upstream and coalesced queries."""
+        upstream = self.coalescing_metrics["upstream_queries"]
+        coalesced = self.coalescing_metrics["coalesced_queries"]
+        total = upstream + coalesced
+        return {
+            "upstream_queries": upstream,
+            "coalesced_queries": coalesced,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": coalesced / total if total else 0.0,
+        }
+
+    async def _execute_query(
+        self,
+        prompt: str,
+        context: Dict[str, Any] = None,
+        preferred_provider: APIProviderType = None,
+        fallback_enabled: bool = True,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        **kwargs,
+    ) -> APIResponse:
+        """Run the provider chain for a single upstream request."""
 
         # Determine provider order
         provider_order = []
@@ -98,15 +287,24 @@ class APIProviderRouter:
 
         logger.info(f"Query execution order: {[p.value for p in provider_order]}")
 
+        session_id = (context or {}).get("session_id") or self.session_id
         last_error = None
         attempted_providers: List[str] = []
         attempted_errors: Dict[str, str] = {}
+        busy_providers: List[str] = []
 
         for provider_type in provider_order:
             provider = self._get_provider(provider_type)
             if not provider:
                 continue
 
+            budget_error = await self._check_budget(provider_type, session_id)
+            if budget_error:
+                logger.warning(f"Skipping {provider_type.value}: {budget_error}")
+                last_error = budget_error
+                attempted_errors[provider_type.value] = budget_error
+                continue
+
             try:
                 # Check if provider can handle request
                 can_handle = await provider.can_handle_request(context)
@@ -114,70 +312,261 @@ class APIProviderRouter:
                     logger.info(f"Provider {provider_type.value} cannot handle request")
                     continue
 
-                attempts = max(1, provider.config.max_retries)
-                for attempt in range(1, attempts + 1):
-                    logger.info(
-                        f"Attempting query with {provider_type.value} (attempt {attempt}/{attempts})"
-                    )
-                    if getattr(provider, "rate_limiter", None):
-                        await provider.rate_limiter.acquire()
-
-                    response = await provider.query(
-                        prompt,
-                        context,
-                        stream_callback=stream_callback,
-                        **kwargs,
-                    )
-                    if provider_type.value not in attempted_providers:
-                        attempted_providers.append(provider_type.value)
-
-                    if response.success:
-                        provider.circuit_breaker.record_success()
-                        logger.info(f"Query successful with {provider_type.value}")
-                        if response.metadata is None:
-                            response.metadata = {}
-                        response.metadata.setdefault(
-                            "attempted_providers", attempted_providers
+                # A HALF_OPEN probe reserved above is released by recording
+                # the outcome; release it explicitly if the call never ran
+                # (busy queue, rate limiter error, cancellation)
+                recorded = False
+                try:
+                    attempts = max(1, provider.config.max_retries)
+                    for attempt in range(1, attempts + 1):
+                        logger.info(
+                            f"Attempting query with {provider_type.value} (attempt {attempt}/{attempts})"
+                        )
+                        queue = self.scheduler.queue_for(provider)
+                        async with queue.slot(priority, session_id) as queue_wait_ms:
+                            if getattr(provider, "rate_limiter", None):
+                                await provider.rate_limiter.acquire()
+
+                            started = time.perf_counter()
+                            try:
+                                response = await provider.query(
+                                    prompt,
+                                    context,
+                                    stream_callback=stream_callback,
+                                    **kwargs,
+                                )
+                            except Exception:
+                                provider.circuit_breaker.record_failure(
+                                    (time.perf_counter() - started) * 1000
+                                )
+                                recorded = True
+                                raise
+                        duration_ms = response.duration_ms or (
+                            (time.perf_counter() - started) * 1000
                         )
-                        response.metadata.setdefault(
-                            "attempted_errors", attempted_errors
+                        self._record_usage(provider, response, session_id)
+                        if provider_type.value not in attempted_providers:
+                            attempted_providers.append(provider_type.value)
+
+                        recorded = True
+                        if response.success:
+                            provider.circuit_breaker.record_success(duration_ms)
+                            logger.info(f"Query successful with {provider_type.value}")
+                            if response.metadata is None:
+                                response.metadata = {}
+                            response.metadata.setdefault(
+                                "attempted_providers", attempted_providers
+                            )
+                            response.metadata.setdefault(
+                                "attempted_errors", attempted_errors
+                            )
+                            response.metadata.setdefault(
+                                "fallback_used", len(attempted_providers) > 1
+                            )
+                            response.metadata.setdefault("queue_wait_ms", queue_wait_ms)
+                            return response
+
+                        provider.circuit_breaker.record_failure(duration_ms)
+                        logger.warning(
+                            f"Provider {provider_type.value} returned error: {response.error}"
                         )
-                        response.metadata.setdefault(
-                            "fallback_used", len(attempted_providers) > 1
+                        last_error = response.error
+                        attempted_errors[provider_type.value] = (
+                            response.error or "unknown"
                         )
-                        return response
+                        if not self._is_retryable_error(response.error):
+                            break
+                        if provider.circuit_breaker.state != CircuitState.CLOSED:
+                            # Do not spend retries on a provider whose circuit opened
+                            break
+                finally:
+                    if not recorded:
+                        provider.circuit_breaker.release_probe()
 
-                    provider.circuit_breaker.record_failure()
-                    logger.warning(
-                        f"Provider {provider_type.value} returned error: {response.error}"
-                    )
-                    last_error = response.error
-                    attempted_errors[provider_type.value] = response.error or "unknown"
-                    if not self._is_retryable_error(response.error):
-                        break
+            except ProviderBusyError as e:
+                logger.info(f"Skipping {provider_type.value}: {e}")
+                last_error = str(e)
+                attempted_errors[provider_type.value] = last_error
+                busy_providers.append(provider_type.value)
+                continue
 
             except Exception as e:
-                provider.circuit_breaker.record_failure()
                 logger.error(f"Provider {provider_type.value} failed: {e}")
                 last_error = str(e)
                 attempted_errors[provider_type.value] = last_error
                 continue
 
         # All providers failed
-        logger.error("All API providers failed")
+        busy = bool(busy_providers) and not attempted_providers
+        if busy:
+            logger.warning(f"All providers busy: {busy_providers}")
+        else:
+            logger.error("All API providers failed")
         return APIResponse(
             success=False,
             content="",
             provider=APIProviderType.RECOVERY,
-            error=f"All providers failed. Last error: {last_error}",
+            error=(
+                f"All providers busy, try again shortly. Last error: {last_error}"
+                if busy
+                else f"All providers failed. Last error: {last_error}"
+            ),
             metadata={
                 "attempted_providers": attempted_providers
                 or [p.value for p in provider_order],
                 "attempted_errors": attempted_errors,
                 "fallback_used": len(attempted_providers) > 1,
+                "busy": busy,
             },
         )
 
+    async def query_batch(
+        self,
+        prompts: Sequence[str],
+        context: Dict[str, Any] = None,
+        providers: Optional[Sequence[APIProviderType]] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+        **kwargs,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Run many prompts across all usable providers.
+
+        Results are yielded as they complete; ``BatchResult.index`` maps each
+        back to its prompt. Each provider runs up to its ``max_concurrency``
+        requests at once (optionally capped by ``max_concurrency``) behind its
+        rate limiter. Failed prompts are retried on other providers, and
+        transient failures on every provider again after a backoff.
+
+        Args:
+            prompts: Prompts to run
+            context: Context shared by all prompts
+            providers: Restrict the batch to these providers (default: all)
+            max_concurrency: Cap on parallel requests per provider
+            max_retries: Backoff rounds for a prompt every provider has failed
+            retry_backoff: Delay in seconds before the first such round,
+                doubled for each further round
+        """
+        session_id = (context or {}).get("session_id") or self.session_id
+        candidates = []
+        for provider_type in providers or self.fallback_chain:
+            provider = self._get_provider(provider_type)
+            if (
+                provider
+                and provider not in candidates
+                and provider.circuit_breaker.state == CircuitState.CLOSED
+                and not await self._check_budget(provider_type, session_id)
+            ):
+                candidates.append(provider)
+
+        checks = await asyncio.gather(
+            *(p.can_handle_request(context) for p in candidates),
+            return_exceptions=True,
+        )
+        usable = [p for p, ok in zip(candidates, checks) if ok is True]
+        logger.info(
+            f"Batch of {len(prompts)} prompts over "
+            f"{[p.config.provider_type.value for p in usable]}"
+        )
+
+        scheduler = BatchScheduler(
+            self,
+            usable,
+            context=context,
+            session_id=session_id,
+            max_concurrency=max_concurrency,
+            max_retries=max_retries,
+            retry_backoff=retry_backoff,
+            **kwargs,
+        )
+        async for result in scheduler.run(prompts):
+            yield result
+
+    def get_scheduler_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """In-flight, queued and queue-wait metrics per provider and priority."""
+        return self.scheduler.metrics()
+
+    def _on_circuit_event(self, event: CircuitEvent) -> None:
+        """Log and keep circuit breaker transitions, then notify listeners."""
+        message = (
+            f"Circuit {event.name}: {event.from_state.value} -> "
+            f"{event.to_state.value} ({event.reason})"
+        )
+        if event.to_state == CircuitState.OPEN:
+            logger.warning(f"{message}, retry in {event.open_for:.1f}s")
+        else:
+            logger.info(message)
+
+        self.circuit_events.append(event)
+        for listener in list(self.circuit_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Circuit listener failed: {e}")
+
+    def get_circuit_status(self) -> Dict[str, Dict[str, Any]]:
+        """Circuit state, failure rate and p95 latency per provider."""
+        status = {}
+        for provider in self.providers:
+            breaker = provider.circuit_breaker
+            status[provider.config.provider_type.value] = {
+                "state": breaker.state.value,
+                "failure_rate": breaker.failure_rate(),
+                "p95_latency_ms": breaker.p95_latency_ms(),
+                "open_for": (
+                    breaker.open_for if breaker.state == CircuitState.OPEN else 0.0
+                ),
+            }
+        return status
+
+    async def _check_budget(
+        self, provider_type: APIProviderType, session_id: str
+    ) -> Optional[str]:
+        """Return a refusal reason when the budget policy blocks a provider."""
+        if not self.budget_policy or not self.usage_ledger:
+            return None
+        if self.budget_policy.enabled:
+            await self.usage_ledger.load_totals(session_id)
+        allowed, reason = self.budget_policy.check(
+            provider_type.value, session_id, self.usage_ledger
+        )
+        return None if allowed else reason
+
+    def _record_usage(
+        self, provider: BaseAPIProvider, response: APIResponse, session_id: str
+    ) -> None:
+        """Append a provider call to the usage ledger."""
+        if not self.usage_ledger:
+            return
+        try:
+            self.usage_ledger.record(
+                UsageRecord(
+                    provider=provider.config.provider_type.value,
+                    model=str(getattr(provider, "model", None) or "unknown"),
+                    session_id=session_id,
+                    cost=response.cost or 0.0,
+                    tokens=response.tokens_used or 0,
+                    success=response.success,
+                    duration_ms=response.duration_ms or 0,
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record usage: {e}")
+
+    def get_usage_summary(
+        self,
+        group_by: Sequence[str] = ("provider", "model"),
+        day: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Aggregated usage from the ledger (empty when usage tracking is off)."""
+        if not self.usage_ledger:
+            return []
+        return self.usage_ledger.summary(
+            group_by=group_by, day=day, session_id=session_id
+        )
+
     @staticmethod
     def _is_retryable_error(error: Optional[str]) -> bool:
         if not error:
@@ -214,30 +603,83 @@ class APIProviderRouter:
                 return provider
         return None
 
-    async def health_check_all(self) -> Dict[str, Any]:
-        """Perform health check on all providers."""
-        results = {}
+    @staticmethod
+    def _provider_key(index: int, provider: BaseAPIProvider) -> str:
+        """Result key of a provider; remote Ollama instances are told apart by URL."""
+        provider_key = provider.config.provider_type.value
+        if provider.config.provider_type == APIProviderType.OLLAMA_REMOTE:
+            base_url = provider.config.config.get("base_url") or getattr(
+                provider, "base_url", None
+            )
+            provider_key = f"{provider_key}:{base_url or index}"
+        return provider_key
+
+    async def health_check_all(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """
+        Health check all providers concurrently.
 
-        for index, provider in enumerate(self.providers):
-            provider_key = provider.config.provider_type.value
-            if provider.config.provider_type == APIProviderType.OLLAMA_REMOTE:
-                base_url = provider.config.config.get("base_url") or getattr(
-                    provider, "base_url", None
-                )
-                provider_key = f"{provider_key}:{base_url or index}"
+        Each probe is bounded by ``timeout`` seconds, so the whole check takes
+        as long as the slowest probe instead of the sum of all of them.
+        """
+
+        async def probe(provider: BaseAPIProvider) -> Dict[str, Any]:
             try:
-                status = await provider.health_check()
-                results[provider_key] = {
-                    "status": status.value,
-                    "metrics": provider.get_metrics(),
+                status = await asyncio.wait_for(provider.health_check(), timeout)
+            except asyncio.TimeoutError:
+                # A slow probe is not an outage: leave the provider's status
+                # alone so routing does not drop it for health_check_interval
+                return {
+                    "status": "timeout",
+                    "error": f"Health check timed out after {timeout}s",
                 }
             except Exception as e:
-                results[provider_key] = {
-                    "status": "error",
-                    "error": str(e),
-                }
+                return {"status": "error", "error": str(e)}
+
+            provider.status = status
+            provider.last_health_check = time.time()
+            return {"status": status.value, "metrics": provider.get_metrics()}
+
+        results = await asyncio.gather(*(probe(p) for p in self.providers))
+        return {
+            self._provider_key(index, provider): result
+            for index, (provider, result) in enumerate(zip(self.providers, results))
+        }
+
+    async def warm_up_all(self, timeout: float = 30.0) -> Dict[str, bool]:
+        """
+        Warm up all enabled providers concurrently.
+
+        Returns:
+            Mapping of provider key to whether its warm-up succeeded
+        """
 
-        return results
+        async def warm(provider: BaseAPIProvider) -> bool:
+            started = time.perf_counter()
+            try:
+                ready = await asyncio.wait_for(provider.warm_up(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Warm-up of {provider.config.provider_type.value} "
+                    f"timed out after {timeout}s"
+                )
+                return False
+            except Exception as e:
+                logger.warning(
+                    f"Warm-up of {provider.config.provider_type.value} failed: {e}"
+                )
+                return False
+            logger.info(
+                f"Warmed up {provider.config.provider_type.value} in "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms (ready={ready})"
+            )
+            return ready
+
+        providers = [p for p in self.providers if p.config.enabled]
+        results = await asyncio.gather(*(warm(p) for p in providers))
+        return {
+            self._provider_key(self.providers.index(provider), provider): ready
+            for provider, ready in zip(providers, results)
+        }
 
     def get_available_providers(self) -> List[APIProviderType]:
         """Get list of currently available providers."""
@@ -250,7 +692,7 @@ class APIProviderRouter:
     async def configure_thermal_integration(self, thermal_config: Dict[str, Any]):
         """Configure thermal management integration for local providers."""
         for provider in self.providers:
-            if isinstance(provider, OllamaProvider) and provider.is_local:
+            if isinstance(provider, llm.OllamaProvider) and provider.is_local:
                 # Configure thermal monitoring for local Ollama instances
                 provider.config.config["thermal_monitoring"] = thermal_config
                 logger.info(
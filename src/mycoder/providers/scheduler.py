@@ -0,0 +1,320 @@
+"""
+Request Scheduler for API Providers.
+Orders requests waiting for a provider by priority and per-session fairness,
+bounds in-flight requests per provider and rejects work it cannot admit.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Scheduling classes; lower values are served first."""
+
+    INTERACTIVE = 0
+    AGENT = 1
+    BATCH = 2
+
+    @classmethod
+    def parse(
+        cls, value: Union["RequestPriority", str, int, None]
+    ) -> "RequestPriority":
+        """Accept an enum, its name ("batch") or its value; default interactive."""
+        if value is None:
+            return cls.INTERACTIVE
+        if isinstance(value, str):
+            try:
+                return cls[value.upper()]
+            except KeyError:
+                raise ValueError(f"Unknown request priority: {value}") from None
+        return cls(value)
+
+
+class ProviderBusyError(Exception):
+    """Raised when a request is not admitted to a provider's queue."""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider} busy: {reason}")
+        self.provider = provider
+        self.reason = reason
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    virtual_finish: float
+    sequence: int
+    session_id: str = field(compare=False)
+    future: "asyncio.Future[None]" = field(compare=False)
+
+
+@dataclass
+class _QueueStats:
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    waits_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=500))
+
+    def summary(self) -> Dict[str, Any]:
+        waits = sorted(self.waits_ms)
+        return {
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait_ms": (
+                waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+            ),
+            "max_wait_ms": waits[-1] if waits else 0.0,
+        }
+
+
+class ProviderQueue:
+    """
+    Admission queue in front of one provider.
+
+    At most ``max_in_flight`` requests run at once. Waiting requests are
+    served strictly by priority and, within a priority, by weighted fair
+    queueing over sessions: every session advances its own virtual clock by
+    ``1 / weight`` per request, so a session submitting many requests cannot
+    starve one submitting a few.
+
+    Admission control keeps the queue short enough to answer quickly: each
+    priority may only fill a share of ``max_queue`` (batch less than
+    interactive), and an agent or batch request waiting longer than
+    ``queue_timeout`` gives up with ``ProviderBusyError`` instead of running
+    into a provider timeout. Interactive requests that were admitted wait for
+    their turn however long the requests ahead of them take.
+    """
+
+    # Share of max_queue each priority may fill before it is rejected
+    ADMISSION_SHARE = {
+        RequestPriority.INTERACTIVE: 1.0,
+        RequestPriority.AGENT: 0.75,
+        RequestPriority.BATCH: 0.5,
+    }
+    # Session clocks kept before finished sessions are forgotten
+    SESSION_PRUNE_THRESHOLD = 256
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int = 4,
+        max_queue: int = 32,
+        queue_timeout: Optional[float] = 30.0,
+        session_weights: Optional[Dict[str, float]] = None,
+    ):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.session_weights = session_weights if session_weights is not None else {}
+
+        self.in_flight = 0
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._session_finish: Dict[str, float] = {}
+        self._prune_at = self.SESSION_PRUNE_THRESHOLD
+        self._stats: Dict[RequestPriority, _QueueStats] = {
+            priority: _QueueStats() for priority in RequestPriority
+        }
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for w in self._waiters if not w.future.done())
+
+    async def acquire(
+        self,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        session_id: str = "",
+        admit: bool = True,
+    ) -> float:
+        """
+        Wait for an in-flight slot.
+
+        Args:
+            priority: Scheduling class of the request
+            session_id: Session the request belongs to (fairness key)
+            admit: Apply admission control; callers that bound their own
+                concurrency (batch workers) may skip it
+
+        Returns:
+            Time spent queued in milliseconds
+
+        Raises:
+            ProviderBusyError: The request was not admitted or waited too long
+        """
+        stats = self._stats[priority]
+        started = time.perf_counter()
+
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            stats.admitted += 1
+            stats.waits_ms.append(0.0)
+            return 0.0
+
+        if admit:
+            limit = int(self.max_queue * self.ADMISSION_SHARE[priority])
+            if self.queued >= limit:
+                stats.rejected += 1
+                raise ProviderBusyError(
+                    self.name, f"{self.queued} requests queued (limit {limit})"
+                )
+
+        waiter = _Waiter(
+            priority=int(priority),
+            virtual_finish=self._next_finish(session_id),
+            sequence=next(self._sequence),
+            session_id=session_id,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._waiters, waiter)
+
+        try:
+            timeout = (
+                self.queue_timeout
+                if admit and priority != RequestPriority.INTERACTIVE
+                else None
+            )
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if not self._abandon(waiter):
+                # Granted while timing out: keep the slot
+                return self._granted(stats, started)
+            stats.timed_out += 1
+            raise ProviderBusyError(
+                self.name, f"no slot within {self.queue_timeout:.0f}s"
+            ) from None
+        except asyncio.CancelledError:
+            if not self._abandon(waiter):
+                self.release()
+            raise
+
+        return self._granted(stats, started)
+
+    def release(self) -> None:
+        """Free a slot and hand it to the next waiter."""
+        self.in_flight = max(0, self.in_flight - 1)
+        while self._waiters and self.in_flight < self.max_in_flight:
+            waiter = heapq.heappop(self._waiters)
+            if waiter.future.done():
+                continue
+            self._virtual_time = max(self._virtual_time, waiter.virtual_finish)
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: RequestPriority = RequestPriority.INTERACTIVE,
+        session_id: str = "",
+        admit: bool = True,
+    ) -> AsyncIterator[float]:
+        """Hold an in-flight slot for the duration of the block."""
+        wait_ms = await self.acquire(priority, session_id, admit)
+        try:
+            yield wait_ms
+        finally:
+            self.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queued,
+            "priorities": {
+                priority.name.lower(): stats.summary()
+                for priority, stats in self._stats.items()
+            },
+        }
+
+    def _next_finish(self, session_id: str) -> float:
+        weight = max(self.session_weights.get(session_id, 1.0), 1e-6)
+        start = max(self._virtual_time, self._session_finish.get(session_id, 0.0))
+        finish = start + 1.0 / weight
+        self._session_finish[session_id] = finish
+        if len(self._session_finish) > self._prune_at:
+            self._prune_sessions()
+        return finish
+
+    def _prune_sessions(self) -> None:
+        """Forget session clocks the virtual clock has passed; they add nothing."""
+        self._session_finish = {
+            session: finish
+            for session, finish in self._session_finish.items()
+            if finish > self._virtual_time
+        }
+        self._prune_at = max(
+            self.SESSION_PRUNE_THRESHOLD, 2 * len(self._session_finish)
+        )
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Withdraw a waiter; False when it was already granted a slot."""
+        if waiter.future.done():
+            return False
+        waiter.future.cancel()
+        return True
+
+    def _granted(self, stats: _QueueStats, started: float) -> float:
+        wait_ms = (time.perf_counter() - started) * 1000
+        stats.admitted += 1
+        stats.waits_ms.append(wait_ms)
+        if wait_ms > 1000:
+            logger.info(f"Request waited {wait_ms:.0f} ms for {self.name}")
+        return wait_ms
+
+
+class RequestScheduler:
+    """ProviderQueue per provider, sized from each provider's max_concurrency."""
+
+    def __init__(
+        self,
+        max_queue: int = 32,
+        queue_timeout: Optional[float] = 30.0,
+    ):
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.session_weights: Dict[str, float] = {}
+        self._queues: Dict[str, ProviderQueue] = {}
+
+    def queue_for(self, provider: Any) -> ProviderQueue:
+        """Queue of a provider, created on first use."""
+        key = f"{provider.config.provider_type.value}:{id(provider)}"
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = ProviderQueue(
+                provider.config.provider_type.value,
+                max_in_flight=getattr(provider, "max_concurrency", 4),
+                max_queue=self.max_queue,
+                queue_timeout=self.queue_timeout,
+                session_weights=self.session_weights,
+            )
+            self._queues[key] = queue
+        return queue
+
+    def set_session_weight(self, session_id: str, weight: float) -> None:
+        """Give a session a larger (or smaller) share of every provider."""
+        self.session_weights[session_id] = weight
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Queue metrics per provider."""
+        metrics: Dict[str, Dict[str, Any]] = {}
+        for queue in self._queues.values():
+            name = queue.name
+            suffix = 2
+            while name in metrics:
+                name = f"{queue.name}#{suffix}"
+                suffix += 1
+            metrics[name] = queue.metrics()
+        return metrics
@@ -0,0 +1,369 @@
+"""
+Usage Ledger for API Providers.
+Persists per-request cost and token usage to SQLite and enforces spend budgets.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UsageRecord:
+    """A single provider call as stored in the ledger."""
+
+    provider: str
+    model: str
+    session_id: str
+    cost: float = 0.0
+    tokens: int = 0
+    success: bool = True
+    duration_ms: int = 0
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def day(self) -> str:
+        return date.fromtimestamp(self.timestamp).isoformat()
+
+
+@dataclass
+class BudgetPolicy:
+    """
+    Spend limits applied by APIProviderRouter before each provider attempt.
+
+    Once the session or daily spend reaches its limit, providers in the
+    expensive set are skipped and the router falls through to cheap ones
+    (local Ollama by default). A limit of None disables that check.
+    """
+
+    session_limit_usd: Optional[float] = None
+    daily_limit_usd: Optional[float] = None
+    free_providers: Set[str] = field(
+        default_factory=lambda: {"ollama_local", "ollama_remote", "termux_ollama"}
+    )
+    expensive_providers: Optional[Set[str]] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BudgetPolicy":
+        """Build a policy from the ``usage`` config section."""
+        policy = cls(
+            session_limit_usd=config.get("session_budget_usd"),
+            daily_limit_usd=config.get("daily_budget_usd"),
+        )
+        if config.get("free_providers") is not None:
+            policy.free_providers = set(config["free_providers"])
+        if config.get("expensive_providers") is not None:
+            policy.expensive_providers = set(config["expensive_providers"])
+        return policy
+
+    @property
+    def enabled(self) -> bool:
+        return self.session_limit_usd is not None or self.daily_limit_usd is not None
+
+    def is_expensive(self, provider: str) -> bool:
+        if self.expensive_providers is not None:
+            return provider in self.expensive_providers
+        return provider not in self.free_providers
+
+    def check(
+        self, provider: str, session_id: str, ledger: "UsageLedger"
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Check whether a provider may be used.
+
+        Returns:
+            (allowed, reason) where reason explains a refusal
+        """
+        if not self.enabled or not self.is_expensive(provider):
+            return True, None
+
+        if self.session_limit_usd is not None:
+            spent = ledger.session_cost(session_id)
+            if spent >= self.session_limit_usd:
+                return False, (
+                    f"session budget exceeded (${spent:.4f} of "
+                    f"${self.session_limit_usd:.2f})"
+                )
+
+        if self.daily_limit_usd is not None:
+            spent = ledger.day_cost()
+            if spent >= self.daily_limit_usd:
+                return False, (
+                    f"daily budget exceeded (${spent:.4f} of "
+                    f"${self.daily_limit_usd:.2f})"
+                )
+
+        return True, None
+
+
+class UsageLedger:
+    """
+    SQLite-backed ledger of provider usage.
+
+    ``record`` is cheap and never blocks the event loop: it queues the row
+    for a background flush on the default executor. Rows are batched per
+    flush. Session and day totals are the database sums plus rows not yet
+    written. The sums are cached for ``totals_ttl`` seconds so processes
+    sharing the database (e.g. parallel CI jobs) see each other's spend.
+    ``load_totals`` refreshes them in a worker thread.
+    """
+
+    DEFAULT_DB_PATH = Path.home() / ".mycoder" / "usage.db"
+    DEFAULT_TOTALS_TTL = 2.0
+
+    GROUP_COLUMNS = ("provider", "model", "session_id", "day")
+
+    def __init__(
+        self, db_path: Optional[Path] = None, totals_ttl: float = DEFAULT_TOTALS_TTL
+    ):
+        """
+        Initialize usage ledger.
+
+        Args:
+            db_path: SQLite file (default: ~/.mycoder/usage.db, or
+                MYCODER_USAGE_DB when set)
+            totals_ttl: Seconds a total read from the database is reused
+        """
+        env_override = os.environ.get("MYCODER_USAGE_DB")
+        if db_path is None:
+            db_path = Path(env_override) if env_override else self.DEFAULT_DB_PATH
+
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.totals_ttl = totals_ttl
+        self._pending: List[UsageRecord] = []
+        self._writing: List[UsageRecord] = []
+        # (kind, key) -> (database sum, monotonic time it was read)
+        self._totals: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._writes = 0
+        self._available = True
+
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._init_database()
+        except Exception as e:
+            logger.warning(f"Usage ledger disabled, cannot open {self.db_path}: {e}")
+            self._available = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _init_database(self) -> None:
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS usage_records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp REAL NOT NULL,
+                    day TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    session_id TEXT NOT NULL,
+                    cost REAL NOT NULL DEFAULT 0,
+                    tokens INTEGER NOT NULL DEFAULT 0,
+                    success INTEGER NOT NULL DEFAULT 1,
+                    duration_ms INTEGER NOT NULL DEFAULT 0
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_usage_day ON usage_records(day);
+                CREATE INDEX IF NOT EXISTS idx_usage_session
+                    ON usage_records(session_id);
+                """)
+
+    def record(self, record: UsageRecord) -> None:
+        """Add a usage record; persisted asynchronously when a loop is running."""
+        with self._lock:
+            self._pending.append(record)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_sync()
+            return
+
+        loop.run_in_executor(None, self.flush_sync)
+
+    async def flush(self) -> None:
+        """Wait until all recorded usage is written."""
+        await asyncio.get_running_loop().run_in_executor(None, self.flush_sync)
+
+    def flush_sync(self) -> None:
+        """Write pending records in one transaction."""
+        # Serializes writers so a flush returns only after earlier ones finish
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._writing = batch
+            if batch and self._available:
+                self._write(batch)
+            with self._lock:
+                self._writing = []
+                self._writes += 1
+                # Cached sums do not include the rows just written
+                for record in batch:
+                    self._totals.pop(("session", record.session_id), None)
+                    self._totals.pop(("day", record.day), None)
+
+    def _write(self, batch: List[UsageRecord]) -> None:
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO usage_records
+                        (timestamp, day, provider, model, session_id,
+                         cost, tokens, success, duration_ms)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (
+                            r.timestamp,
+                            r.day,
+                            r.provider,
+                            r.model,
+                            r.session_id,
+                            r.cost,
+                            r.tokens,
+                            int(r.success),
+                            r.duration_ms,
+                        )
+                        for r in batch
+                    ],
+                )
+        except Exception as e:
+            logger.error(f"Failed to write usage records: {e}")
+
+    async def load_totals(self, session_id: str) -> None:
+        """Refresh stale session and today's totals off the event loop."""
+        keys = [("session", session_id), ("day", date.today().isoformat())]
+        if all(self._fresh_total(key) is not None for key in keys):
+            return
+        await asyncio.to_thread(self._load_totals, session_id)
+
+    def _load_totals(self, session_id: str) -> None:
+        self.session_cost(session_id)
+        self.day_cost()
+
+    def session_cost(self, session_id: str) -> float:
+        """Total spend of a session, including unflushed records."""
+        stored = self._stored_total("session", session_id, "session_id = ?")
+        return stored + self._unwritten_cost(lambda r: r.session_id == session_id)
+
+    def day_cost(self, day: Optional[str] = None) -> float:
+        """Total spend on a day (default: today), including unflushed records."""
+        day = day or date.today().isoformat()
+        return self._stored_total("day", day, "day = ?") + self._unwritten_cost(
+            lambda r: r.day == day
+        )
+
+    def _fresh_total(self, key: Tuple[str, str]) -> Optional[float]:
+        cached = self._totals.get(key)
+        if cached is None or time.monotonic() - cached[1] > self.totals_ttl:
+            return None
+        return cached[0]
+
+    def _stored_total(self, kind: str, value: str, where: str) -> float:
+        key = (kind, value)
+        total = self._fresh_total(key)
+        if total is None:
+            writes = self._writes
+            total = self._sum_cost(where, (value,))
+            with self._lock:
+                # A sum read before one of our writes finished is not reused
+                if writes == self._writes:
+                    self._totals[key] = (total, time.monotonic())
+        return total
+
+    def _unwritten_cost(self, matches: Callable[[UsageRecord], bool]) -> float:
+        with self._lock:
+            return sum(r.cost for r in self._pending + self._writing if matches(r))
+
+    def _sum_cost(self, where: str, params: Sequence[Any]) -> float:
+        if not self._available:
+            return 0.0
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    f"SELECT COALESCE(SUM(cost), 0) FROM usage_records WHERE {where}",
+                    params,
+                ).fetchone()
+            return float(row[0])
+        except Exception as e:
+            logger.warning(f"Failed to read usage totals: {e}")
+            return 0.0
+
+    def summary(
+        self,
+        group_by: Sequence[str] = ("provider", "model"),
+        day: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate usage.
+
+        Args:
+            group_by: Columns from provider, model, session_id, day
+            day: Restrict to one day (YYYY-MM-DD)
+            session_id: Restrict to one session
+
+        Returns:
+            Rows with the group columns plus requests, failures, tokens, cost
+        """
+        columns = [c for c in group_by if c in self.GROUP_COLUMNS]
+        if not columns:
+            raise ValueError(f"group_by must use columns from {self.GROUP_COLUMNS}")
+
+        self.flush_sync()
+        if not self._available:
+            return []
+
+        where, params = [], []
+        if day:
+            where.append("day = ?")
+            params.append(day)
+        if session_id:
+            where.append("session_id = ?")
+            params.append(session_id)
+
+        select = ", ".join(columns)
+        query = (
+            f"SELECT {select}, COUNT(*) AS requests, "
+            "SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END) AS failures, "
+            "SUM(tokens) AS tokens, SUM(cost) AS cost FROM usage_records"
+        )
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" GROUP BY {select} ORDER BY cost DESC, requests DESC"
+
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    def close(self) -> None:
+        """Flush remaining records."""
+        self.flush_sync()
@@ -12,10 +12,12 @@ from .task_context import (
     TaskComplexity,
     TaskContext,
 )
+from .telemetry import RouterTelemetry
 
 __all__ = [
     "ModelRouter",
     "IntentClassifier",
+    "RouterTelemetry",
     "ClassificationResult",
     "TaskContext",
     "RouterResult",
@@ -2,10 +2,11 @@
 Intent classification for determining task complexity and model routing.
 """
 
-import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
 
+from ..utils.token_counter import TokenCounter, get_token_counter
+from .pattern_engine import PatternEngine
 from .task_context import TaskComplexity
 
 
@@ -18,6 +19,7 @@ class ClassificationResult:
     reasons: List[str]
     estimated_tokens: int
     suggested_steps: List[str]
+    matched_categories: List[str] = field(default_factory=list)
 
 
 class IntentClassifier:
@@ -63,13 +65,21 @@ class IntentClassifier:
     ]
 
     # Token estimation heuristics
-    TOKENS_PER_FILE = 500  # Average tokens per file mentioned
+    TOKENS_PER_FILE = 500  # Fallback for files that cannot be read
     TOKENS_PER_FUNCTION = 100  # Average tokens per function
     BASE_PROMPT_TOKENS = 200  # Base overhead
 
-    _COMPILED_COMPLEX = [(re.compile(p), r) for p, r in COMPLEX_PATTERNS]
-    _COMPILED_SIMPLE = [(re.compile(p), r) for p, r in SIMPLE_PATTERNS]
-    _COMPILED_REVIEW = [(re.compile(p), r) for p, r in REVIEW_PATTERNS]
+    # All pattern groups evaluated in a single pass
+    _ENGINE = PatternEngine(
+        {
+            "complex": COMPLEX_PATTERNS,
+            "simple": SIMPLE_PATTERNS,
+            "review": REVIEW_PATTERNS,
+        }
+    )
+
+    def __init__(self, token_counter: Optional[TokenCounter] = None):
+        self.token_counter = token_counter or get_token_counter()
 
     def classify(
         self, prompt: str, file_context: Optional[List[str]] = None
@@ -84,29 +94,16 @@ class IntentClassifier:
         Returns:
             ClassificationResult with complexity and reasoning
         """
-        prompt_lower = prompt.lower()
-        reasons = []
-
-        # Check for COMPLEX patterns
-        complex_score = 0
-        for pattern, reason in self._COMPILED_COMPLEX:
-            if pattern.search(prompt_lower):
-                complex_score += 1
-                reasons.append(f"[COMPLEX] {reason}")
-
-        # Check for SIMPLE patterns
-        simple_score = 0
-        for pattern, reason in self._COMPILED_SIMPLE:
-            if pattern.search(prompt_lower):
-                simple_score += 1
-                reasons.append(f"[SIMPLE] {reason}")
-
-        # Check for REVIEW patterns
-        review_score = 0
-        for pattern, reason in self._COMPILED_REVIEW:
-            if pattern.search(prompt_lower):
-                review_score += 1
-                reasons.append(f"[REVIEW] {reason}")
+        matched = self._ENGINE.match(prompt)
+        reasons = [
+            f"[{category.upper()}] {reason}"
+            for category in ("complex", "simple", "review")
+            for reason in matched.labels(category)
+        ]
+
+        complex_score = matched.count("complex")
+        simple_score = matched.count("simple")
+        review_score = matched.count("review")
 
         # Estimate tokens
         estimated_tokens = self._estimate_tokens(prompt, file_context)
@@ -130,19 +127,20 @@ class IntentClassifier:
             reasons=reasons if reasons else ["No specific patterns detected"],
             estimated_tokens=estimated_tokens,
             suggested_steps=suggested_steps,
+            matched_categories=list(matched.categories),
         )
 
     def _estimate_tokens(
         self, prompt: str, file_context: Optional[List[str]] = None
     ) -> int:
         """Estimate total tokens for the task."""
-        # Prompt tokens (rough: 4 chars per token)
-        prompt_tokens = len(prompt) // 4
+        prompt_tokens = self.token_counter.count(prompt)
 
-        # File context tokens
+        # File context tokens (counts are cached by content hash)
         file_tokens = 0
-        if file_context:
-            file_tokens = len(file_context) * self.TOKENS_PER_FILE
+        for path in file_context or []:
+            tokens = self.token_counter.count_file(path)
+            file_tokens += self.TOKENS_PER_FILE if tokens is None else tokens
 
         return self.BASE_PROMPT_TOKENS + prompt_tokens + file_tokens
 
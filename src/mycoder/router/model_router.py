@@ -9,14 +9,21 @@ Implements the Triad strategy:
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from typing import Any, Callable, Dict, List, Optional
 
 from ..self_evolve.failure_memory import AdvisoryResult, FailureMemory
 from ..tool_registry import ToolRegistry
 from .adapters import BUDGET_MODEL_MAP
-from .adapters.base import AdapterResponse, BaseModelAdapter
+from .adapters.base import AdapterResponse, BaseModelAdapter, ModelInfo
 from .intent_classifier import ClassificationResult, IntentClassifier
+from .pipeline import (
+    REVIEW_VERDICT_INSTRUCTION,
+    PipelinedOrchestrator,
+    review_approved,
+)
 from .task_context import (
     BudgetTier,
     ModelRole,
@@ -24,6 +31,7 @@ from .task_context import (
     TaskComplexity,
     TaskContext,
 )
+from .telemetry import RouterTelemetry
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +45,7 @@ class ModelRouter:
     - Budget constraints
     - FailureMemory warnings
     - Model capabilities
+    - Live latency telemetry (static ModelInfo hints act as priors)
     """
 
     # Complexity to primary role mapping
@@ -53,11 +62,21 @@ class ModelRouter:
         failure_memory: Optional[FailureMemory] = None,
         tool_registry: Optional[ToolRegistry] = None,
         default_budget: BudgetTier = BudgetTier.STANDARD,
+        telemetry: Optional[RouterTelemetry] = None,
+        latency_slo_ms: float = 30_000,
+        role_score_tolerance: float = 0.05,
     ):
         self.failure_memory = failure_memory or FailureMemory()
         self.tool_registry = tool_registry
         self.default_budget = default_budget
 
+        # Latency-aware selection: candidates must score within
+        # role_score_tolerance of the tier's configured model for the role.
+        # Estimates persist across runs in ~/.mycoder/router_telemetry.json.
+        self.telemetry = telemetry or RouterTelemetry.default()
+        self.latency_slo_ms = latency_slo_ms
+        self.role_score_tolerance = role_score_tolerance
+
         self.classifier = IntentClassifier()
         self.adapters: Dict[str, BaseModelAdapter] = {}
 
@@ -154,8 +173,13 @@ class ModelRouter:
                 budget_tier=budget,
             )
 
-        # Step 1: Classify intent
-        classification = self.classifier.classify(prompt, file_context)
+        # Step 1: Classify intent (counting file tokens reads the files)
+        if file_context:
+            classification = await asyncio.to_thread(
+                self.classifier.classify, prompt, file_context
+            )
+        else:
+            classification = self.classifier.classify(prompt)
         context.complexity = classification.complexity
         context.estimated_tokens = classification.estimated_tokens
 
@@ -188,7 +212,8 @@ class ModelRouter:
             )
 
         # Step 5: Execute query
-        response = await adapter.query(
+        response = await self._query_adapter(
+            adapter,
             prompt=prompt,
             system_prompt=system_prompt,
             context=context,
@@ -196,16 +221,7 @@ class ModelRouter:
         )
 
         # Update context
-        context.add_execution(
-            role=role,
-            model_name=adapter.model_info.name,
-            prompt=prompt,
-            response=response.content,
-            cost_usd=response.cost_usd,
-            duration_ms=response.duration_ms,
-        )
-
-        self.total_cost_usd += response.cost_usd
+        self._record_response(adapter, role, prompt, response, context)
 
         # Step 6: Determine if handoff is needed
         requires_handoff, next_role, handoff_prompt = self._check_handoff(
@@ -233,6 +249,7 @@ class ModelRouter:
         budget: Optional[BudgetTier] = None,
         max_handoffs: int = 3,
         stream_callback: Optional[Callable[[str], None]] = None,
+        pipelined: bool = False,
     ) -> RouterResult:
         """
         Orchestrate a full task with automatic handoffs.
@@ -245,6 +262,10 @@ class ModelRouter:
             budget: Budget tier
             max_handoffs: Maximum number of model handoffs
             stream_callback: Callback for streaming
+            pipelined: For COMPLEX tasks, start Workers on each plan step as
+                it streams and review code blocks as they complete instead
+                of waiting for each full response (see PipelinedOrchestrator).
+                Only the Architect output is streamed to stream_callback.
 
         Returns:
             Final RouterResult after all handoffs
@@ -254,6 +275,20 @@ class ModelRouter:
             budget_tier=budget or self.default_budget,
         )
 
+        if pipelined:
+            classification = self.classifier.classify(prompt)
+            if classification.complexity == TaskComplexity.COMPLEX:
+                self.total_requests += 1
+                context.complexity = classification.complexity
+                context.estimated_tokens = classification.estimated_tokens
+                return await PipelinedOrchestrator(
+                    self,
+                    prompt,
+                    budget or self.default_budget,
+                    context,
+                    stream_callback=stream_callback,
+                ).run()
+
         return await self._orchestrate_loop(
             prompt,
             budget or self.default_budget,
@@ -311,6 +346,54 @@ class ModelRouter:
     # Internal Methods
     # ========================================================================
 
+    async def _query_adapter(
+        self, adapter: BaseModelAdapter, **kwargs: Any
+    ) -> AdapterResponse:
+        """Query an adapter; an exception counts as an error in telemetry."""
+        started = time.monotonic()
+        try:
+            return await adapter.query(**kwargs)
+        except Exception as e:
+            model_info = self._model_info_for(adapter)
+            if model_info:
+                self.telemetry.record(
+                    model_info,
+                    AdapterResponse(
+                        success=False,
+                        content="",
+                        model_name=model_info.name,
+                        input_tokens=0,
+                        output_tokens=0,
+                        cost_usd=0.0,
+                        duration_ms=int((time.monotonic() - started) * 1000),
+                        error=str(e),
+                    ),
+                )
+            raise
+
+    def _record_response(
+        self,
+        adapter: BaseModelAdapter,
+        role: ModelRole,
+        prompt: str,
+        response: AdapterResponse,
+        context: TaskContext,
+    ) -> None:
+        """Record an adapter call in the context, cost totals and telemetry."""
+        context.add_execution(
+            role=role,
+            model_name=adapter.model_info.name,
+            prompt=prompt,
+            response=response.content,
+            cost_usd=response.cost_usd,
+            duration_ms=response.duration_ms,
+        )
+
+        self.total_cost_usd += response.cost_usd
+        model_info = self._model_info_for(adapter)
+        if model_info:
+            self.telemetry.record(model_info, response)
+
     async def _build_system_prompt(
         self,
         prompt: str,
@@ -383,13 +466,65 @@ class ModelRouter:
 
         return "\n\n".join(parts)
 
+    @staticmethod
+    def _role_score(model_info: ModelInfo, role: ModelRole) -> float:
+        """Role suitability score from static model info."""
+        return {
+            ModelRole.ARCHITECT: model_info.architect_score,
+            ModelRole.WORKER: model_info.worker_score,
+            ModelRole.REVIEWER: model_info.reviewer_score,
+        }.get(role, 0.0)
+
+    @staticmethod
+    def _model_info_for(adapter: BaseModelAdapter) -> Optional[ModelInfo]:
+        """Look up the static ModelInfo for an adapter by model name."""
+        name = getattr(adapter.model_info, "name", None)
+        for models in BUDGET_MODEL_MAP.values():
+            for model_info in models.values():
+                if model_info.name == name:
+                    return model_info
+        return None
+
+    def _latency_candidates(
+        self,
+        role: ModelRole,
+        budget: BudgetTier,
+        configured: ModelInfo,
+    ) -> List[ModelInfo]:
+        """
+        Models allowed for the role within budget.
+
+        A model qualifies when it is configured for any role in this or a
+        cheaper tier, has an initialized adapter, and its role score is within
+        role_score_tolerance of the configured model.
+        """
+        tiers = list(BudgetTier)
+        allowed_tiers = tiers[: tiers.index(budget) + 1]
+        min_score = self._role_score(configured, role) - self.role_score_tolerance
+
+        candidates: Dict[str, ModelInfo] = {}
+        for tier in allowed_tiers:
+            for model_info in BUDGET_MODEL_MAP.get(tier, {}).values():
+                if (
+                    model_info.name in self.adapters
+                    and self._role_score(model_info, role) >= min_score
+                ):
+                    candidates[model_info.name] = model_info
+        return list(candidates.values())
+
     def _select_adapter(
         self,
         role: ModelRole,
         budget: BudgetTier,
         context: TaskContext,
     ) -> Optional[BaseModelAdapter]:
-        """Select the best adapter for the role and budget."""
+        """
+        Select the best adapter for the role and budget.
+
+        Among comparable models the one with the lowest expected completion
+        time wins; models whose observed p95 latency exceeds the SLO are only
+        used when nothing else qualifies.
+        """
 
         # Get model info for this budget/role combination
         model_info = BUDGET_MODEL_MAP.get(budget, {}).get(role)
@@ -397,6 +532,32 @@ class ModelRouter:
             logger.error(f"No model configured for {budget.value}/{role.value}")
             return None
 
+        candidates = self._latency_candidates(role, budget, model_info)
+        if candidates:
+            within_slo = [
+                c
+                for c in candidates
+                if not self.telemetry.violates_slo(c, self.latency_slo_ms)
+            ]
+            if not within_slo:
+                logger.warning(
+                    f"All {role.value} candidates exceed the "
+                    f"{self.latency_slo_ms:.0f} ms p95 SLO"
+                )
+            best = min(
+                within_slo or candidates,
+                key=lambda c: (
+                    self.telemetry.expected_completion_ms(c),
+                    -self._role_score(c, role),
+                ),
+            )
+            if best.name != model_info.name:
+                logger.info(
+                    f"Latency routing: {best.name} instead of {model_info.name} "
+                    f"for {role.value}"
+                )
+            return self.adapters[best.name]
+
         # Get adapter
         adapter = self.adapters.get(model_info.name)
         if not adapter:
@@ -469,17 +630,15 @@ class ModelRouter:
                     "1. Correctness and completeness\n"
                     "2. Potential bugs or edge cases\n"
                     "3. Impact on other parts of the codebase\n"
-                    "4. Security concerns"
+                    "4. Security concerns\n\n"
+                    f"{REVIEW_VERDICT_INSTRUCTION}"
                 )
                 return True, ModelRole.REVIEWER, handoff_prompt
 
         # Reviewer complete - no further handoff
         if current_role == ModelRole.REVIEWER:
             context.review_result = response.content
-            context.review_passed = (
-                "approved" in response.content.lower()
-                or "lgtm" in response.content.lower()
-            )
+            context.review_passed = review_approved(response.content)
 
         return False, None, None
 
@@ -496,4 +655,5 @@ class ModelRouter:
                 role.value: count for role, count in self.requests_by_role.items()
             },
             "adapters_available": list(self.adapters.keys()),
+            "latency": self.telemetry.summary(),
         }
@@ -0,0 +1,273 @@
+"""
+Single-pass keyword/regex classification engine.
+
+Shared by the CLI ``IntentClassifier`` and the mycoder-chat backend router.
+Keeps no dependencies outside the standard library and no package-relative
+imports so the chat backend can load this file on its own.
+
+Every pattern is reduced to the literal keywords it must start with. All
+literals from all categories are compiled into one Aho-Corasick automaton
+and found in a single scan of the text. Patterns that are only a keyword
+alternation (``\\b(fix|debug)\\b``) are decided by that scan alone; longer
+patterns run their compiled regex only when one of their keywords was seen.
+Patterns without an extractable keyword fall back to a plain regex search.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+_REGEX_META = set("\\.^$*+?{}[]()|")
+
+# Optional \b, optional escaped-dot prefix, then a literal group or word,
+# optional \b, and whatever follows.
+_LEADING_LITERAL = re.compile(
+    r"^(?P<lb>\\b)?(?P<dot>\\\.)?"
+    r"(?:\((?P<alts>[^()\\.*+?{}\[\]^$]+)\)|(?P<word>[^\s()\\|.*+?{}\[\]^$]+))"
+    r"(?P<rb>\\b)?(?P<rest>.*)$",
+    re.DOTALL,
+)
+
+PatternSpec = Union[str, Tuple[str, str]]
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _has_top_level_alternation(regex: str) -> bool:
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in regex:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+@dataclass
+class _CompiledPattern:
+    category: str
+    label: str
+    source: str
+    regex: "re.Pattern[str]"
+    # Decided by the keyword scan alone (no trailing regex to verify)
+    keyword_only: bool
+    literals: List[str] = field(default_factory=list)
+
+
+@dataclass
+class EngineMatch:
+    """All categories matched by a text, with the labels that fired."""
+
+    categories: Dict[str, List[str]] = field(default_factory=dict)
+
+    def __contains__(self, category: str) -> bool:
+        return category in self.categories
+
+    def count(self, category: str) -> int:
+        """Number of patterns that matched in a category."""
+        return len(self.categories.get(category, []))
+
+    def labels(self, category: str) -> List[str]:
+        """Labels of matched patterns in a category, in pattern order."""
+        return list(self.categories.get(category, []))
+
+
+class _AhoCorasick:
+    """Minimal Aho-Corasick automaton over lowercase literals."""
+
+    def __init__(self, literals: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+
+        for literal in literals:
+            state = 0
+            for char in literal:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            if literal not in self._out[state]:
+                self._out[state].append(literal)
+
+        queue = list(self._goto[0].values())
+        while queue:
+            state = queue.pop(0)
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> Iterable[Tuple[int, str]]:
+        """Yield (end_index, literal) for every occurrence in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for literal in out[state]:
+                yield index + 1, literal
+
+
+class PatternEngine:
+    """
+    Classifies text against named categories of regex patterns in one pass.
+
+    Args:
+        categories: Mapping of category name to patterns. Each pattern is a
+            regex string or a ``(regex, label)`` tuple; the label defaults to
+            the regex itself.
+        case_insensitive: Lowercase text and literals before matching
+    """
+
+    def __init__(
+        self,
+        categories: Mapping[str, Sequence[PatternSpec]],
+        case_insensitive: bool = True,
+    ):
+        self.case_insensitive = case_insensitive
+        flags = re.IGNORECASE if case_insensitive else 0
+
+        self._patterns: List[_CompiledPattern] = []
+        self._fallback: List[int] = []
+        # literal -> [(pattern index, needs left boundary, needs right boundary)]
+        self._literal_index: Dict[str, List[Tuple[int, bool, bool]]] = {}
+
+        for category, specs in categories.items():
+            for spec in specs:
+                source, label = spec if isinstance(spec, tuple) else (spec, spec)
+                pattern = _CompiledPattern(
+                    category=category,
+                    label=label,
+                    source=source,
+                    regex=re.compile(source, flags),
+                    keyword_only=False,
+                )
+                index = len(self._patterns)
+                self._patterns.append(pattern)
+
+                extracted = self._extract_literals(source)
+                if extracted is None:
+                    self._fallback.append(index)
+                    continue
+
+                literals, left_b, right_b, rest = extracted
+                # \b next to a non-word character means the opposite check,
+                # so leave those patterns to the regex.
+                pattern.keyword_only = (
+                    rest == ""
+                    and (not left_b or all(_is_word_char(lit[0]) for lit in literals))
+                    and (not right_b or all(_is_word_char(lit[-1]) for lit in literals))
+                )
+                pattern.literals = literals
+                for literal in literals:
+                    key = literal.lower() if case_insensitive else literal
+                    self._literal_index.setdefault(key, []).append(
+                        (index, left_b, right_b)
+                    )
+
+        self._automaton = _AhoCorasick(self._literal_index)
+
+    @property
+    def categories(self) -> List[str]:
+        """Category names in definition order."""
+        return list(dict.fromkeys(p.category for p in self._patterns))
+
+    def match(self, text: str) -> EngineMatch:
+        """Return every category whose patterns match the text."""
+        haystack = text.lower() if self.case_insensitive else text
+        confirmed: Set[int] = set()
+        candidates: Set[int] = set()
+
+        for end, literal in self._automaton.scan(haystack):
+            start = end - len(literal)
+            for index, left_b, right_b in self._literal_index[literal]:
+                if index in confirmed:
+                    continue
+                pattern = self._patterns[index]
+                if not pattern.keyword_only:
+                    # Boundaries are re-checked by the full regex
+                    candidates.add(index)
+                    continue
+                if left_b and start > 0 and _is_word_char(haystack[start - 1]):
+                    continue
+                if right_b and end < len(haystack) and _is_word_char(haystack[end]):
+                    continue
+                confirmed.add(index)
+
+        for index in candidates | set(self._fallback):
+            if index not in confirmed and self._patterns[index].regex.search(haystack):
+                confirmed.add(index)
+
+        result = EngineMatch()
+        for index in sorted(confirmed):
+            pattern = self._patterns[index]
+            result.categories.setdefault(pattern.category, []).append(pattern.label)
+        return result
+
+    def matches(self, text: str, category: str) -> bool:
+        """Whether any pattern of a single category matches."""
+        return category in self.match(text)
+
+    def matched_patterns(self, text: str) -> Dict[str, List[str]]:
+        """Matched regex sources per category (for debugging)."""
+        result = self.match(text)
+        sources: Dict[str, List[str]] = {}
+        for pattern in self._patterns:
+            if pattern.label in result.categories.get(pattern.category, []):
+                sources.setdefault(pattern.category, []).append(pattern.source)
+        return sources
+
+    @staticmethod
+    def _extract_literals(
+        source: str,
+    ) -> Optional[Tuple[List[str], bool, bool, str]]:
+        """
+        Split a pattern into leading literals and the remaining regex.
+
+        Returns (literals, left boundary, right boundary, rest) or None when
+        the pattern does not start with a plain keyword or keyword group.
+        """
+        parsed = _LEADING_LITERAL.match(source)
+        if parsed is None:
+            return None
+
+        if parsed.group("alts") is not None:
+            alternatives = parsed.group("alts").split("|")
+        else:
+            alternatives = [parsed.group("word")]
+
+        prefix = "." if parsed.group("dot") else ""
+        literals = [prefix + alt for alt in alternatives]
+        if not all(literals) or any(c in _REGEX_META for c in "".join(alternatives)):
+            return None
+
+        rest = parsed.group("rest")
+        # A quantifier makes the literal optional and a top-level "|" offers
+        # a branch without it; either way it is not a required prefix.
+        if rest[:1] in ("?", "*", "+", "{") or _has_top_level_alternation(rest):
+            return None
+        return literals, bool(parsed.group("lb")), bool(parsed.group("rb")), rest
@@ -0,0 +1,470 @@
+"""
+Pipelined Triad orchestration.
+
+Overlaps the Architect → Worker → Reviewer handoffs: Workers start on each
+plan step as soon as the Architect has finished streaming it, and Reviewers
+check each completed code block while the Worker is still generating. A step
+re-emitted later by the Architect supersedes the earlier version and cancels
+any work already in flight for it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from .adapters.base import AdapterResponse
+from .task_context import BudgetTier, ModelRole, RouterResult, TaskContext
+
+if TYPE_CHECKING:
+    from .model_router import ModelRouter
+
+logger = logging.getLogger(__name__)
+
+# Markers count only at column 0; indented "1." items are sub-bullets of a step
+_STEP_MARKER = re.compile(
+    r"^(?:#+[ \t]*)?(?:\*\*)?(?:step[ \t]+(\d+)\b[:.)]?|(\d+)([.)]))",
+    re.IGNORECASE | re.MULTILINE,
+)
+_CODE_BLOCK = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+# A verdict starts its line, so "not approved" never passes
+_VERDICT = re.compile(
+    r"^\W*(?:verdict\W*)?(approved|lgtm|changes requested|rejected)\b",
+    re.IGNORECASE,
+)
+
+REVIEW_VERDICT_INSTRUCTION = (
+    "End your review with a line containing only APPROVED or CHANGES REQUESTED."
+)
+
+
+def _marker_style(match: "re.Match[str]") -> str:
+    """Marker style of a step match: ``step``, ``.`` or ``)``."""
+    return "step" if match.group(1) else match.group(3)
+
+
+def review_approved(review: str) -> bool:
+    """Whether the last line opening with a verdict approves; no verdict fails."""
+    for line in reversed(review.splitlines()):
+        match = _VERDICT.match(line.strip())
+        if match:
+            return match.group(1).lower() in ("approved", "lgtm")
+    return False
+
+
+class StreamingStepParser:
+    """Incrementally extracts numbered plan steps from a streamed plan."""
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self._style: Optional[str] = None
+        self._step_start: Optional[int] = None
+        self._scanned = 0
+
+    @staticmethod
+    def split_steps(text: str) -> List[Tuple[int, str]]:
+        """
+        Split text into (step number, step text) pairs.
+
+        Only markers in the style of the first one ("Step N", "N." or "N)")
+        start a step, so numbered lists inside a step stay part of its text.
+        """
+        markers = list(_STEP_MARKER.finditer(text))
+        if markers:
+            style = _marker_style(markers[0])
+            markers = [m for m in markers if _marker_style(m) == style]
+        steps = []
+        for index, match in enumerate(markers):
+            end = markers[index + 1].start() if index + 1 < len(markers) else len(text)
+            number = int(match.group(1) or match.group(2))
+            steps.append((number, text[match.start() : end].strip()))
+        return steps
+
+    def feed(self, delta: str) -> List[Tuple[int, str]]:
+        """Add streamed text; return steps completed by it."""
+        self.buffer += delta
+        new_steps = []
+        # Markers start a line, so scanning resumes at the unfinished line
+        for match in _STEP_MARKER.finditer(self.buffer, self._scanned):
+            self._scanned = match.end()
+            style = _marker_style(match)
+            if self._style is None:
+                self._style = style
+            elif style != self._style:
+                continue
+            # The last step is only complete once the next marker appears
+            if self._step_start is not None:
+                new_steps.append(self._step_at(self._step_start, match.start()))
+            self._step_start = match.start()
+        self._scanned = max(self._scanned, self.buffer.rfind("\n") + 1)
+        return new_steps
+
+    def _step_at(self, start: int, end: int) -> Tuple[int, str]:
+        """Step whose marker starts at ``start``, re-read now its line is whole."""
+        match = _STEP_MARKER.match(self.buffer, start)
+        number = int(match.group(1) or match.group(2))
+        return number, self.buffer[start:end].strip()
+
+    def finish(self) -> List[Tuple[int, str]]:
+        """Return all steps once the stream has ended, latest version wins."""
+        latest: Dict[int, str] = {}
+        for number, text in self.split_steps(self.buffer):
+            latest[number] = text
+        return sorted(latest.items())
+
+
+class StreamingCodeBlockParser:
+    """Incrementally extracts completed fenced code blocks from a stream."""
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self._emitted = 0
+        self._scanned = 0
+
+    def feed(self, delta: str) -> List[str]:
+        """Add streamed text; return code blocks completed by it."""
+        self.buffer += delta
+        new_blocks = []
+        # Scanning resumes after the last closed block
+        for match in _CODE_BLOCK.finditer(self.buffer, self._scanned):
+            new_blocks.append(match.group(0))
+            self._scanned = match.end()
+        self._emitted += len(new_blocks)
+        return new_blocks
+
+    @property
+    def block_count(self) -> int:
+        """Number of complete blocks seen so far."""
+        return self._emitted
+
+
+class PipelinedOrchestrator:
+    """
+    Runs one COMPLEX task through a pipelined Architect → Worker → Reviewer flow.
+
+    Worker calls for different steps run concurrently, bounded by
+    ``max_parallel_workers``; Reviewer calls have their own bound,
+    ``max_parallel_reviews``, so reviews never hold up Workers.
+    """
+
+    def __init__(
+        self,
+        router: "ModelRouter",
+        prompt: str,
+        budget: BudgetTier,
+        context: TaskContext,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        max_parallel_workers: int = 3,
+        max_parallel_reviews: int = 3,
+    ):
+        self.router = router
+        self.prompt = prompt
+        self.budget = budget
+        self.context = context
+        self.stream_callback = stream_callback
+
+        self._semaphore = asyncio.Semaphore(max(1, max_parallel_workers))
+        self._review_semaphore = asyncio.Semaphore(max(1, max_parallel_reviews))
+        self._step_parser = StreamingStepParser()
+        self._step_texts: Dict[int, str] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._reviews: Dict[int, List[asyncio.Task]] = {}
+        self._cancelled_steps = 0
+        self._reviewer_name = "none"
+
+    # ------------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------------
+
+    async def run(self) -> RouterResult:
+        """Execute the pipeline and return the aggregated result."""
+        start = time.monotonic()
+        role = ModelRole.ARCHITECT
+        self.context.current_role = role
+
+        adapter = self.router._select_adapter(role, self.budget, self.context)
+        if not adapter:
+            return self._failure(
+                role, f"No adapter available for role {role.value}", start
+            )
+
+        self.router.requests_by_role[role] += 1
+        system_prompt = await self.router._build_system_prompt(
+            self.prompt, self.context, role
+        )
+
+        def on_plan_delta(delta: str) -> None:
+            if self.stream_callback:
+                self.stream_callback(delta)
+            for number, text in self._step_parser.feed(delta):
+                self._launch_step(number, text)
+
+        try:
+            plan = await self.router._query_adapter(
+                adapter,
+                prompt=self.prompt,
+                system_prompt=system_prompt,
+                context=self.context,
+                stream_callback=on_plan_delta,
+            )
+        except BaseException:
+            self._cancel_all()
+            raise
+        self.router._record_response(adapter, role, self.prompt, plan, self.context)
+
+        if not plan.success:
+            self._cancel_all()
+            return self._failure(role, plan.error or "Architect failed", start, plan)
+
+        self.context.plan = plan.content
+        final_steps = self._step_parser.finish()
+        if not final_steps and self._plan_requires_work(plan.content):
+            final_steps = [(1, plan.content)]
+        self.context.plan_steps = [text for _, text in final_steps]
+
+        # Reconcile in-flight work with the final plan
+        final_numbers = {number for number, _ in final_steps}
+        for number in list(self._workers):
+            if number not in final_numbers:
+                self._cancel_step(number)
+        for number, text in final_steps:
+            if self._step_texts.get(number) != text:
+                self._launch_step(number, text)
+
+        if not final_steps:
+            return RouterResult(
+                success=True,
+                content=plan.content,
+                model_role=role,
+                model_name=adapter.model_info.name,
+                cost_usd=self.context.cost_so_far_usd,
+                duration_ms=int((time.monotonic() - start) * 1000),
+                tokens_used=plan.input_tokens + plan.output_tokens,
+                task_context=self.context,
+                metadata={"pipelined": True, "steps": 0},
+            )
+
+        try:
+            return await self._collect(final_steps, start)
+        except BaseException:
+            self._cancel_all()
+            raise
+
+    # ------------------------------------------------------------------
+    # Step scheduling
+    # ------------------------------------------------------------------
+
+    def _launch_step(self, number: int, text: str) -> None:
+        """Start (or restart) the Worker for a plan step."""
+        if number in self._workers:
+            if self._step_texts.get(number) == text:
+                return
+            logger.info(f"Plan step {number} revised, cancelling in-flight work")
+            self._cancel_step(number)
+
+        self._step_texts[number] = text
+        self._reviews[number] = []
+        self._workers[number] = asyncio.ensure_future(self._run_worker(number, text))
+
+    def _cancel_step(self, number: int) -> None:
+        """Cancel Worker and Reviewer tasks for a step."""
+        task = self._workers.pop(number, None)
+        if task and not task.done():
+            task.cancel()
+            self._cancelled_steps += 1
+        for review in self._reviews.pop(number, []):
+            review.cancel()
+        self._step_texts.pop(number, None)
+
+    def _cancel_all(self) -> None:
+        """Cancel every in-flight step."""
+        for number in list(self._workers):
+            self._cancel_step(number)
+
+    def _plan_so_far(self, number: int) -> str:
+        """Plan text for all known steps up to and including ``number``."""
+        return "\n".join(
+            text for n, text in sorted(self._step_texts.items()) if n <= number
+        )
+
+    async def _run_worker(self, number: int, step_text: str) -> AdapterResponse:
+        """Implement one plan step, reviewing code blocks as they stream."""
+        role = ModelRole.WORKER
+        blocks = StreamingCodeBlockParser()
+
+        async with self._semaphore:
+            adapter = self.router._select_adapter(role, self.budget, self.context)
+            if not adapter:
+                raise RuntimeError(f"No adapter available for role {role.value}")
+
+            self.router.requests_by_role[role] += 1
+            prompt = (
+                f"## Task\n{self.context.original_prompt}\n\n"
+                f"## Implementation Plan (so far)\n{self._plan_so_far(number)}\n\n"
+                f"## Current Step\n{step_text}\n\n"
+                "Implement only the current step. Generate complete, working code."
+            )
+            system_prompt = await self.router._build_system_prompt(
+                prompt, self.context, role
+            )
+
+            def on_code_delta(delta: str) -> None:
+                for block in blocks.feed(delta):
+                    self._launch_review(number, block)
+
+            response = await self.router._query_adapter(
+                adapter,
+                prompt=prompt,
+                system_prompt=system_prompt,
+                context=self.context,
+                stream_callback=on_code_delta,
+            )
+
+        self.router._record_response(adapter, role, prompt, response, self.context)
+        if response.success and blocks.block_count == 0 and response.content.strip():
+            # No fenced code: review the whole answer
+            self._launch_review(number, response.content)
+        return response
+
+    def _launch_review(self, number: int, code: str) -> None:
+        """Start a Reviewer call for a completed code block."""
+        self._reviews.setdefault(number, []).append(
+            asyncio.ensure_future(self._run_review(number, code))
+        )
+
+    async def _run_review(self, number: int, code: str) -> AdapterResponse:
+        """Review one code block."""
+        role = ModelRole.REVIEWER
+        async with self._review_semaphore:
+            adapter = self.router._select_adapter(role, self.budget, self.context)
+            if not adapter:
+                raise RuntimeError(f"No adapter available for role {role.value}")
+
+            self.router.requests_by_role[role] += 1
+            self._reviewer_name = adapter.model_info.name
+            prompt = (
+                f"## Original Request\n{self.context.original_prompt}\n\n"
+                f"## Plan Step\n{self._step_texts.get(number, '')}\n\n"
+                f"## Generated Code\n{code}\n\n"
+                "Review the code above for:\n"
+                "1. Correctness and completeness\n"
+                "2. Potential bugs or edge cases\n"
+                "3. Impact on other parts of the codebase\n"
+                "4. Security concerns\n\n"
+                f"{REVIEW_VERDICT_INSTRUCTION}"
+            )
+            system_prompt = await self.router._build_system_prompt(
+                prompt, self.context, role
+            )
+            response = await self.router._query_adapter(
+                adapter,
+                prompt=prompt,
+                system_prompt=system_prompt,
+                context=self.context,
+            )
+
+        self.router._record_response(adapter, role, prompt, response, self.context)
+        return response
+
+    # ------------------------------------------------------------------
+    # Aggregation
+    # ------------------------------------------------------------------
+
+    async def _collect(
+        self, final_steps: List[Tuple[int, str]], start: float
+    ) -> RouterResult:
+        """Wait for all Workers and Reviewers and merge results in step order."""
+        errors: List[str] = []
+        patches: List[str] = []
+        reviews: List[str] = []
+        review_passed = True
+        tokens = 0
+
+        for number, _ in final_steps:
+            try:
+                worker = await self._workers[number]
+            except Exception as e:
+                errors.append(f"Step {number}: {e}")
+                await self._discard_reviews(number)
+                continue
+
+            tokens += worker.input_tokens + worker.output_tokens
+            if not worker.success:
+                errors.append(f"Step {number}: {worker.error}")
+                await self._discard_reviews(number)
+                continue
+            patches.append(worker.content)
+
+            for review_task in self._reviews.get(number, []):
+                try:
+                    review = await review_task
+                except Exception as e:
+                    errors.append(f"Step {number} review: {e}")
+                    continue
+                tokens += review.input_tokens + review.output_tokens
+                if not review.success:
+                    errors.append(f"Step {number} review: {review.error}")
+                    continue
+                reviews.append(f"### Step {number}\n{review.content}")
+                review_passed &= review_approved(review.content)
+
+        self.context.patches.extend(patches)
+        self.context.review_result = "\n\n".join(reviews)
+        self.context.review_passed = bool(reviews) and review_passed and not errors
+        self.context.current_role = ModelRole.REVIEWER
+
+        return RouterResult(
+            success=not errors,
+            content=self.context.review_result,
+            model_role=ModelRole.REVIEWER,
+            model_name=self._reviewer_name,
+            cost_usd=self.context.cost_so_far_usd,
+            duration_ms=int((time.monotonic() - start) * 1000),
+            tokens_used=tokens,
+            task_context=self.context,
+            error="; ".join(errors) if errors else None,
+            metadata={
+                "pipelined": True,
+                "steps": len(final_steps),
+                "cancelled_steps": self._cancelled_steps,
+                "reviews": len(reviews),
+            },
+        )
+
+    async def _discard_reviews(self, number: int) -> None:
+        """Cancel the reviews of a failed step and wait for them to finish."""
+        reviews = self._reviews.get(number, [])
+        for review in reviews:
+            review.cancel()
+        await asyncio.gather(*reviews, return_exceptions=True)
+
+    @staticmethod
+    def _plan_requires_work(content: str) -> bool:
+        """Same heuristic the sequential Architect → Worker handoff uses."""
+        lowered = content.lower()
+        return "implement" in lowered or "step" in lowered
+
+    def _failure(
+        self,
+        role: ModelRole,
+        error: str,
+        start: float,
+        response: Optional[AdapterResponse] = None,
+    ) -> RouterResult:
+        """Build a failed RouterResult."""
+        return RouterResult(
+            success=False,
+            content=response.content if response else "",
+            model_role=role,
+            model_name=response.model_name if response else "none",
+            cost_usd=self.context.cost_so_far_usd,
+            duration_ms=int((time.monotonic() - start) * 1000),
+            tokens_used=(
+                response.input_tokens + response.output_tokens if response else 0
+            ),
+            task_context=self.context,
+            error=error,
+        )
@@ -0,0 +1,259 @@
+"""
+Live latency telemetry for ModelRouter adapters.
+
+Keeps exponentially weighted estimates of latency, time to first token,
+throughput and error rate per model. The static ``ModelInfo`` performance
+hints are used as priors until real observations arrive. Estimates live in
+memory unless a ``state_path`` is given, in which case they are saved there
+(debounced, off the event loop) and survive restarts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional
+
+from .adapters.base import AdapterResponse, ModelInfo
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelStats:
+    """Running latency estimates for a single model."""
+
+    latency_ms: float
+    ttft_ms: float
+    tokens_per_second: float
+    error_rate: float = 0.0
+    samples: int = 0
+    recent_latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=50))
+
+    @classmethod
+    def from_prior(
+        cls, model_info: ModelInfo, expected_output_tokens: int
+    ) -> "ModelStats":
+        """Build initial estimates from the static ModelInfo hints."""
+        tps = float(max(model_info.tokens_per_second, 1))
+        ttft = float(model_info.typical_latency_ms)
+        return cls(
+            latency_ms=ttft + expected_output_tokens / tps * 1000,
+            ttft_ms=ttft,
+            tokens_per_second=tps,
+        )
+
+    def p95_ms(self) -> Optional[float]:
+        """95th percentile of recent successful latencies."""
+        if not self.recent_latencies:
+            return None
+        ordered = sorted(self.recent_latencies)
+        index = max(0, math.ceil(0.95 * len(ordered)) - 1)
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for persistence."""
+        return {
+            "latency_ms": self.latency_ms,
+            "ttft_ms": self.ttft_ms,
+            "tokens_per_second": self.tokens_per_second,
+            "error_rate": self.error_rate,
+            "samples": self.samples,
+            "recent_latencies": list(self.recent_latencies),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelStats":
+        """Deserialize persisted estimates."""
+        stats = cls(
+            latency_ms=float(data["latency_ms"]),
+            ttft_ms=float(data["ttft_ms"]),
+            tokens_per_second=float(data["tokens_per_second"]),
+            error_rate=float(data.get("error_rate", 0.0)),
+            samples=int(data.get("samples", 0)),
+        )
+        stats.recent_latencies.extend(data.get("recent_latencies", []))
+        return stats
+
+
+class RouterTelemetry:
+    """
+    Exponentially weighted latency model per adapter.
+
+    Used by ModelRouter to pick the adapter with the lowest expected
+    completion time and to avoid adapters that violate a latency SLO.
+    """
+
+    DEFAULT_STATE_PATH = Path.home() / ".mycoder" / "router_telemetry.json"
+
+    def __init__(
+        self,
+        state_path: Optional[Path] = None,
+        alpha: float = 0.2,
+        expected_output_tokens: int = 500,
+        save_delay: float = 5.0,
+    ):
+        """
+        Initialize telemetry.
+
+        Args:
+            state_path: Persistence file; None keeps estimates in memory only
+            alpha: EWMA smoothing factor (higher reacts faster)
+            expected_output_tokens: Output length assumed when estimating
+                completion time
+            save_delay: Seconds to collect updates before saving them
+        """
+        self.state_path = Path(state_path) if state_path is not None else None
+        self.alpha = alpha
+        self.expected_output_tokens = expected_output_tokens
+        self.save_delay = save_delay
+        self.stats: Dict[str, ModelStats] = {}
+
+        self._dirty = False
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._write_lock = threading.Lock()
+
+        if self.state_path is not None:
+            self._load_state()
+
+    @classmethod
+    def default(cls) -> RouterTelemetry:
+        """Telemetry persisted at MYCODER_ROUTER_TELEMETRY or DEFAULT_STATE_PATH."""
+        env_override = os.environ.get("MYCODER_ROUTER_TELEMETRY")
+        return cls(Path(env_override) if env_override else cls.DEFAULT_STATE_PATH)
+
+    def get_stats(self, model_info: ModelInfo) -> ModelStats:
+        """Return estimates for a model, seeding them from its static prior."""
+        stats = self.stats.get(model_info.name)
+        if stats is None:
+            stats = ModelStats.from_prior(model_info, self.expected_output_tokens)
+            self.stats[model_info.name] = stats
+        return stats
+
+    def record(self, model_info: ModelInfo, response: AdapterResponse) -> None:
+        """Fold an observed adapter response into the estimates."""
+        stats = self.get_stats(model_info)
+        a = self.alpha
+        stats.samples += 1
+        stats.error_rate = (1 - a) * stats.error_rate + a * (
+            0.0 if response.success else 1.0
+        )
+
+        if response.success and response.duration_ms > 0:
+            stats.latency_ms = (1 - a) * stats.latency_ms + a * response.duration_ms
+            stats.recent_latencies.append(float(response.duration_ms))
+
+            ttft = response.time_to_first_token_ms
+            if ttft is not None:
+                stats.ttft_ms = (1 - a) * stats.ttft_ms + a * ttft
+
+            generation_ms = response.duration_ms - (ttft or 0)
+            if response.output_tokens > 0 and generation_ms > 0:
+                tps = response.output_tokens / (generation_ms / 1000)
+                stats.tokens_per_second = (1 - a) * stats.tokens_per_second + a * tps
+
+        if self.state_path is not None:
+            self._schedule_save()
+
+    def expected_completion_ms(
+        self, model_info: ModelInfo, output_tokens: Optional[int] = None
+    ) -> float:
+        """
+        Expected wall time for a request, accounting for retries on errors.
+
+        Combines time to first token and generation speed for the expected
+        output length, divided by the success probability.
+        """
+        stats = self.get_stats(model_info)
+        tokens = output_tokens or self.expected_output_tokens
+        estimate = stats.ttft_ms + tokens / max(stats.tokens_per_second, 1.0) * 1000
+        success_rate = max(1.0 - stats.error_rate, 0.05)
+        return estimate / success_rate
+
+    def violates_slo(
+        self, model_info: ModelInfo, slo_ms: float, min_samples: int = 5
+    ) -> bool:
+        """Whether observed p95 latency exceeds the SLO."""
+        stats = self.stats.get(model_info.name)
+        if stats is None or len(stats.recent_latencies) < min_samples:
+            return False
+        p95 = stats.p95_ms()
+        return p95 is not None and p95 > slo_ms
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Rounded estimates for status output."""
+        return {
+            name: {
+                "latency_ms": round(stats.latency_ms, 1),
+                "ttft_ms": round(stats.ttft_ms, 1),
+                "tokens_per_second": round(stats.tokens_per_second, 1),
+                "error_rate": round(stats.error_rate, 3),
+                "p95_ms": stats.p95_ms(),
+                "samples": stats.samples,
+            }
+            for name, stats in self.stats.items()
+        }
+
+    def _load_state(self) -> None:
+        """Load estimates from JSON file."""
+        if not self.state_path.exists():
+            return
+
+        try:
+            with open(self.state_path, "r") as f:
+                data = json.load(f)
+            for name, entry in data.items():
+                self.stats[name] = ModelStats.from_dict(entry)
+        except Exception as e:
+            logger.warning(f"Failed to load router telemetry: {e}")
+
+    def save(self) -> None:
+        """Write pending estimates now (e.g. on shutdown)."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self.state_path is not None and self._dirty:
+            self._dirty = False
+            self._write_state(self._snapshot())
+
+    def _schedule_save(self) -> None:
+        """Save after ``save_delay``, in a worker thread when a loop is running."""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to block: save right away
+            self.save()
+            return
+        if self._save_handle is None:
+            self._save_handle = loop.call_later(
+                self.save_delay, self._save_in_background, loop
+            )
+
+    def _save_in_background(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._save_handle = None
+        if self._dirty:
+            self._dirty = False
+            loop.run_in_executor(None, self._write_state, self._snapshot())
+
+    def _snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+    def _write_state(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """Save estimates to JSON file."""
+        with self._write_lock:
+            try:
+                self.state_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.state_path.with_suffix(".tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f, indent=2)
+                tmp_path.replace(self.state_path)
+            except Exception as e:
+                logger.error(f"Failed to save router telemetry: {e}")
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import random
 import string
@@ -13,7 +14,7 @@ from typing import Any, Awaitable, Callable, Dict, List, Optional
 from .models import EvolveProposal
 from .proposal_engine import ProposalEngine
 from .risk_assessor import RiskAssessor
-from .sandbox import WorktreeSandbox
+from .sandbox import WorktreePool
 from .signal_collector import SignalCollector
 from .storage import ProposalStore
 from .test_runner import TestRunner
@@ -30,15 +31,16 @@ class SelfEvolveManager:
         self.signal_collector = SignalCollector(
             max_output_chars=self.config["max_output_chars"]
         )
-        self.test_runner = TestRunner(
-            self.repo_root, timeout_seconds=self.config["test_timeout_seconds"]
-        )
+        self.test_runner = self._make_test_runner(self.repo_root)
         self.proposal_engine = ProposalEngine(
             coder,
             self.repo_root,
             allowed_paths=self.config["allowed_paths"],
         )
         self.risk_assessor = RiskAssessor()
+        self.worktree_pool = WorktreePool(
+            self.repo_root, size=self.config["max_parallel_evaluations"]
+        )
 
     async def propose(self) -> Optional[EvolveProposal]:
         self._prune_proposals()
@@ -179,7 +181,7 @@ class SelfEvolveManager:
             self.store.upsert(proposal)
             return proposal
 
-        test_run = await self._run_tests()
+        test_run = await self._run_tests(fail_fast=self.config["fail_fast"])
         proposal.test_run = test_run
         proposal.applied_at = EvolveProposal.now_iso()
         if not test_run.failures():
@@ -203,32 +205,82 @@ class SelfEvolveManager:
         proposal = self.store.get(proposal_id)
         if not proposal:
             raise ValueError(f"Proposal not found: {proposal_id}")
+        return await self._evaluate(proposal)
+
+    async def evaluate_proposals(
+        self, proposal_ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Dry-run several proposals in parallel.
+
+        Proposals (default: all in the proposed state) are ranked by risk
+        score, lowest first, and evaluated concurrently in pooled worktrees.
+        When there are more proposals than worktrees, the lowest-risk ones
+        get a worktree first, so the cheapest fixes are reported soonest.
+
+        Returns:
+            One dry-run result per proposal, in rank order, each with its
+            proposal_id and risk_score
+        """
+        if proposal_ids is None:
+            proposals = [p for p in self.store.load_all() if p.status == "proposed"]
+        else:
+            proposals = []
+            for proposal_id in proposal_ids:
+                proposal = self.store.get(proposal_id)
+                if not proposal:
+                    raise ValueError(f"Proposal not found: {proposal_id}")
+                proposals.append(proposal)
+
+        ranked = self.rank_proposals(proposals)
+
+        async def evaluate(proposal: EvolveProposal) -> Dict[str, Any]:
+            result = await self._evaluate(proposal)
+            return {
+                "proposal_id": proposal.proposal_id,
+                "risk_score": proposal.risk_score,
+                **result,
+            }
+
+        # Tasks start in rank order, so they queue for worktrees in that order
+        return list(await asyncio.gather(*(evaluate(p) for p in ranked)))
 
+    def rank_proposals(self, proposals: List[EvolveProposal]) -> List[EvolveProposal]:
+        """Order proposals by risk score, then diff size (cheapest first)."""
+        for proposal in proposals:
+            if not proposal.risk_score and proposal.diff:
+                assessment = self.risk_assessor.assess(proposal.diff)
+                proposal.risk_score = assessment.score
+                proposal.risk_notes = assessment.notes
+        return sorted(proposals, key=lambda p: (p.risk_score, len(p.diff)))
+
+    async def _evaluate(self, proposal: EvolveProposal) -> Dict[str, Any]:
         validation_error = self._validate_diff(proposal.diff)
         if validation_error:
             return {"success": False, "error": validation_error}
 
-        sandbox = WorktreeSandbox(self.repo_root)
-        worktree_path = sandbox.create()
-        try:
-            apply_error = self._apply_patch_in_dir(proposal.diff, worktree_path)
+        async with self.worktree_pool.lease() as worktree_path:
+            apply_error = await asyncio.to_thread(
+                self._apply_patch_in_dir, proposal.diff, worktree_path
+            )
             if apply_error:
                 return {"success": False, "error": apply_error}
 
-            test_runner = TestRunner(
-                worktree_path, timeout_seconds=self.config["test_timeout_seconds"]
-            )
-            test_run = await self._run_in_thread(
-                test_runner.run_commands,
+            # Evaluations run concurrently, so they do not feed the shared
+            # signal collector
+            test_run = await self._make_test_runner(worktree_path).run(
                 list(self.config["test_commands"]),
+                fail_fast=self.config["fail_fast"],
             )
             return {
                 "success": not test_run.failures(),
                 "test_results": test_run.to_dict(),
                 "affected_files": self._extract_paths(proposal.diff),
             }
-        finally:
-            sandbox.cleanup(worktree_path)
+
+    async def close(self) -> None:
+        """Remove pooled worktrees."""
+        await self.worktree_pool.close()
 
     def list_proposals(self) -> List[EvolveProposal]:
         return self.store.load_all()
@@ -253,6 +305,11 @@ class SelfEvolveManager:
             "max_output_chars": 8000,
             "max_patch_bytes": 200000,
             "test_timeout_seconds": 900,
+            "test_parallelism": 2,
+            "test_shards": 1,
+            "test_cache": True,
+            "fail_fast": True,
+            "max_parallel_evaluations": 2,
             "run_tests_on_issue": True,
             "auto_rollback_on_failure": True,
             "max_proposals": 100,
@@ -367,16 +424,33 @@ class SelfEvolveManager:
             return rollback.stderr.strip() or "Patch rollback failed"
         return None
 
-    async def _run_tests(self):
-        return await self._run_in_thread(
-            self.test_runner.run_commands,
-            list(self.config["test_commands"]),
+    def _make_test_runner(self, working_directory: Path) -> TestRunner:
+        return TestRunner(
+            working_directory,
+            timeout_seconds=self.config["test_timeout_seconds"],
+            max_parallel=self.config["test_parallelism"],
+            shards=self.config["test_shards"],
+            cache_dir=(
+                self._storage_dir() / "test_cache"
+                if self.config["test_cache"]
+                else None
+            ),
         )
 
-    async def _run_in_thread(self, func, *args):
-        import asyncio
+    async def _run_tests(self, fail_fast: bool = False):
+        """
+        Run the configured test commands.
 
-        return await asyncio.to_thread(func, *args)
+        Failures are streamed to the signal collector as they are reported.
+        With fail_fast the run stops at the first failure, which is enough to
+        reject or roll back a proposal.
+        """
+        self.signal_collector.reset()
+        return await self.test_runner.run(
+            list(self.config["test_commands"]),
+            on_failure=self.signal_collector.record_failure,
+            fail_fast=fail_fast,
+        )
 
     def _find_repo_root(self, working_directory: Path) -> Path:
         current = working_directory
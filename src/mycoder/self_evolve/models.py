@@ -17,6 +17,8 @@ class TestCommandResult:
     stdout: str
     stderr: str
     duration_ms: int
+    cached: bool = False
+    skipped: bool = False
 
     def to_dict(self) -> Dict[str, object]:
         return {
@@ -25,6 +27,8 @@ class TestCommandResult:
             "stdout": self.stdout,
             "stderr": self.stderr,
             "duration_ms": self.duration_ms,
+            "cached": self.cached,
+            "skipped": self.skipped,
         }
 
 
@@ -37,7 +41,11 @@ class TestRunSummary:
     results: List[TestCommandResult] = field(default_factory=list)
 
     def failures(self) -> List[TestCommandResult]:
-        return [result for result in self.results if result.exit_code != 0]
+        return [
+            result
+            for result in self.results
+            if result.exit_code != 0 and not result.skipped
+        ]
 
     def to_dict(self) -> Dict[str, object]:
         return {
@@ -36,6 +36,7 @@ class ProposalEngine:
         response = await self.coder.process_request(
             prompt,
             use_tools=False,
+            priority="agent",
         )
         content = (
             response.get("content") if isinstance(response, dict) else str(response)
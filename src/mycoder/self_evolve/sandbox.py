@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
 import shutil
 import subprocess
 import tempfile
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, List, Optional
+
+from ..utils.process_runner import get_process_runner
 
 
 class WorktreeSandbox:
@@ -16,14 +20,20 @@ class WorktreeSandbox:
         self.repo_root = repo_root
         self.base_dir = base_dir
 
-    def create(self) -> Path:
-        base_dir = (
+    def worktrees_dir(self) -> Path:
+        return (
             self.base_dir or self.repo_root / ".mycoder" / "self_evolve" / "worktrees"
         )
+
+    def create(self, path: Optional[Path] = None) -> Path:
+        base_dir = self.worktrees_dir()
         base_dir.mkdir(parents=True, exist_ok=True)
-        worktree_path = Path(tempfile.mkdtemp(prefix="self-evolve-", dir=base_dir))
+        if path is None:
+            worktree_path = Path(tempfile.mkdtemp(prefix="self-evolve-", dir=base_dir))
+        else:
+            worktree_path = path
         add_result = subprocess.run(
-            ["git", "worktree", "add", "--detach", str(worktree_path)],
+            ["git", "worktree", "add", "--detach", "--force", str(worktree_path)],
             cwd=self.repo_root,
             capture_output=True,
             text=True,
@@ -47,3 +57,84 @@ class WorktreeSandbox:
             capture_output=True,
             text=True,
         )
+
+
+class WorktreePool:
+    """
+    Reusable worktrees for evaluating several proposals at once.
+
+    Up to ``size`` worktrees are created on demand under fixed names
+    (``pool-0``, ``pool-1``, ...) and kept between leases; ones left behind
+    by an earlier session are adopted instead of recreated. Before each
+    lease a worktree is reset to the repository's current HEAD with
+    ``git checkout --force`` and ``git clean -x``, which is much cheaper
+    than adding a new worktree. Ignored build and test artefacts are
+    removed too, so nothing carries over between proposals.
+    """
+
+    def __init__(
+        self, repo_root: Path, size: int = 2, base_dir: Optional[Path] = None
+    ) -> None:
+        self.sandbox = WorktreeSandbox(repo_root, base_dir=base_dir)
+        self.repo_root = repo_root
+        self.size = max(1, size)
+        self._idle: List[Path] = []
+        self._created = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.created = 0
+        self.reused = 0
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Path]:
+        """Borrow a clean worktree at HEAD for the duration of the block."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+            self._lock = asyncio.Lock()
+        async with self._slots:
+            path = await self._checkout()
+            try:
+                yield path
+            finally:
+                self._idle.append(path)
+
+    async def _checkout(self) -> Path:
+        head = await self._git(self.repo_root, "rev-parse", "HEAD")
+        async with self._lock:
+            if self._idle:
+                path = self._idle.pop()
+            else:
+                path = self.sandbox.worktrees_dir() / f"pool-{self._created}"
+                self._created += 1
+                if not (path / ".git").exists():
+                    await self._recreate(path)
+                    return path
+        try:
+            await self._git(path, "checkout", "--quiet", "--force", "--detach", head)
+            await self._git(path, "clean", "-fdxq")
+        except RuntimeError:
+            # Broken leftover (e.g. pruned by hand): start over
+            await self._recreate(path)
+            return path
+        self.reused += 1
+        return path
+
+    async def _recreate(self, path: Path) -> None:
+        if path.exists():
+            await asyncio.to_thread(self.sandbox.cleanup, path)
+        await asyncio.to_thread(self.sandbox.create, path)
+        self.created += 1
+
+    async def _git(self, cwd: Path, *args: str) -> str:
+        result = await get_process_runner().run(["git", *args], cwd=cwd, timeout=120)
+        if not result.success:
+            raise RuntimeError(result.stderr.strip() or f"git {args[0]} failed")
+        return result.stdout.strip()
+
+    async def close(self) -> None:
+        """Remove every worktree created by the pool."""
+        for index in range(self._created):
+            path = self.sandbox.worktrees_dir() / f"pool-{index}"
+            await asyncio.to_thread(self.sandbox.cleanup, path)
+        self._idle.clear()
+        self._created = 0
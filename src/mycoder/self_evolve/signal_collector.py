@@ -10,13 +10,32 @@ from .models import EvolveSignal, TestCommandResult, TestRunSummary
 class SignalCollector:
     """Build evolve signals from test results."""
 
+    MAX_REPORTED_FAILURES = 50
+
     def __init__(self, max_output_chars: int = 8000) -> None:
         self.max_output_chars = max_output_chars
+        self.reported_failures: List[str] = []
+
+    def reset(self) -> None:
+        """Forget failures reported during a previous run."""
+        self.reported_failures = []
+
+    def record_failure(self, command: str, line: str) -> None:
+        """Record a failure streamed by the test runner while tests run."""
+        entry = f"{command}: {line}"
+        if (
+            entry not in self.reported_failures
+            and len(self.reported_failures) < self.MAX_REPORTED_FAILURES
+        ):
+            self.reported_failures.append(entry)
 
     def build_signal(self, test_run: TestRunSummary) -> EvolveSignal:
         failures = test_run.failures()
         summary = self._summarize_failures(failures)
         failure_output = self._collect_failure_output(failures)
+        if failures and self.reported_failures:
+            reported = "\n".join(f"- {entry}" for entry in self.reported_failures)
+            failure_output = f"Reported failures:\n{reported}\n\n{failure_output}"
         return EvolveSignal(
             summary=summary,
             failure_output=failure_output,
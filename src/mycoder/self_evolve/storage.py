@@ -46,6 +46,8 @@ class ProposalStore:
                             stdout=result.get("stdout", ""),
                             stderr=result.get("stderr", ""),
                             duration_ms=result.get("duration_ms", 0),
+                            cached=result.get("cached", False),
+                            skipped=result.get("skipped", False),
                         )
                         for result in test_run_raw.get("results", [])
                     ],
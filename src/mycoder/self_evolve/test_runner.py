@@ -2,79 +2,451 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import logging
 import os
+import re
 import shlex
-import subprocess
 import time
 from datetime import datetime, timezone
-from typing import List
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
+from ..utils.process_runner import OutputCallback, ProcessResult, get_process_runner
 from .models import TestCommandResult, TestRunSummary
 
+logger = logging.getLogger(__name__)
+
+FailureCallback = Callable[[str, str], Any]
+
+# pytest reports a failing test either in the short summary
+# ("FAILED tests/x.py::test_a - ...") or inline with -v ("tests/x.py::test_a FAILED")
+_FAILURE_LINE = re.compile(
+    r"^(?:(?:FAILED|ERROR)\s+(?P<summary>\S+)|(?P<inline>\S+::\S+)\s+(?:FAILED|ERROR)\b)"
+)
+
+# pytest exit code when no tests were collected (an empty shard)
+_NO_TESTS_COLLECTED = 5
+
+# Exit code reported for a command killed by its timeout
+_TIMEOUT_EXIT_CODE = 124
+
+# pytest options that take no value, so an argument after them is positional
+_PYTEST_FLAG = re.compile(
+    r"-[qvxsl]+|--(?:quiet|verbose|exitfirst|showlocals|lf|last-failed|ff|"
+    r"failed-first|nf|new-first|sw|stepwise|strict-markers|no-header|no-summary)"
+)
+
 
 class TestRunner:
-    """Run test commands and capture output."""
+    """
+    Run test commands and capture output.
+
+    Independent commands run concurrently (``max_parallel``). A pytest
+    command can be split by test file over ``shards`` processes. With a
+    ``cache_dir``, passing results are cached by command and working-tree
+    state (HEAD plus uncommitted changes), so a proposal that already passed
+    and has not changed is not tested again. Failures are always rerun, as
+    they may be flaky or caused by the environment rather than the tree.
+    """
+
+    # Runtime state (proposals, worktrees, this cache) never affects results
+    STATE_DIR = ".mycoder"
+    MAX_HASHED_FILE_BYTES = 1_000_000
 
-    def __init__(self, working_directory, timeout_seconds: int = 900) -> None:
+    def __init__(
+        self,
+        working_directory,
+        timeout_seconds: int = 900,
+        max_output_bytes: int = 1_000_000,
+        max_parallel: int = 4,
+        shards: int = 1,
+        cache_dir: Optional[Path] = None,
+        cache_ttl_seconds: int = 7 * 24 * 3600,
+    ) -> None:
         self.working_directory = working_directory
         self.timeout_seconds = timeout_seconds
+        self.max_output_bytes = max_output_bytes
+        self.max_parallel = max(1, max_parallel)
+        self.shards = max(1, shards)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_ttl_seconds = cache_ttl_seconds
 
     def run_commands(self, commands: List[str]) -> TestRunSummary:
+        """Blocking wrapper around ``run`` for callers without a loop."""
+        return asyncio.run(self.run(commands))
+
+    async def run(
+        self,
+        commands: List[str],
+        on_output: Optional[OutputCallback] = None,
+        on_failure: Optional[FailureCallback] = None,
+        fail_fast: bool = False,
+        use_cache: bool = True,
+    ) -> TestRunSummary:
+        """
+        Run test commands concurrently.
+
+        Args:
+            commands: Shell-style command lines (no shell is used)
+            on_output: Called with every output line as it arrives
+            on_failure: Called with (command, line) for each failing test as
+                soon as it is reported, and once per failed command
+            fail_fast: Stop all remaining commands after the first failure;
+                stopped commands are reported as skipped
+            use_cache: Reuse cached passing results when the tree has not
+                changed
+
+        Returns:
+            Summary with one result per command, in the order given
+        """
         started_at = datetime.now(timezone.utc).isoformat()
         start_time = time.time()
-        results = []
 
-        for command in commands:
-            cmd_start = time.time()
-            try:
-                args = shlex.split(command, posix=os.name != "nt")
-            except ValueError as exc:
-                duration_ms = int((time.time() - cmd_start) * 1000)
-                results.append(
-                    TestCommandResult(
-                        command=command,
-                        exit_code=1,
-                        stdout="",
-                        stderr=str(exc),
-                        duration_ms=duration_ms,
-                    )
-                )
-                continue
+        tree_hash = None
+        if self.cache_dir and use_cache:
+            tree_hash = await self._tree_hash()
 
-            if not args:
-                duration_ms = int((time.time() - cmd_start) * 1000)
-                results.append(
-                    TestCommandResult(
-                        command=command,
-                        exit_code=1,
-                        stdout="",
-                        stderr="Command is empty",
-                        duration_ms=duration_ms,
-                    )
-                )
-                continue
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        stop = asyncio.Event()
 
-            process = subprocess.run(
-                args,
-                cwd=self.working_directory,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout_seconds,
-            )
-            duration_ms = int((time.time() - cmd_start) * 1000)
-            results.append(
-                TestCommandResult(
-                    command=command,
-                    exit_code=process.returncode,
-                    stdout=process.stdout or "",
-                    stderr=process.stderr or "",
-                    duration_ms=duration_ms,
+        async def run_one(command: str) -> TestCommandResult:
+            cached = self._cache_get(command, tree_hash)
+            if cached is not None:
+                return cached
+
+            async with semaphore:
+                if stop.is_set():
+                    return self._skipped_result(command)
+                result, complete = await self._run_command(
+                    command, on_output, on_failure, fail_fast, stop
                 )
-            )
+
+            if result.exit_code != 0 and not result.skipped:
+                self._report_failure(command, result, on_failure, fail_fast, stop)
+            if complete:
+                self._cache_put(command, tree_hash, result)
+            return result
+
+        results = await asyncio.gather(*(run_one(command) for command in commands))
 
         total_duration = int((time.time() - start_time) * 1000)
         return TestRunSummary(
             started_at=started_at,
             duration_ms=total_duration,
-            results=results,
+            results=list(results),
+        )
+
+    async def _run_command(
+        self,
+        command: str,
+        on_output: Optional[OutputCallback],
+        on_failure: Optional[FailureCallback],
+        fail_fast: bool,
+        stop: asyncio.Event,
+    ) -> Tuple[TestCommandResult, bool]:
+        """Run one command; the flag is False when it was stopped early."""
+        cmd_start = time.time()
+        try:
+            args = shlex.split(command, posix=os.name != "nt")
+        except ValueError as exc:
+            return self._error_result(command, str(exc), cmd_start), True
+
+        if not args:
+            return self._error_result(command, "Command is empty", cmd_start), True
+
+        failed_here = False
+
+        async def watch(line: str) -> None:
+            nonlocal failed_here
+            if on_output is not None:
+                outcome = on_output(line)
+                if asyncio.iscoroutine(outcome):
+                    await outcome
+            if _FAILURE_LINE.match(line):
+                failed_here = True
+                if on_failure is not None:
+                    on_failure(command, line.rstrip())
+                if fail_fast:
+                    stop.set()
+
+        try:
+            if self.shards > 1 and self._pytest_index(args) is not None:
+                processes = await self._run_sharded(args, watch, stop)
+            else:
+                processes = [await self._spawn(args, watch, stop)]
+        except OSError as exc:
+            return self._error_result(command, str(exc), cmd_start), False
+
+        result = self._combine(command, processes)
+        if not any(p.stopped for p in processes):
+            return result, True
+        if failed_here:
+            result.exit_code = 1
+        else:
+            result.skipped = True
+            result.stderr = f"{result.stderr}\nStopped after an earlier failure".strip()
+        return result, False
+
+    async def _spawn(
+        self, args: List[str], watch: OutputCallback, stop: asyncio.Event
+    ) -> ProcessResult:
+        return await get_process_runner().run(
+            args,
+            cwd=self.working_directory,
+            timeout=self.timeout_seconds,
+            on_stdout=watch,
+            on_stderr=watch,
+            max_output_bytes=self.max_output_bytes,
+            stop=stop,
+        )
+
+    async def _run_sharded(
+        self, args: List[str], watch: OutputCallback, stop: asyncio.Event
+    ) -> List[ProcessResult]:
+        """
+        Split a pytest command by test file and run the shards in parallel.
+
+        Each shard runs the original options with the node ids collected for
+        its files, so it runs exactly the tests the command selects.
+        """
+        shards = await self._plan_shards(args)
+        base = None
+        if len(shards) >= 2:
+            files = {node.split("::", 1)[0] for shard in shards for node in shard}
+            base = self._strip_test_paths(args, files)
+        if base is None:
+            return [await self._spawn(args, watch, stop)]
+
+        return list(
+            await asyncio.gather(
+                *(self._spawn(base + nodes, watch, stop) for nodes in shards)
+            )
+        )
+
+    async def _plan_shards(self, args: List[str]) -> List[List[str]]:
+        """Group collected tests by file into balanced shards of node ids."""
+        index = self._pytest_index(args)
+        collect_args = [
+            arg for arg in args if not re.fullmatch(r"-v+|--verbose|-q+|--quiet", arg)
+        ]
+        collect_args[index + 1 : index + 1] = ["--collect-only", "-q"]
+        collected = await get_process_runner().run(
+            collect_args,
+            cwd=self.working_directory,
+            timeout=self.timeout_seconds,
+            max_output_bytes=self.max_output_bytes,
+        )
+        if collected.returncode != 0 or collected.stdout_truncated:
+            return []
+
+        nodes: Dict[str, List[str]] = {}
+        for line in collected.stdout.splitlines():
+            line = line.strip()
+            if "::" in line:
+                nodes.setdefault(line.split("::", 1)[0], []).append(line)
+
+        shard_count = min(self.shards, len(nodes))
+        if shard_count < 2:
+            return []
+        shards: List[List[str]] = [[] for _ in range(shard_count)]
+        for path, ids in sorted(
+            nodes.items(), key=lambda item: (-len(item[1]), item[0])
+        ):
+            target = min(range(shard_count), key=lambda i: len(shards[i]))
+            shards[target].extend(ids)
+        return shards
+
+    def _strip_test_paths(
+        self, args: List[str], collected_files: Set[str]
+    ) -> Optional[List[str]]:
+        """
+        Drop the positional test paths given after the pytest token.
+
+        An argument is a test path when it names collected tests. An argument
+        after an option that may take a value is never dropped; when such an
+        argument also names collected tests the command cannot be split
+        safely and None is returned.
+        """
+        index = self._pytest_index(args)
+        kept = list(args[: index + 1])
+        previous = ""
+        for arg in args[index + 1 :]:
+            if not arg.startswith("-") and self._names_tests(arg, collected_files):
+                after_option = previous.startswith("-") and "=" not in previous
+                if after_option and not _PYTEST_FLAG.fullmatch(previous):
+                    return None
+            else:
+                kept.append(arg)
+            previous = arg
+        return kept
+
+    @staticmethod
+    def _names_tests(arg: str, collected_files: Set[str]) -> bool:
+        path = os.path.normpath(arg.split("::", 1)[0]).replace(os.sep, "/")
+        if path == ".":
+            return bool(collected_files)
+        return any(
+            file == path or file.startswith(path + "/") for file in collected_files
+        )
+
+    @staticmethod
+    def _pytest_index(args: List[str]) -> Optional[int]:
+        for index, arg in enumerate(args):
+            if Path(arg).name in ("pytest", "py.test"):
+                return index
+        return None
+
+    def _combine(
+        self, command: str, processes: List[ProcessResult]
+    ) -> TestCommandResult:
+        if len(processes) == 1:
+            process = processes[0]
+            stdout, stderr = process.stdout, process.stderr
+            exit_code = process.returncode
+        else:
+            stdout = "\n".join(
+                f"# shard {i}/{len(processes)}\n{p.stdout}"
+                for i, p in enumerate(processes, 1)
+            )
+            stderr = "\n".join(p.stderr for p in processes if p.stderr)
+            codes = [p.returncode for p in processes]
+            failing = [c for c in codes if c not in (0, _NO_TESTS_COLLECTED)]
+            exit_code = failing[0] if failing else min(codes)
+
+        timed_out = any(p.timed_out for p in processes)
+        if timed_out:
+            stderr += f"\nCommand timed out after {self.timeout_seconds}s"
+            exit_code = _TIMEOUT_EXIT_CODE
+        return TestCommandResult(
+            command=command,
+            exit_code=exit_code,
+            stdout=stdout,
+            stderr=stderr,
+            duration_ms=max(p.duration_ms for p in processes),
+        )
+
+    def _report_failure(
+        self,
+        command: str,
+        result: TestCommandResult,
+        on_failure: Optional[FailureCallback],
+        fail_fast: bool,
+        stop: asyncio.Event,
+    ) -> None:
+        if on_failure is not None:
+            on_failure(command, f"exit code {result.exit_code}")
+        if fail_fast:
+            stop.set()
+
+    async def _tree_hash(self) -> Optional[str]:
+        """Hash of HEAD plus uncommitted changes, or None outside git."""
+        runner = get_process_runner()
+        cwd = self.working_directory
+        try:
+            head, diff, untracked = await asyncio.gather(
+                runner.run(["git", "rev-parse", "HEAD"], cwd=cwd, timeout=30),
+                runner.run(
+                    ["git", "diff", "HEAD", "--no-ext-diff", "--binary"],
+                    cwd=cwd,
+                    timeout=60,
+                    max_output_bytes=1 << 30,
+                ),
+                runner.run(
+                    [
+                        "git",
+                        "ls-files",
+                        "--others",
+                        "--exclude-standard",
+                        "--",
+                        ".",
+                        f":(exclude){self.STATE_DIR}",
+                    ],
+                    cwd=cwd,
+                    timeout=30,
+                ),
+            )
+        except OSError:
+            return None
+        if not (head.success and diff.success and untracked.success):
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(head.stdout.encode())
+        digest.update(diff.stdout.encode())
+        # New files from an applied patch are untracked; hash their contents
+        # so a worktree and the repo with the same patch share cache entries
+        for name in sorted(untracked.stdout.splitlines()):
+            path = Path(cwd) / name
+            try:
+                if path.stat().st_size > self.MAX_HASHED_FILE_BYTES:
+                    content = str(path.stat().st_mtime_ns).encode()
+                else:
+                    content = path.read_bytes()
+            except OSError:
+                continue
+            digest.update(name.encode() + b"\0" + hashlib.sha256(content).digest())
+        return digest.hexdigest()
+
+    def _cache_path(self, command: str, tree_hash: str) -> Path:
+        key = hashlib.sha256(f"{command}\0{tree_hash}".encode()).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def _cache_get(
+        self, command: str, tree_hash: Optional[str]
+    ) -> Optional[TestCommandResult]:
+        if not tree_hash:
+            return None
+        path = self._cache_path(command, tree_hash)
+        try:
+            if time.time() - path.stat().st_mtime > self.cache_ttl_seconds:
+                return None
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if data.get("exit_code", 0) != 0:
+            return None
+        return TestCommandResult(
+            command=command,
+            exit_code=0,
+            stdout=data.get("stdout", ""),
+            stderr=data.get("stderr", ""),
+            duration_ms=data.get("duration_ms", 0),
+            cached=True,
+        )
+
+    def _cache_put(
+        self, command: str, tree_hash: Optional[str], result: TestCommandResult
+    ) -> None:
+        if not tree_hash or result.skipped or result.exit_code != 0:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._cache_path(command, tree_hash).write_text(
+                json.dumps(result.to_dict()), encoding="utf-8"
+            )
+        except OSError as exc:
+            logger.warning(f"Failed to cache test result for {command}: {exc}")
+
+    def _skipped_result(self, command: str) -> TestCommandResult:
+        return TestCommandResult(
+            command=command,
+            exit_code=0,
+            stdout="",
+            stderr="Skipped after an earlier failure",
+            duration_ms=0,
+            skipped=True,
+        )
+
+    def _error_result(
+        self, command: str, error: str, cmd_start: float
+    ) -> TestCommandResult:
+        return TestCommandResult(
+            command=command,
+            exit_code=1,
+            stdout="",
+            stderr=error,
+            duration_ms=int((time.time() - cmd_start) * 1000),
         )
@@ -18,6 +18,8 @@ from typing import Any, Callable, Dict, List, Optional
 
 import aiosqlite
 
+from .vector_index import VectorIndex, create_embedder
+
 logger = logging.getLogger(__name__)
 
 _MAX_RETRIES = 5
@@ -69,12 +71,15 @@ class StorageManager:
     INDEX_SNAPSHOTS = [
         "CREATE INDEX IF NOT EXISTS idx_snapshot_step ON file_snapshots(step_id)"
     ]
+    # Cosine similarity below which history search results are noise
+    MIN_SIMILARITY = 0.1
 
     def __init__(
         self,
         working_dir: Optional[Path] = None,
         db_name: str = "session.db",
         time_provider: Callable[[], float] = time.time,
+        embedder: Any = None,
     ):
         self.working_dir = working_dir or Path.cwd()
         self.db_path = self.working_dir / ".mycoder" / db_name
@@ -82,6 +87,10 @@ class StorageManager:
         self._initialized = False
         self._time_provider = time_provider
         self._conn: Optional[aiosqlite.Connection] = None
+        self._embedder = embedder
+        # Semantic index over chat_history, opened by the first search
+        self.vector_index: Optional[VectorIndex] = None
+        self._vectors_synced = False
         if not self.db_path.parent.exists():
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -222,6 +231,8 @@ class StorageManager:
             await self._conn.commit()
             cursor = await self._conn.execute("SELECT last_insert_rowid()")
             row = await cursor.fetchone()
+            if self._vectors_synced:
+                await asyncio.to_thread(self.vector_index.add, [row[0]], [content])
             return row[0]
         except sqlite3.Error as e:
             logger.error("Failed to save interaction: %s", e)
@@ -261,6 +272,100 @@ class StorageManager:
             logger.error("Failed to retrieve history: %s", e)
             raise StorageError("Failed to fetch history") from e
 
+    async def search_history(
+        self, query: str, limit: int = 5, session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Chat messages closest in meaning to the query.
+
+        Messages are embedded into a local vector index on first use and
+        incrementally afterwards, so past interactions worded differently
+        from the query are still found. With ``session_id`` only that
+        session's messages are ranked.
+        """
+        if not query or limit <= 0:
+            return []
+        await self._ensure_conn()
+        try:
+            await self._sync_vectors()
+            session_ids = None
+            if session_id:
+                cursor = await self._conn.execute(
+                    "SELECT id FROM chat_history WHERE session_id = ?", (session_id,)
+                )
+                session_ids = [row[0] for row in await cursor.fetchall()]
+                if not session_ids:
+                    return []
+            # Over-fetch for messages deleted since they were indexed
+            hits = await asyncio.to_thread(
+                self.vector_index.search,
+                query,
+                limit * 3,
+                self.MIN_SIMILARITY,
+                session_ids,
+            )
+            if not hits:
+                return []
+            placeholders = ",".join("?" for _ in hits)
+            cursor = await self._conn.execute(
+                f"SELECT * FROM chat_history WHERE id IN ({placeholders})",
+                [message_id for message_id, _ in hits],
+            )
+            rows = {row["id"]: row for row in await cursor.fetchall()}
+        except sqlite3.Error as e:
+            logger.error("Failed to search history: %s", e)
+            raise StorageError("Failed to search history") from e
+
+        results = []
+        for message_id, score in hits:
+            row = rows.get(message_id)
+            if row is None:
+                continue
+            results.append(
+                {
+                    "session_id": row["session_id"],
+                    "role": row["role"],
+                    "content": row["content"],
+                    "timestamp": row["timestamp"],
+                    "score": round(score, 4),
+                }
+            )
+            if len(results) >= limit:
+                break
+        return results
+
+    async def _sync_vectors(self) -> None:
+        """Embed chat messages the vector index has not seen yet."""
+        if self._vectors_synced:
+            return
+        if self.vector_index is None:
+            self.vector_index = await asyncio.to_thread(
+                VectorIndex,
+                self.db_path.with_name(self.db_path.stem + "_vectors"),
+                self._embedder or create_embedder(),
+            )
+        cursor = await self._conn.execute("SELECT COUNT(*) FROM chat_history")
+        total = (await cursor.fetchone())[0]
+        if len(self.vector_index) > 2 * total + 1000:
+            await asyncio.to_thread(self.vector_index.clear)
+
+        last_id = self.vector_index.max_id
+        while True:
+            cursor = await self._conn.execute(
+                "SELECT id, content FROM chat_history WHERE id > ? ORDER BY id LIMIT 2000",
+                (last_id,),
+            )
+            batch = await cursor.fetchall()
+            if not batch:
+                break
+            await asyncio.to_thread(
+                self.vector_index.add,
+                [row["id"] for row in batch],
+                [row["content"] for row in batch],
+            )
+            last_id = batch[-1]["id"]
+        self._vectors_synced = True
+
     async def create_snapshot(self, step_id: str, file_path: str) -> bool:
         """
         Saves the current content of a file before modification.
@@ -343,6 +448,8 @@ class StorageManager:
             )
             await self._conn.execute("VACUUM")
             await self._conn.commit()
+            # Vectors of removed messages are dropped on the next search
+            self._vectors_synced = False
         except sqlite3.Error as e:
             logger.error("Cleanup failed: %s", e)
             raise StorageError("Cleanup failed") from e
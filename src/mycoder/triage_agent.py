@@ -24,6 +24,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("JulesTriage")
 
+# Issues per LLM request; chunks of a large backlog are triaged in parallel
+DEFAULT_TRIAGE_BATCH_SIZE = 20
+
 JULES_SYSTEM_PROMPT = """
 ## Role: Jules (System Architect & Guardian)
 
@@ -163,17 +166,21 @@ async def triage_issues_with_llm(
 
     router = APIProviderRouter(provider_configs)
 
-    # 3. Construct Prompt
-    # Convert issues to JSON string for the prompt
-    issues_json = json.dumps(issues, indent=2)
+    # 3. Construct Prompts
+    # Large issue lists are split into chunks that run in parallel
     labels_str = ", ".join(available_labels)
+    batch_size = max(1, int(config.get("triage_batch_size", DEFAULT_TRIAGE_BATCH_SIZE)))
+    chunks = [issues[i : i + batch_size] for i in range(0, len(issues), batch_size)]
 
     try:
-        prompt = JULES_SYSTEM_PROMPT.format(
-            available_labels=labels_str,
-            issues_to_triage=issues_json,
-            github_env=github_env,
-        )
+        prompts = [
+            JULES_SYSTEM_PROMPT.format(
+                available_labels=labels_str,
+                issues_to_triage=json.dumps(chunk, indent=2),
+                github_env=github_env,
+            )
+            for chunk in chunks or [[]]
+        ]
     except Exception as e:
         logger.error(f"Failed to format prompt: {e}")
         raise e
@@ -183,19 +190,38 @@ async def triage_issues_with_llm(
     )
 
     # 4. Query LLM
-    response = await router.query(
-        prompt=prompt,
-        preferred_provider=preferred_provider_type,
-        fallback_enabled=True,
-        temperature=0.1,  # Low temperature for deterministic output
-    )
+    if len(prompts) == 1:
+        response = await router.query(
+            prompt=prompts[0],
+            preferred_provider=preferred_provider_type,
+            fallback_enabled=True,
+            temperature=0.1,  # Low temperature for deterministic output
+        )
+        if not response.success:
+            logger.error(f"Triage failed: {response.error}")
+            return []
+        return _parse_triage_response(response.content)
+
+    logger.info(f"Triaging in {len(prompts)} batches of up to {batch_size} issues")
+    order = [preferred_provider_type] + [
+        p for p in router.fallback_chain if p != preferred_provider_type
+    ]
+    chunk_results: Dict[int, List[Dict[str, Any]]] = {}
+    async for result in router.query_batch(prompts, providers=order, temperature=0.1):
+        if result.success:
+            chunk_results[result.index] = _parse_triage_response(
+                result.response.content
+            )
+        else:
+            logger.error(f"Triage batch {result.index} failed: {result.response.error}")
+
+    # 5. Merge in issue order
+    return [item for index in sorted(chunk_results) for item in chunk_results[index]]
 
-    if not response.success:
-        logger.error(f"Triage failed: {response.error}")
-        return []
 
-    # 5. Parse JSON
-    content = response.content.strip()
+def _parse_triage_response(content: str) -> List[Dict[str, Any]]:
+    """Extract the JSON array of triage decisions from an LLM response."""
+    content = content.strip()
 
     # Attempt to extract JSON array using regex if markdown or extra text is present
     # Matches [...] with DOTALL
@@ -0,0 +1,176 @@
+"""
+Virtualized chat transcript for the interactive CLI.
+
+Every message is rendered to terminal lines once per (message id, width,
+show_thinking) and kept in an LRU cache, so a refresh only slices cached
+lines into the viewport. Heights are the exact line counts of those renders.
+The reply that is still streaming is the only message rendered every frame.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from rich.console import Console, Group, RenderableType
+from rich.segment import Segment, SegmentLines
+from rich.text import Text
+
+Line = List[Segment]
+
+
+@dataclass
+class _RenderedMessage:
+    content: str
+    lines: List[Line]
+
+
+@dataclass
+class TranscriptView:
+    """Lines that fit the viewport, plus how much was left out."""
+
+    lines: List[Line]
+    hidden_older: int = 0
+    hidden_newer: int = 0
+
+    def renderable(self) -> SegmentLines:
+        return SegmentLines(self.lines, new_lines=True)
+
+
+class ChatTranscript:
+    """Renders chat history into a fixed number of lines, newest last."""
+
+    def __init__(
+        self,
+        console: Console,
+        render_body: Callable[[Dict[str, str], bool], RenderableType],
+        max_cached: int = 1024,
+    ) -> None:
+        self.console = console
+        self.render_body = render_body
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[Tuple[int, int, bool], _RenderedMessage]" = (
+            OrderedDict()
+        )
+        self.message_renders = 0
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def message_lines(
+        self, entry: Dict[str, str], width: int, show_thinking: bool
+    ) -> List[Line]:
+        """Header and body of one message, rendered once per width."""
+        key = (entry.get("id", 0), width, show_thinking)
+        content = entry.get("content", "")
+        cached = self._cache.get(key)
+        if cached is not None and cached.content == content:
+            self._cache.move_to_end(key)
+            return cached.lines
+
+        self.message_renders += 1
+        lines = self._render(
+            Group(self.header(entry), self.render_body(entry, show_thinking)), width
+        )
+        self._cache[key] = _RenderedMessage(content, lines)
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return lines
+
+    def streaming_lines(
+        self, content: str, timestamp: str, width: int, height: int
+    ) -> List[Line]:
+        """
+        The reply still being streamed, rendered as plain text.
+
+        Only the end that can be visible is wrapped: ``height`` lines of at
+        most ``width`` characters need no more than ``(width + 1) * height``
+        characters.
+        """
+        limit = (width + 1) * height
+        if len(content) > limit:
+            return self._render(Text(content[-limit:]), width)[-height:]
+        entry = {"role": "ai", "timestamp": timestamp}
+        header = self.header(entry, streaming=True)
+        return self._render(Group(header, Text(content)), width)
+
+    def view(
+        self,
+        history: Sequence[Dict[str, str]],
+        width: int,
+        height: int,
+        show_thinking: bool = False,
+        offset: int = 0,
+        streaming: Optional[Tuple[str, str]] = None,
+    ) -> TranscriptView:
+        """
+        Lines of the newest messages that fit into ``height``.
+
+        Args:
+            history: Chat entries, oldest first
+            width: Content width in cells
+            height: Viewport height in lines
+            show_thinking: Expand <thinking> blocks
+            offset: Number of newest messages scrolled out of view
+            streaming: (content, timestamp) of a reply still streaming
+
+        Returns:
+            TranscriptView; older messages are dropped first, and the oldest
+            visible message may be cut at the top
+        """
+        offset = min(max(offset, 0), max(0, len(history) - 1))
+        source = history[: len(history) - offset]
+        separator = self._separator(width)
+        notices: List[Line] = []
+        if offset:
+            notices += self._notice(f"[... {offset} novějších zpráv skryto ...]", width)
+            notices.append(separator)
+        budget = max(1, height - len(notices))
+
+        # Newest first; each older block ends with the separator to its successor
+        blocks: List[List[Line]] = []
+        used = shown = 0
+        if streaming is not None and not offset:
+            content, timestamp = streaming
+            blocks.append(self.streaming_lines(content, timestamp, width, budget))
+            used += len(blocks[-1])
+        for entry in reversed(source):
+            if used >= budget:
+                break
+            lines = self.message_lines(entry, width, show_thinking)
+            if blocks:
+                lines = lines + [separator]
+            blocks.append(lines)
+            used += len(lines)
+            shown += 1
+
+        hidden_older = len(source) - shown
+        if hidden_older:
+            notices += self._notice(
+                f"[... {hidden_older} starších zpráv skryto ...]", width
+            )
+            notices.append(separator)
+            budget = max(1, height - len(notices))
+
+        # The oldest visible message may be cut at the top
+        lines = [line for block in reversed(blocks) for line in block][-budget:]
+        if notices and lines and lines[0] is separator:
+            lines = lines[1:]
+        return TranscriptView(notices + lines, hidden_older, offset)
+
+    def header(self, entry: Dict[str, str], streaming: bool = False) -> Text:
+        label, style = {
+            "user": ("You", "bold green"),
+            "ai": ("MyCoder AI", "bold cyan"),
+        }.get(entry.get("role", ""), ("System", "bold yellow"))
+        suffix = " …" if streaming else ""
+        return Text(f"[{entry.get('timestamp', '')}] {label}:{suffix}", style=style)
+
+    def _render(self, renderable: RenderableType, width: int) -> List[Line]:
+        options = self.console.options.update(width=width, height=None)
+        return self.console.render_lines(renderable, options, pad=False)
+
+    def _separator(self, width: int) -> Line:
+        return [Segment("─" * min(60, width), self.console.get_style("dim white"))]
+
+    def _notice(self, message: str, width: int) -> List[Line]:
+        return self._render(Text(message, style="dim italic", justify="center"), width)
@@ -0,0 +1,227 @@
+"""
+Token-budgeted packing of file context into a prompt.
+
+Files mentioned in the prompt are packed first. Files that do not fit whole
+are trimmed to their most relevant blocks instead of being cut at a fixed
+character offset.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Set, Tuple
+
+from .token_counter import TokenCounter, get_token_counter
+
+_TERM_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+_BLOCK_SPLIT = re.compile(r"\n\s*\n")
+
+_STOPWORDS = {
+    "the",
+    "and",
+    "for",
+    "this",
+    "that",
+    "with",
+    "from",
+    "into",
+    "file",
+    "code",
+    "please",
+    "what",
+    "how",
+    "why",
+    "can",
+    "you",
+    "does",
+    "should",
+    "make",
+}
+
+
+@dataclass
+class PackedContext:
+    """Result of packing files into a token budget."""
+
+    text: str
+    tokens: int
+    included: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+class ContextPacker:
+    """
+    Packs file contents into a token budget.
+
+    Packing runs in two priority groups: files referenced in the prompt, then
+    the rest in their original order. Within a group, whole files that fit are
+    taken first; the remaining budget is then spent on trimmed versions of the
+    files that did not fit, keeping the blocks that share the most terms with
+    the prompt.
+    """
+
+    FILE_TEMPLATE = "File: {name}\n```\n{content}\n```"
+    # Not a comment in any language, so it cannot be mistaken for code
+    OMITTED_TEMPLATE = "[... {count} blocks omitted ...]"
+    SEPARATOR = "\n\n"
+    MIN_TRIMMED_TOKENS = 64
+
+    def __init__(self, token_counter: Optional[TokenCounter] = None):
+        self.token_counter = token_counter or get_token_counter()
+
+    def pack(
+        self,
+        files: Sequence[Tuple[Path, str]],
+        budget_tokens: int,
+        prompt: str = "",
+    ) -> PackedContext:
+        """
+        Pack files into the budget.
+
+        Args:
+            files: (path, content) pairs in caller order
+            budget_tokens: Maximum tokens for the packed context
+            prompt: User prompt used for prioritization and relevance
+
+        Returns:
+            PackedContext with the rendered text and what was kept
+        """
+        terms = self._prompt_terms(prompt)
+        mentioned = [
+            i for i, (path, _) in enumerate(files) if self._is_mentioned(path, prompt)
+        ]
+        mentioned_set = set(mentioned)
+        others = [i for i in range(len(files)) if i not in mentioned_set]
+
+        separator_tokens = self.token_counter.count(self.SEPARATOR)
+        remaining = budget_tokens
+        blocks = {}
+        truncated: List[str] = []
+
+        for group in (mentioned, others):
+            pending = []
+            for index in group:
+                path, content = files[index]
+                block = self._render(path, content)
+                cost = self.token_counter.count(block) + separator_tokens
+                if cost <= remaining:
+                    blocks[index] = block
+                    remaining -= cost
+                else:
+                    pending.append(index)
+
+            for index in pending:
+                if remaining < self.MIN_TRIMMED_TOKENS:
+                    break
+                path, content = files[index]
+                block, cost = self._trim(
+                    path, content, terms, remaining - separator_tokens
+                )
+                if block:
+                    blocks[index] = block
+                    remaining -= cost + separator_tokens
+                    truncated.append(str(path))
+
+        order = mentioned + others
+        included = [str(files[i][0]) for i in order if i in blocks]
+        dropped = [str(files[i][0]) for i in order if i not in blocks]
+        text = self.SEPARATOR.join(blocks[i] for i in order if i in blocks)
+
+        return PackedContext(
+            text=text,
+            tokens=budget_tokens - remaining,
+            included=included,
+            truncated=truncated,
+            dropped=dropped,
+        )
+
+    def _render(self, path: Path, content: str) -> str:
+        return self.FILE_TEMPLATE.format(name=Path(path).name, content=content)
+
+    def _trim(
+        self, path: Path, content: str, terms: Set[str], budget: int
+    ) -> Tuple[str, int]:
+        """Keep the most relevant blocks of a file within budget."""
+        chunks = [c for c in _BLOCK_SPLIT.split(content) if c.strip()]
+        if not chunks:
+            return "", 0
+
+        overhead = self.token_counter.count(self._render(path, ""))
+        available = budget - overhead
+        if available <= 0:
+            return "", 0
+
+        # Rank by term overlap; ties keep earlier blocks (imports, headers)
+        ranked = sorted(
+            range(len(chunks)),
+            key=lambda i: (-self._relevance(chunks[i], terms), i),
+        )
+
+        marker_cost = self.token_counter.count(
+            "\n\n" + self.OMITTED_TEMPLATE.format(count=10)
+        )
+        kept: List[int] = []
+        used = 0
+        for i in ranked:
+            cost = self.token_counter.count(chunks[i]) + marker_cost
+            if used + cost <= available:
+                kept.append(i)
+                used += cost
+
+        if not kept:
+            # Nothing fits whole: hard-cut the best block by lines
+            best = ranked[0]
+            lines = []
+            for line in chunks[best].splitlines():
+                cost = self.token_counter.count(line + "\n")
+                if used + cost + marker_cost > available:
+                    break
+                lines.append(line)
+                used += cost
+            if not lines:
+                return "", 0
+            chunks[best] = "\n".join(lines)
+            kept = [best]
+            used += marker_cost
+
+        kept.sort()
+        parts = []
+        previous = -1
+        for i in kept:
+            if i != previous + 1:
+                parts.append(self.OMITTED_TEMPLATE.format(count=i - previous - 1))
+            parts.append(chunks[i])
+            previous = i
+        if previous != len(chunks) - 1:
+            parts.append(self.OMITTED_TEMPLATE.format(count=len(chunks) - previous - 1))
+
+        return self._render(path, "\n\n".join(parts)), overhead + used
+
+    @staticmethod
+    def _prompt_terms(prompt: str) -> Set[str]:
+        return {
+            term.lower()
+            for term in _TERM_PATTERN.findall(prompt)
+            if term.lower() not in _STOPWORDS
+        }
+
+    @staticmethod
+    def _relevance(chunk: str, terms: Set[str]) -> int:
+        if not terms:
+            return 0
+        words = {w.lower() for w in _TERM_PATTERN.findall(chunk)}
+        return len(words & terms)
+
+    @staticmethod
+    def _is_mentioned(path: Path, prompt: str) -> bool:
+        if not prompt:
+            return False
+        path = Path(path)
+        lowered = prompt.lower()
+        if path.name.lower() in lowered:
+            return True
+        stem = path.stem.lower()
+        return (
+            len(stem) >= 3 and re.search(rf"\b{re.escape(stem)}\b", lowered) is not None
+        )
@@ -0,0 +1,330 @@
+"""
+Async Process Runner.
+Runs subprocesses on the event loop with streamed output, bounded output
+buffers, timeouts, cancellation of whole process groups and a concurrency
+limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+import signal
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+OutputCallback = Callable[[str], Union[None, Awaitable[None]]]
+
+DEFAULT_MAX_OUTPUT_BYTES = 1_000_000
+
+
+@dataclass
+class ProcessResult:
+    """Outcome of a finished (or killed) process."""
+
+    args: Sequence[str]
+    returncode: int
+    stdout: str
+    stderr: str
+    duration_ms: int
+    timed_out: bool = False
+    stopped: bool = False
+    stdout_truncated: int = 0
+    stderr_truncated: int = 0
+
+    @property
+    def success(self) -> bool:
+        return self.returncode == 0 and not (self.timed_out or self.stopped)
+
+
+class OutputBuffer:
+    """
+    Keeps the first ``head_bytes`` and the last ``max_bytes`` of a stream.
+
+    Long test or build output matters most at its end (failures, summaries),
+    so older lines are dropped ring-buffer style and counted instead. A
+    non-zero ``head_bytes`` also keeps the beginning (the command banner,
+    the first error); the dropped middle is replaced by a marker.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_OUTPUT_BYTES, head_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.head_bytes = head_bytes
+        self._head = bytearray()
+        self._chunks: Deque[bytes] = deque()
+        self._size = 0
+        self.dropped = 0
+
+    def append(self, data: bytes) -> None:
+        if len(self._head) < self.head_bytes:
+            room = self.head_bytes - len(self._head)
+            self._head += data[:room]
+            data = data[room:]
+            if not data:
+                return
+        if len(data) > self.max_bytes:
+            self.dropped += len(data) - self.max_bytes
+            data = data[-self.max_bytes :]
+        self._chunks.append(data)
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            oldest = self._chunks.popleft()
+            excess = self._size - self.max_bytes
+            if len(oldest) > excess:
+                # Keep the end of an oversized chunk (a long line)
+                self._chunks.appendleft(oldest[excess:])
+                oldest = oldest[:excess]
+            self._size -= len(oldest)
+            self.dropped += len(oldest)
+
+    def text(self) -> str:
+        head = self._head.decode("utf-8", errors="replace")
+        body = b"".join(self._chunks).decode("utf-8", errors="replace")
+        if not self.dropped:
+            return head + body
+        if head and not head.endswith("\n"):
+            head += "\n"
+        return f"{head}[... {self.dropped} bytes truncated ...]\n{body}"
+
+
+class ProcessRunner:
+    """
+    Shared runner for subprocesses started by agents and the test runner.
+
+    At most ``max_concurrency`` processes run at once per event loop; further
+    calls wait for a slot. Output is read line by line, handed to optional
+    callbacks as it arrives and kept in bounded buffers. A process that
+    exceeds its timeout, or whose caller is cancelled, is terminated and then
+    killed. On POSIX every process leads its own process group and the whole
+    group is signalled, so children of a shell or build tool do not outlive
+    it.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_output_bytes: int = DEFAULT_MAX_OUTPUT_BYTES,
+        kill_grace_seconds: float = 2.0,
+        process_groups: bool = os.name == "posix",
+    ):
+        self.max_concurrency = max_concurrency or max(2, os.cpu_count() or 2)
+        self.max_output_bytes = max_output_bytes
+        self.kill_grace_seconds = kill_grace_seconds
+        self.process_groups = process_groups
+        # Semaphores bind to the loop they first wait on
+        self._semaphores: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.running = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def run(
+        self,
+        args: Sequence[str],
+        cwd: Optional[Union[str, Path]] = None,
+        timeout: Optional[float] = None,
+        env: Optional[Dict[str, str]] = None,
+        input: Optional[str] = None,
+        on_stdout: Optional[OutputCallback] = None,
+        on_stderr: Optional[OutputCallback] = None,
+        max_output_bytes: Optional[int] = None,
+        stop: Optional[asyncio.Event] = None,
+        head_output_bytes: int = 0,
+    ) -> ProcessResult:
+        """
+        Run a command and wait for it.
+
+        Args:
+            args: Program and arguments (no shell)
+            cwd: Working directory
+            timeout: Seconds before the process is killed; None waits forever
+            env: Environment for the process (default: inherited)
+            input: Text written to stdin
+            on_stdout: Called with each stdout line as it arrives
+            on_stderr: Called with each stderr line as it arrives
+            max_output_bytes: Per-stream buffer size (default: runner setting)
+            stop: Kill the process when this event is set
+            head_output_bytes: Also keep this much of the start of each stream
+
+        Returns:
+            ProcessResult; ``timed_out`` or ``stopped`` is set when the process
+            was killed, with the output read up to that point
+
+        Raises:
+            OSError: The program could not be started
+            asyncio.CancelledError: The caller was cancelled (process killed)
+        """
+        limit = max_output_bytes or self.max_output_bytes
+        async with self._semaphore():
+            self.running += 1
+            try:
+                return await self._run(
+                    list(args),
+                    cwd,
+                    timeout,
+                    env,
+                    input,
+                    on_stdout,
+                    on_stderr,
+                    limit,
+                    head_output_bytes,
+                    stop,
+                )
+            finally:
+                self.running -= 1
+
+    async def _run(
+        self,
+        args: Sequence[str],
+        cwd: Optional[Union[str, Path]],
+        timeout: Optional[float],
+        env: Optional[Dict[str, str]],
+        input: Optional[str],
+        on_stdout: Optional[OutputCallback],
+        on_stderr: Optional[OutputCallback],
+        limit: int,
+        head_limit: int,
+        stop: Optional[asyncio.Event],
+    ) -> ProcessResult:
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            cwd=str(cwd) if cwd else None,
+            env=env,
+            stdin=asyncio.subprocess.PIPE if input is not None else None,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=self.process_groups,
+        )
+        stdout = OutputBuffer(limit, head_limit)
+        stderr = OutputBuffer(limit, head_limit)
+
+        async def communicate() -> None:
+            if input is not None:
+                process.stdin.write(input.encode("utf-8"))
+                await process.stdin.drain()
+                process.stdin.close()
+            await asyncio.gather(
+                self._pump(process.stdout, stdout, on_stdout),
+                self._pump(process.stderr, stderr, on_stderr),
+            )
+            await process.wait()
+
+        comm = asyncio.ensure_future(communicate())
+        stopping = asyncio.ensure_future(stop.wait()) if stop else None
+        waiting = [comm] + ([stopping] if stopping else [])
+        try:
+            done, _ = await asyncio.wait(
+                waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        except BaseException:
+            for task in waiting:
+                task.cancel()
+            await self._kill(process)
+            raise
+        finally:
+            if stopping:
+                stopping.cancel()
+
+        finished = comm in done
+        stopped = not finished and stopping is not None and stopping in done
+        timed_out = not finished and not stopped
+        if finished:
+            comm.result()
+        else:
+            comm.cancel()
+            await self._kill(process)
+            await asyncio.gather(comm, return_exceptions=True)
+
+        return ProcessResult(
+            args=args,
+            returncode=process.returncode if process.returncode is not None else -1,
+            stdout=stdout.text(),
+            stderr=stderr.text(),
+            duration_ms=int((time.perf_counter() - started) * 1000),
+            timed_out=timed_out,
+            stopped=stopped,
+            stdout_truncated=stdout.dropped,
+            stderr_truncated=stderr.dropped,
+        )
+
+    async def _pump(
+        self,
+        stream: asyncio.StreamReader,
+        buffer: OutputBuffer,
+        callback: Optional[OutputCallback],
+    ) -> None:
+        while True:
+            try:
+                line = await stream.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                # End of stream; the last line may lack a newline
+                line = e.partial
+            except asyncio.LimitOverrunError as e:
+                # Line longer than the stream limit: the data stays buffered,
+                # so hand it on in pieces instead of losing it
+                line = await stream.readexactly(e.consumed or 1)
+            if not line:
+                return
+            buffer.append(line)
+            if callback is not None:
+                try:
+                    outcome = callback(line.decode("utf-8", errors="replace"))
+                    if inspect.isawaitable(outcome):
+                        await outcome
+                except Exception as e:
+                    logger.warning(f"Process output callback failed: {e}")
+
+    async def _kill(self, process: asyncio.subprocess.Process) -> None:
+        try:
+            if process.returncode is None:
+                self._signal(process, signal.SIGTERM)
+                try:
+                    await asyncio.wait_for(process.wait(), self.kill_grace_seconds)
+                except asyncio.TimeoutError:
+                    self._signal(process, signal.SIGKILL)
+                    await process.wait()
+            # Children that ignored SIGTERM, or outlived their parent while
+            # still holding its pipes
+            if self.process_groups:
+                self._signal(process, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def _signal(self, process: asyncio.subprocess.Process, sig: int) -> None:
+        if self.process_groups:
+            try:
+                os.killpg(process.pid, sig)
+                return
+            except ProcessLookupError:
+                if process.returncode is not None:
+                    return
+            except PermissionError:
+                pass
+        process.send_signal(sig)
+
+
+_default_runner: Optional[ProcessRunner] = None
+
+
+def get_process_runner() -> ProcessRunner:
+    """Process runner shared by agents and the self-evolve test runner."""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = ProcessRunner()
+    return _default_runner
@@ -0,0 +1,373 @@
+"""
+Local Vector Index.
+Embeds text on the CPU and finds nearest neighbours in a memory-mapped
+float32 matrix, without any external service. Used for semantic recall of
+MCP memories and chat history.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import unicodedata
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbedder:
+    """
+    Hashing-trick text embedding.
+
+    Words and character trigrams are hashed into ``dim`` signed buckets and
+    the result is L2-normalized. Trigrams make inflected or misspelled forms
+    ("testy", "testing", "tests") land close together. No model download,
+    no dependencies; quality is below a learned model but far above
+    substring matching.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        normalized = unicodedata.normalize("NFKD", text.lower())
+        normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+        for word in _WORD.findall(normalized):
+            self._add(vector, word, 1.0)
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                self._add(vector, padded[i : i + 3], 0.5)
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm:
+            vector = [v / norm for v in vector]
+        return vector
+
+    def _add(self, vector: List[float], feature: str, weight: float) -> None:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % self.dim] += weight if h & 0x80000000 else -weight
+
+
+class SentenceTransformerEmbedder:
+    """Small CPU model from sentence-transformers (optional dependency)."""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-transformers:{model_name}"
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors = self.model.encode(list(texts), normalize_embeddings=True)
+        return [list(map(float, v)) for v in vectors]
+
+
+def create_embedder(model: Optional[str] = None):
+    """
+    Embedder named by ``model`` or MYCODER_EMBEDDING_MODEL.
+
+    "hashing" (the default) needs nothing; any other value is loaded as a
+    sentence-transformers model, falling back to hashing when that fails.
+    """
+    model = model or os.getenv("MYCODER_EMBEDDING_MODEL") or "hashing"
+    if model != "hashing":
+        try:
+            return SentenceTransformerEmbedder(model)
+        except Exception as e:
+            logger.warning(f"Embedding model {model} unavailable, using hashing: {e}")
+    return HashingEmbedder()
+
+
+class VectorIndex:
+    """
+    Append-only nearest neighbour index persisted next to its data.
+
+    Vectors are stored as raw float32 rows in ``<path>.f32`` and their ids as
+    int64 in ``<path>.ids``; with NumPy the matrix is memory-mapped, so only
+    the pages a search touches are read. Below ``ivf_threshold`` vectors a
+    search is one exact matrix-vector product. Above it an IVF layer
+    (k-means centroids, ``nprobe`` lists probed per query) keeps queries in
+    the millisecond range; it is trained in memory and retrained as the
+    index doubles. Without NumPy the index falls back to exact pure-Python
+    search.
+
+    Ids are expected to grow monotonically, so callers can catch up on rows
+    added while the index was not running by indexing ids above ``max_id``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path],
+        embedder: Any = None,
+        ivf_threshold: int = 50_000,
+        nprobe: int = 8,
+        use_numpy: Optional[bool] = None,
+    ):
+        self.path = Path(path) if path else None
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else use_numpy
+        self._lock = threading.Lock()
+        self._ids = array("q")
+        self._vectors = array("f")
+        self._matrix = None
+        self._centroids = None
+        self._lists: List[List[int]] = []
+        self._trained_size = 0
+        self._max_id = 0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def max_id(self) -> int:
+        return self._max_id
+
+    def _file(self, suffix: str) -> Path:
+        return self.path.with_name(self.path.name + suffix)
+
+    def _load(self) -> None:
+        if not self.path:
+            return
+        meta_path = self._file(".json")
+        if not meta_path.exists():
+            self.clear()
+            return
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            ids = array("q", self._file(".ids").read_bytes())
+            if (
+                meta.get("embedder") != self.embedder.name
+                or meta.get("dim") != self.dim
+                or self._file(".f32").stat().st_size != len(ids) * self.dim * 4
+            ):
+                raise ValueError("index does not match the embedder")
+        except (OSError, ValueError) as e:
+            logger.info(f"Rebuilding vector index {self.path}: {e}")
+            self.clear()
+            return
+        self._ids = ids
+        self._max_id = max(ids) if ids else 0
+        if not self.use_numpy:
+            self._vectors = array("f", self._file(".f32").read_bytes())
+
+    def clear(self) -> None:
+        """Drop all vectors (callers re-add from their source data)."""
+        self._ids = array("q")
+        self._vectors = array("f")
+        self._matrix = None
+        self._centroids = None
+        self._lists = []
+        self._trained_size = 0
+        self._max_id = 0
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file(".ids").write_bytes(b"")
+            self._file(".f32").write_bytes(b"")
+            self._file(".json").write_text(
+                json.dumps({"embedder": self.embedder.name, "dim": self.dim}),
+                encoding="utf-8",
+            )
+
+    def add(self, ids: Sequence[int], texts: Sequence[str]) -> None:
+        """Embed texts and add them under the given ids."""
+        if ids:
+            self.add_vectors(ids, self.embedder.embed(texts))
+
+    def add_vectors(
+        self, ids: Sequence[int], vectors: Sequence[Sequence[float]]
+    ) -> None:
+        rows = array("f")
+        for vector in vectors:
+            if len(vector) != self.dim:
+                raise ValueError(f"Expected {self.dim} dimensions, got {len(vector)}")
+            rows.extend(vector)
+        new_ids = array("q", ids)
+
+        with self._lock:
+            start = len(self._ids)
+            if self.path:
+                with self._file(".f32").open("ab") as handle:
+                    rows.tofile(handle)
+                with self._file(".ids").open("ab") as handle:
+                    new_ids.tofile(handle)
+            self._ids.extend(new_ids)
+            self._max_id = max(self._max_id, max(new_ids, default=0))
+            if not self.use_numpy or not self.path:
+                self._vectors.extend(rows)
+            if not self.use_numpy:
+                return
+            # Reopened lazily so the memory map covers the new rows
+            self._matrix = None
+            if self._centroids is not None:
+                block = np.array(rows, dtype=np.float32).reshape(-1, self.dim)
+                for offset, cluster in enumerate(self._assign(block)):
+                    self._lists[cluster].append(start + offset)
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        min_score: float = -1.0,
+        ids: Optional[Collection[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Ids and cosine similarities of the ``k`` nearest texts.
+
+        With ``ids``, only those entries are ranked (exactly, without IVF).
+        """
+        return self.search_vector(self.embedder.embed([query])[0], k, min_score, ids)
+
+    def search_vector(
+        self,
+        vector: Sequence[float],
+        k: int = 10,
+        min_score: float = -1.0,
+        ids: Optional[Collection[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        if not self._ids or k <= 0:
+            return []
+        with self._lock:
+            positions = None if ids is None else self._positions(ids)
+            if positions is not None and not len(positions):
+                return []
+            if self.use_numpy:
+                hits = self._search_numpy(
+                    np.asarray(vector, dtype=np.float32), k, positions
+                )
+            else:
+                hits = self._search_python(vector, k, positions)
+        return [hit for hit in hits if hit[1] >= min_score]
+
+    def _positions(self, ids: Collection[int]) -> Any:
+        """Row positions of the given ids."""
+        if self.use_numpy:
+            stored = np.frombuffer(self._ids, dtype=np.int64)
+            return np.flatnonzero(np.isin(stored, np.fromiter(ids, dtype=np.int64)))
+        wanted = set(ids)
+        return [i for i, id_ in enumerate(self._ids) if id_ in wanted]
+
+    def _search_python(
+        self, vector: Sequence[float], k: int, positions: Optional[List[int]] = None
+    ) -> List[Tuple[int, float]]:
+        dim = self.dim
+        rows = self._vectors
+        scores = [
+            (sum(a * b for a, b in zip(vector, rows[i * dim : (i + 1) * dim])), i)
+            for i in (range(len(self._ids)) if positions is None else positions)
+        ]
+        scores.sort(reverse=True)
+        return [(self._ids[i], score) for score, i in scores[:k]]
+
+    def _search_numpy(
+        self, vector: Any, k: int, rows: Any = None
+    ) -> List[Tuple[int, float]]:
+        matrix = self._get_matrix()
+        if rows is None:
+            rows = self._probe(matrix, vector, k)
+
+        candidates = matrix if rows is None else matrix[rows]
+        scores = candidates @ vector
+        top = min(k, len(scores))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        positions = best if rows is None else rows[best]
+        return [
+            (self._ids[int(position)], float(scores[i]))
+            for i, position in zip(best, positions)
+        ]
+
+    def _probe(self, matrix: Any, vector: Any, k: int) -> Any:
+        """Candidate rows from the IVF lists, or None to scan every row."""
+        if len(self._ids) >= self.ivf_threshold and (
+            self._centroids is None or len(self._ids) >= 2 * self._trained_size
+        ):
+            self._train(matrix)
+        if self._centroids is None:
+            return None
+        probe = np.argsort(self._centroids @ vector)[::-1][: self.nprobe]
+        rows = np.fromiter(
+            (row for cluster in probe for row in self._lists[cluster]),
+            dtype=np.int64,
+        )
+        return rows if len(rows) >= k else None
+
+    def _get_matrix(self) -> Any:
+        if self._matrix is None or len(self._matrix) != len(self._ids):
+            if self.path:
+                self._matrix = np.memmap(
+                    self._file(".f32"),
+                    dtype=np.float32,
+                    mode="r",
+                    shape=(len(self._ids), self.dim),
+                )
+            else:
+                # A copy: a view would pin the growing array's buffer
+                self._matrix = np.array(self._vectors, dtype=np.float32).reshape(
+                    -1, self.dim
+                )
+        return self._matrix
+
+    def _train(self, matrix: Any, iterations: int = 8) -> None:
+        """k-means over a sample; every row is then assigned to a list."""
+        size = len(matrix)
+        nlist = max(1, int(math.sqrt(size)))
+        rng = np.random.default_rng(0)
+        sample = np.asarray(
+            matrix[np.sort(rng.choice(size, min(size, nlist * 40), replace=False))]
+        )
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(nlist):
+                members = sample[assignment == cluster]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    centroids[cluster] = centroid / norm if norm else centroid
+
+        self._centroids = centroids
+        self._lists = [[] for _ in range(nlist)]
+        for start in range(0, size, 8192):
+            block = np.asarray(matrix[start : start + 8192])
+            for offset, cluster in enumerate(self._assign(block)):
+                self._lists[cluster].append(start + offset)
+        self._trained_size = size
+        logger.debug(f"Trained IVF index with {nlist} lists over {size} vectors")
+
+    def _assign(self, block: Any) -> Any:
+        return np.argmax(block @ self._centroids.T, axis=1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "vectors": len(self._ids),
+            "dim": self.dim,
+            "embedder": self.embedder.name,
+            "ivf_lists": len(self._lists),
+            "numpy": self.use_numpy,
+        }
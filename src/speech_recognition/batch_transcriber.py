@@ -0,0 +1,370 @@
+"""
+Batch transcription of recorded audio files.
+
+Fans WAV files out over a worker pool, writes JSONL results incrementally and
+resumes from the results file when a previous run was interrupted.
+"""
+
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .whisper_transcriber import WhisperProvider, WhisperTranscriber
+
+logger = logging.getLogger(__name__)
+
+# Per-process transcriber used by local Whisper pool workers. Each worker loads
+# the model exactly once in its initializer and reuses it for every file.
+_worker_transcriber: Optional[WhisperTranscriber] = None
+
+
+@dataclass
+class BatchResult:
+    """Transcription result for a single audio file."""
+
+    path: str
+    status: str  # "ok" or "error"
+    text: Optional[str] = None
+    error: Optional[str] = None
+    audio_seconds: float = 0.0
+    processing_seconds: float = 0.0
+    real_time_factor: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert result to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+def collect_audio_files(source: str, pattern: str = "*.wav") -> List[Path]:
+    """
+    Resolve a directory or glob expression into a sorted list of WAV files.
+
+    Args:
+        source: Directory path, single file or glob expression
+        pattern: File pattern used when ``source`` is a directory
+
+    Returns:
+        Sorted list of audio file paths
+    """
+    path = Path(source).expanduser()
+    if path.is_dir():
+        files = path.rglob(pattern)
+    elif path.is_file():
+        files = [path]
+    else:
+        files = (Path(p) for p in glob.glob(str(path), recursive=True))
+    return sorted(p.resolve() for p in files if p.is_file())
+
+
+def get_wav_duration(path: Path) -> float:
+    """Return WAV duration in seconds, or 0.0 if the header is unreadable."""
+    try:
+        with wave.open(str(path), "rb") as wav_file:
+            rate = wav_file.getframerate()
+            return wav_file.getnframes() / rate if rate else 0.0
+    except (wave.Error, EOFError, OSError) as e:
+        logger.warning(f"Could not read WAV header for {path}: {e}")
+        return 0.0
+
+
+def _successful_records(output_path: Path) -> Dict[str, str]:
+    """First successful JSONL line per path, in file order."""
+    records: Dict[str, str] = {}
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Partially written last line from an interrupted run
+                continue
+            path = record.get("path")
+            if record.get("status") == "ok" and path and path not in records:
+                records[path] = line
+    return records
+
+
+def load_checkpoint(output_path: Path) -> Set[str]:
+    """
+    Read already transcribed files from an existing JSONL results file.
+
+    Only successful results count as done, so failed files are retried on resume.
+    """
+    if not output_path.exists():
+        return set()
+    return set(_successful_records(output_path))
+
+
+def compact_checkpoint(output_path: Path) -> Set[str]:
+    """
+    Prepare a results file for resuming and return the files already done.
+
+    Keeps one successful record per file and drops failed records (those
+    files are retried and get a new record) and a partially written last
+    line, so appended records start on a line of their own.
+    """
+    if not output_path.exists():
+        return set()
+
+    records = _successful_records(output_path)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in records.values())
+    tmp_path.replace(output_path)
+    return set(records)
+
+
+def _transcribe_file(
+    transcriber: WhisperTranscriber, path: Path, audio_seconds: float
+) -> BatchResult:
+    """Transcribe one file and measure its real-time factor."""
+    start = time.perf_counter()
+    try:
+        text = transcriber.transcribe(path.read_bytes())
+    except Exception as e:
+        text = None
+        error: Optional[str] = str(e)
+    else:
+        error = None if text else "Transcription returned no text"
+    elapsed = time.perf_counter() - start
+
+    return BatchResult(
+        path=str(path),
+        status="ok" if text else "error",
+        text=text,
+        error=error,
+        audio_seconds=round(audio_seconds, 3),
+        processing_seconds=round(elapsed, 3),
+        real_time_factor=(
+            round(elapsed / audio_seconds, 4) if audio_seconds > 0 else None
+        ),
+    )
+
+
+def _init_local_worker(
+    factory: Optional[Callable[..., WhisperTranscriber]],
+    local_model: str,
+    language: str,
+    temperature: float,
+    threads: int,
+) -> None:
+    """Process pool initializer: load the local Whisper model once per worker."""
+    global _worker_transcriber
+    try:
+        import torch
+
+        # Share the CPU between workers instead of each using every core
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_transcriber = (factory or WhisperTranscriber)(
+        provider=WhisperProvider.LOCAL,
+        local_model=local_model,
+        language=language,
+        temperature=temperature,
+    )
+
+
+def _local_worker_transcribe(path_str: str, audio_seconds: float) -> Dict[str, Any]:
+    """Process pool task: transcribe with the worker's preloaded model."""
+    if _worker_transcriber is None:
+        raise RuntimeError("Worker transcriber not initialized")
+    return _transcribe_file(
+        _worker_transcriber, Path(path_str), audio_seconds
+    ).to_dict()
+
+
+class BatchTranscriber:
+    """
+    Transcribes many audio files with a bounded worker pool.
+
+    Local Whisper runs in a process pool where every worker holds one loaded
+    model and gets an equal share of the CPU threads; the API provider uses a
+    bounded asyncio pool since requests are I/O bound.
+    """
+
+    # Each local worker holds a full model in memory and already runs its
+    # inference on several threads, so more workers rarely pay off.
+    DEFAULT_LOCAL_WORKERS = 2
+    DEFAULT_API_WORKERS = 4
+
+    def __init__(
+        self,
+        provider: WhisperProvider = WhisperProvider.LOCAL,
+        api_key: Optional[str] = None,
+        model: str = "whisper-1",
+        local_model: str = "base",
+        language: str = "cs",
+        temperature: float = 0.0,
+        workers: Optional[int] = None,
+        on_result: Optional[Callable[[BatchResult], None]] = None,
+        transcriber_factory: Optional[Callable[..., WhisperTranscriber]] = None,
+    ):
+        """
+        Initialize the batch transcriber.
+
+        Args:
+            provider: Transcription provider (API or LOCAL)
+            api_key: OpenAI API key (for API provider)
+            model: Whisper model name for API
+            local_model: Local Whisper model size
+            language: Language code for transcription
+            temperature: Sampling temperature
+            workers: Pool size (default: 2 for local, at most one per CPU;
+                4 for API)
+            on_result: Optional callback invoked for every finished file
+            transcriber_factory: Builds the local workers' transcriber
+                (default: WhisperTranscriber); must be picklable, e.g. a
+                module-level class, since it is sent to the worker processes
+        """
+        self.provider = provider
+        self.api_key = api_key
+        self.model = model
+        self.local_model = local_model
+        self.language = language
+        self.temperature = temperature
+        self.on_result = on_result
+        self.transcriber_factory = transcriber_factory
+
+        if workers is None:
+            if provider == WhisperProvider.LOCAL:
+                workers = min(self.DEFAULT_LOCAL_WORKERS, os.cpu_count() or 1)
+            else:
+                workers = self.DEFAULT_API_WORKERS
+        self.workers = max(1, workers)
+
+    def run(
+        self, files: Iterable[Path], output_path: Path, resume: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Transcribe files and append results to a JSONL file.
+
+        Args:
+            files: Audio files to transcribe
+            output_path: JSONL results file (also used as checkpoint)
+            resume: Skip files already transcribed successfully in output_path
+
+        Returns:
+            Summary dictionary with counts and aggregate real-time factor
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        done = compact_checkpoint(output_path) if resume else set()
+        if not resume and output_path.exists():
+            output_path.unlink()
+
+        files = list(files)
+        pending = [p for p in files if str(p) not in done]
+        skipped = len(files) - len(pending)
+        logger.info(
+            f"Batch transcription: {len(pending)} pending, {skipped} already done "
+            f"({self.provider.value}, {self.workers} workers)"
+        )
+
+        results: List[BatchResult] = []
+        start = time.perf_counter()
+
+        with open(output_path, "a", encoding="utf-8") as out:
+
+            def write(result: BatchResult) -> None:
+                out.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+                out.flush()
+                results.append(result)
+                if self.on_result:
+                    self.on_result(result)
+
+            if pending:
+                if self.provider == WhisperProvider.LOCAL:
+                    self._run_local(pending, write)
+                else:
+                    asyncio.run(self._run_api(pending, write))
+
+        return self._summarize(results, skipped, time.perf_counter() - start)
+
+    def _run_local(
+        self, files: List[Path], write: Callable[[BatchResult], None]
+    ) -> None:
+        """Run local Whisper transcription in a process pool."""
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_local_worker,
+            initargs=(
+                self.transcriber_factory,
+                self.local_model,
+                self.language,
+                self.temperature,
+                max(1, (os.cpu_count() or 1) // self.workers),
+            ),
+        ) as pool:
+            futures = {
+                pool.submit(
+                    _local_worker_transcribe, str(path), get_wav_duration(path)
+                ): path
+                for path in files
+            }
+            for future in as_completed(futures):
+                try:
+                    write(BatchResult(**future.result()))
+                except Exception as e:
+                    write(
+                        BatchResult(
+                            path=str(futures[future]), status="error", error=str(e)
+                        )
+                    )
+
+    async def _run_api(
+        self, files: List[Path], write: Callable[[BatchResult], None]
+    ) -> None:
+        """Run API transcription with a bounded number of concurrent requests."""
+        transcriber = WhisperTranscriber(
+            provider=WhisperProvider.API,
+            api_key=self.api_key,
+            model=self.model,
+            language=self.language,
+            temperature=self.temperature,
+        )
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def worker(path: Path) -> BatchResult:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    _transcribe_file, transcriber, path, get_wav_duration(path)
+                )
+
+        for task in asyncio.as_completed([worker(path) for path in files]):
+            write(await task)
+
+    @staticmethod
+    def _summarize(
+        results: List[BatchResult], skipped: int, wall_seconds: float
+    ) -> Dict[str, Any]:
+        """Build the run summary."""
+        succeeded = [r for r in results if r.status == "ok"]
+        audio_total = sum(r.audio_seconds for r in succeeded)
+        processing_total = sum(r.processing_seconds for r in succeeded)
+
+        return {
+            "processed": len(results),
+            "succeeded": len(succeeded),
+            "failed": len(results) - len(succeeded),
+            "skipped": skipped,
+            "audio_seconds": round(audio_total, 3),
+            "wall_seconds": round(wall_seconds, 3),
+            "real_time_factor": (
+                round(processing_total / audio_total, 4) if audio_total > 0 else None
+            ),
+            "throughput_rtf": (
+                round(wall_seconds / audio_total, 4) if audio_total > 0 else None
+            ),
+        }
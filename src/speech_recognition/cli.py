@@ -166,6 +166,7 @@ def run(
             silence_threshold=app_config.audio.silence_threshold,
             silence_duration=app_config.audio.silence_duration,
             injection_method=InjectionMethod(app_config.injection.method),
+            paste_threshold=app_config.injection.paste_threshold,
             enable_gui=app_config.gui.enabled,
             enable_hotkeys=app_config.hotkey.enabled,
             hotkey_combo=(
@@ -278,6 +279,132 @@ def config_create(config: Optional[Path]):
         return 1
 
 
+@cli.command()
+@click.argument("source")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(path_type=Path),
+    default=Path("transcripts.jsonl"),
+    show_default=True,
+    help="JSONL results file (also used as resume checkpoint)",
+)
+@click.option(
+    "--config",
+    "-c",
+    type=click.Path(path_type=Path),
+    help="Path to configuration file",
+)
+@click.option(
+    "--provider",
+    type=click.Choice(["api", "local"], case_sensitive=False),
+    help="Whisper provider (api or local)",
+)
+@click.option(
+    "--model",
+    "-m",
+    help="Whisper model name",
+)
+@click.option(
+    "--language",
+    "-l",
+    help="Language code (default: from configuration)",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    help="Worker processes (local) or concurrent requests (api)",
+)
+@click.option(
+    "--pattern",
+    default="*.wav",
+    show_default=True,
+    help="File pattern used when SOURCE is a directory",
+)
+@click.option(
+    "--no-resume",
+    is_flag=True,
+    help="Ignore existing results and start from scratch",
+)
+def transcribe_batch(
+    source: str,
+    output: Path,
+    config: Optional[Path],
+    provider: Optional[str],
+    model: Optional[str],
+    language: Optional[str],
+    workers: Optional[int],
+    pattern: str,
+    no_resume: bool,
+):
+    """Transcribe a directory or glob of WAV files to JSONL."""
+    from .batch_transcriber import BatchTranscriber, collect_audio_files
+
+    config_manager = ConfigManager(config)
+    app_config = config_manager.load()
+    setup_logging(app_config)
+
+    if provider:
+        app_config.whisper.provider = provider
+    if model:
+        if app_config.whisper.provider == "api":
+            app_config.whisper.model = model
+        else:
+            app_config.whisper.local_model = model
+    if language:
+        app_config.whisper.language = language
+
+    files = collect_audio_files(source, pattern)
+    if not files:
+        click.echo(f"No audio files found for: {source}", err=True)
+        return 1
+
+    def report(result) -> None:
+        rtf = (
+            f"RTF {result.real_time_factor:.3f}"
+            if result.real_time_factor is not None
+            else "RTF n/a"
+        )
+        mark = "✓" if result.status == "ok" else "✗"
+        detail = "" if result.status == "ok" else f" - {result.error}"
+        click.echo(
+            f"{mark} {Path(result.path).name} "
+            f"({result.audio_seconds:.1f}s audio, {rtf}){detail}"
+        )
+
+    batch = BatchTranscriber(
+        provider=WhisperProvider(app_config.whisper.provider),
+        api_key=app_config.whisper.api_key,
+        model=app_config.whisper.model,
+        local_model=app_config.whisper.local_model,
+        language=app_config.whisper.language,
+        temperature=app_config.whisper.temperature,
+        workers=workers,
+        on_result=report,
+    )
+
+    try:
+        summary = batch.run(files, output, resume=not no_resume)
+    except Exception as e:
+        click.echo(f"Batch transcription failed: {e}", err=True)
+        return 1
+
+    click.echo(
+        f"\nProcessed {summary['processed']} files "
+        f"({summary['succeeded']} ok, {summary['failed']} failed, "
+        f"{summary['skipped']} skipped) in {summary['wall_seconds']:.1f}s"
+    )
+    if summary["real_time_factor"] is not None:
+        click.echo(
+            f"Real-time factor: {summary['real_time_factor']:.3f} per file, "
+            f"{summary['throughput_rtf']:.3f} wall clock"
+        )
+    click.echo(f"Results: {output}")
+
+    return 0 if summary["failed"] == 0 else 1
+
+
 @cli.command()
 def devices():
     """List available audio input devices."""
@@ -44,6 +44,7 @@ class InjectionConfig:
     method: str = "auto"  # "xdotool_type", "xdotool_paste", "clipboard_only", "auto"
     typing_delay: int = 12
     use_clipboard_backup: bool = True
+    paste_threshold: int = 64  # AUTO: paste texts at least this long, type shorter
 
 
 @dataclass
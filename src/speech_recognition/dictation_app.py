@@ -5,9 +5,12 @@ Orchestrates audio recording, transcription, and text injection.
 """
 
 import asyncio
+import concurrent.futures
 import logging
+import queue
 import threading
 import time
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, Optional
 
@@ -30,6 +33,16 @@ class AppState(Enum):
     ERROR = "error"
 
 
+@dataclass
+class TranscriptionJob:
+    """Recorded utterance waiting for transcription."""
+
+    audio_data: bytes
+    enqueued_at: float = field(default_factory=time.monotonic)
+    # Overlay window that had focus when recording started, if any
+    focus_window: Optional[str] = None
+
+
 class GlobalDictationApp:
     """
     Global dictation application for Linux.
@@ -47,10 +60,13 @@ class GlobalDictationApp:
         silence_threshold: float = 0.01,
         silence_duration: float = 1.5,
         injection_method: InjectionMethod = InjectionMethod.AUTO,
+        paste_threshold: int = 64,
         enable_gui: bool = True,
         enable_hotkeys: bool = True,
         hotkey_combo: Optional[list[str]] = None,
         mycoder_callback=None,
+        max_queue_size: int = 4,
+        callback_timeout: float = 120.0,
     ):
         """
         Initialize the global dictation application.
@@ -64,9 +80,15 @@ class GlobalDictationApp:
             silence_threshold: RMS threshold for silence detection
             silence_duration: Seconds of silence before stopping
             injection_method: Text injection method
+            paste_threshold: Text length from which AUTO injection pastes
             enable_gui: Whether to show GUI overlay
             enable_hotkeys: Whether to enable global hotkeys
             hotkey_combo: Hotkey combination (default: ["ctrl", "shift", "space"])
+            mycoder_callback: Optional callable receiving transcribed text
+                instead of injecting it (may return a coroutine)
+            max_queue_size: Utterances allowed to wait for transcription before
+                new recordings are refused
+            callback_timeout: Seconds to wait for an async MyCoder callback
         """
         self.state = AppState.IDLE
         self.language = language
@@ -96,7 +118,9 @@ class GlobalDictationApp:
             logger.info(f"Whisper transcriber initialized: {whisper_provider.value}")
 
             # Text injector
-            self.injector = TextInjector(method=injection_method)
+            self.injector = TextInjector(
+                method=injection_method, paste_threshold=paste_threshold
+            )
             logger.info("Text injector initialized")
 
             # GUI overlay (optional)
@@ -120,29 +144,68 @@ class GlobalDictationApp:
             logger.error(f"Failed to initialize application: {e}")
             raise
 
-        # Thread for async operations
-        self.processing_thread: Optional[threading.Thread] = None
+        # Transcription worker with bounded job queue
+        self.callback_timeout = callback_timeout
+        self._jobs: "queue.Queue[Optional[TranscriptionJob]]" = queue.Queue(
+            maxsize=max(1, max_queue_size)
+        )
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, float] = {
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "total_wait_ms": 0.0,
+            "total_processing_ms": 0.0,
+            "last_latency_ms": 0.0,
+        }
+        self.processing_thread = threading.Thread(
+            target=self._worker_loop,
+            name="dictation-transcriber",
+            daemon=True,
+        )
+        self.processing_thread.start()
+
+        # Persistent event loop for async MyCoder callbacks (created lazily)
+        self._callback_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._callback_thread: Optional[threading.Thread] = None
+
+        # Overlay window focused when the current recording started, if any
+        self._recording_window: Optional[str] = None
 
         logger.info("Global Dictation App ready")
 
     def toggle_recording(self) -> None:
         """Toggle recording on/off."""
-        if self.state == AppState.IDLE:
-            self.start_recording()
-        elif self.state == AppState.RECORDING:
+        if self.state == AppState.RECORDING:
             self.stop_recording()
+        elif self.state != AppState.ERROR:
+            self.start_recording()
         else:
             logger.warning(f"Cannot toggle recording in state: {self.state.value}")
 
     def start_recording(self) -> None:
-        """Start recording audio."""
-        if self.state != AppState.IDLE:
+        """
+        Start recording audio.
+
+        Recording is allowed while earlier utterances are still being
+        transcribed, unless the job queue is full (back-pressure).
+        """
+        if self.state in (AppState.RECORDING, AppState.ERROR):
             logger.warning(f"Cannot start recording in state: {self.state.value}")
             return
 
+        if self._jobs.full():
+            logger.warning("Transcription queue full, refusing new recording")
+            with self._metrics_lock:
+                self._metrics["rejected"] += 1
+            if self.overlay:
+                self.overlay.button.show_notification("Busy...", duration=1500)
+            return
+
         try:
             logger.info("Starting recording...")
             self.state = AppState.RECORDING
+            self._recording_window = self._focused_overlay_window()
 
             # Update GUI
             if self.overlay:
@@ -155,8 +218,21 @@ class GlobalDictationApp:
 
         except Exception as e:
             logger.error(f"Failed to start recording: {e}")
+            self.state = AppState.IDLE
             self._handle_error("Failed to start recording")
 
+    def _focused_overlay_window(self) -> Optional[str]:
+        """
+        Return the overlay's window ID if it has keyboard focus.
+
+        Only our own window has to hand focus back before injecting; on the
+        hotkey path the focused window is already the target.
+        """
+        if not self.overlay:
+            return None
+        active = self.injector.get_active_window_id()
+        return active if active == self.overlay.window_id() else None
+
     def stop_recording(self) -> None:
         """Stop recording and process audio."""
         if self.state != AppState.RECORDING:
@@ -168,38 +244,101 @@ class GlobalDictationApp:
 
             # Stop recording and get audio data
             audio_data = self.recorder.stop_recording()
+            self.state = AppState.IDLE
 
             if not audio_data:
                 logger.warning("No audio data recorded")
                 self._handle_error("No audio recorded")
                 return
 
-            # Process audio in separate thread
-            self.processing_thread = threading.Thread(
-                target=self._process_audio,
-                args=(audio_data,),
-                daemon=True,
-            )
-            self.processing_thread.start()
+            # Hand off to the transcription worker
+            try:
+                self._jobs.put_nowait(
+                    TranscriptionJob(audio_data, focus_window=self._recording_window)
+                )
+            except queue.Full:
+                with self._metrics_lock:
+                    self._metrics["rejected"] += 1
+                self._handle_error("Transcription queue full")
+                return
+
+            self._set_processing_state(AppState.TRANSCRIBING)
 
         except Exception as e:
             logger.error(f"Failed to stop recording: {e}")
+            self.state = AppState.IDLE
             self._handle_error("Failed to stop recording")
 
-    def _process_audio(self, audio_data: bytes) -> None:
+    def _worker_loop(self) -> None:
+        """Transcription worker: process queued utterances one at a time."""
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+
+                started = time.monotonic()
+                success = self._process_audio(job.audio_data, job.focus_window)
+                finished = time.monotonic()
+
+                with self._metrics_lock:
+                    self._metrics["completed" if success else "failed"] += 1
+                    self._metrics["total_wait_ms"] += (started - job.enqueued_at) * 1000
+                    self._metrics["total_processing_ms"] += (finished - started) * 1000
+                    self._metrics["last_latency_ms"] = (
+                        finished - job.enqueued_at
+                    ) * 1000
+            except Exception as e:
+                logger.error(f"Transcription worker error: {e}")
+            finally:
+                self._jobs.task_done()
+
+    def _set_processing_state(self, state: AppState) -> None:
+        """Update state from the worker without clobbering an active recording."""
+        if self.state == AppState.RECORDING:
+            return
+
+        self.state = state
+        if not self.overlay:
+            return
+
+        if state == AppState.TRANSCRIBING:
+            self.overlay.button.set_state(ButtonState.PROCESSING)
+            self.overlay.button.set_status("Transcribing...")
+        elif state == AppState.INJECTING:
+            self.overlay.button.set_status("Injecting text...")
+        elif state == AppState.IDLE:
+            self.overlay.button.set_state(ButtonState.IDLE)
+
+    def _get_callback_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the persistent event loop used for async MyCoder callbacks."""
+        if self._callback_loop is None:
+            loop = asyncio.new_event_loop()
+            self._callback_thread = threading.Thread(
+                target=loop.run_forever,
+                name="dictation-callbacks",
+                daemon=True,
+            )
+            self._callback_thread.start()
+            self._callback_loop = loop
+        return self._callback_loop
+
+    def _process_audio(
+        self, audio_data: bytes, focus_window: Optional[str] = None
+    ) -> bool:
         """
         Process recorded audio (transcribe and inject).
 
         Args:
             audio_data: Audio data in WAV format
+            focus_window: Window that had focus when recording started
+
+        Returns:
+            True if text was delivered successfully
         """
         try:
             # Transcribe
-            self.state = AppState.TRANSCRIBING
-
-            if self.overlay:
-                self.overlay.button.set_state(ButtonState.PROCESSING)
-                self.overlay.button.set_status("Transcribing...")
+            self._set_processing_state(AppState.TRANSCRIBING)
 
             logger.info("Transcribing audio...")
             text = self.transcriber.transcribe(audio_data)
@@ -207,31 +346,36 @@ class GlobalDictationApp:
             if not text:
                 logger.warning("Transcription returned no text")
                 self._handle_error("No text recognized")
-                return
+                return False
 
             logger.info(f"Transcribed: {text[:100]}...")
 
             # Deliver text
-            self.state = AppState.INJECTING
-
-            if self.overlay:
-                self.overlay.button.set_status("Injecting text...")
+            self._set_processing_state(AppState.INJECTING)
 
             if self.mycoder_callback:
                 try:
                     result = self.mycoder_callback(text)
                     if asyncio.iscoroutine(result):
-                        asyncio.run(result)
+                        future = asyncio.run_coroutine_threadsafe(
+                            result, self._get_callback_loop()
+                        )
+                        try:
+                            future.result(timeout=self.callback_timeout)
+                        except concurrent.futures.TimeoutError:
+                            # Do not leave the callback running on the loop
+                            future.cancel()
+                            raise
                     logger.info("Delivered transcription to MyCoder callback")
                 except Exception as exc:
                     logger.error(f"MyCoder callback failed: {exc}")
                     self._handle_error("MyCoder callback failed")
-                    return
+                    return False
             else:
                 logger.info("Injecting text into active window...")
 
-                # Small delay to allow user to focus target window
-                time.sleep(0.3)
+                # Wait for focus to settle on the target window
+                self.injector.wait_for_focus(previous_window=focus_window)
 
                 success = self.injector.inject_text(text)
 
@@ -244,17 +388,18 @@ class GlobalDictationApp:
                 else:
                     logger.error("Failed to inject text")
                     self._handle_error("Failed to inject text")
-                    return
-
-            # Return to idle state
-            self.state = AppState.IDLE
+                    return False
 
-            if self.overlay:
-                self.overlay.button.set_state(ButtonState.IDLE)
+            # Return to idle state unless more utterances are waiting
+            self._set_processing_state(
+                AppState.TRANSCRIBING if self._jobs.qsize() else AppState.IDLE
+            )
+            return True
 
         except Exception as e:
             logger.error(f"Error processing audio: {e}")
             self._handle_error(f"Processing error: {str(e)[:50]}")
+            return False
 
     def _handle_error(self, message: str) -> None:
         """
@@ -265,7 +410,8 @@ class GlobalDictationApp:
         """
         logger.error(f"Application error: {message}")
 
-        self.state = AppState.ERROR
+        if self.state != AppState.RECORDING:
+            self.state = AppState.ERROR
 
         if self.overlay:
             self.overlay.button.flash_error()
@@ -274,6 +420,8 @@ class GlobalDictationApp:
         # Reset to idle after delay
         def reset():
             time.sleep(2)
+            if self.state != AppState.ERROR:
+                return
             self.state = AppState.IDLE
             if self.overlay:
                 self.overlay.button.set_state(ButtonState.IDLE)
@@ -334,6 +482,24 @@ class GlobalDictationApp:
         if self.overlay:
             self.overlay.hide()
 
+        # Stop transcription worker after queued jobs and callback loop
+        try:
+            self._jobs.put(None, timeout=1)
+        except queue.Full:
+            logger.warning("Transcription queue full during shutdown")
+        if self.processing_thread.is_alive():
+            self.processing_thread.join(timeout=5)
+
+        if self._callback_loop is not None:
+            self._callback_loop.call_soon_threadsafe(self._callback_loop.stop)
+            if self._callback_thread:
+                self._callback_thread.join(timeout=2)
+            self._callback_loop.close()
+            self._callback_loop = None
+
+        # Release persistent injection session
+        self.injector.close()
+
         logger.info("Shutdown complete")
 
     def get_status(self) -> Dict[str, Any]:
@@ -354,12 +520,45 @@ class GlobalDictationApp:
         if self.hotkey_manager:
             status["registered_hotkeys"] = self.hotkey_manager.get_registered_hotkeys()
 
+        if self.injector:
+            status["injection"] = self.injector.get_injection_stats()
+
+        status["transcription_queue"] = self.get_queue_metrics()
+
         if self.recorder:
             status["recording_active"] = self.recorder.is_active()
             status["recording_duration"] = self.recorder.get_duration()
 
         return status
 
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        """
+        Get transcription queue depth and latency metrics.
+
+        Returns:
+            Dictionary with queue depth, job counts and average latencies
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+
+        processed = metrics["completed"] + metrics["failed"]
+        return {
+            "depth": self._jobs.qsize(),
+            "max_size": self._jobs.maxsize,
+            "completed": int(metrics["completed"]),
+            "failed": int(metrics["failed"]),
+            "rejected": int(metrics["rejected"]),
+            "avg_wait_ms": (
+                round(metrics["total_wait_ms"] / processed, 2) if processed else 0.0
+            ),
+            "avg_processing_ms": (
+                round(metrics["total_processing_ms"] / processed, 2)
+                if processed
+                else 0.0
+            ),
+            "last_latency_ms": round(metrics["last_latency_ms"], 2),
+        }
+
     def test_components(self) -> Dict[str, bool]:
         """
         Test all application components.
@@ -332,6 +332,10 @@ class OverlayApp:
         """Hide the overlay button."""
         self.button.hide()
 
+    def window_id(self) -> str:
+        """Return the X window ID of the overlay button."""
+        return str(int(self.button.winId()))
+
     def run(self) -> int:
         """
         Run the application event loop.
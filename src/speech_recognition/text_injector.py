@@ -8,7 +8,7 @@ import logging
 import subprocess
 import time
 from enum import Enum
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 try:
     import pyperclip
@@ -18,6 +18,18 @@ except ImportError:
     CLIPBOARD_AVAILABLE = False
     pyperclip = None
 
+try:
+    from Xlib import X
+    from Xlib import display as xdisplay
+    from Xlib.ext import xtest
+
+    XTEST_AVAILABLE = True
+except ImportError:
+    XTEST_AVAILABLE = False
+    X = None
+    xdisplay = None
+    xtest = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +42,141 @@ class InjectionMethod(Enum):
     AUTO = "auto"  # Automatic selection
 
 
+# Keysyms for control characters that have no printable keysym
+_SPECIAL_KEYSYMS = {
+    "\n": 0xFF0D,  # Return
+    "\r": 0xFF0D,  # Return
+    "\t": 0xFF09,  # Tab
+}
+
+
+class XTestSession:
+    """
+    Long-lived X connection that types text through the XTEST extension.
+
+    Replaces one ``xdotool type`` subprocess per utterance with a single
+    display connection kept open for the lifetime of the injector. Characters
+    missing from the current keymap, or only reachable through AltGr, are
+    typed by temporarily binding them to a spare keycode, the same trick
+    xdotool uses internally.
+    """
+
+    def __init__(self):
+        """Open the display connection and locate a spare keycode."""
+        if not XTEST_AVAILABLE:
+            raise ImportError(
+                "XTEST typing requires python-xlib. "
+                "Install with: poetry install --extras speech"
+            )
+
+        self.display = xdisplay.Display()
+        if not self.display.has_extension("XTEST"):
+            self.display.close()
+            raise RuntimeError("X server does not support the XTEST extension")
+
+        self._scratch_keycode = self._find_scratch_keycode()
+        # Characters sent by the last type_text call, kept when it fails
+        self.typed_chars = 0
+        self._root = self.display.screen().root
+        self._active_window_atom = self.display.intern_atom("_NET_ACTIVE_WINDOW")
+
+    def _find_scratch_keycode(self) -> Optional[int]:
+        """Find a keycode without any keysyms to remap for unmapped characters."""
+        min_keycode = self.display.display.info.min_keycode
+        max_keycode = self.display.display.info.max_keycode
+        mapping = self.display.get_keyboard_mapping(
+            min_keycode, max_keycode - min_keycode + 1
+        )
+        for offset, keysyms in enumerate(mapping):
+            if not any(keysyms):
+                return min_keycode + offset
+        return None
+
+    @staticmethod
+    def _keysym_for(char: str) -> int:
+        """Map a character to its X keysym."""
+        if char in _SPECIAL_KEYSYMS:
+            return _SPECIAL_KEYSYMS[char]
+        code = ord(char)
+        # Latin-1 keysyms equal their code points; everything else uses the
+        # Unicode keysym range.
+        if 0x20 <= code <= 0x7E or 0xA0 <= code <= 0xFF:
+            return code
+        return 0x01000000 | code
+
+    def _press(self, keycode: int, shift: bool) -> None:
+        """Send a key press/release pair, optionally holding Shift."""
+        shift_keycode = self.display.keysym_to_keycode(0xFFE1) if shift else 0
+        if shift_keycode:
+            xtest.fake_input(self.display, X.KeyPress, shift_keycode)
+        xtest.fake_input(self.display, X.KeyPress, keycode)
+        xtest.fake_input(self.display, X.KeyRelease, keycode)
+        if shift_keycode:
+            xtest.fake_input(self.display, X.KeyRelease, shift_keycode)
+
+    def _keycode_for(self, keysym: int) -> Tuple[Optional[int], bool]:
+        """
+        Find a keycode producing ``keysym`` without AltGr.
+
+        Returns:
+            (keycode, shift); keycode is None when the keysym is only
+            reachable at AltGr levels or not mapped at all
+        """
+        for keycode, index in self.display.keysym_to_keycodes(keysym):
+            if index in (0, 1):
+                return keycode, index == 1
+        return None, False
+
+    def type_text(self, text: str, delay_ms: int = 0) -> None:
+        """
+        Type text into the focused window.
+
+        Args:
+            text: Text to type
+            delay_ms: Delay between characters in milliseconds
+        """
+        self.typed_chars = 0
+        remapped = False
+        try:
+            for char in text:
+                keysym = self._keysym_for(char)
+                keycode, shift = self._keycode_for(keysym)
+
+                if keycode is None:
+                    if self._scratch_keycode is None:
+                        raise RuntimeError(
+                            f"Cannot type character {char!r}: no free keycode"
+                        )
+                    keycode = self._scratch_keycode
+                    self.display.change_keyboard_mapping(keycode, [(keysym, keysym)])
+                    self.display.sync()
+                    remapped = True
+
+                self._press(keycode, shift)
+                self.typed_chars += 1
+                self.display.sync()
+                if delay_ms:
+                    time.sleep(delay_ms / 1000)
+        finally:
+            if remapped:
+                self.display.change_keyboard_mapping(self._scratch_keycode, [(0, 0)])
+                self.display.sync()
+
+    def get_active_window_id(self) -> Optional[str]:
+        """Return the focused window ID via _NET_ACTIVE_WINDOW."""
+        prop = self._root.get_full_property(self._active_window_atom, X.AnyPropertyType)
+        if not prop or not prop.value:
+            return None
+        return str(prop.value[0])
+
+    def close(self) -> None:
+        """Close the display connection."""
+        try:
+            self.display.close()
+        except Exception as e:
+            logger.debug(f"Failed to close X display: {e}")
+
+
 class TextInjector:
     """
     Injects text into the currently active window.
@@ -42,6 +189,9 @@ class TextInjector:
         method: InjectionMethod = InjectionMethod.AUTO,
         typing_delay: int = 12,
         use_clipboard_backup: bool = True,
+        paste_threshold: int = 64,
+        focus_timeout: float = 0.5,
+        use_xtest: bool = True,
     ):
         """
         Initialize the text injector.
@@ -50,14 +200,32 @@ class TextInjector:
             method: Injection method to use
             typing_delay: Delay between keystrokes in milliseconds (for XDOTOOL_TYPE)
             use_clipboard_backup: Whether to backup and restore clipboard
+            paste_threshold: In AUTO mode, texts at least this long are pasted,
+                shorter ones are typed
+            focus_timeout: Maximum seconds to wait for window focus to settle
+            use_xtest: Type through a persistent XTEST connection when available
         """
         self.method = method
         self.typing_delay = typing_delay
         self.use_clipboard_backup = use_clipboard_backup
+        self.paste_threshold = paste_threshold
+        self.focus_timeout = focus_timeout
+
+        # Injection latency per method: count, failures, total/last ms
+        self._stats: Dict[str, Dict[str, float]] = {}
 
         # Check xdotool availability
         self.xdotool_available = self._check_xdotool()
 
+        # Persistent typing session (optional)
+        self.xtest_session: Optional[XTestSession] = None
+        if use_xtest and XTEST_AVAILABLE:
+            try:
+                self.xtest_session = XTestSession()
+                logger.info("Using persistent XTEST session for typing")
+            except Exception as e:
+                logger.debug(f"XTEST session unavailable: {e}")
+
         if not self.xdotool_available:
             logger.warning(
                 "xdotool not found. Install with: sudo apt-get install xdotool"
@@ -97,50 +265,106 @@ class TextInjector:
             return False
 
         # Determine injection method
-        method = self._select_method()
+        method = self._select_method(text)
 
         logger.info(f"Injecting text using method: {method.value}")
 
+        start = time.perf_counter()
+        success = False
         try:
             if method == InjectionMethod.XDOTOOL_TYPE:
-                return self._inject_xdotool_type(text)
+                success = self._inject_xdotool_type(text)
             elif method == InjectionMethod.XDOTOOL_PASTE:
-                return self._inject_xdotool_paste(text)
+                success = self._inject_xdotool_paste(text)
             elif method == InjectionMethod.CLIPBOARD_ONLY:
-                return self._inject_clipboard_only(text)
+                success = self._inject_clipboard_only(text)
             else:
                 logger.error(f"Unknown injection method: {method}")
-                return False
 
         except Exception as e:
             logger.error(f"Text injection failed: {e}")
-            return False
 
-    def _select_method(self) -> InjectionMethod:
-        """Select appropriate injection method based on availability."""
+        self._record_latency(method, time.perf_counter() - start, success)
+        return success
+
+    def _select_method(self, text: str = "") -> InjectionMethod:
+        """
+        Select appropriate injection method based on availability and length.
+
+        Short texts are typed so the clipboard stays untouched; long texts are
+        pasted because typing them key by key is slow.
+        """
         if self.method != InjectionMethod.AUTO:
             return self.method
 
+        can_type = self.xdotool_available or self.xtest_session is not None
+        can_paste = self.xdotool_available and CLIPBOARD_AVAILABLE
+
         # Automatic selection based on available tools
-        if self.xdotool_available:
-            # Prefer paste method for better performance with long texts
+        if can_paste and (len(text) >= self.paste_threshold or not can_type):
             return InjectionMethod.XDOTOOL_PASTE
+        elif can_type:
+            return InjectionMethod.XDOTOOL_TYPE
         elif CLIPBOARD_AVAILABLE:
             return InjectionMethod.CLIPBOARD_ONLY
         else:
             logger.error("No injection method available")
             return InjectionMethod.CLIPBOARD_ONLY
 
+    def _record_latency(
+        self, method: InjectionMethod, elapsed: float, success: bool
+    ) -> None:
+        """Record injection latency for a method."""
+        stats = self._stats.setdefault(
+            method.value,
+            {"count": 0, "failures": 0, "total_ms": 0.0, "last_ms": 0.0},
+        )
+        elapsed_ms = elapsed * 1000
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["last_ms"] = elapsed_ms
+        if not success:
+            stats["failures"] += 1
+
+    def get_injection_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get injection latency statistics per method.
+
+        Returns:
+            Dictionary keyed by method name with count, failures, avg and last ms
+        """
+        return {
+            method: {
+                "count": int(stats["count"]),
+                "failures": int(stats["failures"]),
+                "avg_ms": round(stats["total_ms"] / stats["count"], 2),
+                "last_ms": round(stats["last_ms"], 2),
+            }
+            for method, stats in self._stats.items()
+            if stats["count"]
+        }
+
     def _inject_xdotool_type(self, text: str) -> bool:
-        """Inject text by simulating typing with xdotool."""
+        """Inject text by simulating typing (XTEST session or xdotool)."""
+        if self.xtest_session is not None:
+            try:
+                self.xtest_session.type_text(text, delay_ms=self.typing_delay)
+                logger.info(f"Successfully typed {len(text)} characters (XTEST)")
+                return True
+            except Exception as e:
+                logger.warning(f"XTEST typing failed, falling back to xdotool: {e}")
+                # Only type what XTEST did not already send
+                text = text[self.xtest_session.typed_chars :]
+                self.xtest_session.close()
+                self.xtest_session = None
+                if not text:
+                    return True
+
         if not self.xdotool_available:
             logger.error("xdotool not available")
             return False
 
         try:
-            # Small delay to ensure focus is ready
-            time.sleep(0.1)
-
             # Use xdotool to type the text
             result = subprocess.run(
                 [
@@ -239,6 +463,80 @@ class TextInjector:
             logger.error(f"Failed to copy to clipboard: {e}")
             return False
 
+    def get_active_window_id(self) -> Optional[str]:
+        """
+        Get the ID of the currently focused window.
+
+        Uses the persistent XTEST connection when available, otherwise a single
+        ``xdotool getactivewindow`` call.
+
+        Returns:
+            Window ID as string, or None if unavailable
+        """
+        if self.xtest_session is not None:
+            try:
+                return self.xtest_session.get_active_window_id()
+            except Exception as e:
+                logger.debug(f"XTEST active window lookup failed: {e}")
+
+        if not self.xdotool_available:
+            return None
+
+        try:
+            result = subprocess.run(
+                ["xdotool", "getactivewindow"],
+                capture_output=True,
+                text=True,
+                timeout=1,
+            )
+            return result.stdout.strip() if result.returncode == 0 else None
+        except Exception as e:
+            logger.debug(f"Failed to get active window: {e}")
+            return None
+
+    def wait_for_focus(
+        self,
+        previous_window: Optional[str] = None,
+        timeout: Optional[float] = None,
+        poll_interval: float = 0.02,
+    ) -> Optional[str]:
+        """
+        Wait until keyboard focus has settled on a target window.
+
+        Returns as soon as the active window differs from ``previous_window``
+        (e.g. the overlay button) and is stable across two polls, instead of
+        sleeping for a fixed period.
+
+        Args:
+            previous_window: Window ID that should lose focus, if known
+            timeout: Maximum seconds to wait (default: focus_timeout)
+            poll_interval: Seconds between polls
+
+        Returns:
+            Active window ID once settled (or at timeout), None if unknown
+        """
+        timeout = self.focus_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        last = self.get_active_window_id()
+
+        while time.monotonic() < deadline:
+            time.sleep(poll_interval)
+            current = self.get_active_window_id()
+            if current is None:
+                return None
+            if current == last and current != previous_window:
+                return current
+            last = current
+
+        logger.debug("Focus did not settle before timeout")
+        return last
+
+    def close(self) -> None:
+        """Release the persistent typing session."""
+        if self.xtest_session is not None:
+            self.xtest_session.close()
+            self.xtest_session = None
+
     def get_active_window_info(self) -> Optional[dict]:
         """
         Get information about the currently active window.
@@ -17,6 +17,22 @@ sys.path.insert(0, str(repo_root))
 sys.path.insert(0, str(repo_root / "src"))
 
 
+@pytest.fixture(autouse=True)
+def isolated_usage_ledger(tmp_path_factory, monkeypatch):
+    """Keep usage ledgers created by tests out of ~/.mycoder/usage.db."""
+    usage_dir = tmp_path_factory.mktemp("usage")
+    monkeypatch.setenv("MYCODER_USAGE_DB", str(usage_dir / "usage.db"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_router_telemetry(tmp_path_factory, monkeypatch):
+    """Keep router latency estimates out of ~/.mycoder/router_telemetry.json."""
+    telemetry_dir = tmp_path_factory.mktemp("telemetry")
+    monkeypatch.setenv(
+        "MYCODER_ROUTER_TELEMETRY", str(telemetry_dir / "router_telemetry.json")
+    )
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create an instance of the default event loop for the test session."""
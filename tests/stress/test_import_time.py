@@ -0,0 +1,64 @@
+"""
+Import-time budget for the package and its command-line entry points.
+
+Measures with ``python -X importtime`` in fresh interpreters, so a heavy
+module pulled back into the startup path shows up as a failure here.
+
+Usage:
+    pytest tests/stress/test_import_time.py --run-performance -s
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).parent.parent.parent / "src"
+
+# Cumulative import time in milliseconds, best of RUNS fresh interpreters
+BUDGETS_MS = {
+    "mycoder": 100,
+    "mycoder.cli_entry": 100,
+    # headless imports asyncio at module level because it runs right away;
+    # asyncio (with ssl and socket) alone takes 45-60 ms, so best-of-5 runs
+    # land at 75-95 ms and the package budget would leave no headroom.
+    "mycoder.headless": 150,
+}
+RUNS = 5
+
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(module: str):
+    """(cumulative ms, [(self ms, name), ...]) of one fresh import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+        check=True,
+    )
+    total = 0.0
+    modules = []
+    for match in _IMPORTTIME.finditer(result.stderr):
+        own, cumulative, indent, name = match.groups()
+        modules.append((int(own) / 1000, name))
+        if name == module and len(indent) == 1:
+            total = int(cumulative) / 1000
+    return total, modules
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("module", sorted(BUDGETS_MS))
+def test_import_time_budget(module):
+    runs = [import_profile(module) for _ in range(RUNS)]
+    total, modules = min(runs, key=lambda run: run[0])
+
+    slowest = sorted(modules, reverse=True)[:10]
+    print(f"\n{module}: {total:.1f}ms (budget {BUDGETS_MS[module]}ms)")
+    for own, name in slowest:
+        print(f"  {own:7.1f}ms  {name}")
+    assert total <= BUDGETS_MS[module]
@@ -0,0 +1,82 @@
+"""
+Scale benchmark for LocalMemoryStore.
+
+Fills the store with 100k memories and checks that searches stay fast,
+which the former JSONL scan could not do.
+
+Usage:
+    pytest tests/stress/test_memory_store_scale.py --run-performance -s
+"""
+
+import random
+import statistics
+import time
+
+import pytest
+
+from mycoder.local_mcp_server import LocalMemoryStore
+
+MEMORY_COUNT = 100_000
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    rng = random.Random(42)
+    vocabulary = [f"term{i}" for i in range(5000)]
+    now = time.time()
+    store = LocalMemoryStore(
+        tmp_path_factory.mktemp("memories"),
+        max_entries=0,
+        compact_every=0,
+    )
+
+    started = time.perf_counter()
+    store.extend(
+        [
+            {
+                "content": " ".join(rng.choices(vocabulary, k=12)),
+                "importance": rng.random(),
+                "timestamp": now - rng.random() * 90 * 86400,
+            }
+            for _ in range(MEMORY_COUNT)
+        ]
+    )
+    print(f"\nInserted {MEMORY_COUNT} memories in {time.perf_counter() - started:.2f}s")
+    store.vocabulary = vocabulary
+    yield store
+    store.close()
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+class TestMemoryStoreScale:
+    """LocalMemoryStore with 100k+ memories"""
+
+    def test_search_latency(self, store):
+        rng = random.Random(7)
+        timings = []
+        for _ in range(200):
+            query = " ".join(rng.choices(store.vocabulary, k=2))
+            started = time.perf_counter()
+            store.search(query, 5)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        median = statistics.median(timings)
+        print(f"Search median {median:.2f}ms, max {max(timings):.2f}ms")
+        assert store.count() >= MEMORY_COUNT
+        assert median < 20
+
+    def test_append_stays_incremental(self, store):
+        started = time.perf_counter()
+        for i in range(100):
+            store.append({"content": f"fresh memory {i}"})
+        per_write = (time.perf_counter() - started) * 10
+        print(f"Append {per_write:.2f}ms per memory")
+        assert per_write < 20
+        assert store.search("fresh", 5)
+
+    def test_compaction(self, store):
+        started = time.perf_counter()
+        stats = store.compact()
+        print(f"Compaction {stats} in {time.perf_counter() - started:.2f}s")
+        assert stats["remaining"] >= MEMORY_COUNT
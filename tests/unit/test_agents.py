@@ -1,13 +1,18 @@
+import asyncio
+import os
+import sys
+import time
 from pathlib import Path
 
 import pytest
 
-from mycoder.agents.base import AgentType
+from mycoder.agents.base import AgentResult, AgentType
 from mycoder.agents.bash import BashAgent
 from mycoder.agents.explore import ExploreAgent
 from mycoder.agents.general import GeneralPurposeAgent
-from mycoder.agents.orchestrator import AgentOrchestrator
+from mycoder.agents.orchestrator import AgentOrchestrator, SubTask
 from mycoder.agents.plan import PlanAgent
+from mycoder.agents.workspace_cache import WorkspaceCache
 
 
 class DummyCoder:
@@ -64,6 +69,27 @@ async def test_explore_agent_lists_structure(tmp_path: Path) -> None:
     assert "alpha.txt" in result.content
 
 
+@pytest.mark.asyncio
+async def test_explore_code_search_keeps_first_matches(tmp_path, monkeypatch) -> None:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_rg = bin_dir / "rg"
+    fake_rg.write_text(
+        f"#!{sys.executable}\n"
+        "for i in range(20000):\n"
+        "    print(f'src/app.py:{i}: needle {i}')\n",
+        encoding="utf-8",
+    )
+    fake_rg.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    agent = ExploreAgent(DummyCoder(), tmp_path)
+
+    result = await agent.execute("search for needle")
+
+    assert result.content.startswith("src/app.py:0: needle 0\n")
+    assert len(result.content) == ExploreAgent.MAX_SEARCH_CHARS
+
+
 @pytest.mark.asyncio
 async def test_orchestrator_selects_agent(tmp_path: Path) -> None:
     coder = DummyCoder()
@@ -72,3 +98,155 @@ async def test_orchestrator_selects_agent(tmp_path: Path) -> None:
     agent = orchestrator.select_agent("find file *.py", context={})
 
     assert agent.agent_type == AgentType.EXPLORE
+
+
+class SlowCoder(DummyCoder):
+    def __init__(self, delays) -> None:
+        super().__init__()
+        self.delays = delays
+
+    async def process_request(self, prompt: str, **kwargs):
+        for key, delay in self.delays.items():
+            if key in prompt:
+                await asyncio.sleep(delay)
+        return await super().process_request(prompt, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_parallel_subtasks_run_concurrently_in_order(tmp_path: Path) -> None:
+    coder = SlowCoder({"alpha": 0.3, "beta": 0.1, "gamma": 0.2})
+    orchestrator = AgentOrchestrator(coder, tmp_path, max_workers=3)
+    subtasks = [
+        SubTask(i, AgentType.GENERAL, name)
+        for i, name in enumerate(["alpha", "beta", "gamma"])
+    ]
+
+    started = time.perf_counter()
+    result = await orchestrator.execute_parallel("work", subtasks=subtasks)
+    elapsed = time.perf_counter() - started
+
+    assert result.success is True
+    assert elapsed < 0.5
+    content = result.content
+    assert content.index("alpha") < content.index("beta") < content.index("gamma")
+    assert [s["index"] for s in result.metadata["subtasks"]] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_parallel_subtask_timeout_is_reported(tmp_path: Path) -> None:
+    coder = SlowCoder({"slow": 5})
+    orchestrator = AgentOrchestrator(coder, tmp_path, subtask_timeout=0.1)
+    subtasks = [
+        SubTask(0, AgentType.GENERAL, "slow step"),
+        SubTask(1, AgentType.GENERAL, "fast step"),
+    ]
+
+    result = await orchestrator.execute_parallel("work", subtasks=subtasks)
+
+    assert result.success is False
+    first, second = result.metadata["subtasks"]
+    assert "timed out" in first["error"]
+    assert second["success"] is True
+
+
+@pytest.mark.asyncio
+async def test_timed_out_subtask_does_not_cancel_shared_cache_lookup(
+    tmp_path: Path, monkeypatch
+) -> None:
+    calls = 0
+
+    async def slow_listing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.3)
+        return ["alpha.txt"]
+
+    async def execute(self, task, context=None):
+        listing = await self.workspace_cache.get_or_compute(("ls",), slow_listing)
+        return AgentResult(
+            success=True, content=str(listing), agent_type=self.agent_type
+        )
+
+    monkeypatch.setattr(ExploreAgent, "execute", execute)
+    orchestrator = AgentOrchestrator(DummyCoder(), tmp_path)
+    subtasks = [
+        SubTask(0, AgentType.EXPLORE, "list files", timeout=0.1),
+        SubTask(1, AgentType.EXPLORE, "list files again", timeout=5),
+    ]
+
+    result = await orchestrator.execute_parallel("explore", subtasks=subtasks)
+
+    first, second = result.metadata["subtasks"]
+    assert "timed out" in first["error"]
+    assert second["success"] is True
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_decompose_uses_plan_steps(tmp_path: Path) -> None:
+    class PlanCoder(DummyCoder):
+        async def process_request(self, prompt: str, **kwargs):
+            return {
+                "content": (
+                    "## Summary\n- refactor\n"
+                    "## Step-by-step implementation\n"
+                    "1. Find the config loader\n"
+                    "2. **Update** the parser\n"
+                    "   - nested detail\n"
+                    "3. bash: echo done\n"
+                    "## Risks\n- breakage\n"
+                )
+            }
+
+    orchestrator = AgentOrchestrator(PlanCoder(), tmp_path)
+
+    subtasks = await orchestrator.decompose("refactor config")
+
+    assert [(s.agent_type, s.task) for s in subtasks] == [
+        (AgentType.EXPLORE, "Find the config loader"),
+        (AgentType.GENERAL, "Update the parser"),
+        (AgentType.GENERAL, "bash: echo done"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_plan_bash_lines_are_never_executed(tmp_path: Path, monkeypatch) -> None:
+    class PlanCoder(DummyCoder):
+        async def process_request(self, prompt: str, **kwargs):
+            if "rm -rf" in prompt:
+                return {"content": "not run"}
+            return {"content": "## Steps\n1. bash: rm -rf x\n2. bash rm -rf x\n"}
+
+    async def forbidden(self, task, context=None):
+        raise AssertionError(f"shell command run from plan: {task}")
+
+    monkeypatch.setattr(BashAgent, "execute", forbidden)
+    target = tmp_path / "x"
+    target.mkdir()
+    orchestrator = AgentOrchestrator(PlanCoder(), tmp_path)
+
+    result = await orchestrator.execute_parallel("clean up")
+
+    assert result.success is True
+    assert [s["agent"] for s in result.metadata["subtasks"]] == ["general"] * 2
+    assert target.exists()
+
+
+@pytest.mark.asyncio
+async def test_workspace_cache_computes_once(tmp_path: Path) -> None:
+    cache = WorkspaceCache(tmp_path)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "value"
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute(("key",), compute) for _ in range(5))
+    )
+
+    assert results == ["value"] * 5
+    assert calls == 1
+    assert cache.stats()["hits"] == 4
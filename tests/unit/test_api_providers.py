@@ -5,8 +5,10 @@ Tests the multi-API provider system with all fallback scenarios,
 error handling, and thermal integration for Q9550 systems.
 """
 
+import asyncio
 import os
 import sys
+import time
 from contextlib import ExitStack
 from pathlib import Path
 from types import SimpleNamespace
@@ -774,6 +776,34 @@ class TestOllamaProvider:
 
         assert status == APIProviderStatus.UNAVAILABLE
 
+    @pytest.mark.asyncio
+    @patch("aiohttp.ClientSession.post")
+    @patch("aiohttp.ClientSession.get")
+    async def test_warm_up_loads_model(self, mock_get, mock_post):
+        """Warm-up sends a prompt-less generate with keep_alive"""
+        mock_get.return_value.__aenter__.return_value = AsyncMock(status=200)
+        mock_post.return_value.__aenter__.return_value = AsyncMock(status=200)
+
+        provider = self.create_local_provider()
+        provider.keep_alive = "30m"
+        assert await provider.warm_up() is True
+
+        assert provider.status == APIProviderStatus.HEALTHY
+        assert provider.last_health_check > 0
+        payload = mock_post.call_args.kwargs["json"]
+        assert payload == {"model": "tinyllama", "keep_alive": "30m"}
+
+    @pytest.mark.asyncio
+    @patch("aiohttp.ClientSession.post")
+    @patch("aiohttp.ClientSession.get")
+    async def test_warm_up_skips_unreachable_instance(self, mock_get, mock_post):
+        """No generate request when the health check fails"""
+        mock_get.side_effect = Exception("Connection refused")
+
+        provider = self.create_local_provider()
+        assert await provider.warm_up() is False
+        mock_post.assert_not_called()
+
     @pytest.mark.asyncio
     @patch("asyncio.create_subprocess_exec")
     async def test_check_thermal_status_local(self, mock_subprocess):
@@ -1009,6 +1039,61 @@ class TestAPIProviderRouter:
             assert health_results["gemini"]["status"] == "unavailable"
             assert health_results["ollama_local"]["status"] == "healthy"
 
+    @pytest.mark.asyncio
+    async def test_health_check_all_runs_probes_concurrently(self):
+        """Slow probes overlap and a hung probe is cut off by its timeout"""
+        router = self.create_router()
+        gemini = router._get_provider(APIProviderType.GEMINI)
+        gemini_status = gemini.status
+
+        async def slow_probe():
+            await asyncio.sleep(0.2)
+            return APIProviderStatus.HEALTHY
+
+        async def hung_probe():
+            await asyncio.sleep(10)
+
+        with ExitStack() as stack:
+            for provider in router.providers:
+                probe = (
+                    hung_probe
+                    if provider.config.provider_type == APIProviderType.GEMINI
+                    else slow_probe
+                )
+                stack.enter_context(
+                    patch.object(provider, "health_check", side_effect=probe)
+                )
+
+            started = time.perf_counter()
+            health_results = await router.health_check_all(timeout=0.5)
+            elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.8
+        assert health_results["claude_anthropic"]["status"] == "healthy"
+        assert health_results["gemini"]["status"] == "timeout"
+        # A timed-out probe is reported but does not take the provider offline
+        assert gemini.status == gemini_status
+
+    @pytest.mark.asyncio
+    async def test_warm_up_all(self):
+        """Warm-up runs for every enabled provider and reports readiness"""
+        router = self.create_router()
+        router._get_provider(APIProviderType.CLAUDE_OAUTH).config.enabled = False
+
+        with ExitStack() as stack:
+            for provider in router.providers:
+                ready = provider.config.provider_type != APIProviderType.GEMINI
+                stack.enter_context(
+                    patch.object(provider, "warm_up", AsyncMock(return_value=ready))
+                )
+            results = await router.warm_up_all()
+
+        assert results == {
+            "claude_anthropic": True,
+            "gemini": False,
+            "ollama_local": True,
+        }
+
     def test_get_available_providers(self):
         """Test getting available providers"""
         router = self.create_router()
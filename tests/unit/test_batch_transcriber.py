@@ -0,0 +1,170 @@
+"""Unit tests for batch transcription of recorded audio files."""
+
+import json
+import wave
+from pathlib import Path
+
+import pytest
+
+from speech_recognition.batch_transcriber import (
+    BatchTranscriber,
+    collect_audio_files,
+    get_wav_duration,
+    load_checkpoint,
+)
+from speech_recognition.whisper_transcriber import WhisperProvider
+
+
+def _write_wav(path: Path, seconds: float, rate: int = 16000) -> Path:
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(b"\x00\x00" * int(seconds * rate))
+    return path
+
+
+class _FakeTranscriber:
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+
+    def transcribe(self, audio_data: bytes):
+        self.calls += 1
+        return f"text-{len(audio_data)}"
+
+
+@pytest.mark.unit
+def test_collect_audio_files_directory_and_glob(tmp_path):
+    _write_wav(tmp_path / "b.wav", 0.1)
+    _write_wav(tmp_path / "a.wav", 0.1)
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    from_dir = collect_audio_files(str(tmp_path))
+    from_glob = collect_audio_files(str(tmp_path / "*.wav"))
+
+    assert [p.name for p in from_dir] == ["a.wav", "b.wav"]
+    assert from_glob == from_dir
+
+
+@pytest.mark.unit
+def test_get_wav_duration(tmp_path):
+    path = _write_wav(tmp_path / "clip.wav", 0.5)
+    assert get_wav_duration(path) == pytest.approx(0.5)
+
+    broken = tmp_path / "broken.wav"
+    broken.write_bytes(b"not a wav")
+    assert get_wav_duration(broken) == 0.0
+
+
+@pytest.mark.unit
+def test_load_checkpoint_ignores_failures_and_partial_lines(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        json.dumps({"path": "/a.wav", "status": "ok"})
+        + "\n"
+        + json.dumps({"path": "/b.wav", "status": "error"})
+        + "\n"
+        + '{"path": "/c.wav", "sta'
+    )
+
+    assert load_checkpoint(output) == {"/a.wav"}
+
+
+@pytest.mark.unit
+def test_api_batch_writes_jsonl_and_resumes(tmp_path, monkeypatch):
+    fake = _FakeTranscriber()
+    monkeypatch.setattr(
+        "speech_recognition.batch_transcriber.WhisperTranscriber",
+        lambda *args, **kwargs: fake,
+    )
+    files = [_write_wav(tmp_path / f"{i}.wav", 0.2) for i in range(3)]
+    files = [p.resolve() for p in files]
+    output = tmp_path / "out" / "results.jsonl"
+    seen = []
+
+    batch = BatchTranscriber(
+        provider=WhisperProvider.API, workers=2, on_result=seen.append
+    )
+    summary = batch.run(files[:2], output)
+
+    assert summary["succeeded"] == 2
+    assert summary["real_time_factor"] is not None
+    assert len(seen) == 2
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert {r["path"] for r in records} == {str(p) for p in files[:2]}
+    assert all(r["audio_seconds"] == pytest.approx(0.2) for r in records)
+
+    summary = batch.run(files, output)
+
+    assert summary["processed"] == 1
+    assert summary["skipped"] == 2
+    assert fake.calls == 3
+    assert len(output.read_text().splitlines()) == 3
+
+
+@pytest.mark.unit
+def test_api_batch_records_failures(tmp_path, monkeypatch):
+    class _Failing(_FakeTranscriber):
+        def transcribe(self, audio_data: bytes):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(
+        "speech_recognition.batch_transcriber.WhisperTranscriber",
+        lambda *args, **kwargs: _Failing(),
+    )
+    path = _write_wav(tmp_path / "x.wav", 0.1).resolve()
+    output = tmp_path / "results.jsonl"
+
+    summary = BatchTranscriber(provider=WhisperProvider.API).run([path], output)
+
+    assert summary["failed"] == 1
+    record = json.loads(output.read_text())
+    assert record["status"] == "error"
+    assert record["error"] == "boom"
+    assert load_checkpoint(output) == set()
+
+
+@pytest.mark.unit
+def test_resume_drops_partial_line_and_failed_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "speech_recognition.batch_transcriber.WhisperTranscriber",
+        lambda *args, **kwargs: _FakeTranscriber(),
+    )
+    files = [_write_wav(tmp_path / f"{i}.wav", 0.1).resolve() for i in range(3)]
+    output = tmp_path / "results.jsonl"
+    output.write_text(
+        json.dumps({"path": str(files[0]), "status": "ok", "text": "a"})
+        + "\n"
+        + json.dumps({"path": str(files[1]), "status": "error", "error": "x"})
+        + "\n"
+        + json.dumps({"path": str(files[0]), "status": "ok", "text": "again"})
+        + "\n"
+        + '{"path": "'
+        + str(files[2])
+    )
+
+    summary = BatchTranscriber(provider=WhisperProvider.API).run(files, output)
+
+    assert summary["processed"] == 2
+    assert summary["skipped"] == 1
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(r["path"] for r in records) == sorted(str(p) for p in files)
+    assert all(r["status"] == "ok" for r in records)
+    assert records[0]["text"] == "a"
+
+
+@pytest.mark.unit
+def test_local_batch_runs_in_process_pool(tmp_path):
+    files = [_write_wav(tmp_path / f"{i}.wav", 0.1).resolve() for i in range(3)]
+    output = tmp_path / "results.jsonl"
+
+    # Passed to the workers, so it works under spawn and forkserver too
+    batch = BatchTranscriber(transcriber_factory=_FakeTranscriber)
+    summary = batch.run(files, output)
+
+    assert batch.provider == WhisperProvider.LOCAL
+    assert 1 <= batch.workers <= BatchTranscriber.DEFAULT_LOCAL_WORKERS
+    assert summary["succeeded"] == 3
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert {r["path"] for r in records} == {str(p) for p in files}
+    assert all(r["text"].startswith("text-") for r in records)
@@ -0,0 +1,116 @@
+"""Tests for the virtualized chat transcript of the interactive CLI."""
+
+import itertools
+
+from rich.console import Console
+from rich.text import Text
+
+from mycoder.cli_interactive import InteractiveCLI
+from mycoder.ui_chat_transcript import ChatTranscript
+
+
+def _plain(lines):
+    return ["".join(segment.text for segment in line).rstrip() for line in lines]
+
+
+def _transcript():
+    console = Console(width=100, height=40, color_system=None)
+    return ChatTranscript(console, lambda entry, _: Text(entry["content"]))
+
+
+def _history(count):
+    return [
+        {"id": i, "role": "user", "content": f"message {i}", "timestamp": "12:00:00"}
+        for i in range(1, count + 1)
+    ]
+
+
+def test_messages_render_once_per_width_and_thinking_mode():
+    transcript = _transcript()
+    history = _history(3)
+
+    transcript.view(history, 40, 30)
+    transcript.view(history, 40, 30)
+    assert transcript.message_renders == 3
+
+    transcript.view(history, 50, 30)
+    transcript.view(history, 50, 30, show_thinking=True)
+    assert transcript.message_renders == 9
+
+    history[-1]["content"] = "edited"
+    assert _plain(transcript.view(history, 50, 30, show_thinking=True).lines)[-1] == (
+        "edited"
+    )
+    assert transcript.message_renders == 10
+
+
+def test_view_fills_viewport_with_newest_lines():
+    transcript = _transcript()
+    history = _history(10)
+
+    view = transcript.view(history, 40, 8)
+    lines = _plain(view.lines)
+
+    assert len(lines) <= 8
+    assert view.hidden_older == 7
+    assert "7 starších zpráv skryto" in lines[0]
+    assert lines[-2:] == ["[12:00:00] You:", "message 10"]
+    # Only the messages that can be visible are rendered
+    assert transcript.message_renders == 3
+
+
+def test_scrolled_view_hides_newer_messages():
+    transcript = _transcript()
+
+    view = transcript.view(_history(10), 40, 20, offset=4)
+    lines = _plain(view.lines)
+
+    assert view.hidden_newer == 4
+    assert "4 novějších zpráv skryto" in lines[0]
+    assert lines[-1] == "message 6"
+
+
+def test_only_streaming_tail_is_rendered_per_frame():
+    transcript = _transcript()
+    history = _history(3)
+    reply = ""
+
+    for token in ["Hello", " streaming", " world"]:
+        reply += token
+        view = transcript.view(history, 40, 20, streaming=(reply, "12:00:01"))
+
+    assert transcript.message_renders == 3
+    assert _plain(view.lines)[-2:] == ["[12:00:01] MyCoder AI: …", reply]
+
+
+def test_long_streaming_tail_keeps_its_end():
+    transcript = _transcript()
+    reply = "\n".join(f"line {i}" for i in range(10_000))
+
+    lines = _plain(transcript.streaming_lines(reply, "12:00:01", 40, 5))
+
+    assert lines == [f"line {i}" for i in range(9995, 10_000)]
+
+
+def test_cli_panel_uses_transcript():
+    cli = InteractiveCLI.__new__(InteractiveCLI)
+    cli.console = Console(width=120, height=30, color_system=None)
+    cli.chat_transcript = ChatTranscript(cli.console, cli._render_message_body)
+    cli._message_ids = itertools.count(1)
+    cli.chat_history = []
+    cli.history_offset = 0
+    cli.show_thinking = False
+    cli.streaming_reply = None
+    cli.history_path = None
+    cli._save_history = lambda: None
+
+    cli._append_chat_entry("user", "hello")
+    cli._append_chat_entry("ai", "**hi** there")
+    cli.history_offset = 99
+    with cli.console.capture() as capture:
+        cli.console.print(cli._render_chat_panel())
+
+    assert [entry["id"] for entry in cli.chat_history] == [1, 2]
+    assert cli.history_offset == 1
+    assert "1 novějších zpráv skryto" in capture.get()
+    assert "hello" in capture.get()
@@ -1,4 +1,38 @@
-from mycoder.api_providers import CircuitBreaker, CircuitState
+import asyncio
+
+import pytest
+
+from mycoder.api_providers import (
+    APIProviderConfig,
+    APIProviderRouter,
+    APIProviderStatus,
+    APIProviderType,
+    APIResponse,
+    BaseAPIProvider,
+    CircuitBreaker,
+    CircuitState,
+)
+
+
+class TimeoutProvider(BaseAPIProvider):
+    """Provider whose every call times out."""
+
+    def __init__(self, config: APIProviderConfig):
+        super().__init__(config)
+        self.calls = 0
+
+    async def query(self, prompt, context=None, **kwargs) -> APIResponse:
+        self.calls += 1
+        return APIResponse(
+            success=False,
+            content="",
+            provider=self.config.provider_type,
+            duration_ms=30000,
+            error="Request timeout",
+        )
+
+    async def health_check(self) -> APIProviderStatus:
+        return APIProviderStatus.HEALTHY
 
 
 def test_circuit_breaker_opens_on_failures() -> None:
@@ -32,3 +66,157 @@ def test_circuit_breaker_closes_after_successes() -> None:
     assert breaker.state == CircuitState.HALF_OPEN
     breaker.record_success()
     assert breaker.state == CircuitState.CLOSED
+
+
+def test_circuit_breaker_trips_on_p95_latency() -> None:
+    breaker = CircuitBreaker(latency_slo_ms=1000, min_calls=10, window_size=20)
+    for _ in range(9):
+        breaker.record_success(200)
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_success(5000)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.p95_latency_ms() == 5000
+
+
+def test_circuit_breaker_trips_on_failure_rate() -> None:
+    breaker = CircuitBreaker(
+        failure_threshold=10, min_calls=4, failure_rate_threshold=0.5
+    )
+    for ok in (True, False, True, False, False):
+        breaker.record_success() if ok else breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_circuit_breaker_backoff_grows_with_jitter() -> None:
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=10, max_recovery_timeout=25, jitter=0.2
+    )
+    periods = []
+    for _ in range(3):
+        breaker.record_failure()
+        periods.append(breaker.open_for)
+        breaker.opened_at -= breaker.open_for
+        assert breaker.can_execute() is True
+
+    assert 8 <= periods[0] <= 12
+    assert 16 <= periods[1] <= 24
+    assert 20 <= periods[2] <= 30
+
+
+def test_circuit_breaker_limits_half_open_probes() -> None:
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=0, jitter=0, half_open_max_probes=1
+    )
+    breaker.record_failure()
+
+    assert breaker.can_execute() is True
+    assert breaker.can_execute() is False
+    breaker.release_probe()
+    assert breaker.can_execute() is True
+
+
+def test_circuit_breaker_emits_transition_events() -> None:
+    events = []
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=0, half_open_max_calls=1, name="gemini"
+    )
+    breaker.add_listener(events.append)
+
+    breaker.record_failure()
+    breaker.can_execute()
+    breaker.record_success(100)
+
+    assert [(e.from_state, e.to_state) for e in events] == [
+        (CircuitState.CLOSED, CircuitState.OPEN),
+        (CircuitState.OPEN, CircuitState.HALF_OPEN),
+        (CircuitState.HALF_OPEN, CircuitState.CLOSED),
+    ]
+    assert events[0].name == "gemini"
+    assert events[0].reason == "1 consecutive failures"
+
+
+@pytest.mark.asyncio
+async def test_router_stops_retrying_once_circuit_opens() -> None:
+    provider = TimeoutProvider(
+        APIProviderConfig(
+            provider_type=APIProviderType.GEMINI,
+            max_retries=3,
+            config={"circuit_breaker_threshold": 2},
+        )
+    )
+    router = APIProviderRouter([])
+    router.providers = [provider]
+    router.fallback_chain = [APIProviderType.GEMINI]
+    provider.circuit_breaker.add_listener(router._on_circuit_event)
+
+    response = await router.query("hello")
+    assert not response.success
+    assert provider.calls == 2
+    assert router.circuit_events[-1].to_state == CircuitState.OPEN
+    assert router.get_circuit_status()["gemini"]["state"] == "open"
+
+    await router.query("hello again")
+    assert provider.calls == 2
+
+
+def test_circuit_breaker_p95_ignores_single_outlier_in_full_window() -> None:
+    breaker = CircuitBreaker(latency_slo_ms=1000, min_calls=10, window_size=20)
+    for _ in range(19):
+        breaker.record_success(200)
+    breaker.record_success(5000)
+
+    assert breaker.p95_latency_ms() == 200
+    assert breaker.state == CircuitState.CLOSED
+
+
+class SlowProvider(TimeoutProvider):
+    """Provider whose call never finishes."""
+
+    async def query(self, prompt, context=None, **kwargs) -> APIResponse:
+        self.calls += 1
+        await asyncio.sleep(3600)
+
+
+def _half_open_router(provider: BaseAPIProvider) -> APIProviderRouter:
+    router = APIProviderRouter([])
+    router.providers = [provider]
+    router.fallback_chain = [provider.config.provider_type]
+    breaker = provider.circuit_breaker
+    breaker.state = CircuitState.OPEN
+    breaker.open_for = 0
+    return router
+
+
+@pytest.mark.asyncio
+async def test_router_releases_probe_when_call_never_runs() -> None:
+    provider = TimeoutProvider(APIProviderConfig(provider_type=APIProviderType.GEMINI))
+    router = _half_open_router(provider)
+
+    class FailingLimiter:
+        async def acquire(self):
+            raise RuntimeError("rate limiter unavailable")
+
+    provider.rate_limiter = FailingLimiter()
+
+    response = await router.query("hello")
+
+    assert not response.success
+    assert provider.calls == 0
+    assert provider.circuit_breaker.state == CircuitState.HALF_OPEN
+    assert provider.circuit_breaker.can_execute() is True
+
+
+@pytest.mark.asyncio
+async def test_router_releases_probe_when_cancelled() -> None:
+    provider = SlowProvider(APIProviderConfig(provider_type=APIProviderType.GEMINI))
+    router = _half_open_router(provider)
+
+    task = asyncio.create_task(router.query("hello"))
+    while provider.calls == 0:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert provider.circuit_breaker.can_execute() is True
@@ -0,0 +1,143 @@
+"""Unit tests for token counting and context packing."""
+
+from pathlib import Path
+
+import pytest
+
+from mycoder.providers.base import APIProviderConfig, APIProviderType
+from mycoder.providers.llm.ollama import OllamaProvider
+from mycoder.router.intent_classifier import IntentClassifier
+from mycoder.utils.context_packer import ContextPacker
+from mycoder.utils.token_counter import (
+    ApproximateTokenCounter,
+    TokenCounter,
+    get_token_counter,
+    model_family,
+)
+
+
+class TestTokenCounter:
+    def test_model_family_mapping(self):
+        assert model_family("claude-3-5-sonnet-20241022") == "claude"
+        assert model_family("gpt-4o") == "gpt"
+        assert model_family("meta-llama/Llama-3.2-3B-Instruct") == "llama"
+        assert model_family("tinyllama") == "llama"
+        assert model_family(None) == "default"
+
+    def test_code_counts_more_than_char_heuristic(self):
+        counter = ApproximateTokenCounter()
+        code = "def f(a, b):\n    return {'x': a[0], 'y': b.get('z')}\n" * 20
+        assert counter.count(code) > len(code) // 4
+
+    def test_cache_hits_on_repeated_content(self):
+        counter = ApproximateTokenCounter()
+        text = "hello world " * 100
+        first = counter.count(text)
+        assert counter.count(text) == first
+        assert counter.cache_info()["hits"] == 1
+        assert counter.cache_info()["misses"] == 1
+
+    def test_lru_eviction(self):
+        counter = ApproximateTokenCounter(cache_size=2)
+        for text in ("a b", "c d", "e f"):
+            counter.count(text)
+        assert counter.cache_info()["size"] == 2
+
+    def test_counters_shared_per_family(self):
+        assert get_token_counter("claude-3-haiku") is get_token_counter("claude-opus")
+
+    def test_base_counter_is_abstract(self):
+        with pytest.raises(TypeError):
+            TokenCounter()
+
+    def test_large_file_count_is_extrapolated_from_head(self, tmp_path):
+        path = tmp_path / "big.py"
+        path.write_text("value = 1\n" * 1000)
+        counter = ApproximateTokenCounter()
+        full = counter.count_file(path)
+
+        counter.MAX_FILE_BYTES = 1000
+        assert counter.count_file(path) == pytest.approx(full, rel=0.05)
+
+
+class TestContextPacker:
+    @pytest.fixture
+    def packer(self):
+        return ContextPacker(ApproximateTokenCounter())
+
+    def test_everything_fits(self, packer):
+        files = [(Path("a.py"), "x = 1"), (Path("b.py"), "y = 2")]
+        packed = packer.pack(files, budget_tokens=1000)
+        assert packed.included == ["a.py", "b.py"]
+        assert not packed.truncated and not packed.dropped
+        assert "File: a.py" in packed.text and "y = 2" in packed.text
+
+    def test_mentioned_file_wins_budget(self, packer):
+        big = "value = compute(1, 2, 3)\n" * 60
+        files = [(Path("other.py"), big), (Path("target.py"), big)]
+        budget = packer.token_counter.count(packer._render(Path("x.py"), big)) + 10
+        packed = packer.pack(files, budget_tokens=budget, prompt="Fix target.py")
+        assert packed.included[0] == "target.py"
+        assert "target.py" not in packed.truncated
+        assert packed.tokens <= budget
+
+    def test_trims_to_relevant_blocks(self, packer):
+        blocks = [f"def helper_{i}():\n    return {i}" for i in range(40)]
+        blocks[25] = "def parse_config(path):\n    return load(path)"
+        content = "\n\n".join(blocks)
+        packed = packer.pack(
+            [(Path("util.py"), content)], budget_tokens=80, prompt="parse_config"
+        )
+        assert packed.truncated == ["util.py"]
+        assert "def parse_config" in packed.text
+        assert "[... 24 blocks omitted ...]" in packed.text
+        assert "# ..." not in packed.text
+        assert packed.tokens <= 80
+
+    def test_drops_when_no_budget(self, packer):
+        files = [(Path("a.py"), "x = 1\n" * 500)]
+        packed = packer.pack(files, budget_tokens=10)
+        assert packed.dropped == ["a.py"]
+        assert packed.text == ""
+
+
+class TestTokenAwareCallers:
+    def test_classifier_counts_real_file_tokens(self, tmp_path):
+        small = tmp_path / "small.py"
+        small.write_text("x = 1\n")
+        classifier = IntentClassifier(ApproximateTokenCounter())
+        estimate = classifier._estimate_tokens("fix it", [str(small)])
+        assert estimate < classifier.BASE_PROMPT_TOKENS + classifier.TOKENS_PER_FILE
+
+    @pytest.mark.asyncio
+    async def test_provider_packs_into_context_window(self, tmp_path):
+        files = []
+        for i in range(5):
+            path = tmp_path / f"module_{i}.py"
+            path.write_text("\n\n".join(f"def fn_{j}():\n    pass" for j in range(200)))
+            files.append(path)
+
+        provider = OllamaProvider(
+            APIProviderConfig(
+                provider_type=APIProviderType.OLLAMA_LOCAL,
+                config={"max_context_tokens": 2048},
+            )
+        )
+        content = await provider._process_file_context(
+            files, prompt="Explain module_3.py", reserve_tokens=512
+        )
+        assert content.startswith("File: module_3.py")
+        assert provider.token_counter.count(content) <= 2048 - 512
+
+    @pytest.mark.asyncio
+    async def test_provider_caps_characters_read_per_file(self, tmp_path):
+        path = tmp_path / "huge.py"
+        path.write_text("head = 1\n" + "x = 0\n" * 10000)
+        provider = OllamaProvider(
+            APIProviderConfig(
+                provider_type=APIProviderType.OLLAMA_LOCAL,
+                config={"max_context_tokens": 200000, "max_file_context_chars": 60},
+            )
+        )
+        content = await provider._process_file_context([path], reserve_tokens=0)
+        assert content == "File: huge.py\n```\n" + path.read_text()[:60] + "\n```"
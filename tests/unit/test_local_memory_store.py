@@ -0,0 +1,135 @@
+"""Tests for the SQLite-backed LocalMemoryStore."""
+
+import json
+import time
+
+import pytest
+
+from mycoder.local_mcp_server import LocalMCPServer, LocalMemoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalMemoryStore(tmp_path, compact_every=0)
+    yield store
+    store.close()
+
+
+def test_search_ranks_by_relevance_importance_and_recency(store):
+    now = time.time()
+    store.extend(
+        [
+            {"content": "deploy with docker", "importance": 0.1, "timestamp": now},
+            {"content": "docker compose setup", "importance": 0.9, "timestamp": now},
+            {
+                "content": "old docker notes",
+                "importance": 0.9,
+                "timestamp": now - 365 * 86400,
+            },
+            {"content": "pytest fixtures", "importance": 1.0, "timestamp": now},
+        ]
+    )
+
+    results = store.search("docker", 10)
+
+    assert [r["content"] for r in results] == [
+        "docker compose setup",
+        "deploy with docker",
+        "old docker notes",
+    ]
+    assert [r["content"] for r in store.search("dock comp", 10)] == [
+        "docker compose setup"
+    ]
+    assert store.search("docker", 1)[0]["content"] == "docker compose setup"
+    assert store.search("", 5) == []
+
+
+def test_search_ignores_case_and_diacritics_and_keeps_extra_fields(store):
+    store.append({"content": "Použij Pytest", "tags": ["cz"], "timestamp": 5.0})
+
+    (entry,) = store.search("pouzij PYTEST", 5)
+
+    assert entry == {
+        "content": "Použij Pytest",
+        "type": "interaction",
+        "importance": 0.5,
+        "timestamp": 5.0,
+        "tags": ["cz"],
+    }
+
+
+def test_migrates_legacy_jsonl_once(tmp_path):
+    legacy = tmp_path / "mcp_memory.jsonl"
+    legacy.write_text(
+        json.dumps({"content": "remember the milk", "importance": 0.7})
+        + "\nnot json\n"
+        + json.dumps({"content": ""})
+        + "\n",
+        encoding="utf-8",
+    )
+
+    store = LocalMemoryStore(tmp_path)
+    assert store.count() == 1
+    assert store.search("milk", 5)[0]["importance"] == 0.7
+    assert not legacy.exists()
+    assert (tmp_path / "mcp_memory.jsonl.migrated").exists()
+    store.close()
+
+    reopened = LocalMemoryStore(tmp_path)
+    assert reopened.count() == 1
+    reopened.close()
+
+
+def test_compaction_deduplicates_and_evicts(tmp_path):
+    store = LocalMemoryStore(tmp_path, max_entries=2, compact_every=0)
+    store.extend(
+        [
+            {"content": "same", "importance": 0.9, "timestamp": 1.0},
+            {"content": "same", "importance": 0.1, "timestamp": 2.0},
+            {"content": "keep", "importance": 0.8, "timestamp": 1.0},
+            {"content": "drop", "importance": 0.2, "timestamp": 1.0},
+        ]
+    )
+
+    stats = store.compact()
+
+    assert stats == {"duplicates": 1, "evicted": 1, "remaining": 2}
+    assert store.search("same", 5) == [
+        {"content": "same", "type": "interaction", "importance": 0.9, "timestamp": 2.0}
+    ]
+    assert store.search("drop", 5) == []
+    store.close()
+
+
+def test_compacts_periodically(tmp_path):
+    store = LocalMemoryStore(tmp_path, compact_every=3)
+    for _ in range(3):
+        store.append({"content": "repeated"})
+
+    assert store.count() == 1
+    store.close()
+
+
+def test_substring_fallback_without_fts(store):
+    store.append({"content": "C++ templates"})
+
+    # Punctuation-only queries have no indexable words
+    assert [r["content"] for r in store.search("++", 5)] == ["C++ templates"]
+
+    store.fts_enabled = False
+    assert [r["content"] for r in store.search("templ", 5)] == ["C++ templates"]
+
+
+@pytest.mark.asyncio
+async def test_server_memory_tools_round_trip(tmp_path):
+    server = LocalMCPServer(data_dir=tmp_path)
+
+    status, _ = await server.call_tool(
+        "store_memory", {"content": "the build uses poetry", "importance": 0.8}
+    )
+    assert status == 200
+    status, result = await server.call_tool("search_memories", {"query": "poetry"})
+
+    assert status == 200
+    assert result["memories"][0]["content"] == "the build uses poetry"
+    await server.stop()
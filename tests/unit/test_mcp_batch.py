@@ -0,0 +1,201 @@
+"""Tests for batched MCP tool calls and per-mode tool caching."""
+
+import asyncio
+import socket
+from unittest.mock import AsyncMock
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from mycoder.adaptive_modes import OperationalMode
+from mycoder.local_mcp_server import LocalMCPServer
+from mycoder.mcp_bridge import MCPBridge
+from mycoder.mcp_connector import MCPConnector
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest_asyncio.fixture
+async def server(tmp_path):
+    server = LocalMCPServer(port=_free_port(), data_dir=tmp_path / "data")
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest_asyncio.fixture
+async def bridge(server):
+    bridge = MCPBridge(
+        mcp_url=f"http://{server.host}:{server.port}",
+        auto_start=False,
+        batch_window_ms=20,
+    )
+    bridge.session = aiohttp.ClientSession()
+    posted = []
+    post = bridge.session.post
+
+    def spy(url, **kwargs):
+        posted.append(url.rsplit("/", 1)[-1])
+        return post(url, **kwargs)
+
+    bridge.session.post = spy
+    bridge.posted = posted
+    yield bridge
+    await bridge.close()
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_runs_calls_and_reports_errors(server, tmp_path):
+    target = tmp_path / "a.txt"
+    target.write_text("hello", encoding="utf-8")
+    url = f"http://{server.host}:{server.port}/mcp/batch"
+    calls = [
+        {"tool": "file_read", "arguments": {"path": str(target)}},
+        {"tool": "nope", "arguments": {}},
+        {"tool": "file_read", "arguments": {"path": str(tmp_path / "missing")}},
+    ]
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json={"calls": calls}) as response:
+            assert response.status == 200
+            data = await response.json()
+        async with session.post(url, json={"calls": "x"}) as response:
+            assert response.status == 400
+
+    results = data["results"]
+    assert results[0]["status"] == 200
+    assert results[0]["result"]["content"] == "hello"
+    assert results[1] == {"status": 400, "error": "Unknown tool: nope"}
+    assert results[2]["status"] == 400
+
+
+@pytest.mark.asyncio
+async def test_bridge_coalesces_concurrent_calls(bridge, tmp_path):
+    for name in ("a", "b", "c"):
+        (tmp_path / name).write_text(name, encoding="utf-8")
+
+    results = await asyncio.gather(
+        *(
+            bridge.call_mcp_tool("file_read", {"path": str(tmp_path / name)})
+            for name in ("a", "b", "c")
+        ),
+        bridge.call_mcp_tool("nope", {}),
+    )
+
+    assert bridge.posted == ["batch"]
+    assert [r["data"]["content"] for r in results[:3]] == ["a", "b", "c"]
+    assert results[3] == {"success": False, "error": "Unknown tool: nope"}
+
+
+@pytest.mark.asyncio
+async def test_bridge_single_call_uses_plain_endpoint(bridge, tmp_path):
+    (tmp_path / "a").write_text("a", encoding="utf-8")
+
+    result = await bridge.call_mcp_tool("file_read", {"path": str(tmp_path / "a")})
+
+    assert result["success"] is True
+    assert bridge.posted == ["mcp"]
+
+
+@pytest.mark.asyncio
+async def test_bridge_lone_call_does_not_wait_for_batch_window(bridge, tmp_path):
+    (tmp_path / "a").write_text("a", encoding="utf-8")
+    bridge.batch_window = 5.0
+    args = {"path": str(tmp_path / "a")}
+
+    first = await asyncio.wait_for(bridge.call_mcp_tool("file_read", args), 2)
+    second = await asyncio.wait_for(bridge.call_mcp_tool("file_read", args), 2)
+
+    assert first["success"] is True and second["success"] is True
+    assert bridge.posted == ["mcp", "mcp"]
+
+
+@pytest.mark.asyncio
+async def test_bridge_batches_calls_made_while_a_batch_runs(bridge, tmp_path):
+    (tmp_path / "a").write_text("a", encoding="utf-8")
+    args = {"path": str(tmp_path / "a")}
+
+    first = asyncio.ensure_future(bridge.call_mcp_tool("file_read", args))
+    while not bridge._batch_tasks:  # first call is sent on its own
+        await asyncio.sleep(0)
+    later = [
+        asyncio.ensure_future(bridge.call_mcp_tool("file_read", args)) for _ in range(3)
+    ]
+    results = await asyncio.gather(first, *later)
+
+    assert all(result["success"] for result in results)
+    assert bridge.posted == ["mcp", "batch"]
+
+
+@pytest.mark.asyncio
+async def test_bridge_falls_back_when_batch_unsupported(bridge, server, tmp_path):
+    # An older server that only knows /mcp
+    app = web.Application()
+    app.router.add_post("/mcp", server._handle_mcp)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = _free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    bridge.mcp_url = f"http://127.0.0.1:{port}"
+    (tmp_path / "a").write_text("a", encoding="utf-8")
+
+    results = await bridge.call_mcp_tools(
+        [("file_read", {"path": str(tmp_path / "a")}), ("nope", {})]
+    )
+
+    assert results[0]["success"] is True
+    assert results[1]["success"] is False
+    assert bridge._batch_supported is False
+    assert bridge.posted.count("batch") == 1
+    assert bridge.posted.count("mcp") == 2
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_connector_caches_tools_until_services_change():
+    connector = MCPConnector(auto_start_local=False)
+    services = {
+        "zen_coordinator": {
+            "services": {
+                "fs": {"status": "running", "tools": ["file_read", "git_log"]},
+            }
+        }
+    }
+
+    response = AsyncMock()
+    response.status = 200
+    response.json = AsyncMock(side_effect=lambda: services)
+    response.__aenter__ = AsyncMock(return_value=response)
+    response.__aexit__ = AsyncMock(return_value=None)
+    connector.session = AsyncMock()
+    connector.session.get = lambda url: response
+    connector.test_connection = AsyncMock(return_value=True)
+
+    await connector.check_services_health()
+    degraded = await connector.get_available_tools_for_mode(OperationalMode.DEGRADED)
+    assert degraded == ["file_read"]
+    filtered = connector._mode_tools[OperationalMode.DEGRADED]
+
+    # Unchanged /services keeps the cache (and the connection is not re-probed)
+    await connector.check_services_health()
+    assert connector._mode_tools[OperationalMode.DEGRADED] is filtered
+    assert connector.test_connection.await_count == 1
+
+    services = {
+        "zen_coordinator": {
+            "services": {
+                "fs": {"status": "running", "tools": ["file_read", "git_diff"]},
+            }
+        }
+    }
+    await connector.check_services_health()
+    assert OperationalMode.DEGRADED not in connector._mode_tools
+    assert await connector.get_available_tools_for_mode(OperationalMode.DEGRADED) == [
+        "file_read",
+        "git_diff",
+    ]
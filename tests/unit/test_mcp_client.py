@@ -1,7 +1,75 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
 import pytest
+import pytest_asyncio
 
 from mycoder.mcp.client import MCPClient
 
+FAKE_SERVER = r"""
+import json, os, sys, threading, time
+
+lock = threading.Lock()
+starts = os.environ["STARTS_FILE"]
+with open(starts, "a") as handle:
+    handle.write("x")
+generation = len(open(starts).read())
+
+
+def send(message):
+    with lock:
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+
+def handle(request):
+    method, params = request["method"], request.get("params", {})
+    if method == "initialize":
+        return {"capabilities": {}}
+    if method == "tools/list":
+        return {"tools": [{"name": f"echo{generation}", "inputSchema": {}}]}
+    args = params.get("arguments", {})
+    if args.get("crash"):
+        os._exit(1)
+    if args.get("fail"):
+        raise ValueError("boom")
+    time.sleep(args.get("delay", 0))
+    return {"content": [{"type": "text", "text": args.get("text", "")}]}
+
+
+def worker(request):
+    try:
+        send({"jsonrpc": "2.0", "id": request["id"], "result": handle(request)})
+    except ValueError as exc:
+        send({"jsonrpc": "2.0", "id": request["id"],
+              "error": {"code": -32000, "message": str(exc)}})
+
+
+# Fill far more than a pipe buffer of stderr before serving anything
+sys.stderr.write("log line\n" * 20000)
+sys.stderr.flush()
+for line in sys.stdin:
+    request = json.loads(line)
+    if "id" not in request:
+        continue
+    send({"jsonrpc": "2.0", "method": "notifications/message",
+          "params": {"data": request["method"]}})
+    threading.Thread(target=worker, args=(request,), daemon=True).start()
+"""
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path: Path, monkeypatch):
+    script = tmp_path / "server.py"
+    script.write_text(FAKE_SERVER)
+    monkeypatch.setenv("STARTS_FILE", str(tmp_path / "starts"))
+    client = MCPClient(request_timeout=5, restart_backoff=0.05)
+    assert await client.connect("fake", [sys.executable, str(script)])
+    yield client
+    await client.close()
+
 
 @pytest.mark.asyncio
 async def test_call_tool_missing_returns_error() -> None:
@@ -18,3 +86,105 @@ def test_get_available_tools_empty() -> None:
     tools = client.get_available_tools()
 
     assert tools == []
+
+
+def _text(result):
+    return result["content"][0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_multiplexed(client: MCPClient) -> None:
+    notifications = []
+    client.add_notification_handler(
+        lambda server, method, params: notifications.append(params["data"])
+    )
+    finished = []
+
+    async def call(text, delay):
+        result = await client.call_tool("echo1", {"text": text, "delay": delay})
+        finished.append(_text(result))
+
+    started = time.perf_counter()
+    await asyncio.gather(call("slow", 0.4), call("fast", 0), call("mid", 0.2))
+
+    assert time.perf_counter() - started < 0.8
+    assert finished == ["fast", "mid", "slow"]
+    assert notifications.count("tools/call") == 3
+    assert client.get_server_status()["fake"]["stderr_tail"][-1] == "log line"
+
+
+@pytest.mark.asyncio
+async def test_timeouts_and_errors_do_not_break_connection(client: MCPClient) -> None:
+    timed_out = await client.call_tool("fake:echo1", {"delay": 1}, timeout=0.1)
+    assert "timed out" in timed_out["error"]
+
+    failed = await client.call_tool("echo1", {"fail": True})
+    assert failed["error"] == "boom"
+    assert failed["code"] == -32000
+
+    assert _text(await client.call_tool("echo1", {"text": "still ok"})) == "still ok"
+
+
+@pytest.mark.asyncio
+async def test_crashed_server_is_restarted_with_new_tools(
+    client: MCPClient,
+) -> None:
+    pending = asyncio.create_task(client.call_tool("echo1", {"delay": 1}))
+    await asyncio.sleep(0.1)
+
+    crashed = await client.call_tool("echo1", {"crash": True})
+    assert "exited" in crashed["error"]
+    assert "exited" in (await pending)["error"]
+
+    result = await client.call_tool("fake:echo2", {"text": "back"})
+    assert _text(result) == "back"
+    assert [tool.name for tool in client.get_available_tools()] == ["echo2"]
+    assert client.get_server_status()["fake"]["restarts"] == 1
+
+
+
+@pytest.mark.asyncio
+async def test_notification_handler_can_call_tools(client: MCPClient) -> None:
+    nested = asyncio.get_running_loop().create_future()
+
+    async def handler(server, method, params):
+        if method == "notifications/message" and not nested.done():
+            nested.set_result(None)
+            result = await client.call_tool("echo1", {"text": "nested"})
+            handled.set_result(_text(result))
+
+    handled = asyncio.get_running_loop().create_future()
+    client.add_notification_handler(handler)
+
+    outer = await asyncio.wait_for(client.call_tool("echo1", {"text": "outer"}), 2)
+
+    assert _text(outer) == "outer"
+    assert await asyncio.wait_for(handled, 2) == "nested"
+
+
+@pytest.mark.asyncio
+async def test_restart_budget_returns_once_server_stays_up(
+    tmp_path: Path, monkeypatch
+) -> None:
+    script = tmp_path / "server.py"
+    script.write_text(FAKE_SERVER)
+    monkeypatch.setenv("STARTS_FILE", str(tmp_path / "starts"))
+    client = MCPClient(
+        request_timeout=5,
+        max_restarts=1,
+        restart_backoff=0.05,
+        restart_reset_after=0.1,
+    )
+    assert await client.connect("fake", [sys.executable, str(script)])
+    try:
+        for generation in (1, 2):
+            await asyncio.sleep(0.2)
+            crashed = await client.call_tool(f"echo{generation}", {"crash": True})
+            assert "exited" in crashed["error"]
+
+            result = await client.call_tool(f"fake:echo{generation + 1}", {})
+            assert "error" not in result
+
+        assert client.get_server_status()["fake"]["restarts"] == 2
+    finally:
+        await client.close()
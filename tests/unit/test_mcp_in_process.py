@@ -0,0 +1,111 @@
+"""Tests for in-process dispatch to the local MCP server."""
+
+import socket
+from unittest.mock import Mock
+
+import pytest
+
+from mycoder.adaptive_modes import OperationalMode
+from mycoder.local_mcp_server import LocalMCPServer
+from mycoder.mcp_bridge import MCPBridge
+from mycoder.mcp_connector import MCPConnector
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_bridge_calls_in_process_server_without_http(tmp_path):
+    port = _free_port()
+    bridge = MCPBridge(
+        mcp_url=f"http://127.0.0.1:{port}",
+        local_port=port,
+        data_dir=tmp_path / "data",
+    )
+    try:
+        assert await bridge.initialize() is True
+        assert isinstance(bridge.local_server, LocalMCPServer)
+        assert "file_read" in bridge.mcp_tools
+
+        bridge.session.post = Mock(side_effect=AssertionError("HTTP used"))
+        target = tmp_path / "a.txt"
+        target.write_text("hello", encoding="utf-8")
+
+        result = await bridge.call_mcp_tool("file_read", {"path": str(target)})
+        assert result == {
+            "success": True,
+            "data": {"path": str(target), "content": "hello"},
+        }
+        assert await bridge.call_mcp_tools([("nope", {})]) == [
+            {"success": False, "error": "Unknown tool: nope"}
+        ]
+        # The HTTP listener stays up for other clients
+        assert await bridge._check_mcp_health() is True
+    finally:
+        await bridge.close()
+    assert bridge.local_server is None
+
+
+@pytest.mark.asyncio
+async def test_connector_dispatches_to_local_server(tmp_path):
+    connector = MCPConnector(
+        auto_start_local=True,
+        local_port=_free_port(),
+        local_data_dir=str(tmp_path / "data"),
+    )
+    async with connector:
+        assert connector.orchestrator_url == connector._local_server_url
+        connector.session.post = Mock(side_effect=AssertionError("HTTP used"))
+        target = tmp_path / "a.txt"
+        target.write_text("hello", encoding="utf-8")
+
+        result = await connector.call_mcp_tool(
+            "file_read", {"path": str(target)}, OperationalMode.FULL
+        )
+        assert result["success"] is True
+        assert result["result"]["content"] == "hello"
+
+        missing = await connector.call_mcp_tool(
+            "file_read", {"path": str(tmp_path / "missing")}, OperationalMode.FULL
+        )
+        assert missing["success"] is False
+        assert missing["status_code"] == 400
+
+
+@pytest.mark.asyncio
+async def test_filesystem_tools_do_not_block_the_event_loop(tmp_path, monkeypatch):
+    import asyncio
+    import threading
+
+    server = LocalMCPServer(data_dir=tmp_path / "data")
+    (tmp_path / "a.txt").write_text("needle", encoding="utf-8")
+    monkeypatch.setattr("mycoder.local_mcp_server.shutil.which", lambda name: None)
+    threads = []
+    search = server._python_search
+
+    def tracking_search(*args):
+        threads.append(threading.current_thread())
+        return search(*args)
+
+    monkeypatch.setattr(server, "_python_search", tracking_search)
+    try:
+        status, payload = await server.call_tool(
+            "file_search", {"query": "needle", "path": str(tmp_path)}
+        )
+        assert status == 200
+        assert payload["matches"][0]["text"] == "needle"
+        assert threads and threads[0] is not threading.main_thread()
+
+        status, payload = await server.call_tool(
+            "file_list", {"path": str(tmp_path), "recursive": True}
+        )
+        assert str(tmp_path / "a.txt") in payload["entries"]
+        status, payload = await server.call_tool(
+            "file_read", {"path": str(tmp_path / "missing")}
+        )
+        assert status == 400
+    finally:
+        await asyncio.to_thread(server.memory_store.close)
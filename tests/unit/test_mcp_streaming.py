@@ -0,0 +1,113 @@
+"""Tests for streamed, capped command output from the local MCP server."""
+
+import json
+import socket
+
+import aiohttp
+import pytest
+
+from mycoder.local_mcp_server import LocalMCPServer
+from mycoder.mcp_bridge import MCPBridge
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.asyncio
+async def test_terminal_exec_caps_head_and_tail(tmp_path):
+    server = LocalMCPServer(
+        data_dir=tmp_path, output_head_bytes=6, output_tail_bytes=12
+    )
+    try:
+        status, result = await server.call_tool(
+            "terminal_exec",
+            {"command": "for i in 0 1 2 3 4 5 6 7 8 9; do echo line$i; done"},
+        )
+    finally:
+        await server.stop()
+
+    assert status == 200
+    assert result["returncode"] == 0
+    assert result["stdout"] == "line0\n[... 42 bytes truncated ...]\nline8\nline9\n"
+    assert result["stdout_truncated"] == 42
+    assert "stderr_truncated" not in result
+
+
+@pytest.mark.asyncio
+async def test_terminal_exec_timeout_keeps_partial_output(tmp_path):
+    server = LocalMCPServer(data_dir=tmp_path)
+    try:
+        status, result = await server.call_tool(
+            "terminal_exec", {"command": "echo started; sleep 30", "timeout": 1}
+        )
+    finally:
+        await server.stop()
+
+    assert status == 200
+    assert result["returncode"] == 124
+    assert result["timed_out"] is True
+    assert result["stdout"] == "started\n"
+    assert result["stderr"].endswith("Command timed out")
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_sends_ndjson_lines(tmp_path):
+    server = LocalMCPServer(port=_free_port(), data_dir=tmp_path)
+    await server.start()
+    url = f"http://{server.host}:{server.port}/mcp/stream"
+    try:
+        async with aiohttp.ClientSession() as session:
+            payload = {
+                "tool": "terminal_exec",
+                "arguments": {"command": "echo one; echo oops >&2; echo two"},
+            }
+            async with session.post(url, json=payload) as response:
+                assert response.headers["Content-Type"].startswith(
+                    "application/x-ndjson"
+                )
+                events = [json.loads(line) async for line in response.content]
+            async with session.post(url, json={"tool": "nope"}) as response:
+                (error,) = [json.loads(line) async for line in response.content]
+    finally:
+        await server.stop()
+
+    output = [(e["type"], e["data"]) for e in events[:-1]]
+    assert [d for t, d in output if t == "stdout"] == ["one\n", "two\n"]
+    assert ("stderr", "oops\n") in output
+    assert events[-1] == {"type": "result", "status": 200, "result": {"returncode": 0}}
+    assert error == {"type": "result", "status": 400, "error": "Unknown tool: nope"}
+
+
+@pytest.mark.asyncio
+async def test_bridge_streams_in_process_and_stops_on_early_exit(tmp_path):
+    port = _free_port()
+    bridge = MCPBridge(
+        mcp_url=f"http://127.0.0.1:{port}",
+        local_port=port,
+        data_dir=tmp_path / "data",
+    )
+    try:
+        assert await bridge.initialize() is True
+        events = [
+            event
+            async for event in bridge.stream_mcp_tool(
+                "terminal_exec", {"command": "echo a; echo b"}
+            )
+        ]
+        assert events == [
+            {"type": "stdout", "data": "a\n"},
+            {"type": "stdout", "data": "b\n"},
+            {"type": "result", "success": True, "data": {"returncode": 0}},
+        ]
+
+        stream = bridge.stream_mcp_tool(
+            "terminal_exec", {"command": "echo first; sleep 30", "timeout": 60}
+        )
+        assert await stream.__anext__() == {"type": "stdout", "data": "first\n"}
+        await stream.aclose()
+        assert bridge.local_server.process_runner.running == 0
+    finally:
+        await bridge.close()
@@ -4,6 +4,8 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from mycoder.router.adapters import CLAUDE_HAIKU, CLAUDE_SONNET_4, GPT_4O
+from mycoder.router.adapters.base import AdapterResponse
 from mycoder.router.model_router import ModelRouter
 from mycoder.router.task_context import (
     BudgetTier,
@@ -11,6 +13,7 @@ from mycoder.router.task_context import (
     TaskComplexity,
     TaskContext,
 )
+from mycoder.router.telemetry import RouterTelemetry
 
 
 class TestModelRouter:
@@ -91,3 +94,138 @@ class TestModelRouter:
         assert requires_handoff is True
         assert next_role == ModelRole.REVIEWER
         assert "Review the code" in handoff_prompt
+
+
+class TestLatencyAwareSelection:
+    """Tests for telemetry-driven adapter selection."""
+
+    @pytest.fixture
+    def telemetry(self, tmp_path):
+        return RouterTelemetry(state_path=tmp_path / "telemetry.json")
+
+    @pytest.fixture
+    def router(self, telemetry):
+        router = ModelRouter(
+            default_budget=BudgetTier.HIGH,
+            telemetry=telemetry,
+            failure_memory=MagicMock(),
+        )
+        for model_info in (CLAUDE_SONNET_4, GPT_4O):
+            adapter = MagicMock()
+            adapter.model_info = model_info
+            router.adapters[model_info.name] = adapter
+        return router
+
+    @staticmethod
+    def _response(duration_ms, success=True, ttft=None, output_tokens=500):
+        return AdapterResponse(
+            success=success,
+            content="ok",
+            model_name="m",
+            input_tokens=10,
+            output_tokens=output_tokens,
+            cost_usd=0.0,
+            duration_ms=duration_ms,
+            time_to_first_token_ms=ttft,
+        )
+
+    def _select(self, router):
+        return router._select_adapter(
+            role=ModelRole.WORKER,
+            budget=BudgetTier.HIGH,
+            context=TaskContext(original_prompt="test"),
+        ).model_info.name
+
+    def test_priors_pick_fastest_comparable_model(self, router):
+        # GPT-4o scores >= Sonnet for WORKER and its prior latency is lower
+        assert self._select(router) == GPT_4O.name
+
+    def test_observed_latency_overrides_prior(self, router, telemetry):
+        for _ in range(20):
+            telemetry.record(GPT_4O, self._response(20_000, ttft=5_000))
+            telemetry.record(CLAUDE_SONNET_4, self._response(1_500, ttft=200))
+
+        assert self._select(router) == CLAUDE_SONNET_4.name
+
+    def test_errors_penalize_expected_time(self, router, telemetry):
+        for _ in range(10):
+            telemetry.record(GPT_4O, self._response(0, success=False))
+
+        assert telemetry.get_stats(GPT_4O).error_rate > 0.8
+        assert self._select(router) == CLAUDE_SONNET_4.name
+
+    def test_slo_violation_excludes_adapter(self, router, telemetry):
+        router.latency_slo_ms = 10_000
+        for _ in range(5):
+            telemetry.record(GPT_4O, self._response(12_000, ttft=100))
+
+        assert telemetry.violates_slo(GPT_4O, router.latency_slo_ms)
+        assert self._select(router) == CLAUDE_SONNET_4.name
+
+    def test_cheaper_lower_scoring_model_not_chosen(self, router):
+        adapter = MagicMock()
+        adapter.model_info = CLAUDE_HAIKU
+        router.adapters[CLAUDE_HAIKU.name] = adapter
+
+        assert self._select(router) != CLAUDE_HAIKU.name
+
+    def test_telemetry_persists_across_instances(self, tmp_path):
+        path = tmp_path / "telemetry.json"
+        first = RouterTelemetry(state_path=path)
+        first.record(GPT_4O, self._response(1_000, ttft=100))
+
+        second = RouterTelemetry(state_path=path)
+        stats = second.get_stats(GPT_4O)
+
+        assert stats.samples == 1
+        assert list(stats.recent_latencies) == [1_000.0]
+
+    def test_default_telemetry_persists_across_routers(self, tmp_path, monkeypatch):
+        path = tmp_path / "router_telemetry.json"
+        monkeypatch.setenv("MYCODER_ROUTER_TELEMETRY", str(path))
+        router = ModelRouter(failure_memory=MagicMock())
+        router.telemetry.record(GPT_4O, self._response(1_000, ttft=100))
+
+        restarted = ModelRouter(failure_memory=MagicMock())
+
+        assert router.telemetry.state_path == path
+        assert restarted.telemetry.get_stats(GPT_4O).samples == 1
+
+    @pytest.mark.asyncio
+    async def test_telemetry_saves_debounced_off_loop(self, tmp_path):
+        import asyncio
+        import json
+        import threading
+
+        path = tmp_path / "telemetry.json"
+        telemetry = RouterTelemetry(state_path=path, save_delay=0.01)
+        writers = []
+        write = telemetry._write_state
+
+        def tracking_write(data):
+            writers.append(threading.current_thread())
+            write(data)
+
+        telemetry._write_state = tracking_write
+        for _ in range(3):
+            telemetry.record(GPT_4O, self._response(1_000, ttft=100))
+        assert not path.exists()
+
+        while not path.exists():
+            await asyncio.sleep(0.01)
+
+        assert len(writers) == 1
+        assert writers[0] is not threading.main_thread()
+        assert json.loads(path.read_text())[GPT_4O.name]["samples"] == 3
+
+    @pytest.mark.asyncio
+    async def test_adapter_exception_recorded_as_error(self, router, telemetry):
+        adapter = router.adapters[GPT_4O.name]
+        adapter.query = AsyncMock(side_effect=ConnectionError("reset"))
+
+        with pytest.raises(ConnectionError):
+            await router._query_adapter(adapter, prompt="hi")
+
+        stats = telemetry.get_stats(GPT_4O)
+        assert stats.samples == 1
+        assert stats.error_rate > 0
@@ -0,0 +1,149 @@
+"""Unit tests for the single-pass PatternEngine."""
+
+import importlib.util
+import re
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from mycoder.router.intent_classifier import IntentClassifier
+from mycoder.router.pattern_engine import PatternEngine
+
+ROUTER_PATH = Path(__file__).parents[2] / "mycoder-chat" / "backend" / "router.py"
+
+# Prompts collected from CLI and chat sessions (English and Czech)
+PROMPT_CORPUS = [
+    "Refactor the authentication module to use dependency injection",
+    "Fix the typo in README",
+    "Review all changes for regressions before the release",
+    "Why does the worker crash with a KeyError on startup?",
+    "Add a docstring to parse_config",
+    "Rename get_user to fetch_user across the codebase",
+    "Update the version constant to 2.3.0",
+    "Implement a plugin system for custom tools",
+    "Optimize the database query, it is a bottleneck",
+    "Check the logs and find why the deploy failed",
+    "Migrate the settings from JSON to TOML",
+    "What is the latest news about Python 3.13?",
+    "Jak nastavit virtualenv pro tento projekt?",
+    "Přelož tento odstavec do angličtiny",
+    "Translate this paragraph from Czech to English",
+    "Transcribe meeting.mp3 please",
+    "Zapni světlo v obýváku a ztlum lampu",
+    "What did we discuss yesterday about the API?",
+    "Vygeneruj diagram architektury",
+    "Generate an image of a robot writing code",
+    "Debug error in auth.py",
+    "Write a function that parses ISO dates",
+    "Can you explain how asyncio.gather works?",
+    "Make a multi-file change to split utils into modules",
+    "Format the code in src/ with black",
+    "Analyze the security of the token refresh flow",
+    "git commit the staged changes with a good message",
+    "Turn off the kitchen light",
+    "Hello, how are you today?",
+    "Improve test coverage of the router and testuj edge cases",
+]
+
+
+def _load_chat_router():
+    spec = importlib.util.spec_from_file_location("chat_router", ROUTER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["chat_router"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _naive_match(categories, text):
+    """Reference implementation: every pattern searched separately."""
+    matched = {}
+    for category, patterns in categories.items():
+        for spec in patterns:
+            source, label = spec if isinstance(spec, tuple) else (spec, spec)
+            if re.search(source, text.lower(), re.IGNORECASE):
+                matched.setdefault(category, []).append(label)
+    return matched
+
+
+CLASSIFIER_CATEGORIES = {
+    "complex": IntentClassifier.COMPLEX_PATTERNS,
+    "simple": IntentClassifier.SIMPLE_PATTERNS,
+    "review": IntentClassifier.REVIEW_PATTERNS,
+}
+
+
+class TestPatternEngine:
+    def test_returns_all_matched_categories(self):
+        engine = PatternEngine(
+            {"code": [r"\b(fix|debug)\b"], "docs": [r"\b(readme|docs)\b"]}
+        )
+        result = engine.match("Fix the README")
+        assert set(result.categories) == {"code", "docs"}
+
+    def test_word_boundaries_respected(self):
+        engine = PatternEngine({"code": [r"\b(fix)\b"], "sub": [r"(fix)"]})
+        result = engine.match("prefix handling")
+        assert "code" not in result
+        assert "sub" in result
+
+    def test_extension_patterns(self):
+        engine = PatternEngine({"code": [r"\.(py|js)\b"]})
+        assert "code" in engine.match("look at main.py please")
+        assert "code" not in engine.match("look at main.pyc")
+
+    def test_regex_tail_verified(self):
+        engine = PatternEngine(
+            {"debug": [(r"\b(debug|why)\b.*\b(crash|error)\b", "Complex debugging")]}
+        )
+        assert engine.match("why does it crash").labels("debug") == [
+            "Complex debugging"
+        ]
+        assert "debug" not in engine.match("why is the sky blue")
+
+    def test_optional_leading_literal_falls_back_to_regex(self):
+        engine = PatternEngine({"color": [r"\bcolou?r\b"], "either": [r"\bfoo\b|bar"]})
+        assert "color" in engine.match("pick a color")
+        assert "either" in engine.match("crowbar")
+
+    @pytest.mark.parametrize("prompt", PROMPT_CORPUS)
+    def test_classifier_patterns_match_reference(self, prompt):
+        engine = PatternEngine(CLASSIFIER_CATEGORIES)
+        assert engine.match(prompt).categories == _naive_match(
+            CLASSIFIER_CATEGORIES, prompt
+        )
+
+    @pytest.mark.parametrize("prompt", PROMPT_CORPUS)
+    def test_chat_router_patterns_match_reference(self, prompt):
+        patterns = _load_chat_router().MiniOrchestrator.PATTERNS
+        engine = PatternEngine(patterns)
+        assert engine.match(prompt).categories == _naive_match(patterns, prompt)
+
+    def test_chat_router_reports_categories(self):
+        orchestrator = _load_chat_router().MiniOrchestrator()
+        routing = orchestrator.route_request("Debug the failing git commit hook")
+        assert routing["mode"] == "debug"
+        assert routing["categories"] == ["code"]
+
+
+@pytest.mark.performance
+def test_benchmark_against_per_pattern_search():
+    """Single pass should beat per-pattern re.search over the corpus."""
+    patterns = _load_chat_router().MiniOrchestrator.PATTERNS
+    engine = PatternEngine(patterns)
+    rounds = 50
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for prompt in PROMPT_CORPUS:
+            _naive_match(patterns, prompt)
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for prompt in PROMPT_CORPUS:
+            engine.match(prompt)
+    single_pass = time.perf_counter() - start
+
+    assert single_pass < naive
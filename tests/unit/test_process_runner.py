@@ -0,0 +1,174 @@
+"""Unit tests for the async process runner."""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from mycoder.self_evolve.test_runner import TestRunner as SelfEvolveTestRunner
+from mycoder.utils.process_runner import OutputBuffer, ProcessRunner
+
+
+def _python(code: str):
+    return [sys.executable, "-c", code]
+
+
+@pytest.mark.asyncio
+async def test_run_streams_lines_to_callbacks():
+    runner = ProcessRunner()
+    seen = []
+
+    async def on_stderr(line):
+        seen.append(("err", line.strip()))
+
+    result = await runner.run(
+        _python(
+            "import sys\n"
+            "print('one', flush=True)\n"
+            "print('oops', file=sys.stderr, flush=True)\n"
+            "print('two', flush=True)\n"
+            "sys.exit(3)"
+        ),
+        on_stdout=lambda line: seen.append(("out", line.strip())),
+        on_stderr=on_stderr,
+    )
+
+    assert result.returncode == 3
+    assert not result.success
+    assert result.stdout.split() == ["one", "two"]
+    assert ("out", "one") in seen and ("err", "oops") in seen
+
+
+def test_output_buffer_keeps_tail():
+    buffer = OutputBuffer(max_bytes=12)
+    for i in range(10):
+        buffer.append(f"line{i}\n".encode())
+
+    text = buffer.text()
+    assert text.endswith("line8\nline9\n")
+    assert "bytes truncated" in text
+    assert buffer.dropped == 48
+
+
+def test_output_buffer_keeps_head_and_tail():
+    buffer = OutputBuffer(max_bytes=12, head_bytes=6)
+    for i in range(10):
+        buffer.append(f"line{i}\n".encode())
+
+    assert buffer.text() == "line0\n[... 42 bytes truncated ...]\nline8\nline9\n"
+    assert OutputBuffer(max_bytes=12, head_bytes=6).text() == ""
+
+
+@pytest.mark.asyncio
+async def test_long_lines_are_kept_whole():
+    runner = ProcessRunner()
+    code = "import sys; sys.stdout.write('x' * 200_000 + '\\nend\\n')"
+    chunks = []
+
+    result = await runner.run(_python(code), on_stdout=chunks.append)
+    assert result.stdout == "x" * 200_000 + "\nend\n"
+    assert result.stdout_truncated == 0
+    assert "".join(chunks) == result.stdout
+
+    capped = await runner.run(_python(code), max_output_bytes=1000)
+    assert capped.stdout.endswith("]\n" + "x" * 995 + "\nend\n")
+    assert capped.stdout_truncated == 200_005 - 1000
+
+
+def _alive(pid: int) -> bool:
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return False
+    # Zombies are dead; only the reaper is missing
+    return stat.rsplit(")", 1)[1].split()[0] != "Z"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not Path("/proc/self/stat").exists(), reason="needs /proc")
+async def test_timeout_kills_whole_process_group():
+    runner = ProcessRunner(kill_grace_seconds=0.5)
+    pids = []
+
+    result = await runner.run(
+        ["/bin/sh", "-c", "sleep 30 & echo $!; wait"],
+        timeout=0.5,
+        on_stdout=lambda line: pids.append(int(line)),
+    )
+
+    assert result.timed_out
+    for _ in range(50):
+        if not _alive(pids[0]):
+            break
+        await asyncio.sleep(0.05)
+    assert not _alive(pids[0])
+
+
+@pytest.mark.asyncio
+async def test_run_timeout_kills_process():
+    runner = ProcessRunner(kill_grace_seconds=0.5)
+    started = time.perf_counter()
+
+    result = await runner.run(
+        _python("import time; print('start', flush=True); time.sleep(30)"),
+        timeout=0.5,
+    )
+
+    assert result.timed_out
+    assert result.stdout.strip() == "start"
+    assert time.perf_counter() - started < 5
+
+
+@pytest.mark.asyncio
+async def test_cancel_kills_process():
+    runner = ProcessRunner(kill_grace_seconds=0.5)
+    task = asyncio.create_task(runner.run(_python("import time; time.sleep(30)")))
+    await asyncio.sleep(0.3)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert runner.running == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    runner = ProcessRunner(max_concurrency=1)
+    peak = 0
+
+    async def run():
+        return await runner.run(_python("import time; time.sleep(0.2)"))
+
+    async def watch():
+        nonlocal peak
+        for _ in range(20):
+            peak = max(peak, runner.running)
+            await asyncio.sleep(0.02)
+
+    await asyncio.gather(run(), run(), watch())
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_test_runner_does_not_block_loop(tmp_path):
+    runner = SelfEvolveTestRunner(tmp_path, timeout_seconds=10)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    summary = await runner.run(
+        [f'"{sys.executable}" -c "import time; time.sleep(0.3)"', ""]
+    )
+    ticking.cancel()
+
+    assert summary.results[0].exit_code == 0
+    assert summary.results[1].stderr == "Command is empty"
+    assert ticks > 10
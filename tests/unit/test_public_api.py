@@ -1,8 +1,12 @@
 """Public API surface tests for the mycoder package."""
 
+import os
+import subprocess
 import sys
 from pathlib import Path
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
 import mycoder
@@ -25,3 +29,63 @@ def test_public_api_exports():
 def test_version_matches_expected():
     """Package version should stay in sync with release versioning."""
     assert mycoder.__version__ == "2.2.0"
+
+
+def _run_isolated(code: str) -> str:
+    src = Path(__file__).parent.parent.parent / "src"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(src)},
+        check=True,
+    )
+    return result.stdout
+
+
+def test_package_import_is_lazy():
+    """Importing the package must not load the heavy dependency graph."""
+    loaded = _run_isolated(
+        "import sys, mycoder\n"
+        "print(' '.join(sorted(sys.modules)))\n"
+        "mycoder.MyCoder\n"
+        "print('mycoder.mycoder' in sys.modules)"
+    ).split("\n")
+    modules = set(loaded[0].split())
+
+    for heavy in ["aiohttp", "aiosqlite", "rich", "mycoder.api_providers"]:
+        assert heavy not in modules
+    assert loaded[1] == "True"
+    assert "StorageManager" in dir(mycoder)
+    with pytest.raises(AttributeError):
+        mycoder.NoSuchThing
+
+
+def test_router_imports_only_configured_providers():
+    loaded = _run_isolated(
+        "import sys\n"
+        "from mycoder.api_providers import APIProviderConfig, APIProviderRouter\n"
+        "from mycoder.api_providers import APIProviderType\n"
+        "APIProviderRouter([APIProviderConfig(APIProviderType.OLLAMA_LOCAL)])\n"
+        "print(' '.join(m for m in sys.modules if m.startswith('mycoder.providers.llm.')))"
+    )
+
+    assert loaded.split() == ["mycoder.providers.llm.ollama"]
+
+
+def test_cli_help_does_not_load_the_interactive_cli():
+    loaded = _run_isolated(
+        "import contextlib, io, sys\n"
+        "from mycoder.cli_entry import main\n"
+        "with contextlib.redirect_stdout(io.StringIO()) as out:\n"
+        "    try:\n"
+        "        main(['--help'])\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        "print('usage: mycoder' in out.getvalue())\n"
+        "print(' '.join(m for m in ('rich', 'psutil', 'prompt_toolkit',"
+        " 'mycoder.cli_interactive') if m in sys.modules))"
+    ).split("\n")
+
+    assert loaded[0] == "True"
+    assert loaded[1] == ""
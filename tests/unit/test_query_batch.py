@@ -0,0 +1,193 @@
+"""Unit tests for APIProviderRouter.query_batch."""
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from mycoder.api_providers import (
+    APIProviderConfig,
+    APIProviderRouter,
+    APIProviderStatus,
+    APIProviderType,
+    APIResponse,
+    BaseAPIProvider,
+)
+
+
+class BatchProvider(BaseAPIProvider):
+    """Provider recording peak concurrency and failing selected prompts."""
+
+    def __init__(
+        self,
+        provider_type: APIProviderType,
+        delay: float = 0.01,
+        fail: tuple = (),
+        max_concurrency: int = 2,
+    ):
+        super().__init__(
+            APIProviderConfig(
+                provider_type=provider_type,
+                config={"max_concurrency": max_concurrency},
+            )
+        )
+        self.rate_limiter = None
+        self.delay = delay
+        self.fail = fail
+        self.prompts: List[str] = []
+        self.active = 0
+        self.peak = 0
+
+    async def query(
+        self, prompt: str, context: Dict[str, Any] = None, **kwargs
+    ) -> APIResponse:
+        self.prompts.append(prompt)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if prompt in self.fail:
+            return APIResponse(
+                success=False,
+                content="",
+                provider=self.config.provider_type,
+                error="Server overloaded",
+            )
+        return APIResponse(
+            success=True,
+            content=f"{self.config.provider_type.value}:{prompt}",
+            provider=self.config.provider_type,
+        )
+
+    async def health_check(self) -> APIProviderStatus:
+        return APIProviderStatus.HEALTHY
+
+
+def _router(*providers: BaseAPIProvider) -> APIProviderRouter:
+    router = APIProviderRouter([])
+    router.providers = list(providers)
+    router.fallback_chain = [p.config.provider_type for p in providers]
+    return router
+
+
+async def _collect(router, prompts, **kwargs):
+    return [result async for result in router.query_batch(prompts, **kwargs)]
+
+
+@pytest.mark.asyncio
+async def test_batch_spreads_work_and_respects_concurrency():
+    fast = BatchProvider(APIProviderType.GEMINI, delay=0.01, max_concurrency=3)
+    slow = BatchProvider(APIProviderType.OLLAMA_LOCAL, delay=0.05, max_concurrency=1)
+    router = _router(fast, slow)
+    prompts = [f"issue-{i}" for i in range(30)]
+
+    results = await _collect(router, prompts)
+
+    assert sorted(r.index for r in results) == list(range(30))
+    assert all(r.success for r in results)
+    assert all(r.response.metadata["batch_index"] == r.index for r in results)
+    assert fast.peak == 3 and slow.peak == 1
+    assert len(fast.prompts) > len(slow.prompts) > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_prompts_retry_on_other_provider():
+    flaky = BatchProvider(APIProviderType.GEMINI, fail=("b", "c"))
+    backup = BatchProvider(APIProviderType.OLLAMA_LOCAL, fail=("c",))
+    router = _router(flaky, backup)
+
+    results = {
+        r.prompt: r for r in await _collect(router, ["a", "b", "c"], retry_backoff=0.01)
+    }
+
+    assert results["a"].success
+    assert results["b"].response.provider == APIProviderType.OLLAMA_LOCAL
+    assert results["b"].response.metadata["fallback_used"] is True
+    assert not results["c"].success
+    assert results["c"].response.provider == APIProviderType.RECOVERY
+    assert set(results["c"].response.metadata["attempted_errors"]) == {
+        "gemini",
+        "ollama_local",
+    }
+
+
+@pytest.mark.asyncio
+async def test_results_stream_in_completion_order():
+    provider = BatchProvider(APIProviderType.GEMINI, max_concurrency=2)
+
+    async def query(prompt, context=None, **kwargs):
+        await asyncio.sleep(0.1 if prompt == "slow" else 0.01)
+        return APIResponse(
+            success=True, content=prompt, provider=provider.config.provider_type
+        )
+
+    provider.query = query
+    results = await _collect(_router(provider), ["slow", "fast"])
+    assert [r.prompt for r in results] == ["fast", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_retried_after_backoff():
+    provider = BatchProvider(APIProviderType.GEMINI, fail=("a",))
+    query = provider.query
+
+    async def flaky_once(prompt, context=None, **kwargs):
+        if provider.prompts.count(prompt) == 1:
+            provider.fail = ()
+        return await query(prompt, context, **kwargs)
+
+    provider.query = flaky_once
+    started = asyncio.get_running_loop().time()
+    results = await _collect(_router(provider), ["a"], retry_backoff=0.05)
+
+    assert results[0].success
+    assert provider.prompts == ["a", "a"]
+    assert asyncio.get_running_loop().time() - started >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_retries_are_bounded_and_skip_permanent_errors():
+    overloaded = BatchProvider(APIProviderType.GEMINI, fail=("a",))
+    results = await _collect(
+        _router(overloaded), ["a"], max_retries=2, retry_backoff=0.01
+    )
+    assert not results[0].success
+    assert overloaded.prompts == ["a", "a", "a"]
+
+    unauthorized = BatchProvider(APIProviderType.GEMINI)
+
+    async def reject(prompt, context=None, **kwargs):
+        unauthorized.prompts.append(prompt)
+        return APIResponse(
+            success=False,
+            content="",
+            provider=unauthorized.config.provider_type,
+            error="Invalid API key",
+        )
+
+    unauthorized.query = reject
+    results = await _collect(_router(unauthorized), ["a"], retry_backoff=0.01)
+    assert not results[0].success
+    assert unauthorized.prompts == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_provider_is_skipped():
+    broken = BatchProvider(APIProviderType.GEMINI)
+    for _ in range(broken.circuit_breaker.failure_threshold):
+        broken.circuit_breaker.record_failure()
+    healthy = BatchProvider(APIProviderType.OLLAMA_LOCAL)
+
+    results = await _collect(_router(broken, healthy), ["a", "b"])
+
+    assert broken.prompts == []
+    assert all(r.response.provider == APIProviderType.OLLAMA_LOCAL for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_without_providers_fails_every_prompt():
+    results = await _collect(_router(), ["a", "b"])
+    assert [r.success for r in results] == [False, False]
+    assert "no provider available" in results[0].response.error
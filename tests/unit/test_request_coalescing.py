@@ -0,0 +1,138 @@
+"""Unit tests for single-flight coalescing in APIProviderRouter."""
+
+import asyncio
+from typing import Any, Dict
+
+import pytest
+
+from mycoder.api_providers import (
+    APIProviderConfig,
+    APIProviderRouter,
+    APIProviderStatus,
+    APIProviderType,
+    APIResponse,
+    BaseAPIProvider,
+)
+
+
+class SlowProvider(BaseAPIProvider):
+    """Provider that streams two chunks and counts upstream calls."""
+
+    def __init__(self, config: APIProviderConfig, delay: float = 0.05):
+        super().__init__(config)
+        self.delay = delay
+        self.calls = 0
+
+    async def query(
+        self, prompt: str, context: Dict[str, Any] = None, **kwargs
+    ) -> APIResponse:
+        self.calls += 1
+        callback = kwargs.get("stream_callback")
+        if callback:
+            callback("hel")
+        await asyncio.sleep(self.delay)
+        if callback:
+            callback("lo")
+        return APIResponse(
+            success=True,
+            content=f"answer:{prompt}",
+            provider=self.config.provider_type,
+            metadata={"calls": self.calls},
+        )
+
+    async def health_check(self) -> APIProviderStatus:
+        return APIProviderStatus.HEALTHY
+
+
+def _router(delay: float = 0.05, **kwargs):
+    provider = SlowProvider(
+        APIProviderConfig(provider_type=APIProviderType.OLLAMA_LOCAL), delay
+    )
+    router = APIProviderRouter([], **kwargs)
+    router.providers = [provider]
+    router.fallback_chain = [provider.config.provider_type]
+    return router, provider
+
+
+@pytest.mark.asyncio
+async def test_identical_queries_share_one_call():
+    router, provider = _router()
+    context = {"session_id": "s1", "timestamp": 1.0}
+
+    responses = await asyncio.gather(
+        *(
+            router.query("same", context={**context, "timestamp": float(i)})
+            for i in range(5)
+        )
+    )
+
+    assert provider.calls == 1
+    assert all(r.content == "answer:same" for r in responses)
+    assert sum(r.metadata["coalesced"] for r in responses) == 4
+    # Each caller owns its response object
+    responses[0].metadata["edited"] = True
+    assert "edited" not in responses[1].metadata
+
+    metrics = router.get_coalescing_metrics()
+    assert metrics["upstream_queries"] == 1
+    assert metrics["coalesced_queries"] == 4
+    assert metrics["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_different_requests_are_not_coalesced():
+    router, provider = _router()
+    await asyncio.gather(
+        router.query("a", context={"session_id": "s1"}),
+        router.query("a", context={"session_id": "s2"}),
+        router.query("a", context={"session_id": "s1"}, max_tokens=10),
+        router.query("b", context={"session_id": "s1"}),
+    )
+    assert provider.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_stream_chunks_fan_out_to_every_caller():
+    router, provider = _router()
+    first, second, late = [], [], []
+
+    async def join_late():
+        await asyncio.sleep(0.01)
+        return await router.query("q", stream_callback=late.append)
+
+    await asyncio.gather(
+        router.query("q", stream_callback=first.append),
+        router.query("q", stream_callback=second.append),
+        join_late(),
+    )
+
+    assert provider.calls == 1
+    assert first == second == late == ["hel", "lo"]
+
+
+@pytest.mark.asyncio
+async def test_opt_out_and_sequential_calls_hit_upstream():
+    router, provider = _router()
+    await asyncio.gather(router.query("q"), router.query("q", coalesce=False))
+    await router.query("q")
+    assert provider.calls == 3
+
+    disabled, disabled_provider = _router(coalesce_requests=False)
+    await asyncio.gather(disabled.query("q"), disabled.query("q"))
+    assert disabled_provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_follower_does_not_cancel_shared_call():
+    router, provider = _router(delay=0.1)
+    leader = asyncio.ensure_future(router.query("q"))
+    follower = asyncio.ensure_future(router.query("q"))
+    await asyncio.sleep(0.01)
+
+    follower.cancel()
+    response = await leader
+
+    assert response.success
+    assert provider.calls == 1
+    with pytest.raises(asyncio.CancelledError):
+        await follower
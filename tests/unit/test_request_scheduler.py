@@ -0,0 +1,218 @@
+"""Unit tests for priority scheduling and admission control."""
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from mycoder.api_providers import (
+    APIProviderConfig,
+    APIProviderRouter,
+    APIProviderStatus,
+    APIProviderType,
+    APIResponse,
+    BaseAPIProvider,
+    ProviderBusyError,
+    RequestPriority,
+    RequestScheduler,
+)
+from mycoder.providers.scheduler import ProviderQueue
+
+
+async def _hold(queue: ProviderQueue, order: List[str], name: str, **kwargs):
+    async with queue.slot(**kwargs):
+        order.append(name)
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_priority_classes_served_in_order():
+    queue = ProviderQueue("p", max_in_flight=1)
+    order: List[str] = []
+    await queue.acquire()
+
+    tasks = [
+        asyncio.create_task(
+            _hold(queue, order, "batch", priority=RequestPriority.BATCH)
+        ),
+        asyncio.create_task(
+            _hold(queue, order, "agent", priority=RequestPriority.AGENT)
+        ),
+        asyncio.create_task(
+            _hold(queue, order, "interactive", priority=RequestPriority.INTERACTIVE)
+        ),
+    ]
+    await asyncio.sleep(0)
+    queue.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["interactive", "agent", "batch"]
+
+
+@pytest.mark.asyncio
+async def test_sessions_share_fairly_within_priority():
+    queue = ProviderQueue("p", max_in_flight=1)
+    order: List[str] = []
+    await queue.acquire()
+
+    tasks = [
+        asyncio.create_task(_hold(queue, order, "heavy", session_id="heavy"))
+        for _ in range(4)
+    ]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(_hold(queue, order, "light", session_id="light")))
+    await asyncio.sleep(0)
+    queue.release()
+    await asyncio.gather(*tasks)
+
+    # The light session's only request is not stuck behind the heavy backlog
+    assert order.index("light") <= 1
+
+
+@pytest.mark.asyncio
+async def test_admission_rejects_low_priority_first():
+    queue = ProviderQueue("p", max_in_flight=1, max_queue=4)
+    await queue.acquire()
+    waiters = [
+        asyncio.create_task(queue.acquire(RequestPriority.INTERACTIVE))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+
+    with pytest.raises(ProviderBusyError):
+        await queue.acquire(RequestPriority.BATCH)
+    extra = asyncio.create_task(queue.acquire(RequestPriority.INTERACTIVE))
+    await asyncio.sleep(0)
+    assert queue.queued == 3
+
+    metrics = queue.metrics()
+    assert metrics["priorities"]["batch"]["rejected"] == 1
+    for task in waiters + [extra]:
+        task.cancel()
+    await asyncio.gather(*waiters, extra, return_exceptions=True)
+    assert queue.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_returns_busy_and_frees_nothing():
+    queue = ProviderQueue("p", max_in_flight=1, queue_timeout=0.05)
+    await queue.acquire()
+
+    with pytest.raises(ProviderBusyError, match="no slot"):
+        await queue.acquire(RequestPriority.AGENT)
+    assert queue.in_flight == 1
+    assert queue.metrics()["priorities"]["agent"]["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_wait_past_queue_timeout():
+    queue = ProviderQueue("p", max_in_flight=1, queue_timeout=0.01)
+    await queue.acquire()
+
+    waiter = asyncio.create_task(queue.acquire(RequestPriority.INTERACTIVE))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    queue.release()
+    assert await waiter >= 50
+    assert queue.metrics()["priorities"]["interactive"]["timed_out"] == 0
+
+
+@pytest.mark.asyncio
+async def test_finished_session_clocks_are_pruned():
+    queue = ProviderQueue("p", max_in_flight=1)
+    await queue.acquire()
+
+    for index in range(3 * ProviderQueue.SESSION_PRUNE_THRESHOLD):
+        waiter = asyncio.create_task(queue.acquire(session_id=f"s{index}"))
+        await asyncio.sleep(0)
+        queue.release()
+        await waiter
+
+    assert len(queue._session_finish) <= ProviderQueue.SESSION_PRUNE_THRESHOLD + 1
+
+
+class SlowProvider(BaseAPIProvider):
+    def __init__(self, provider_type: APIProviderType, delay: float = 0.05):
+        super().__init__(
+            APIProviderConfig(
+                provider_type=provider_type, config={"max_concurrency": 1}
+            )
+        )
+        self.rate_limiter = None
+        self.delay = delay
+        self.prompts: List[str] = []
+
+    async def query(
+        self, prompt: str, context: Dict[str, Any] = None, **kwargs
+    ) -> APIResponse:
+        assert "priority" not in kwargs
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        return APIResponse(
+            success=True, content=prompt, provider=self.config.provider_type
+        )
+
+    async def health_check(self) -> APIProviderStatus:
+        return APIProviderStatus.HEALTHY
+
+
+def _router(*providers, **scheduler_kwargs) -> APIProviderRouter:
+    router = APIProviderRouter([], scheduler=RequestScheduler(**scheduler_kwargs))
+    router.providers = list(providers)
+    router.fallback_chain = [p.config.provider_type for p in providers]
+    return router
+
+
+@pytest.mark.asyncio
+async def test_router_serves_interactive_before_batch():
+    provider = SlowProvider(APIProviderType.OLLAMA_LOCAL)
+    router = _router(provider)
+
+    first = asyncio.create_task(router.query("running"))
+    await asyncio.sleep(0.01)
+    batch = asyncio.create_task(router.query("batch", priority="batch"))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(router.query("interactive"))
+    await asyncio.gather(first, batch, interactive)
+
+    assert provider.prompts == ["running", "interactive", "batch"]
+    assert interactive.result().metadata["queue_wait_ms"] > 0
+    metrics = router.get_scheduler_metrics()["ollama_local"]
+    assert metrics["priorities"]["batch"]["admitted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_router_falls_through_busy_provider():
+    local = SlowProvider(APIProviderType.OLLAMA_LOCAL, delay=0.1)
+    remote = SlowProvider(APIProviderType.GEMINI, delay=0.01)
+    router = _router(local, remote, max_queue=0)
+
+    first, second = await asyncio.gather(
+        router.query("a", coalesce=False), router.query("a", coalesce=False)
+    )
+    assert {first.provider, second.provider} == {
+        APIProviderType.OLLAMA_LOCAL,
+        APIProviderType.GEMINI,
+    }
+
+
+@pytest.mark.asyncio
+async def test_router_reports_busy_when_every_provider_is_full():
+    provider = SlowProvider(APIProviderType.OLLAMA_LOCAL, delay=0.1)
+    router = _router(provider, max_queue=0)
+
+    first, second = await asyncio.gather(
+        router.query("a", coalesce=False), router.query("b")
+    )
+    assert first.success
+    assert not second.success
+    assert second.metadata["busy"] is True
+    assert "busy" in second.error
+
+
+def test_priority_parse():
+    assert RequestPriority.parse(None) is RequestPriority.INTERACTIVE
+    assert RequestPriority.parse("batch") is RequestPriority.BATCH
+    with pytest.raises(ValueError):
+        RequestPriority.parse("urgent")
@@ -0,0 +1,246 @@
+"""Unit tests for the pipelined Architect → Worker → Reviewer flow."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from mycoder.router.adapters import CLAUDE_OPUS_4, CLAUDE_SONNET_4, GEMINI_1_5_PRO
+from mycoder.router.adapters.base import AdapterResponse
+from mycoder.router.model_router import ModelRouter
+from mycoder.router.pipeline import (
+    StreamingCodeBlockParser,
+    StreamingStepParser,
+    review_approved,
+)
+from mycoder.router.task_context import BudgetTier, ModelRole
+from mycoder.router.telemetry import RouterTelemetry
+
+COMPLEX_PROMPT = "Architect and implement a complex feature."
+
+
+class ScriptedAdapter:
+    """Adapter that streams scripted chunks, yielding between them."""
+
+    def __init__(self, model_info, respond, events):
+        self.model_info = model_info
+        self.respond = respond
+        self.events = events
+
+    async def query(self, prompt, system_prompt=None, context=None, **kwargs):
+        stream_callback = kwargs.get("stream_callback")
+        self.events.append(("start", self.model_info.name, prompt))
+        chunks = self.respond(prompt)
+        for chunk in chunks:
+            if isinstance(chunk, float):
+                await asyncio.sleep(chunk)
+                continue
+            if stream_callback:
+                stream_callback(chunk)
+            await asyncio.sleep(0)
+        self.events.append(("end", self.model_info.name, prompt))
+        return AdapterResponse(
+            success=True,
+            content="".join(c for c in chunks if isinstance(c, str)),
+            model_name=self.model_info.name,
+            input_tokens=10,
+            output_tokens=10,
+            cost_usd=0.01,
+            duration_ms=10,
+        )
+
+
+def _router(architect, worker, reviewer, tmp_path):
+    router = ModelRouter(
+        default_budget=BudgetTier.UNLIMITED,
+        telemetry=RouterTelemetry(state_path=tmp_path / "telemetry.json"),
+        failure_memory=MagicMock(),
+    )
+    for adapter in (architect, worker, reviewer):
+        router.adapters[adapter.model_info.name] = adapter
+    return router
+
+
+def test_step_parser_emits_completed_steps_only():
+    parser = StreamingStepParser()
+
+    assert parser.feed("Plan:\n1. Create model") == []
+    assert parser.feed("\n2. Add") == [(1, "1. Create model")]
+    assert parser.feed(" API\n3) Tests\n") == []
+    assert parser.feed("3. Tests\n") == [(2, "2. Add API\n3) Tests")]
+    assert parser.finish() == [
+        (1, "1. Create model"),
+        (2, "2. Add API\n3) Tests"),
+        (3, "3. Tests"),
+    ]
+
+
+def test_step_parser_keeps_numbered_sub_items_in_their_step():
+    plan = (
+        "Step 1: Extend the user model\n"
+        "  1. add fields\n"
+        "  2. add validation\n"
+        "Step 2: Expose the API\n"
+        "1. route\n"
+        "2) serializer\n"
+    )
+    parser = StreamingStepParser()
+
+    streamed = [step for char in plan for step in parser.feed(char)]
+
+    assert streamed == [
+        (1, "Step 1: Extend the user model\n  1. add fields\n  2. add validation")
+    ]
+    assert parser.finish() == [
+        (1, "Step 1: Extend the user model\n  1. add fields\n  2. add validation"),
+        (2, "Step 2: Expose the API\n1. route\n2) serializer"),
+    ]
+
+
+def test_step_parser_reads_step_number_once_its_line_is_complete():
+    parser = StreamingStepParser()
+
+    assert parser.feed("Step 1") == []
+    assert parser.feed("2: Model\nStep 13: API\n") == [(12, "Step 12: Model")]
+    assert parser.finish() == [(12, "Step 12: Model"), (13, "Step 13: API")]
+
+
+@pytest.mark.parametrize(
+    "review, approved",
+    [
+        ("LGTM", True),
+        ("LGTM. The code is correct.", True),
+        ("Looks fine.\n\n**Verdict:** APPROVED", True),
+        ("This is not approved yet.", False),
+        ("Approved in principle.\n\nChanges requested: add tests", False),
+        ("Found no bugs.", False),
+    ],
+)
+def test_review_verdict_needs_an_approving_verdict_line(review, approved):
+    assert review_approved(review) is approved
+
+
+def test_code_block_parser_emits_closed_blocks():
+    parser = StreamingCodeBlockParser()
+
+    assert parser.feed("Here:\n```python\nx = 1\n") == []
+    assert parser.feed("```\ntext\n```py\ny = 2\n```") == [
+        "```python\nx = 1\n```",
+        "```py\ny = 2\n```",
+    ]
+    assert parser.block_count == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_starts_before_architect_finishes(tmp_path):
+    events = []
+    architect = ScriptedAdapter(
+        CLAUDE_OPUS_4,
+        lambda p: ["## Plan\n1. Create model\n", "2. Add API\n", 0.05, "3. Tests"],
+        events,
+    )
+    worker = ScriptedAdapter(
+        CLAUDE_SONNET_4, lambda p: ["```python\ncode()\n```"], events
+    )
+    reviewer = ScriptedAdapter(GEMINI_1_5_PRO, lambda p: ["LGTM"], events)
+    router = _router(architect, worker, reviewer, tmp_path)
+
+    result = await router.orchestrate_full_task(
+        COMPLEX_PROMPT, budget=BudgetTier.UNLIMITED, pipelined=True
+    )
+
+    assert result.success
+    assert result.metadata["steps"] == 3
+    assert result.metadata["reviews"] == 3
+    assert result.task_context.review_passed is True
+    assert len(result.task_context.patches) == 3
+
+    architect_end = events.index(("end", CLAUDE_OPUS_4.name, COMPLEX_PROMPT))
+    first_worker = next(
+        i for i, e in enumerate(events) if e[:2] == ("start", CLAUDE_SONNET_4.name)
+    )
+    first_review = next(
+        i for i, e in enumerate(events) if e[:2] == ("start", GEMINI_1_5_PRO.name)
+    )
+    assert first_worker < architect_end
+    assert first_review < architect_end
+
+    roles = [h["role"] for h in result.task_context.execution_history]
+    assert roles.count(ModelRole.WORKER.value) == 3
+    assert roles.count(ModelRole.REVIEWER.value) == 3
+
+
+@pytest.mark.asyncio
+async def test_revised_step_cancels_in_flight_worker(tmp_path):
+    events = []
+    architect = ScriptedAdapter(
+        CLAUDE_OPUS_4,
+        lambda p: ["1. Use SQLite\n", "2. Add API\n", 0.05, "1. Use Postgres\n"],
+        events,
+    )
+
+    def work(prompt):
+        if "Current Step\n1. Use SQLite" in prompt:
+            return [1.0, "```\nsqlite()\n```"]
+        return ["```\nok()\n```"]
+
+    worker = ScriptedAdapter(CLAUDE_SONNET_4, work, events)
+    reviewer = ScriptedAdapter(GEMINI_1_5_PRO, lambda p: ["Approved"], events)
+    router = _router(architect, worker, reviewer, tmp_path)
+
+    result = await asyncio.wait_for(
+        router.orchestrate_full_task(
+            COMPLEX_PROMPT, budget=BudgetTier.UNLIMITED, pipelined=True
+        ),
+        timeout=0.8,
+    )
+
+    assert result.success
+    assert result.metadata["cancelled_steps"] == 1
+    assert result.task_context.plan_steps == ["1. Use Postgres", "2. Add API"]
+    assert all("sqlite" not in patch for patch in result.task_context.patches)
+
+
+@pytest.mark.asyncio
+async def test_non_complex_task_uses_sequential_loop(tmp_path):
+    events = []
+    architect = ScriptedAdapter(CLAUDE_OPUS_4, lambda p: ["plan"], events)
+    worker = ScriptedAdapter(CLAUDE_SONNET_4, lambda p: ["Fixed typo."], events)
+    reviewer = ScriptedAdapter(GEMINI_1_5_PRO, lambda p: ["LGTM"], events)
+    router = _router(architect, worker, reviewer, tmp_path)
+
+    result = await router.orchestrate_full_task(
+        "Fix typo in README", budget=BudgetTier.UNLIMITED, pipelined=True
+    )
+
+    assert "pipelined" not in result.metadata
+    assert len(result.task_context.execution_history) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_worker_cancels_its_reviews(tmp_path):
+    events = []
+    architect = ScriptedAdapter(CLAUDE_OPUS_4, lambda p: ["1. Build it\n"], events)
+    worker = ScriptedAdapter(CLAUDE_SONNET_4, lambda p: [], events)
+    reviewer = ScriptedAdapter(GEMINI_1_5_PRO, lambda p: [5.0, "LGTM"], events)
+
+    async def failing_query(prompt, system_prompt=None, context=None, **kwargs):
+        kwargs["stream_callback"]("```\npartial()\n```")
+        await asyncio.sleep(0.01)
+        raise RuntimeError("worker crashed")
+
+    worker.query = failing_query
+    router = _router(architect, worker, reviewer, tmp_path)
+
+    result = await asyncio.wait_for(
+        router.orchestrate_full_task(
+            COMPLEX_PROMPT, budget=BudgetTier.UNLIMITED, pipelined=True
+        ),
+        timeout=1.0,
+    )
+
+    assert not result.success
+    assert "worker crashed" in result.error
+    assert ("start", GEMINI_1_5_PRO.name) in [e[:2] for e in events]
+    pending = asyncio.all_tasks() - {asyncio.current_task()}
+    assert not [task for task in pending if not task.done()]
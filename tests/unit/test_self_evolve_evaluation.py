@@ -0,0 +1,111 @@
+"""Unit tests for pooled, parallel self-evolve proposal evaluation."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from mycoder.self_evolve.manager import SelfEvolveManager
+from mycoder.self_evolve.models import EvolveProposal
+from mycoder.self_evolve.sandbox import WorktreePool
+
+
+class DummyCoder:
+    async def process_request(self, prompt: str, **kwargs):
+        return {"content": "ok"}
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.email=t@example.com", "-c", "user.name=t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "value.py").write_text("VALUE = 1\n")
+    (tmp_path / ".gitignore").write_text(".mycoder/\n")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def _diff(repo: Path, content: str) -> str:
+    (repo / "src" / "value.py").write_text(content)
+    diff = _git(repo, "diff")
+    _git(repo, "checkout", "--", ".")
+    return diff
+
+
+def _proposal(proposal_id: str, diff: str, risk: float) -> EvolveProposal:
+    return EvolveProposal(
+        proposal_id=proposal_id,
+        status="proposed",
+        summary=proposal_id,
+        rationale="",
+        diff=diff,
+        created_at=EvolveProposal.now_iso(),
+        risk_score=risk,
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_and_resets_worktrees(repo: Path) -> None:
+    pool = WorktreePool(repo, size=1)
+    try:
+        async with pool.lease() as first:
+            (first / "src" / "value.py").write_text("VALUE = 99\n")
+            (first / "scratch.txt").write_text("leftover")
+            (first / ".mycoder").mkdir()
+            (first / ".mycoder" / "artefact.log").write_text("ignored")
+
+        async with pool.lease() as second:
+            assert second == first
+            assert (second / "src" / "value.py").read_text() == "VALUE = 1\n"
+            assert not (second / "scratch.txt").exists()
+            assert not (second / ".mycoder").exists()
+
+        assert (pool.created, pool.reused) == (1, 1)
+    finally:
+        await pool.close()
+    assert not first.exists()
+
+
+@pytest.mark.asyncio
+async def test_evaluate_proposals_ranks_by_risk(repo: Path) -> None:
+    config_dir = repo / ".mycoder" / "self_evolve"
+    config_dir.mkdir(parents=True)
+    check = "import sys; sys.path.insert(0, 'src'); import value; sys.exit(value.VALUE != 2)"
+    (config_dir / "config.json").write_text(
+        json.dumps(
+            {
+                "test_commands": [f'"{sys.executable}" -c "{check}"'],
+                "test_cache": False,
+            }
+        )
+    )
+    manager = SelfEvolveManager(DummyCoder(), repo)
+    manager.store.upsert(_proposal("risky", _diff(repo, "VALUE = 3\n"), 0.8))
+    manager.store.upsert(_proposal("safe", _diff(repo, "VALUE = 2\n"), 0.2))
+    manager.store.upsert(_proposal("broken", "diff --git a/x b/x\n", 0.5))
+
+    try:
+        results = await manager.evaluate_proposals()
+    finally:
+        await manager.close()
+
+    assert [r["proposal_id"] for r in results] == ["safe", "broken", "risky"]
+    assert results[0]["success"] is True
+    assert results[1]["success"] is False and "error" in results[1]
+    assert results[2]["success"] is False
+    assert manager.worktree_pool.created == 2
+    # Evaluation never touches the main checkout
+    assert (repo / "src" / "value.py").read_text() == "VALUE = 1\n"
@@ -0,0 +1,174 @@
+"""Unit tests for the self-evolve test runner."""
+
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from mycoder.self_evolve.signal_collector import SignalCollector
+from mycoder.self_evolve.test_runner import TestRunner as SelfEvolveTestRunner
+
+
+def _python(code: str) -> str:
+    return f'"{sys.executable}" -c "{code}"'
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.email=t@example.com", "-c", "user.name=t", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_commands_run_concurrently_in_order(tmp_path):
+    runner = SelfEvolveTestRunner(tmp_path, max_parallel=2)
+
+    started = time.perf_counter()
+    summary = await runner.run(
+        [
+            _python("import time; time.sleep(0.4); print('first')"),
+            _python("import time; time.sleep(0.4); print('second')"),
+        ]
+    )
+
+    assert time.perf_counter() - started < 0.75
+    assert [r.stdout.strip() for r in summary.results] == ["first", "second"]
+    assert not summary.failures()
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_streams_failure_and_skips_rest(tmp_path):
+    runner = SelfEvolveTestRunner(tmp_path, max_parallel=2)
+    collector = SignalCollector()
+
+    started = time.perf_counter()
+    summary = await runner.run(
+        [
+            _python(
+                "import time; print('FAILED tests/test_a.py::test_x', flush=True); "
+                "time.sleep(10)"
+            ),
+            _python("import time; time.sleep(10)"),
+            _python("print('never')"),
+        ],
+        on_failure=collector.record_failure,
+        fail_fast=True,
+    )
+
+    assert time.perf_counter() - started < 5
+    failing, stopped, queued = summary.results
+    assert failing.exit_code == 1
+    assert stopped.skipped and queued.skipped
+    assert summary.failures() == [failing]
+    assert "FAILED tests/test_a.py::test_x" in collector.reported_failures[0]
+    signal = collector.build_signal(summary)
+    assert signal.failure_output.startswith("Reported failures:")
+
+
+@pytest.mark.asyncio
+async def test_results_cached_until_tree_changes(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "module.py").write_text("x = 1\n")
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "init")
+
+    counter = tmp_path / "runs.txt"
+    command = _python(f"open(r'{counter}', 'a').write('run')")
+    runner = SelfEvolveTestRunner(repo, cache_dir=tmp_path / "cache")
+
+    first = await runner.run([command])
+    second = await runner.run([command])
+    assert not first.results[0].cached
+    assert second.results[0].cached
+    assert counter.read_text() == "run"
+
+    (repo / "module.py").write_text("x = 2\n")
+    third = await runner.run([command])
+    assert not third.results[0].cached
+    assert counter.read_text() == "runrun"
+
+
+@pytest.mark.asyncio
+async def test_failing_results_are_not_cached(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "module.py").write_text("x = 1\n")
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "init")
+
+    counter = tmp_path / "runs.txt"
+    command = _python(f"open(r'{counter}', 'a').write('run'); raise SystemExit(1)")
+    runner = SelfEvolveTestRunner(repo, cache_dir=tmp_path / "cache")
+
+    first = await runner.run([command])
+    second = await runner.run([command])
+    assert first.results[0].exit_code == second.results[0].exit_code == 1
+    assert not second.results[0].cached
+    assert counter.read_text() == "runrun"
+
+
+@pytest.mark.asyncio
+async def test_pytest_command_is_sharded_by_file(tmp_path):
+    tests_dir = tmp_path / "tests"
+    tests_dir.mkdir()
+    for name in ("a", "b", "c"):
+        (tests_dir / f"test_{name}.py").write_text(
+            "def test_one():\n    assert True\n\ndef test_two():\n    assert True\n"
+        )
+
+    runner = SelfEvolveTestRunner(tmp_path, shards=2)
+    summary = await runner.run(
+        [f'"{sys.executable}" -m pytest -q -p no:cacheprovider tests']
+    )
+
+    result = summary.results[0]
+    assert result.exit_code == 0, result.stdout + result.stderr
+    assert "# shard 1/2" in result.stdout and "# shard 2/2" in result.stdout
+    assert result.stdout.count("passed") == 2
+
+
+@pytest.mark.asyncio
+async def test_sharded_run_keeps_node_ids_and_option_values(tmp_path):
+    tests_dir = tmp_path / "tests"
+    (tests_dir / "stress").mkdir(parents=True)
+    for name in ("a", "b", "c"):
+        (tests_dir / f"test_{name}.py").write_text(
+            "def test_one():\n    assert True\n\ndef test_two():\n    assert True\n"
+        )
+    (tests_dir / "stress" / "test_load.py").write_text(
+        "def test_load():\n    assert False\n"
+    )
+
+    runner = SelfEvolveTestRunner(tmp_path, shards=2)
+    summary = await runner.run(
+        [
+            f'"{sys.executable}" -m pytest -q -p no:cacheprovider '
+            "--ignore tests/stress tests/test_a.py::test_one tests/test_b.py "
+            "tests/test_c.py"
+        ]
+    )
+
+    result = summary.results[0]
+    assert result.exit_code == 0, result.stdout + result.stderr
+    assert "# shard 2/2" in result.stdout
+    passed = [int(n) for n in re.findall(r"(\d+) passed", result.stdout)]
+    assert sum(passed) == 5
+
+
+def test_strip_never_drops_option_values(tmp_path):
+    runner = SelfEvolveTestRunner(tmp_path, shards=2)
+    files = {"tests/test_a.py", "tests/test_b.py"}
+
+    args = ["pytest", "--ignore", "tests/stress", "--cov", "src", "-q", "tests"]
+    assert runner._strip_test_paths(args, files) == args[:-1]
+    # An option value that names the tests themselves is ambiguous
+    assert runner._strip_test_paths(["pytest", "--rootdir", "tests"], files) is None
@@ -127,6 +127,218 @@ class TestTextInjector:
         except ImportError:
             pytest.skip("Text injection dependencies not installed")
 
+    @pytest.mark.unit
+    def test_auto_method_depends_on_text_length(self):
+        """AUTO types short texts and pastes long ones."""
+        from speech_recognition import InjectionMethod, TextInjector
+
+        with patch.object(TextInjector, "_check_xdotool", return_value=True):
+            injector = TextInjector(paste_threshold=10, use_xtest=False)
+
+        with patch("speech_recognition.text_injector.CLIPBOARD_AVAILABLE", True):
+            assert injector._select_method("short") == InjectionMethod.XDOTOOL_TYPE
+            assert (
+                injector._select_method("a much longer text")
+                == InjectionMethod.XDOTOOL_PASTE
+            )
+
+        with patch("speech_recognition.text_injector.CLIPBOARD_AVAILABLE", False):
+            assert (
+                injector._select_method("a much longer text")
+                == InjectionMethod.XDOTOOL_TYPE
+            )
+
+    @pytest.mark.unit
+    def test_injection_latency_stats(self):
+        """Injection latency is reported per method."""
+        from speech_recognition import InjectionMethod, TextInjector
+
+        with patch.object(TextInjector, "_check_xdotool", return_value=False):
+            injector = TextInjector(
+                method=InjectionMethod.CLIPBOARD_ONLY, use_xtest=False
+            )
+
+        with patch.object(
+            injector, "_inject_clipboard_only", side_effect=[True, False]
+        ):
+            assert injector.inject_text("hello")
+            assert not injector.inject_text("world")
+
+        stats = injector.get_injection_stats()["clipboard_only"]
+        assert stats["count"] == 2
+        assert stats["failures"] == 1
+        assert stats["avg_ms"] >= 0
+
+    @pytest.mark.unit
+    def test_wait_for_focus_returns_once_window_settles(self):
+        """Focus wait returns as soon as a new window is stable."""
+        from speech_recognition import TextInjector
+
+        with patch.object(TextInjector, "_check_xdotool", return_value=False):
+            injector = TextInjector(use_xtest=False, focus_timeout=5.0)
+
+        windows = iter(["overlay", "editor", "editor", "other"])
+        with patch.object(
+            injector, "get_active_window_id", side_effect=lambda: next(windows)
+        ):
+            result = injector.wait_for_focus(previous_window="overlay", poll_interval=0)
+
+        assert result == "editor"
+
+    @pytest.mark.unit
+    def test_wait_for_focus_without_window_info(self):
+        """Focus wait does not block when window info is unavailable."""
+        from speech_recognition import TextInjector
+
+        with patch.object(TextInjector, "_check_xdotool", return_value=False):
+            injector = TextInjector(use_xtest=False, focus_timeout=5.0)
+
+        assert injector.wait_for_focus(poll_interval=0) is None
+
+
+class FakeDisplay:
+    """Display with a fixed keymap: keycode -> keysyms per shift level."""
+
+    SHIFT_KEYCODE = 50
+
+    def __init__(self, keymap):
+        self.keymap = keymap
+        self.remaps = []
+
+    def keysym_to_keycodes(self, keysym):
+        matches = [
+            (keycode, index)
+            for keycode, keysyms in self.keymap.items()
+            for index, mapped in enumerate(keysyms)
+            if mapped == keysym
+        ]
+        return sorted(matches, key=lambda match: (match[1], match[0]))
+
+    def keysym_to_keycode(self, keysym):
+        return self.SHIFT_KEYCODE if keysym == 0xFFE1 else 0
+
+    def change_keyboard_mapping(self, keycode, keysyms):
+        self.remaps.append((keycode, keysyms))
+
+    def sync(self):
+        pass
+
+
+class FakeXTest:
+    def __init__(self):
+        self.events = []
+
+    def fake_input(self, display, event_type, keycode):
+        self.events.append((event_type, keycode))
+
+
+class TestXTestSession:
+    """Tests for typing through XTEST with a fake display."""
+
+    SCRATCH = 200
+    PRESS, RELEASE = 2, 3
+
+    def _session(self, keymap):
+        from speech_recognition.text_injector import XTestSession
+
+        session = XTestSession.__new__(XTestSession)
+        session.display = FakeDisplay(keymap)
+        session._scratch_keycode = self.SCRATCH
+        return session
+
+    def _type(self, session, text, **kwargs):
+        fake_xtest = FakeXTest()
+        fake_x = type("X", (), {"KeyPress": self.PRESS, "KeyRelease": self.RELEASE})
+        with (
+            patch("speech_recognition.text_injector.xtest", fake_xtest),
+            patch("speech_recognition.text_injector.X", fake_x),
+        ):
+            session.type_text(text, **kwargs)
+        return fake_xtest.events
+
+    @pytest.mark.unit
+    def test_shift_level_uses_existing_keycode(self):
+        """Levels 0 and 1 type on the mapped key, level 1 with Shift."""
+        session = self._session({38: [ord("a"), ord("A")]})
+
+        events = self._type(session, "aA")
+
+        shift = FakeDisplay.SHIFT_KEYCODE
+        assert events == [
+            (self.PRESS, 38),
+            (self.RELEASE, 38),
+            (self.PRESS, shift),
+            (self.PRESS, 38),
+            (self.RELEASE, 38),
+            (self.RELEASE, shift),
+        ]
+        assert session.display.remaps == []
+
+    @pytest.mark.unit
+    def test_altgr_level_uses_scratch_keycode(self):
+        """Characters at AltGr levels are typed on the scratch keycode."""
+        # Czech layout: "@" is AltGr+v, at level 2 of the v key
+        session = self._session({55: [ord("v"), ord("V"), ord("@"), 0]})
+
+        events = self._type(session, "@")
+
+        assert events == [(self.PRESS, self.SCRATCH), (self.RELEASE, self.SCRATCH)]
+        assert session.display.remaps == [
+            (self.SCRATCH, [(ord("@"), ord("@"))]),
+            (self.SCRATCH, [(0, 0)]),
+        ]
+
+    @pytest.mark.unit
+    def test_scratch_mapping_reset_when_typing_fails(self):
+        """The scratch keycode is unmapped even if typing raises."""
+        session = self._session({})
+
+        with patch.object(session, "_press", side_effect=RuntimeError("X error")):
+            with pytest.raises(RuntimeError):
+                self._type(session, "ř")
+
+        assert session.display.remaps[-1] == (self.SCRATCH, [(0, 0)])
+
+    @pytest.mark.unit
+    def test_injector_honours_typing_delay(self):
+        """The persistent session types with the configured delay."""
+        from unittest.mock import MagicMock
+
+        from speech_recognition import InjectionMethod, TextInjector
+
+        with patch.object(TextInjector, "_check_xdotool", return_value=False):
+            injector = TextInjector(
+                method=InjectionMethod.XDOTOOL_TYPE, typing_delay=7, use_xtest=False
+            )
+        injector.xtest_session = MagicMock()
+
+        assert injector.inject_text("ahoj")
+        injector.xtest_session.type_text.assert_called_once_with("ahoj", delay_ms=7)
+
+    @pytest.mark.unit
+    def test_failed_xtest_session_falls_back_with_remainder(self):
+        """Text already sent over XTEST is not retyped by xdotool."""
+        from unittest.mock import MagicMock
+
+        from speech_recognition import InjectionMethod, TextInjector
+
+        with patch.object(TextInjector, "_check_xdotool", return_value=True):
+            injector = TextInjector(
+                method=InjectionMethod.XDOTOOL_TYPE, typing_delay=7, use_xtest=False
+            )
+        session = MagicMock()
+        session.type_text.side_effect = RuntimeError("X connection lost")
+        session.typed_chars = 2
+        injector.xtest_session = session
+
+        with patch("speech_recognition.text_injector.subprocess.run") as run:
+            run.return_value.returncode = 0
+            assert injector.inject_text("ahoj")
+
+        assert run.call_args[0][0][-1] == "oj"
+        session.close.assert_called_once()
+        assert injector.xtest_session is None
+
 
 class TestHotkeyManager:
     """Tests for HotkeyManager class."""
@@ -322,6 +534,163 @@ class TestDictationApp:
             pytest.skip("App dependencies not installed")
 
 
+def _make_queued_app(**kwargs):
+    """Create a GlobalDictationApp with mocked audio, transcriber and injector."""
+    from speech_recognition import GlobalDictationApp
+
+    with (
+        patch("speech_recognition.dictation_app.AudioRecorder") as recorder_cls,
+        patch("speech_recognition.dictation_app.WhisperTranscriber") as transcriber_cls,
+        patch("speech_recognition.dictation_app.TextInjector") as injector_cls,
+    ):
+        recorder_cls.return_value.stop_recording.return_value = b"wav"
+        transcriber_cls.return_value.transcribe.return_value = "hello"
+        injector_cls.return_value.inject_text.return_value = True
+        injector_cls.return_value.get_injection_stats.return_value = {}
+        return GlobalDictationApp(enable_gui=False, enable_hotkeys=False, **kwargs)
+
+
+class TestDictationWorkerQueue:
+    """Tests for the transcription worker and job queue."""
+
+    @pytest.mark.unit
+    def test_worker_processes_queued_utterances(self):
+        """Recordings are transcribed by the worker and metrics are reported."""
+        from speech_recognition import AppState
+
+        delivered = []
+        app = _make_queued_app(mycoder_callback=delivered.append)
+        try:
+            for _ in range(2):
+                app.start_recording()
+                app.stop_recording()
+                app._jobs.join()
+
+            assert delivered == ["hello", "hello"]
+            assert app.state == AppState.IDLE
+            metrics = app.get_status()["transcription_queue"]
+            assert metrics["completed"] == 2
+            assert metrics["depth"] == 0
+        finally:
+            app.shutdown()
+
+    @pytest.mark.unit
+    def test_async_callbacks_share_persistent_loop(self):
+        """Coroutine callbacks run on one long-lived event loop."""
+        import asyncio
+
+        loops = []
+
+        async def callback(text):
+            loops.append(asyncio.get_running_loop())
+
+        app = _make_queued_app(mycoder_callback=callback)
+        try:
+            for _ in range(2):
+                app.start_recording()
+                app.stop_recording()
+                app._jobs.join()
+
+            assert len(loops) == 2
+            assert loops[0] is loops[1]
+        finally:
+            app.shutdown()
+        assert app._callback_loop is None
+
+    @pytest.mark.unit
+    def test_timed_out_async_callback_is_cancelled(self):
+        """A coroutine callback that overruns callback_timeout is cancelled."""
+        import asyncio
+        import threading
+
+        cancelled = threading.Event()
+
+        async def callback(text):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        app = _make_queued_app(mycoder_callback=callback, callback_timeout=0.05)
+        try:
+            app.start_recording()
+            app.stop_recording()
+            app._jobs.join()
+
+            assert cancelled.wait(2)
+        finally:
+            app.shutdown()
+
+    @pytest.mark.unit
+    def test_injection_waits_for_focus_to_leave_overlay(self):
+        """A focused overlay at recording start is passed to the focus wait."""
+        from unittest.mock import MagicMock
+
+        app = _make_queued_app()
+        app.overlay = MagicMock()
+        app.overlay.window_id.return_value = "overlay"
+        app.injector.get_active_window_id.return_value = "overlay"
+        try:
+            app.start_recording()
+            app.injector.get_active_window_id.return_value = "editor"
+            app.stop_recording()
+            app._jobs.join()
+
+            app.injector.wait_for_focus.assert_called_once_with(
+                previous_window="overlay"
+            )
+            app.injector.inject_text.assert_called_once_with("hello")
+        finally:
+            app.shutdown()
+
+    @pytest.mark.unit
+    def test_hotkey_recording_does_not_wait_for_target_to_lose_focus(self):
+        """The target editor focused at recording start is not a previous window."""
+        from unittest.mock import MagicMock
+
+        app = _make_queued_app()
+        app.overlay = MagicMock()
+        app.overlay.window_id.return_value = "overlay"
+        app.injector.get_active_window_id.return_value = "editor"
+        try:
+            app.start_recording()
+            app.stop_recording()
+            app._jobs.join()
+
+            app.injector.wait_for_focus.assert_called_once_with(previous_window=None)
+        finally:
+            app.shutdown()
+
+    @pytest.mark.unit
+    def test_full_queue_refuses_new_recording(self):
+        """New recordings are refused while the queue is full."""
+        import threading
+
+        from speech_recognition import AppState
+
+        release = threading.Event()
+        app = _make_queued_app(
+            mycoder_callback=lambda text: release.wait(5), max_queue_size=1
+        )
+        try:
+            app.start_recording()
+            app.stop_recording()  # picked up by the worker, which then blocks
+            while not app._jobs.empty():
+                pass
+            app.start_recording()
+            app.stop_recording()  # waits in the queue
+
+            app.start_recording()
+
+            assert app.state != AppState.RECORDING
+            assert app.get_queue_metrics()["rejected"] == 1
+            assert app.get_queue_metrics()["depth"] == 1
+        finally:
+            release.set()
+            app.shutdown()
+
+
 class TestButtonState:
     """Tests for button state enum."""
 
@@ -1,8 +1,10 @@
 import asyncio
+import json
+import re
 import unittest
 from unittest.mock import MagicMock, patch
 
-from mycoder.api_providers import APIProviderType, APIResponse
+from mycoder.api_providers import APIProviderType, APIResponse, BatchResult
 from mycoder.triage_agent import main as triage_main
 from mycoder.triage_agent import triage_issues_with_llm
 
@@ -208,6 +210,43 @@ class TestTriageAgent(unittest.TestCase):
         self.assertNotIn("Final Command Construction", prompt_sent)
         self.assertIn(github_env_val, prompt_sent)
 
+    @patch("mycoder.triage_agent.APIProviderRouter")
+    @patch("mycoder.triage_agent.ContextManager")
+    def test_large_backlog_uses_query_batch(self, mock_ctx_mgr, mock_router_cls):
+        mock_ctx = MagicMock()
+        mock_ctx.config = {"triage_batch_size": 2}
+        mock_ctx_mgr.return_value.get_context.return_value = mock_ctx
+
+        mock_router_instance = mock_router_cls.return_value
+        mock_router_instance.fallback_chain = [APIProviderType.OLLAMA_LOCAL]
+
+        async def mock_query_batch(prompts, **kwargs):
+            # Complete in reverse order; results must come back in issue order
+            for index in reversed(range(len(prompts))):
+                numbers = re.findall(r'"number": (\d+)', prompts[index])
+                content = json.dumps(
+                    [{"issue_number": int(n), "labels_to_set": []} for n in numbers]
+                )
+                yield BatchResult(
+                    index,
+                    prompts[index],
+                    APIResponse(
+                        success=True,
+                        content=content,
+                        provider=APIProviderType.OLLAMA_LOCAL,
+                    ),
+                )
+
+        mock_router_instance.query_batch.side_effect = mock_query_batch
+
+        issues = [{"number": n, "title": f"Issue {n}"} for n in range(1, 6)]
+        results = asyncio.run(triage_issues_with_llm(issues, self.available_labels))
+
+        prompts = mock_router_instance.query_batch.call_args.args[0]
+        self.assertEqual(len(prompts), 3)
+        self.assertEqual([r["issue_number"] for r in results], [1, 2, 3, 4, 5])
+        mock_router_instance.query.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,214 @@
+"""Unit tests for the usage ledger and budget policies."""
+
+import time
+from typing import Any, Dict
+from unittest.mock import MagicMock
+
+import pytest
+
+from mycoder.api_providers import (
+    APIProviderConfig,
+    APIProviderRouter,
+    APIProviderStatus,
+    APIProviderType,
+    APIResponse,
+    BaseAPIProvider,
+    BudgetPolicy,
+    UsageLedger,
+    UsageRecord,
+)
+
+
+class CostProvider(BaseAPIProvider):
+    """Provider returning a fixed cost per call."""
+
+    def __init__(self, config: APIProviderConfig, cost: float, model: str):
+        super().__init__(config)
+        self.cost = cost
+        self.model = model
+        self.calls = 0
+
+    async def query(
+        self, prompt: str, context: Dict[str, Any] = None, **kwargs
+    ) -> APIResponse:
+        self.calls += 1
+        return APIResponse(
+            success=True,
+            content=f"ok:{self.config.provider_type.value}",
+            provider=self.config.provider_type,
+            cost=self.cost,
+            tokens_used=100,
+        )
+
+    async def health_check(self) -> APIProviderStatus:
+        return APIProviderStatus.HEALTHY
+
+
+def _router(ledger, policy):
+    claude = CostProvider(
+        APIProviderConfig(provider_type=APIProviderType.CLAUDE_ANTHROPIC),
+        cost=0.6,
+        model="claude-3-5-sonnet",
+    )
+    ollama = CostProvider(
+        APIProviderConfig(provider_type=APIProviderType.OLLAMA_LOCAL),
+        cost=0.0,
+        model="tinyllama",
+    )
+    router = APIProviderRouter([], usage_ledger=ledger, budget_policy=policy)
+    router.providers = [claude, ollama]
+    router.fallback_chain = [p.config.provider_type for p in router.providers]
+    return router, claude, ollama
+
+
+class TestUsageLedger:
+    def test_record_and_summary(self, tmp_path):
+        ledger = UsageLedger(tmp_path / "usage.db")
+        ledger.record(
+            UsageRecord("gemini", "gemini-1.5-pro", "s1", cost=0.2, tokens=50)
+        )
+        ledger.record(
+            UsageRecord("gemini", "gemini-1.5-pro", "s2", cost=0.3, tokens=70)
+        )
+        ledger.record(
+            UsageRecord("ollama_local", "tinyllama", "s1", tokens=10, success=False)
+        )
+
+        rows = ledger.summary(group_by=("provider",))
+        by_provider = {row["provider"]: row for row in rows}
+        assert by_provider["gemini"]["requests"] == 2
+        assert by_provider["gemini"]["cost"] == pytest.approx(0.5)
+        assert by_provider["ollama_local"]["failures"] == 1
+        assert ledger.session_cost("s1") == pytest.approx(0.2)
+
+    def test_totals_survive_restart(self, tmp_path):
+        db_path = tmp_path / "usage.db"
+        UsageLedger(db_path).record(UsageRecord("openai", "gpt-4o", "s1", cost=1.25))
+
+        reopened = UsageLedger(db_path)
+        assert reopened.session_cost("s1") == pytest.approx(1.25)
+        assert reopened.day_cost() == pytest.approx(1.25)
+
+    def test_totals_include_other_processes_after_ttl(self, tmp_path):
+        db_path = tmp_path / "usage.db"
+        ci_job = UsageLedger(db_path, totals_ttl=0.05)
+        assert ci_job.day_cost() == 0
+
+        UsageLedger(db_path).record(UsageRecord("openai", "gpt-4o", "s2", cost=3.0))
+        assert ci_job.day_cost() == 0  # cached
+
+        time.sleep(0.06)
+        assert ci_job.day_cost() == pytest.approx(3.0)
+
+    def test_invalid_group_by(self, tmp_path):
+        with pytest.raises(ValueError):
+            UsageLedger(tmp_path / "usage.db").summary(group_by=("cost",))
+
+    @pytest.mark.asyncio
+    async def test_async_record_is_flushed(self, tmp_path):
+        ledger = UsageLedger(tmp_path / "usage.db")
+        for _ in range(5):
+            ledger.record(UsageRecord("gemini", "g", "s1", cost=0.1))
+        await ledger.flush()
+
+        fresh = UsageLedger(tmp_path / "usage.db")
+        assert fresh.summary(group_by=("session_id",))[0]["requests"] == 5
+
+
+class TestBudgetPolicy:
+    def test_free_providers_never_blocked(self, tmp_path):
+        ledger = UsageLedger(tmp_path / "usage.db")
+        ledger.record(UsageRecord("gemini", "g", "s1", cost=5.0))
+        policy = BudgetPolicy(session_limit_usd=1.0)
+
+        assert policy.check("ollama_local", "s1", ledger) == (True, None)
+        allowed, reason = policy.check("gemini", "s1", ledger)
+        assert not allowed
+        assert "session budget" in reason
+
+    def test_from_config(self):
+        policy = BudgetPolicy.from_config(
+            {"daily_budget_usd": 3, "expensive_providers": ["claude_anthropic"]}
+        )
+        assert policy.daily_limit_usd == 3
+        assert policy.is_expensive("claude_anthropic")
+        assert not policy.is_expensive("gemini")
+
+    @pytest.mark.asyncio
+    async def test_router_skips_expensive_provider_after_budget(self, tmp_path):
+        ledger = UsageLedger(tmp_path / "usage.db")
+        router, claude, ollama = _router(ledger, BudgetPolicy(session_limit_usd=1.0))
+        context = {"session_id": "ci-run"}
+
+        first = await router.query("a", context=context)
+        second = await router.query("b", context=context)
+        assert first.provider == second.provider == APIProviderType.CLAUDE_ANTHROPIC
+
+        third = await router.query("c", context=context)
+        assert third.provider == APIProviderType.OLLAMA_LOCAL
+        assert (
+            "session budget" in third.metadata["attempted_errors"]["claude_anthropic"]
+        )
+        assert claude.calls == 2
+
+        # Other sessions keep their own budget
+        other = await router.query("d", context={"session_id": "other"})
+        assert other.provider == APIProviderType.CLAUDE_ANTHROPIC
+
+        await ledger.flush()
+        rows = router.get_usage_summary(group_by=("provider", "model"))
+        assert {row["model"] for row in rows} == {"claude-3-5-sonnet", "tinyllama"}
+
+    @pytest.mark.asyncio
+    async def test_budget_check_reads_totals_off_the_loop(self, tmp_path):
+        import threading
+
+        UsageLedger(tmp_path / "usage.db").record(
+            UsageRecord("claude_anthropic", "sonnet", "s1", cost=0.4)
+        )
+        ledger = UsageLedger(tmp_path / "usage.db")
+        readers = []
+        sum_cost = ledger._sum_cost
+
+        def tracking_sum(*args):
+            readers.append(threading.current_thread())
+            return sum_cost(*args)
+
+        ledger._sum_cost = tracking_sum
+        router, _, _ = _router(ledger, BudgetPolicy(session_limit_usd=0.5))
+
+        assert (
+            await router._check_budget(APIProviderType.CLAUDE_ANTHROPIC, "s1") is None
+        )
+        assert len(readers) == 2
+        assert threading.main_thread() not in readers
+
+        await router._check_budget(APIProviderType.CLAUDE_ANTHROPIC, "s1")
+        assert len(readers) == 2
+
+    @pytest.mark.asyncio
+    async def test_router_without_ledger_records_nothing(self):
+        router, _, _ = _router(None, None)
+        response = await router.query("a")
+        assert response.success
+        assert router.get_usage_summary() == []
+
+
+def test_usage_command_renders_table(tmp_path):
+    from mycoder.cli_interactive import InteractiveCLI
+
+    ledger = UsageLedger(tmp_path / "usage.db")
+    router, _, _ = _router(ledger, BudgetPolicy(daily_limit_usd=10.0))
+    ledger.record(
+        UsageRecord("claude_anthropic", "sonnet", router.session_id, cost=0.5)
+    )
+
+    cli = InteractiveCLI.__new__(InteractiveCLI)
+    cli.coder = MagicMock(provider_router=router)
+    cli.console = MagicMock()
+    cli._show_usage(["session"])
+
+    printed = [call.args[0] for call in cli.console.print.call_args_list]
+    assert printed[0].row_count == 1
+    assert "$0.5000" in printed[1]
+    assert "/ $10.00" in printed[1]
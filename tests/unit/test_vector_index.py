@@ -0,0 +1,189 @@
+"""Tests for the local vector index and semantic recall."""
+
+import random
+
+import pytest
+
+from mycoder.local_mcp_server import LocalMemoryStore
+from mycoder.storage import StorageManager
+from mycoder.vector_index import (
+    NUMPY_AVAILABLE,
+    HashingEmbedder,
+    VectorIndex,
+    create_embedder,
+)
+
+BACKENDS = [
+    pytest.param(False, id="python"),
+    pytest.param(
+        True,
+        id="numpy",
+        marks=pytest.mark.skipif(not NUMPY_AVAILABLE, reason="NumPy not installed"),
+    ),
+]
+
+
+def test_hashing_embedder_is_normalized_and_morphology_aware():
+    embedder = HashingEmbedder(dim=128)
+    tests, testing, docker = embedder.embed(["unit tests", "unit testing", "docker"])
+
+    def cosine(a, b):
+        return sum(x * y for x, y in zip(a, b))
+
+    assert len(tests) == 128
+    assert cosine(tests, tests) == pytest.approx(1.0)
+    assert cosine(tests, testing) > cosine(tests, docker)
+    assert embedder.embed(["Použij"]) == embedder.embed(["pouzij"])
+    assert embedder.embed([""])[0] == [0.0] * 128
+
+
+def test_create_embedder_falls_back_to_hashing(monkeypatch):
+    monkeypatch.setenv("MYCODER_EMBEDDING_MODEL", "no-such-model")
+    assert isinstance(create_embedder(), HashingEmbedder)
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_index_finds_nearest_and_persists(tmp_path, use_numpy):
+    path = tmp_path / "vectors"
+    index = VectorIndex(path, use_numpy=use_numpy)
+    index.add([3, 7], ["deploy docker containers", "run the pytest suite"])
+    index.add([9], ["write release notes"])
+
+    assert index.search("running tests", 1)[0][0] == 7
+    assert [i for i, _ in index.search("running tests", 5, min_score=0.15)] == [7]
+    assert index.max_id == 9
+
+    reopened = VectorIndex(path, use_numpy=use_numpy)
+    assert len(reopened) == 3
+    assert reopened.search("docker deployment", 1)[0][0] == 3
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_search_restricted_to_ids(tmp_path, use_numpy):
+    index = VectorIndex(tmp_path / "vectors", use_numpy=use_numpy)
+    index.add([1, 2, 3], ["run the pytest suite", "pytest tests", "docker notes"])
+
+    assert [i for i, _ in index.search("pytest", 1, ids=[3])] == [3]
+    assert [i for i, _ in index.search("pytest", 5, ids={1, 3})] == [1, 3]
+    assert index.search("pytest", 5, ids=[42]) == []
+
+
+def test_index_rebuilds_when_embedder_changes(tmp_path):
+    path = tmp_path / "vectors"
+    VectorIndex(path, HashingEmbedder(dim=64)).add([1], ["hello"])
+
+    assert len(VectorIndex(path, HashingEmbedder(dim=64))) == 1
+    assert len(VectorIndex(path, HashingEmbedder(dim=32))) == 0
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="NumPy not installed")
+def test_ivf_search_matches_exact_neighbours(tmp_path):
+    rng = random.Random(3)
+    words = [f"word{i}" for i in range(300)]
+    texts = [" ".join(rng.choices(words, k=8)) for _ in range(2000)]
+    index = VectorIndex(tmp_path / "vectors", ivf_threshold=1000, nprobe=6)
+    index.add(range(1, 1001), texts[:1000])
+    index.search("warm up", 1)
+    # Rows added after training are assigned to existing lists
+    index.add(range(1001, 2001), texts[1000:])
+
+    hits = [index.search(texts[i], 1)[0][0] for i in range(0, 2000, 50)]
+    assert index.stats()["ivf_lists"] > 1
+    assert hits == list(range(1, 2001, 50))
+
+
+def test_memory_store_semantic_and_hybrid_search(tmp_path):
+    store = LocalMemoryStore(tmp_path, compact_every=0)
+    store.extend(
+        [
+            {"content": "run the unit tests with pytest"},
+            {"content": "deploy containers via docker compose"},
+        ]
+    )
+
+    # No shared word, so keyword search misses what semantic search finds
+    assert store.search("testing", 5) == []
+    (hit,) = store.semantic_search("testing", 5)
+    assert hit["content"] == "run the unit tests with pytest"
+    assert hit["score"] > 0
+
+    store.append({"content": "Kubernetes deployment notes"})
+    assert [m["content"] for m in store.hybrid_search("deployment", 2)] == [
+        "Kubernetes deployment notes",
+        "deploy containers via docker compose",
+    ]
+    store.close()
+
+
+def test_memory_store_drops_vectors_of_compacted_memories(tmp_path):
+    store = LocalMemoryStore(tmp_path, max_entries=1, compact_every=0)
+    store.extend(
+        [
+            {"content": "docker compose notes", "importance": 0.1},
+            {"content": "docker swarm notes", "importance": 0.9},
+        ]
+    )
+    assert len(store.semantic_search("docker", 5)) == 2
+
+    store.compact()
+
+    assert [m["content"] for m in store.semantic_search("docker", 5)] == [
+        "docker swarm notes"
+    ]
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_storage_search_history(tmp_path):
+    storage = StorageManager(tmp_path)
+    try:
+        await storage.save_interaction("a", "user", "How do I run the unit tests?")
+        await storage.save_interaction("b", "user", "Deploy with docker compose")
+
+        results = await storage.search_history("running unit tests", limit=5)
+        assert results[0]["content"] == "How do I run the unit tests?"
+        assert results[0]["session_id"] == "a"
+
+        # Indexed incrementally once the index is open
+        await storage.save_interaction("a", "assistant", "Use pytest to test it")
+        results = await storage.search_history("tests", limit=5, session_id="a")
+        assert [r["content"] for r in results] == [
+            "How do I run the unit tests?",
+            "Use pytest to test it",
+        ]
+        results = await storage.search_history("docker deployment", session_id="b")
+        assert [r["content"] for r in results] == ["Deploy with docker compose"]
+
+        # Closer matches in other sessions do not crowd out this session's
+        for _ in range(20):
+            await storage.save_interaction("c", "user", "docker compose up")
+        results = await storage.search_history("docker compose", 1, session_id="b")
+        assert [r["content"] for r in results] == ["Deploy with docker compose"]
+    finally:
+        await storage.close()
+
+@pytest.mark.asyncio
+async def test_continued_session_recalls_related_history(enhanced_mycoder):
+    storage = enhanced_mycoder.storage_manager
+    enhanced_mycoder.config["history_recall"] = {"enabled": True}
+    try:
+        await storage.save_interaction("a", "user", "How do I run the unit tests?")
+        await storage.save_interaction("b", "user", "Run the tests in docker")
+
+        context = await enhanced_mycoder._prepare_enhanced_context(
+            prompt="running unit tests", session_id="a", continue_session=True
+        )
+        assert context["memory_context"] == "[user] How do I run the unit tests?"
+
+        context = await enhanced_mycoder._prepare_enhanced_context(
+            prompt="running unit tests", session_id="a"
+        )
+        assert "memory_context" not in context
+
+        enhanced_mycoder.config["history_recall"] = {"enabled": False}
+        context = await enhanced_mycoder._prepare_enhanced_context(
+            prompt="running unit tests", session_id="a", continue_session=True
+        )
+        assert "memory_context" not in context
+    finally:
+        await storage.close()